@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from functools import lru_cache
 
 from fastapi import Depends
@@ -5,23 +6,30 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import AsyncSessionLocal
 from app.application.use_cases.create_reservation_intent import CreateReservationIntentUseCase
+from app.application.use_cases.drain_outbox_book_supplier import DrainOutboxBookSupplierUseCase
+from app.application.use_cases.get_outbox_metrics import GetOutboxMetricsUseCase
 from app.application.use_cases.get_receipt import GetReceiptUseCase
 from app.application.use_cases.handle_stripe_webhook import HandleStripeWebhookUseCase
 from app.application.use_cases.pay_reservation import PayReservationUseCase
 from app.application.use_cases.process_outbox_book_supplier import ProcessOutboxBookSupplierUseCase
+from app.application.use_cases.replay_dead_letters import ReplayDeadLettersUseCase
 from app.config import Settings, get_settings
+from app.infrastructure.circuit_breaker import get_supplier_breakers
 from app.infrastructure.db.queries.receipt_query_sql import ReceiptQuerySQL
+from app.infrastructure.db.repositories.dlq_replay_repo_sql import DlqReplayRepoSQL
 from app.infrastructure.db.repositories.idempotency_repo_sql import IdempotencyRepoSQL
-from app.infrastructure.db.repositories.outbox_repo_sql import OutboxRepoSQL
+from app.infrastructure.db.repositories.outbox_repo_sql import OutboxRepoSQL, ScopedOutboxRepoSQL
 from app.infrastructure.db.repositories.payment_repo_sql import PaymentRepoSQL
 from app.infrastructure.db.repositories.reservation_repo_sql import ReservationRepoSQL
 from app.infrastructure.db.repositories.supplier_request_repo_sql import SupplierRequestRepoSQL
 from app.infrastructure.db.transaction_manager import SQLAlchemyTransactionManager
-from app.infrastructure.gateways.america_group_gateway import AmericaGroupGateway
-from app.infrastructure.gateways.factory import SupplierGatewayFactory
 from app.infrastructure.gateways.stripe_gateway_real import StripeGatewayReal
-from app.infrastructure.gateways.supplier_gateway_http import SupplierGatewayHTTP
-from app.infrastructure.gateways.supplier_gateway_selector import SupplierGatewaySelector
+from app.infrastructure.gateways.supplier_gateway_selector import (
+    SupplierGatewaySelector,
+    get_supplier_gateway_registry,
+)
+from app.infrastructure.gateways.supplier_limiter import get_supplier_limiters
+from app.infrastructure.gateways.in_memory.dlq_replay_repo import InMemoryDlqReplayRepo
 from app.infrastructure.gateways.in_memory.idempotency_repo import InMemoryIdempotencyRepo
 from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
 from app.infrastructure.gateways.in_memory.payment_repo import InMemoryPaymentRepo
@@ -31,6 +39,9 @@ from app.infrastructure.gateways.in_memory.stripe_gateway import StubStripeGatew
 from app.infrastructure.gateways.in_memory.supplier_gateway import StubSupplierGateway
 from app.infrastructure.gateways.in_memory.supplier_request_repo import InMemorySupplierRequestRepo
 from app.infrastructure.gateways.in_memory.transaction_manager import NoopTransactionManager
+from app.infrastructure.messaging.book_supplier import book_supplier_use_case_scope
+from app.infrastructure.messaging.metrics import MetricsSnapshotStore, outbox_metrics
+from app.infrastructure.messaging.notifier import get_outbox_notifier
 
 
 async def get_session(settings: Settings = Depends(get_settings)) -> AsyncSession | None:
@@ -46,7 +57,7 @@ def _in_memory_bundle():
     idempotency_repo = InMemoryIdempotencyRepo()
     reservation_repo = InMemoryReservationRepo()
     payment_repo = InMemoryPaymentRepo()
-    outbox_repo = InMemoryOutboxRepo()
+    outbox_repo = InMemoryOutboxRepo(reservation_repo=reservation_repo)
     supplier_request_repo = InMemorySupplierRequestRepo()
     stripe_gateway = StubStripeGateway()
     tx_manager = NoopTransactionManager()
@@ -66,6 +77,7 @@ def _in_memory_bundle():
         "tx_manager": tx_manager,
         "receipt_query": receipt_query,
         "supplier_selector": supplier_selector,
+        "dlq_replay_repo": InMemoryDlqReplayRepo(outbox_repo),
     }
 
 
@@ -102,6 +114,7 @@ def get_use_cases(
                 stripe_gateway=bundle["stripe_gateway"],
                 outbox_repo=bundle["outbox_repo"],
                 transaction_manager=bundle["tx_manager"],
+                outbox_notifier=get_outbox_notifier(),
             ),
             "handle_webhook": HandleStripeWebhookUseCase(
                 payment_repo=bundle["payment_repo"],
@@ -109,6 +122,8 @@ def get_use_cases(
                 outbox_repo=bundle["outbox_repo"],
                 stripe_gateway=bundle["stripe_gateway"],
                 stripe_webhook_secret=settings.stripe_webhook_secret,
+                transaction_manager=bundle["tx_manager"],
+                outbox_notifier=get_outbox_notifier(),
             ),
             "get_receipt": GetReceiptUseCase(receipt_query=bundle["receipt_query"]),
             "process_outbox": ProcessOutboxBookSupplierUseCase(
@@ -116,6 +131,7 @@ def get_use_cases(
                 reservation_repo=bundle["reservation_repo"],
                 supplier_gateway_selector=bundle["supplier_selector"],
                 supplier_request_repo=bundle["supplier_request_repo"],
+                transaction_manager=bundle["tx_manager"],
             ),
         }
 
@@ -130,57 +146,7 @@ def get_use_cases(
     stripe_gateway = StripeGatewayReal(api_key=settings.stripe_api_key)
     tx_manager = SQLAlchemyTransactionManager(session)
     receipt_query = ReceiptQuerySQL(session)
-    default_supplier_gateway = StubSupplierGateway()
-    
-    # Configuración preliminar para la Factory (se debe expandir Settings en el futuro)
-    factory_config = {
-        "avis": {"endpoint": settings.supplier_base_url},
-        "europcargroup": {"endpoint": settings.supplier_base_url},
-        "americagroup": {
-            "endpoint": settings.americagroup_endpoint,
-            "requestor_id": settings.americagroup_requestor_id,
-            "timeout_seconds": settings.americagroup_timeout_seconds,
-            "retry_times": settings.americagroup_retry_times,
-            "retry_sleep_ms": settings.americagroup_retry_sleep_ms,
-        },
-        # Placeholders para nuevos proveedores (requieren variables de entorno reales)
-        "hertzargentina": {"base_url": "https://hertz.test"},
-        "infinity": {"endpoint": "https://infinity.test"},
-        "localiza": {"endpoint": "https://localiza.test"},
-        "mexgroup": {"endpoint": "https://mex.test"},
-        "nationalgroup": {"endpoint": "https://national.test"},
-        "nizacars": {"base_url": "https://niza.test"},
-        "noleggiare": {"endpoint": "https://noleggiare.test"},
-    }
-    
-    gateway_factory = SupplierGatewayFactory(config=factory_config)
-    
-    selector = SupplierGatewaySelector(
-        default_gateway=default_supplier_gateway,
-        factory=gateway_factory
-    )
-    
-    if settings.supplier_base_url:
-        selector.register(
-            supplier_id=0,  # fallback mapping; real mappings deberían ser específicos
-            country_code="*",
-            gateway=SupplierGatewayHTTP(
-                base_url=settings.supplier_base_url,
-                timeout_seconds=settings.supplier_timeout_seconds,
-            ),
-        )
-    if settings.americagroup_endpoint:
-        selector.register(
-            supplier_id=32,  # America Group
-            country_code="MX",
-            gateway=AmericaGroupGateway(
-                endpoint=settings.americagroup_endpoint,
-                requestor_id=settings.americagroup_requestor_id or "13",
-                timeout_seconds=settings.americagroup_timeout_seconds,
-                retry_times=settings.americagroup_retry_times,
-                retry_sleep_ms=settings.americagroup_retry_sleep_ms,
-            ),
-        )
+    selector = get_supplier_gateway_registry()
 
     return {
         "create_reservation": CreateReservationIntentUseCase(
@@ -196,6 +162,7 @@ def get_use_cases(
             stripe_gateway=stripe_gateway,
             outbox_repo=outbox_repo,
             transaction_manager=tx_manager,
+            outbox_notifier=get_outbox_notifier(),
         ),
         "handle_webhook": HandleStripeWebhookUseCase(
             payment_repo=payment_repo,
@@ -203,6 +170,8 @@ def get_use_cases(
             outbox_repo=outbox_repo,
             stripe_gateway=stripe_gateway,
             stripe_webhook_secret=settings.stripe_webhook_secret,
+            transaction_manager=tx_manager,
+            outbox_notifier=get_outbox_notifier(),
         ),
         "get_receipt": GetReceiptUseCase(receipt_query=receipt_query),
         "process_outbox": ProcessOutboxBookSupplierUseCase(
@@ -210,5 +179,67 @@ def get_use_cases(
             reservation_repo=reservation_repo,
             supplier_gateway_selector=selector,
             supplier_request_repo=supplier_request_repo,
+            transaction_manager=tx_manager,
+            booking_budget_seconds=settings.supplier_booking_budget_seconds,
         ),
     }
+
+
+def get_drain_use_case(
+    settings: Settings = Depends(get_settings),
+) -> DrainOutboxBookSupplierUseCase:
+    """Drain en bloque: cada evento usa su propia sesión, no la del request."""
+    if settings.use_in_memory:
+        bundle = _in_memory_bundle()
+
+        @asynccontextmanager
+        async def in_memory_scope():
+            yield ProcessOutboxBookSupplierUseCase(
+                outbox_repo=bundle["outbox_repo"],
+                reservation_repo=bundle["reservation_repo"],
+                supplier_gateway_selector=bundle["supplier_selector"],
+                supplier_request_repo=bundle["supplier_request_repo"],
+                transaction_manager=bundle["tx_manager"],
+            )
+
+        return DrainOutboxBookSupplierUseCase(
+            outbox_repo=bundle["outbox_repo"], use_case_scope=in_memory_scope
+        )
+
+    return DrainOutboxBookSupplierUseCase(
+        outbox_repo=ScopedOutboxRepoSQL(AsyncSessionLocal),
+        use_case_scope=book_supplier_use_case_scope(
+            AsyncSessionLocal,
+            get_supplier_gateway_registry(),
+            booking_budget_seconds=settings.supplier_booking_budget_seconds,
+        ),
+    )
+
+
+def get_outbox_metrics_use_case(
+    settings: Settings = Depends(get_settings),
+) -> GetOutboxMetricsUseCase:
+    if settings.use_in_memory:
+        outbox_repo = _in_memory_bundle()["outbox_repo"]
+    else:
+        outbox_repo = ScopedOutboxRepoSQL(AsyncSessionLocal)
+    return GetOutboxMetricsUseCase(
+        outbox_repo=outbox_repo,
+        metrics=outbox_metrics,
+        breakers=get_supplier_breakers(),
+        limiters=get_supplier_limiters(),
+        snapshot_store=MetricsSnapshotStore(settings.outbox_metrics_dir)
+        if settings.outbox_metrics_dir
+        else None,
+    )
+
+
+def get_dlq_replay_use_case(
+    settings: Settings = Depends(get_settings),
+) -> ReplayDeadLettersUseCase:
+    """Replay del DLQ: cada lote abre su propia transacción, no usa la sesión del request."""
+    if settings.use_in_memory:
+        replay_repo = _in_memory_bundle()["dlq_replay_repo"]
+    else:
+        replay_repo = DlqReplayRepoSQL(AsyncSessionLocal)
+    return ReplayDeadLettersUseCase(replay_repo=replay_repo)
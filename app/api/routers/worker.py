@@ -1,13 +1,127 @@
-from typing import Annotated
+from dataclasses import asdict
+from datetime import datetime
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
 
-from app.api.dependencies import get_use_cases
-from app.infrastructure.db.retry import retry_on_deadlock
+from app.api.dependencies import (
+    get_dlq_replay_use_case,
+    get_drain_use_case,
+    get_outbox_metrics_use_case,
+    get_use_cases,
+)
+from app.application.interfaces.dlq_replay_repo import DeadLetterFilter
+from app.application.use_cases.drain_outbox_book_supplier import DrainOutboxBookSupplierUseCase
+from app.application.use_cases.get_outbox_metrics import GetOutboxMetricsUseCase
+from app.application.use_cases.replay_dead_letters import ReplayDeadLettersUseCase
+from app.config import Settings, get_settings
+from app.infrastructure.messaging.metrics import render_prometheus
 
 router = APIRouter()
 
 
+@router.get("/workers/outbox/metrics", status_code=status.HTTP_200_OK)
+async def outbox_metrics(
+    metrics: Annotated[GetOutboxMetricsUseCase, Depends(get_outbox_metrics_use_case)],
+    output: Literal["json", "prometheus"] = Query(default="json", alias="format"),
+):
+    """
+    Outbox/DLQ metrics: pending counts per event_type and supplier, age of the
+    oldest ready event and DLQ inflow (from the database), plus claim latency /
+    handler duration histograms summed over the worker processes that publish to
+    OUTBOX_METRICS_DIR ("worker" is null when none has reported).
+    `format=prometheus` returns the text exposition format.
+    """
+    report = await metrics.execute()
+    if output == "prometheus":
+        return PlainTextResponse(render_prometheus(report), media_type="text/plain; version=0.0.4")
+    return report
+
+
+@router.post("/workers/outbox/dlq/replays", status_code=status.HTTP_202_ACCEPTED)
+async def start_dlq_replay(
+    background_tasks: BackgroundTasks,
+    replays: Annotated[ReplayDeadLettersUseCase, Depends(get_dlq_replay_use_case)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    supplier_id: int | None = Query(default=None, alias="supplier-id"),
+    error_code: str | None = Query(default=None, alias="error-code"),
+    event_type: str | None = Query(default=None, alias="event-type"),
+    moved_from: datetime | None = Query(default=None, alias="moved-from"),
+    moved_to: datetime | None = Query(default=None, alias="moved-to"),
+    rate: float | None = Query(default=None, gt=0, le=1000),
+    batch_size: int | None = Query(default=None, alias="batch-size", ge=1, le=1000),
+) -> dict:
+    """
+    Re-enqueue dead letters matching the filters (supplier, error_code, event
+    type, moved_at range) at `rate` events/s, in the background.
+
+    Returns the replay record; poll GET /workers/outbox/dlq/replays/{id} for
+    progress and POST .../{id}/resume if the process was interrupted.
+    """
+    replay = await replays.start(
+        DeadLetterFilter(
+            supplier_id=supplier_id,
+            error_code=error_code,
+            event_type=event_type,
+            moved_from=moved_from,
+            moved_to=moved_to,
+        ),
+        rate_per_second=rate or settings.outbox_dlq_replay_rate_per_second,
+        batch_size=batch_size or settings.outbox_dlq_replay_batch_size,
+    )
+    background_tasks.add_task(replays.run, replay.id)
+    return asdict(replay)
+
+
+@router.get("/workers/outbox/dlq/replays/{replay_id}", status_code=status.HTTP_200_OK)
+async def get_dlq_replay(
+    replay_id: int,
+    replays: Annotated[ReplayDeadLettersUseCase, Depends(get_dlq_replay_use_case)],
+) -> dict:
+    return asdict(await replays.get(replay_id))
+
+
+@router.post(
+    "/workers/outbox/dlq/replays/{replay_id}/resume", status_code=status.HTTP_202_ACCEPTED
+)
+async def resume_dlq_replay(
+    replay_id: int,
+    background_tasks: BackgroundTasks,
+    replays: Annotated[ReplayDeadLettersUseCase, Depends(get_dlq_replay_use_case)],
+) -> dict:
+    """Continue an interrupted or failed replay after its last committed batch."""
+    replay = await replays.resume(replay_id)
+    background_tasks.add_task(replays.run, replay.id)
+    return asdict(replay)
+
+
+# Declared before /book-supplier/{reservation_code} so "drain" is not taken as a code
+@router.post(
+    "/workers/outbox/book-supplier/drain",
+    status_code=status.HTTP_200_OK,
+)
+async def drain_outbox_book_supplier(
+    drain: Annotated[DrainOutboxBookSupplierUseCase, Depends(get_drain_use_case)],
+    limit: int = Query(default=100, ge=1, le=5000),
+    supplier_id: int | None = Query(default=None, alias="supplier-id"),
+    concurrency: int = Query(default=8, ge=1, le=64),
+    worker_id: str | None = Query(default=None, alias="worker-id"),
+) -> dict:
+    """
+    Book up to `limit` ready BOOK_SUPPLIER events in one call (e.g. after a supplier outage).
+
+    Returns one outcome per event (status, attempts, error, elapsed_ms) plus
+    aggregate counts and timing. Call repeatedly until `claimed` is 0.
+    """
+    return await drain.execute(
+        limit=limit,
+        supplier_id=supplier_id,
+        concurrency=concurrency,
+        worker_id=worker_id,
+    )
+
+
 @router.post(
     "/workers/outbox/book-supplier/{reservation_code}",
     status_code=status.HTTP_200_OK,
@@ -19,9 +133,10 @@ async def process_outbox_book_supplier(
     worker_id: str | None = Query(default=None, alias="worker-id"),
 ) -> dict:
     """
-    Process outbox event for supplier booking with automatic deadlock retry.
+    Process outbox event for supplier booking.
 
-    Handles concurrent outbox processing safely with retry logic.
+    The use case retries its result-recording transaction on deadlock; the
+    supplier call itself is never repeated here.
     """
     if not idem_key:
         raise HTTPException(
@@ -29,13 +144,10 @@ async def process_outbox_book_supplier(
             detail="Idem key required for supplier booking",
         )
 
-    async def execute_outbox():
+    try:
         return await use_cases["process_outbox"].execute(
             reservation_code=reservation_code, idem_key=idem_key, worker_id=worker_id or "worker-1"
         )
-
-    try:
-        return await retry_on_deadlock(execute_outbox, max_attempts=3, base_delay=0.1)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,79 @@
+"""
+Time budget for one supplier booking, propagated to the gateways.
+
+ProcessOutboxBookSupplierUseCase opens a deadline_scope() around the supplier
+call (limiter wait, book(), the second book() with the snapshot). The deadline
+travels in a context variable, so gateways read it without changing the
+SupplierGateway.book() signature: each HTTP attempt gets
+min(gateway timeout, remaining budget) and retries stop when too little is
+left for another attempt. Nested scopes never extend an outer deadline.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current: ContextVar["Deadline | None"] = ContextVar("supplier_deadline", default=None)
+
+
+class Deadline:
+    __slots__ = ("expires_at", "_clock")
+
+    def __init__(self, expires_at: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.expires_at = expires_at
+        self._clock = clock
+
+    @classmethod
+    def after(
+        cls, seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> "Deadline":
+        return cls(clock() + seconds, clock)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def cap(self, timeout: float) -> float:
+        """The smaller of `timeout` and the remaining budget."""
+        return min(timeout, self.remaining())
+
+
+def current_deadline() -> Deadline | None:
+    return _current.get()
+
+
+def remaining_budget() -> float | None:
+    """Seconds left in the current scope, None when no deadline is set."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def cap_timeout(timeout: float) -> float:
+    deadline = _current.get()
+    return deadline.cap(timeout) if deadline is not None else timeout
+
+
+@contextmanager
+def deadline_scope(
+    budget_seconds: float | None, clock: Callable[[], float] = time.monotonic
+) -> Iterator[Deadline | None]:
+    """
+    `with deadline_scope(60):` sets the deadline for everything awaited inside
+    (tasks created inside inherit it). None or <= 0 keeps the outer one.
+    """
+    outer = _current.get()
+    if not budget_seconds or budget_seconds <= 0:
+        yield outer
+        return
+    deadline = Deadline.after(budget_seconds, clock)
+    if outer is not None and outer.expires_at <= deadline.expires_at:
+        deadline = outer
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -4,6 +4,7 @@ from app.application.interfaces.clock import Clock, FakeClock, SystemClock
 from app.application.interfaces.contact_repo import ContactRecord, ContactRepo
 from app.application.interfaces.driver_repo import DriverRecord, DriverRepo
 from app.application.interfaces.idempotency_repo import IdempotencyRepo
+from app.application.interfaces.outbox_notifier import OutboxNotifier
 from app.application.interfaces.outbox_repo import OutboxRepo
 from app.application.interfaces.payment_repo import PaymentRecord, PaymentRepo
 from app.application.interfaces.receipt_query import ReceiptQuery
@@ -44,6 +45,7 @@ __all__ = [
     "SupplierGateway",
     # Infrastructure
     "TransactionManager",
+    "OutboxNotifier",
     # Utilities
     "Clock",
     "SystemClock",
@@ -0,0 +1,99 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+# DlqReplay.status
+REPLAY_RUNNING = "RUNNING"
+REPLAY_COMPLETED = "COMPLETED"
+REPLAY_FAILED = "FAILED"
+
+
+@dataclass
+class DeadLetterFilter:
+    """Selects dead letters to replay; None means "any"."""
+
+    supplier_id: int | None = None
+    error_code: str | None = None
+    event_type: str | None = None
+    moved_from: datetime | None = None  # moved_at >= moved_from
+    moved_to: datetime | None = None  # moved_at < moved_to
+
+
+@dataclass
+class DeadLetter:
+    id: int
+    original_event_id: int
+    event_type: str
+    aggregate_type: str
+    reservation_code: str | None
+    payload: dict[str, Any]
+    error_code: str | None
+    attempts: int
+    moved_at: datetime
+    supplier_id: int = 0
+
+
+@dataclass
+class DlqReplay:
+    """
+    Progress of a bulk replay, persisted so an interrupted run resumes.
+
+    Dead letters are walked in id order; last_dead_letter_id is the keyset
+    cursor, advanced in the same transaction that re-enqueues each batch.
+    """
+
+    id: int
+    status: str
+    filters: DeadLetterFilter = field(default_factory=DeadLetterFilter)
+    rate_per_second: float = 5.0
+    batch_size: int = 100
+    total: int = 0  # matching dead letters when the replay was created
+    last_dead_letter_id: int = 0
+    replayed: int = 0
+    skipped: int = 0  # original event no longer FAILED (already replayed or live again)
+    error_message: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class DlqReplayRepo:
+    async def create(
+        self, filters: DeadLetterFilter, rate_per_second: float, batch_size: int
+    ) -> DlqReplay:
+        """Record a new RUNNING replay, with `total` = dead letters matching now."""
+        raise NotImplementedError
+
+    async def get(self, replay_id: int) -> DlqReplay | None:
+        raise NotImplementedError
+
+    async def next_batch(self, replay: DlqReplay) -> list[DeadLetter]:
+        """Up to replay.batch_size unreplayed matches after the cursor, by id."""
+        raise NotImplementedError
+
+    async def requeue_batch(
+        self,
+        replay: DlqReplay,
+        dead_letters: list[DeadLetter],
+        next_attempt_at: list[datetime],
+    ) -> DlqReplay | None:
+        """
+        Re-enqueue a batch in one transaction and advance the cursor.
+
+        The original outbox event is reset in place (FAILED -> RETRY with
+        attempts=0 and the given next_attempt_at): enqueue() would coalesce
+        with it on (aggregate_code, event_type) and never run it again. If
+        retention already removed it, a fresh event is inserted. Events that
+        are no longer FAILED are left alone and counted as skipped. Every
+        dead letter of the batch is marked replayed.
+
+        Returns the updated replay, or None if another runner advanced the
+        cursor first (the batch is then not applied).
+        """
+        raise NotImplementedError
+
+    async def set_status(
+        self, replay_id: int, status: str, error_message: str | None = None
+    ) -> DlqReplay | None:
+        """RUNNING again to resume; COMPLETED/FAILED also set finished_at."""
+        raise NotImplementedError
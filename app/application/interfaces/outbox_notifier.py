@@ -0,0 +1,15 @@
+class OutboxNotifier:
+    """
+    Wake-up channel between producers of outbox events and the workers.
+
+    Producers call `notify` after the transaction that enqueued the event has
+    committed; workers block on `wait` instead of sleeping a fixed interval,
+    so polling only remains as a safety net.
+    """
+
+    async def notify(self, event_type: str, aggregate_code: str | None = None) -> None:
+        raise NotImplementedError
+
+    async def wait(self, timeout: float) -> bool:
+        """Block until notified or `timeout` elapses. Returns True if notified."""
+        raise NotImplementedError
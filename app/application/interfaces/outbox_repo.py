@@ -1,7 +1,16 @@
+import zlib
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
+# supplier_id of events not tied to a supplier booking (also the selector's fallback id)
+NO_SUPPLIER = 0
+
+
+def outbox_shard_key(aggregate_code: str | None) -> int:
+    """Stable, non-negative hash of aggregate_code (same value as MySQL CRC32())."""
+    return zlib.crc32((aggregate_code or "").encode("utf-8")) & 0x7FFFFFFF
+
 
 @dataclass
 class OutboxEvent:
@@ -17,6 +26,21 @@ class OutboxEvent:
     lock_expires_at: datetime | None = None
     error_code: str | None = None
     error_message: str | None = None
+    supplier_id: int = NO_SUPPLIER
+
+
+@dataclass
+class OutboxQueueStats:
+    # (event_type, supplier_id, status) -> events, for the PENDING_STATUSES only
+    counts: dict[tuple[str, int, str], int]
+    # now - oldest next_attempt_at among due NEW/RETRY events (queue lag)
+    oldest_ready_age_seconds: float | None
+    # window in seconds -> dead letters moved within that window
+    dead_letters_moved: dict[int, int]
+
+
+# Statuses reported by queue_stats(); DONE rows are the bulk of the table and skipped
+PENDING_STATUSES = ("NEW", "RETRY", "IN_PROGRESS", "FAILED")
 
 
 class OutboxRepo:
@@ -26,7 +50,20 @@ class OutboxRepo:
         aggregate_type: str,
         aggregate_code: str,
         payload: dict[str, Any],
+        supplier_id: int | None = None,
     ) -> OutboxEvent:
+        """
+        Enqueue an event, coalescing on (aggregate_code, event_type).
+
+        If the aggregate already has an event of this type, no new event is
+        created and the existing one is returned.
+
+        Args:
+            supplier_id: Supplier the event books with (denormalized from the
+                reservation for per-supplier scheduling). When None it is looked
+                up from the reservation for aggregate_type "reservation", and
+                NO_SUPPLIER otherwise.
+        """
         raise NotImplementedError
 
     async def claim(
@@ -39,7 +76,67 @@ class OutboxRepo:
     ) -> OutboxEvent | None:
         raise NotImplementedError
 
-    async def mark_done(self, event_id: int) -> None:
+    async def claim_ready(
+        self,
+        limit: int,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+        event_type: str | None = None,
+        shard: tuple[int, int] | None = None,
+        supplier_id: int | None = None,
+    ) -> list[OutboxEvent]:
+        """
+        Lease up to `limit` ready events (NEW/RETRY, due and unlocked) in one round trip.
+
+        Events already leased by another worker are skipped, never waited on, so
+        several workers can drain the queue in parallel.
+
+        Args:
+            shard: Optional (index, total) partition; only events whose
+                outbox_shard_key(aggregate_code) % total == index are leased.
+            supplier_id: Only events of this supplier (OutboxEvent.supplier_id).
+        """
+        raise NotImplementedError
+
+    async def count_ready_by_supplier(
+        self,
+        now: datetime,
+        event_type: str | None = None,
+        shard: tuple[int, int] | None = None,
+    ) -> dict[int, int]:
+        """Number of events claim_ready() could lease right now, per supplier_id."""
+        raise NotImplementedError
+
+    async def queue_stats(
+        self, now: datetime, dlq_windows: tuple[int, ...] = (300, 3600)
+    ) -> OutboxQueueStats:
+        """Queue depth, lag and DLQ inflow; index-only queries, cheap enough to scrape."""
+        raise NotImplementedError
+
+    async def get_by_id(self, event_id: int) -> OutboxEvent | None:
+        raise NotImplementedError
+
+    async def renew_lease(
+        self,
+        event_id: int,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+    ) -> bool:
+        """
+        Extend the lease of an IN_PROGRESS event held by `locked_by`.
+
+        Returns False if the lease was lost (expired and reclaimed by another
+        worker, or the event already left IN_PROGRESS).
+        """
+        raise NotImplementedError
+
+    # Fencing: when `locked_by` is given, the transitions below only apply if the
+    # event is still IN_PROGRESS and leased by that worker, and return False
+    # otherwise so a worker that lost its lease never overwrites the new owner.
+
+    async def mark_done(self, event_id: int, locked_by: str | None = None) -> bool:
         raise NotImplementedError
 
     async def mark_retry(
@@ -49,7 +146,8 @@ class OutboxRepo:
         next_attempt_at: datetime,
         error_code: str | None,
         error_message: str | None,
-    ) -> None:
+        locked_by: str | None = None,
+    ) -> bool:
         raise NotImplementedError
 
     async def mark_failed(
@@ -60,7 +158,8 @@ class OutboxRepo:
         event_type: str,
         error_code: str | None,
         error_message: str | None,
-    ) -> None:
+        locked_by: str | None = None,
+    ) -> bool:
         raise NotImplementedError
 
     async def move_to_dlq(
@@ -68,7 +167,8 @@ class OutboxRepo:
         event: OutboxEvent,
         error_code: str | None = None,
         error_message: str | None = None,
-    ) -> None:
+        locked_by: str | None = None,
+    ) -> bool:
         """
         Move a permanently failed event to the Dead Letter Queue.
 
@@ -76,5 +176,6 @@ class OutboxRepo:
             event: The outbox event that has exceeded max attempts
             error_code: Optional error code for the final failure
             error_message: Optional error message for the final failure
+            locked_by: Fencing token (lease holder); see above
         """
         raise NotImplementedError
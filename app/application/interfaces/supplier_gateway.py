@@ -11,6 +11,7 @@ class SupplierBookingResult:
     error_code: str | None = None
     error_message: str | None = None
     http_status: int | None = None
+    retry_after_seconds: float | None = None  # from the supplier's Retry-After header
 
 
 class SupplierGateway(ABC):
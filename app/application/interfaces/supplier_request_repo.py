@@ -45,3 +45,9 @@ class SupplierRequestRepo:
         response_payload: dict[str, Any] | None,
     ) -> SupplierRequestRecord:
         raise NotImplementedError
+
+    async def list_for_reservation(
+        self, reservation_code: str, with_payloads: bool = True
+    ) -> list[SupplierRequestRecord]:
+        """Audit trail: every supplier request of a reservation, oldest first."""
+        raise NotImplementedError
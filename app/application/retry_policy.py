@@ -0,0 +1,164 @@
+"""
+Retry policy shared by every path that reschedules outbox events.
+
+OutboxWorker, ProcessOutboxBookSupplierUseCase and DrainOutboxBookSupplierUseCase
+all ask the same RetryPolicy what to do after a failed attempt, so backoff,
+attempt limits and the set of errors worth retrying are defined once.
+
+Failures are classified from SupplierBookingResult.error_code / http_status
+(or the exception raised by a handler):
+
+- PERMANENT: retrying can never succeed (bad credentials, missing supplier
+  data, 4xx). The event goes to the DLQ on the first failure.
+- THROTTLED: the supplier (or our circuit breaker / limiter) asked us to back
+  off (CIRCUIT_OPEN, SUPPLIER_RATE_LIMITED, 429, 503). Retried no sooner than
+  Retry-After / the breaker reset timeout. Throttled attempts don't count
+  towards max_attempts: a breaker that stays open must not push events to the
+  DLQ without the supplier ever being called.
+- TRANSIENT: timeouts, network errors, 5xx, unknown errors. Exponential
+  backoff with jitter.
+"""
+
+import asyncio
+import random
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from fastapi import HTTPException
+
+MAX_ATTEMPTS = 5
+BASE_DELAY_SECONDS = 15.0
+MAX_DELAY_SECONDS = 300.0
+# Cap on a supplier-provided Retry-After, so a bogus header can't park an event for days
+MAX_RETRY_AFTER_SECONDS = 3600.0
+
+PERMANENT = "PERMANENT"
+THROTTLED = "THROTTLED"
+TRANSIENT = "TRANSIENT"
+
+# RetryDecision.reason
+RETRY = "RETRY"
+NON_RETRYABLE = "NON_RETRYABLE"
+ATTEMPTS_EXHAUSTED = "MAX_ATTEMPTS"
+
+NON_RETRYABLE_ERROR_CODES = frozenset(
+    {
+        "AUTH_ERROR",
+        # The use case already retried once with the reservation snapshot
+        "MISSING_SNAPSHOT",
+        "MISSING_OFFICE_CODES",
+        "MISSING_SUPPLIER_DATA",
+        "MISSING_DATA",
+        "NO_ENDPOINT",
+        "CENTAURO_REJECTED",
+    }
+)
+# Minimum delay per throttling error code (CIRCUIT_OPEN: supplier breaker reset timeout,
+# SUPPLIER_RATE_LIMITED: our own per-supplier limiter queue timed out)
+THROTTLED_ERROR_CODES: Mapping[str, float] = {"CIRCUIT_OPEN": 60.0, "SUPPLIER_RATE_LIMITED": 5.0}
+RETRYABLE_HTTP_STATUSES = frozenset({408, 409, 425, 429})
+THROTTLED_HTTP_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value: str | None, now: datetime | None = None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+@dataclass(frozen=True)
+class RetryDecision:
+    retry: bool
+    attempts: int
+    reason: str
+    error_class: str
+    delay_seconds: float | None = None
+
+    def next_attempt_at(self, now: datetime) -> datetime | None:
+        if not self.retry:
+            return None
+        return now + timedelta(seconds=self.delay_seconds or 0)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Decides whether and when a failed outbox event is retried.
+
+    `attempts` passed to decide() counts the attempt that just failed
+    (event.attempts + 1). Delays are BASE * 2^(attempts-1) capped at
+    max_delay_seconds, then spread by +/- jitter so events that failed
+    together (e.g. a supplier outage) don't all come back at once.
+
+    A THROTTLED decision hands back attempts - 1 (the failed attempt is not
+    counted), so callers that persist decision.attempts keep the budget intact.
+    """
+
+    max_attempts: int = MAX_ATTEMPTS
+    base_delay_seconds: float = BASE_DELAY_SECONDS
+    max_delay_seconds: float = MAX_DELAY_SECONDS
+    jitter: float = 0.2
+    non_retryable_error_codes: frozenset[str] = NON_RETRYABLE_ERROR_CODES
+    throttled_error_codes: Mapping[str, float] = field(
+        default_factory=lambda: dict(THROTTLED_ERROR_CODES)
+    )
+    rng: Callable[[], float] = field(default=random.random, compare=False, repr=False)
+
+    def classify(self, error_code: str | None = None, http_status: int | None = None) -> str:
+        if error_code in self.non_retryable_error_codes:
+            return PERMANENT
+        if error_code in self.throttled_error_codes:
+            return THROTTLED
+        if http_status:
+            if http_status in THROTTLED_HTTP_STATUSES:
+                return THROTTLED
+            if 400 <= http_status < 500 and http_status not in RETRYABLE_HTTP_STATUSES:
+                return PERMANENT
+        return TRANSIENT
+
+    def decide(
+        self,
+        attempts: int,
+        error_code: str | None = None,
+        http_status: int | None = None,
+        retry_after_seconds: float | None = None,
+    ) -> RetryDecision:
+        error_class = self.classify(error_code, http_status)
+        if error_class == PERMANENT:
+            return RetryDecision(False, attempts, NON_RETRYABLE, error_class)
+        if error_class != THROTTLED and attempts >= self.max_attempts:
+            return RetryDecision(False, attempts, ATTEMPTS_EXHAUSTED, error_class)
+
+        delay = min(self.base_delay_seconds * (2 ** (attempts - 1)), self.max_delay_seconds)
+        delay *= 1 + self.jitter * (2 * self.rng() - 1)
+        floor = self.throttled_error_codes.get(error_code, 0.0)
+        if retry_after_seconds is not None:
+            floor = max(floor, min(retry_after_seconds, MAX_RETRY_AFTER_SECONDS))
+        if error_class == THROTTLED:
+            attempts = max(attempts - 1, 0)
+        return RetryDecision(True, attempts, RETRY, error_class, round(max(delay, floor), 3))
+
+    def decide_for_exception(self, attempts: int, error: BaseException | None) -> RetryDecision:
+        """Same as decide() for a handler that raised instead of returning a result."""
+        if isinstance(error, HTTPException):
+            return self.decide(attempts, http_status=error.status_code)
+        if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+            return self.decide(attempts, error_code="TIMEOUT")
+        return self.decide(attempts, error_code=type(error).__name__ if error else None)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
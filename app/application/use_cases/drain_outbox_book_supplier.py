@@ -0,0 +1,180 @@
+import asyncio
+import logging
+import statistics
+import time
+from collections import Counter
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+from app.application.interfaces.outbox_repo import OutboxEvent, OutboxRepo
+from app.application.retry_policy import DEFAULT_RETRY_POLICY, RetryPolicy
+from app.application.use_cases.process_outbox_book_supplier import (
+    LEASE_TTL_SECONDS,
+    ProcessOutboxBookSupplierUseCase,
+)
+from app.infrastructure.messaging.lease import LeaseHeartbeat
+from app.infrastructure.messaging.metrics import OutboxMetrics, outbox_metrics
+
+UseCaseScope = Callable[[], AbstractAsyncContextManager[ProcessOutboxBookSupplierUseCase]]
+
+
+class DrainOutboxBookSupplierUseCase:
+    """
+    Processes a batch of ready BOOK_SUPPLIER events in one call.
+
+    Claims up to `limit` events (optionally for one supplier) in chunks of at
+    most `concurrency` and books each chunk concurrently before claiming the
+    next one, so no event sits leased in a local queue while its lease runs
+    out. Each event gets its own ProcessOutboxBookSupplierUseCase from
+    `use_case_scope` (one DB session per event) and a lease heartbeat; the
+    lease is renewed right before booking and the event is skipped if another
+    worker has taken it over in the meantime.
+    """
+
+    def __init__(
+        self,
+        outbox_repo: OutboxRepo,
+        use_case_scope: UseCaseScope,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        metrics: OutboxMetrics = outbox_metrics,
+    ) -> None:
+        """
+        Args:
+            outbox_repo: Repo used for the batch claim, lease renewals and releasing
+                events whose processing raised; must be safe for concurrent calls
+                (ScopedOutboxRepoSQL / InMemoryOutboxRepo).
+            use_case_scope: Yields a ProcessOutboxBookSupplierUseCase per event.
+            retry_policy: Decides retry vs DLQ for events whose processing raised.
+        """
+        self._outbox_repo = outbox_repo
+        self._use_case_scope = use_case_scope
+        self._retry_policy = retry_policy
+        self._metrics = metrics
+        self._logger = logging.getLogger(__name__)
+
+    async def execute(
+        self,
+        limit: int = 100,
+        supplier_id: int | None = None,
+        concurrency: int = 8,
+        worker_id: str | None = None,
+        now: datetime | None = None,
+    ) -> dict:
+        worker_id = worker_id or f"drain-{uuid4().hex[:8]}"
+        now = now or datetime.now(timezone.utc)
+        started = time.perf_counter()
+
+        chunk_size = max(1, concurrency)
+        events: list[OutboxEvent] = []
+        results: list[dict] = []
+        while len(events) < limit:
+            claim_started = time.perf_counter()
+            chunk = await self._outbox_repo.claim_ready(
+                limit=min(chunk_size, limit - len(events)),
+                locked_by=worker_id,
+                now=now + timedelta(seconds=claim_started - started),
+                lock_ttl_seconds=LEASE_TTL_SECONDS,
+                event_type="BOOK_SUPPLIER",
+                supplier_id=supplier_id,
+            )
+            self._metrics.observe_claim(time.perf_counter() - claim_started, len(chunk))
+            if not chunk:
+                break
+            events.extend(chunk)
+            results.extend(
+                await asyncio.gather(*(self._process(event, worker_id) for event in chunk))
+            )
+
+        elapsed = time.perf_counter() - started
+        durations = [r["elapsed_ms"] for r in results]
+        summary = {
+            "worker_id": worker_id,
+            "supplier_id": supplier_id,
+            "claimed": len(events),
+            "concurrency": concurrency,
+            "by_status": dict(Counter(r["status"] for r in results)),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "events_per_second": round(len(events) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(statistics.median(durations), 1) if durations else None,
+            "max_ms": max(durations) if durations else None,
+            "results": results,
+        }
+        self._logger.info(
+            "Outbox drain finished",
+            extra={k: v for k, v in summary.items() if k != "results"},
+        )
+        return summary
+
+    async def _process(self, event: OutboxEvent, worker_id: str) -> dict:
+        started = time.perf_counter()
+        outcome = {"event_id": event.id, "reservation_code": event.aggregate_code}
+
+        async def renew() -> bool:
+            return await self._outbox_repo.renew_lease(
+                event_id=event.id,
+                locked_by=worker_id,
+                now=datetime.now(timezone.utc),
+                lock_ttl_seconds=LEASE_TTL_SECONDS,
+            )
+
+        try:
+            if not await renew():
+                # The lease expired and another worker re-claimed the event: booking
+                # here would call the supplier a second time for the same event.
+                self._logger.warning(
+                    "Outbox drain: lease lost before booking, skipping event",
+                    extra={"outbox_event_id": event.id, "locked_by": worker_id},
+                )
+                outcome.update(status="LEASE_LOST")
+            else:
+                async with LeaseHeartbeat(
+                    renew, LeaseHeartbeat.interval_for(LEASE_TTL_SECONDS), event_id=event.id
+                ):
+                    async with self._use_case_scope() as use_case:
+                        outcome.update(
+                            await use_case.execute(
+                                reservation_code=event.aggregate_code,
+                                idem_key=f"outbox-{event.id}",
+                                worker_id=worker_id,
+                                event=event,
+                            )
+                        )
+        except Exception as exc:
+            error = exc.detail if isinstance(exc, HTTPException) else str(exc)
+            self._logger.exception(
+                "Outbox drain: event failed", extra={"outbox_event_id": event.id}
+            )
+            await self._release(event, worker_id, exc, str(error)[:255])
+            outcome.update(status="ERROR", error=error)
+        elapsed = time.perf_counter() - started
+        self._metrics.observe_handler(event.event_type, elapsed, outcome["status"])
+        outcome["elapsed_ms"] = round(elapsed * 1000, 1)
+        return outcome
+
+    async def _release(
+        self, event: OutboxEvent, worker_id: str, error: Exception, error_message: str
+    ) -> None:
+        """Schedules a retry (or DLQ) for an event whose processing raised."""
+        decision = self._retry_policy.decide_for_exception((event.attempts or 0) + 1, error)
+        error_code = type(error).__name__
+        if not decision.retry:
+            await self._outbox_repo.move_to_dlq(
+                event=replace(event, attempts=decision.attempts),
+                error_code=error_code,
+                error_message=error_message,
+                locked_by=worker_id,
+            )
+            return
+        await self._outbox_repo.mark_retry(
+            event_id=event.id,
+            attempts=decision.attempts,
+            next_attempt_at=decision.next_attempt_at(datetime.now(timezone.utc)),
+            error_code=error_code,
+            error_message=error_message,
+            locked_by=worker_id,
+        )
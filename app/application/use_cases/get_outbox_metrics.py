@@ -0,0 +1,107 @@
+import os
+from datetime import datetime, timezone
+
+from app.application.interfaces.outbox_repo import PENDING_STATUSES, OutboxRepo
+from app.infrastructure.circuit_breaker import SupplierBreakerRegistry
+from app.infrastructure.gateways.supplier_limiter import SupplierLimiterRegistry
+from app.infrastructure.messaging.metrics import (
+    MetricsSnapshotStore,
+    OutboxMetrics,
+    has_observations,
+    merge_outbox_snapshots,
+)
+
+# Windows for DLQ inflow, in seconds
+DLQ_WINDOWS = {"5m": 300, "1h": 3600}
+
+
+class GetOutboxMetricsUseCase:
+    """
+    Operational snapshot of the outbox, cheap enough to scrape every few seconds.
+
+    Queue depth/lag and DLQ inflow come from index-only queries
+    (OutboxRepo.queue_stats), so they cover every worker. Claim latency and
+    handler duration histograms, breaker states and limiter queues are
+    per-process counters: the report sums the snapshots the runner's worker
+    processes publish to `snapshot_store` plus this process's own (drains run
+    here), skipping processes that observed nothing. With no observations at
+    all "worker" is None rather than a set of empty histograms.
+    """
+
+    def __init__(
+        self,
+        outbox_repo: OutboxRepo,
+        metrics: OutboxMetrics | None = None,
+        breakers: SupplierBreakerRegistry | None = None,
+        limiters: SupplierLimiterRegistry | None = None,
+        snapshot_store: MetricsSnapshotStore | None = None,
+    ) -> None:
+        self._outbox_repo = outbox_repo
+        self._metrics = metrics
+        self._breakers = breakers
+        self._limiters = limiters
+        self._snapshot_store = snapshot_store
+
+    async def execute(self, now: datetime | None = None) -> dict:
+        now = now or datetime.now(timezone.utc)
+        stats = await self._outbox_repo.queue_stats(now, tuple(DLQ_WINDOWS.values()))
+
+        by_event_type: dict[str, dict[str, int]] = {}
+        by_supplier: dict[str, dict[str, int]] = {}
+        for (event_type, supplier_id, status), count in sorted(stats.counts.items()):
+            for bucket, key in ((by_event_type, event_type), (by_supplier, str(supplier_id))):
+                statuses = bucket.setdefault(key, dict.fromkeys(PENDING_STATUSES, 0))
+                statuses[status] += count
+
+        moved = {label: stats.dead_letters_moved[seconds] for label, seconds in DLQ_WINDOWS.items()}
+        snapshots = self._snapshot_store.collect() if self._snapshot_store else []
+        return {
+            "generated_at": now.isoformat(),
+            "sources": {
+                "queue": "database",
+                "dlq": "database",
+                "worker": "process_snapshots",
+            },
+            "queue": {
+                "by_event_type": by_event_type,
+                "by_supplier": by_supplier,
+                "oldest_ready_age_seconds": stats.oldest_ready_age_seconds,
+            },
+            "dlq": {
+                "moved": moved,
+                "inflow_per_minute_5m": round(moved["5m"] / 5, 2),
+            },
+            "worker": self._worker_metrics(snapshots),
+            "circuit_breakers": self._per_process(
+                self._breakers.snapshot() if self._breakers else [],
+                snapshots,
+                "circuit_breakers",
+            ),
+            "supplier_limiters": self._per_process(
+                self._limiters.snapshot() if self._limiters else [],
+                snapshots,
+                "supplier_limiters",
+            ),
+        }
+
+    def _worker_metrics(self, snapshots: list[dict]) -> dict | None:
+        observed = [(s["pid"], s["outbox"]) for s in snapshots if has_observations(s["outbox"])]
+        if self._metrics is not None:
+            local = self._metrics.snapshot()
+            if has_observations(local):
+                observed.append((os.getpid(), local))
+        if not observed:
+            return None
+        return {
+            "processes": sorted(pid for pid, _ in observed),
+            **merge_outbox_snapshots([snapshot for _, snapshot in observed]),
+        }
+
+    @staticmethod
+    def _per_process(local: list[dict], snapshots: list[dict], key: str) -> list[dict]:
+        """This process's entries as-is, other processes' tagged with their pid."""
+        return local + [
+            {**entry, "pid": snapshot["pid"]}
+            for snapshot in snapshots
+            for entry in snapshot.get(key, [])
+        ]
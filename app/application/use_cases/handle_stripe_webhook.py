@@ -1,12 +1,15 @@
 import logging
+from contextlib import nullcontext
 
 from fastapi import HTTPException, status
 
 from app.api.schemas.reservations import StripeWebhookEnvelope
+from app.application.interfaces.outbox_notifier import OutboxNotifier
 from app.application.interfaces.outbox_repo import OutboxRepo
 from app.application.interfaces.payment_repo import PaymentRepo
 from app.application.interfaces.reservation_repo import ReservationRepo
 from app.application.interfaces.stripe_gateway import StripeGateway
+from app.application.interfaces.transaction_manager import TransactionManager
 from app.domain.constants import PAYMENT_STATUS_PAID, PAYMENT_STATUS_UNPAID
 
 
@@ -18,12 +21,16 @@ class HandleStripeWebhookUseCase:
         outbox_repo: OutboxRepo,
         stripe_gateway: StripeGateway,
         stripe_webhook_secret: str | None,
+        transaction_manager: TransactionManager | None = None,
+        outbox_notifier: OutboxNotifier | None = None,
     ) -> None:
         self._payment_repo = payment_repo
         self._reservation_repo = reservation_repo
         self._outbox_repo = outbox_repo
         self._stripe_gateway = stripe_gateway
         self._stripe_webhook_secret = stripe_webhook_secret
+        self._transaction_manager = transaction_manager
+        self._outbox_notifier = outbox_notifier
         self._logger = logging.getLogger(__name__)
 
     async def execute(self, raw_body: bytes, signature: str | None) -> None:
@@ -46,6 +53,18 @@ class HandleStripeWebhookUseCase:
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid event payload"
             )
 
+        transaction = (
+            self._transaction_manager.start() if self._transaction_manager else nullcontext()
+        )
+        async with transaction:
+            enqueued_for = await self._apply_event(event)
+
+        # Only after commit: the worker must be able to see the BOOK_SUPPLIER event
+        if enqueued_for and self._outbox_notifier:
+            await self._outbox_notifier.notify("BOOK_SUPPLIER", enqueued_for)
+
+    async def _apply_event(self, event: StripeWebhookEnvelope) -> str | None:
+        """Apply the webhook; returns the reservation code if BOOK_SUPPLIER was enqueued."""
         stripe_event_id = event.id
         intent_id = self._extract_intent_id(event)
         payment = await self._payment_repo.find_by_payment_intent(intent_id) if intent_id else None
@@ -56,7 +75,7 @@ class HandleStripeWebhookUseCase:
                 provider="stripe", stripe_event_id=stripe_event_id
             )
             if existing_by_event:
-                return
+                return None
 
         if not payment:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found")
@@ -79,6 +98,7 @@ class HandleStripeWebhookUseCase:
                 aggregate_type="reservation",
                 aggregate_code=payment.reservation_code,
                 payload={"reservation_code": payment.reservation_code},
+                supplier_id=reservation.supplier_id if reservation else None,
             )
             self._logger.info(
                 "Stripe webhook processed: payment succeeded",
@@ -88,6 +108,7 @@ class HandleStripeWebhookUseCase:
                     "reservation_code": payment.reservation_code,
                 },
             )
+            return payment.reservation_code
         elif event.type == "payment_intent.payment_failed":
             await self._payment_repo.mark_failed(
                 payment_id=payment.id,
@@ -106,6 +127,7 @@ class HandleStripeWebhookUseCase:
                     "reservation_code": payment.reservation_code,
                 },
             )
+            return None
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="Unhandled event type"
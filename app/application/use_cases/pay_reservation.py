@@ -12,6 +12,7 @@ from app.api.schemas.reservations import (
     SupplierRequestSummary,
 )
 from app.application.interfaces.idempotency_repo import IdempotencyRecord, IdempotencyRepo
+from app.application.interfaces.outbox_notifier import OutboxNotifier
 from app.application.interfaces.outbox_repo import OutboxRepo
 from app.application.interfaces.payment_repo import PaymentRepo
 from app.application.interfaces.reservation_repo import ReservationRepo
@@ -42,6 +43,7 @@ class PayReservationUseCase:
         stripe_gateway: StripeGateway,
         outbox_repo: OutboxRepo,
         transaction_manager: TransactionManager,
+        outbox_notifier: OutboxNotifier | None = None,
     ) -> None:
         self._reservation_repo = reservation_repo
         self._payment_repo = payment_repo
@@ -49,6 +51,7 @@ class PayReservationUseCase:
         self._stripe_gateway = stripe_gateway
         self._outbox_repo = outbox_repo
         self._transaction_manager = transaction_manager
+        self._outbox_notifier = outbox_notifier
         self._logger = logging.getLogger(__name__)
 
     async def execute(
@@ -120,6 +123,7 @@ class PayReservationUseCase:
                 aggregate_type="reservation",
                 aggregate_code=reservation_code,
                 payload={"reservation_code": reservation_code},
+                supplier_id=reservation.supplier_id,
             )
 
             response = self._build_response(reservation_code, captured_payment)
@@ -142,7 +146,11 @@ class PayReservationUseCase:
                     "charge_id": captured_payment.stripe_charge_id,
                 },
             )
-            return response
+
+        # Only after commit: the worker must be able to see the BOOK_SUPPLIER event
+        if self._outbox_notifier:
+            await self._outbox_notifier.notify("BOOK_SUPPLIER", reservation_code)
+        return response
 
     def _build_response(self, reservation_code: str, payment: Any) -> PayReservationResponse:
         return PayReservationResponse(
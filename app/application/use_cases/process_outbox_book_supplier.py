@@ -1,46 +1,159 @@
+import asyncio
 import logging
+import time
+from contextlib import nullcontext
+from dataclasses import asdict
 from datetime import datetime, timedelta, timezone
 
 from fastapi import HTTPException, status
 
-from app.application.interfaces.outbox_repo import OutboxRepo
+from app.application.deadline import deadline_scope, remaining_budget
+from app.application.interfaces.outbox_repo import OutboxEvent, OutboxRepo
 from app.application.interfaces.reservation_repo import ReservationRepo
+from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
 from app.application.interfaces.supplier_request_repo import SupplierRequestRepo
+from app.application.interfaces.transaction_manager import TransactionManager
+from app.application.retry_policy import DEFAULT_RETRY_POLICY, RetryPolicy
 from app.domain.constants import RESERVATION_STATUS_CONFIRMED, RESERVATION_STATUS_ON_REQUEST
+from app.infrastructure.db.retry import retry_on_deadlock
 from app.infrastructure.gateways.supplier_gateway_selector import SupplierGatewaySelector
+from app.infrastructure.gateways.supplier_limiter import (
+    SupplierLimiterRegistry,
+    SupplierLimitExceeded,
+    get_supplier_limiters,
+)
+from app.infrastructure.messaging.lease import LeaseHeartbeat
 
-MAX_ATTEMPTS = 5
-BASE_BACKOFF_SECONDS = 15
+LEASE_TTL_SECONDS = 30
+# Default wall-time budget for the supplier phase (limiter wait + every book() call)
+BOOKING_BUDGET_SECONDS = 60.0
 
 
 class ProcessOutboxBookSupplierUseCase:
+    """
+    Books the reservation with its supplier in three phases:
+
+    1. Claim the outbox event and create the IN_PROGRESS supplier request (commit).
+    2. Call the supplier with no transaction open, so no DB connection or row
+       lock is held for the duration of the remote call. If the event was
+       claimed here, a heartbeat keeps renewing its lease meanwhile.
+    3. Record the outcome in a short transaction, fenced on the lease holder:
+       if another worker reclaimed the event, only this attempt's supplier
+       request is recorded and the event is left to the new owner. A successful
+       booking still confirms the reservation (conditional on its lock_version,
+       not on the lease), and the new owner finds it CONFIRMED at claim time and
+       closes the event without calling the supplier again.
+       A deadlock retries this transaction alone, never the supplier call.
+
+    The supplier call waits for a slot of that supplier's limiter (concurrency
+    and rate per process); if none frees up in time the attempt fails with
+    SUPPLIER_RATE_LIMITED and is retried later.
+
+    The whole supplier phase runs under a deadline (booking_budget_seconds):
+    gateways derive per-attempt timeouts from what is left and stop retrying
+    when it runs out, and a booking still running at the deadline is cancelled
+    and recorded as DEADLINE_EXCEEDED (transient, retried later).
+
+    Failed bookings are rescheduled or sent to the DLQ by the shared RetryPolicy.
+    """
+
     def __init__(
         self,
         outbox_repo: OutboxRepo,
         reservation_repo: ReservationRepo,
         supplier_gateway_selector: SupplierGatewaySelector,
         supplier_request_repo: SupplierRequestRepo,
+        transaction_manager: TransactionManager | None = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        supplier_limiters: SupplierLimiterRegistry | None = None,
+        booking_budget_seconds: float | None = BOOKING_BUDGET_SECONDS,
     ) -> None:
         self._outbox_repo = outbox_repo
         self._reservation_repo = reservation_repo
         self._supplier_gateway_selector = supplier_gateway_selector
         self._supplier_request_repo = supplier_request_repo
+        self._transaction_manager = transaction_manager
+        self._retry_policy = retry_policy
+        self._supplier_limiters = supplier_limiters or get_supplier_limiters()
+        self._booking_budget = booking_budget_seconds
         self._logger = logging.getLogger(__name__)
 
+    def _transaction(self):
+        return self._transaction_manager.start() if self._transaction_manager else nullcontext()
+
     async def execute(
         self,
         reservation_code: str,
         idem_key: str,
         worker_id: str = "worker-1",
         now: datetime | None = None,
+        event: OutboxEvent | None = None,
     ) -> dict:
+        """
+        Args:
+            event: Event already leased by the caller (OutboxWorker batch claim).
+                When omitted the event is claimed here by reservation_code.
+        """
         now = now or datetime.now(timezone.utc)
-        event = await self._outbox_repo.claim(
-            aggregate_code=reservation_code,
-            event_type="BOOK_SUPPLIER",
-            locked_by=worker_id,
-            now=now,
-        )
+        started = time.monotonic()
+        leased_here = event is None
+        async with self._transaction():
+            event, reservation, gateway, supplier_req = await self._claim(
+                reservation_code=reservation_code,
+                idem_key=idem_key,
+                worker_id=worker_id,
+                now=now,
+                event=event,
+            )
+            if supplier_req is None:
+                return await self._already_confirmed(event, reservation)
+        expected_lock_version = reservation.lock_version
+        attempt_number = supplier_req.attempt
+
+        if leased_here:
+            async with LeaseHeartbeat(
+                lambda: self._renew_lease(event),
+                LeaseHeartbeat.interval_for(LEASE_TTL_SECONDS),
+                event_id=event.id,
+            ):
+                booking_result = await self._book(gateway, reservation, reservation_code, idem_key)
+        else:
+            # The caller (OutboxWorker) owns the lease and renews it
+            booking_result = await self._book(gateway, reservation, reservation_code, idem_key)
+
+        # Only the short recording transaction is retried on deadlock: the supplier
+        # call above must never run twice for one claim.
+        async def record_result() -> dict:
+            async with self._transaction():
+                return await self._record_result(
+                    event=event,
+                    reservation_code=reservation_code,
+                    supplier_req=supplier_req,
+                    booking_result=booking_result,
+                    attempt_number=attempt_number,
+                    expected_lock_version=expected_lock_version,
+                    # Backoff counts from when the result is recorded, not from the claim
+                    now=now + timedelta(seconds=time.monotonic() - started),
+                )
+
+        return await retry_on_deadlock(record_result, max_attempts=3, base_delay=0.1)
+
+    async def _claim(
+        self,
+        reservation_code: str,
+        idem_key: str,
+        worker_id: str,
+        now: datetime,
+        event: OutboxEvent | None = None,
+    ):
+        if event is None:
+            event = await self._outbox_repo.claim(
+                aggregate_code=reservation_code,
+                event_type="BOOK_SUPPLIER",
+                locked_by=worker_id,
+                now=now,
+                lock_ttl_seconds=LEASE_TTL_SECONDS,
+            )
         if not event:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -52,11 +165,16 @@ class ProcessOutboxBookSupplierUseCase:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found"
             )
-        expected_lock_version = reservation.lock_version
         if not getattr(reservation, "country_code", None):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="country_code required"
             )
+        if (
+            reservation.status == RESERVATION_STATUS_CONFIRMED
+            and reservation.supplier_reservation_code
+        ):
+            # Booked by a previous owner that lost the lease before closing the event
+            return event, reservation, None, None
 
         gateway = self._supplier_gateway_selector.for_supplier(
             supplier_id=reservation.supplier_id,
@@ -76,22 +194,119 @@ class ProcessOutboxBookSupplierUseCase:
             idem_key=idem_key,
             attempt=attempt_number,
         )
+        return event, reservation, gateway, supplier_req
 
-        booking_result = await gateway.book(reservation_code=reservation_code, idem_key=idem_key)
-        # Try with snapshot if gateway requests it
-        if (
-            booking_result.status == "FAILED"
-            and booking_result.error_code in {"MISSING_SNAPSHOT", "MISSING_OFFICE_CODES"}
-        ):
-            from dataclasses import asdict
+    async def _already_confirmed(self, event: OutboxEvent, reservation) -> dict:
+        owned = await self._outbox_repo.mark_done(event.id, locked_by=event.locked_by)
+        self._logger.warning(
+            "Reservation already confirmed, supplier not called again",
+            extra={
+                "reservation_code": reservation.reservation_code,
+                "outbox_event_id": event.id,
+                "supplier_reservation_code": reservation.supplier_reservation_code,
+                "lease_lost": not owned,
+            },
+        )
+        return {
+            "status": RESERVATION_STATUS_CONFIRMED,
+            "supplier_reservation_code": reservation.supplier_reservation_code,
+            "already_confirmed": True,
+        }
 
-            booking_result = await gateway.book(
-                reservation_code=reservation_code,
-                idem_key=idem_key,
-                reservation_snapshot=asdict(reservation),
+    async def _renew_lease(self, event: OutboxEvent) -> bool:
+        async with self._transaction():
+            return await self._outbox_repo.renew_lease(
+                event_id=event.id,
+                locked_by=event.locked_by,
+                now=datetime.now(timezone.utc),
+                lock_ttl_seconds=LEASE_TTL_SECONDS,
+            )
+
+    async def _book(
+        self,
+        gateway: SupplierGateway,
+        reservation,
+        reservation_code: str,
+        idem_key: str,
+    ) -> SupplierBookingResult:
+        try:
+            with deadline_scope(self._booking_budget):
+                async with self._supplier_limiters.slot(reservation.supplier_id):
+                    return await self._call_gateway(
+                        gateway, reservation, reservation_code, idem_key
+                    )
+        except SupplierLimitExceeded as exc:
+            return SupplierBookingResult(
+                status="FAILED",
+                error_code="SUPPLIER_RATE_LIMITED",
+                error_message=str(exc),
+                retry_after_seconds=exc.retry_after_seconds,
+            )
+
+    async def _call_gateway(
+        self,
+        gateway: SupplierGateway,
+        reservation,
+        reservation_code: str,
+        idem_key: str,
+    ) -> SupplierBookingResult:
+        try:
+            booking_result = await self._gateway_book(
+                gateway, reservation_code=reservation_code, idem_key=idem_key
+            )
+            # Try with snapshot if gateway requests it
+            if (
+                booking_result.status == "FAILED"
+                and booking_result.error_code in {"MISSING_SNAPSHOT", "MISSING_OFFICE_CODES"}
+            ):
+                booking_result = await self._gateway_book(
+                    gateway,
+                    reservation_code=reservation_code,
+                    idem_key=idem_key,
+                    reservation_snapshot=asdict(reservation),
+                )
+        except Exception as exc:
+            # The claim is already committed: record the failure instead of leaving
+            # the supplier request IN_PROGRESS until the lease expires.
+            self._logger.exception(
+                "Supplier gateway raised", extra={"reservation_code": reservation_code}
+            )
+            booking_result = SupplierBookingResult(
+                status="FAILED",
+                error_code="GATEWAY_ERROR",
+                error_message=str(exc)[:255],
             )
+        return booking_result
 
+    async def _gateway_book(self, gateway: SupplierGateway, **kwargs) -> SupplierBookingResult:
+        """gateway.book() cut off at the deadline, for gateways that ignore the budget."""
+        remaining = remaining_budget()
+        if remaining is None:
+            return await gateway.book(**kwargs)
+        if remaining > 0:
+            try:
+                return await asyncio.wait_for(gateway.book(**kwargs), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+        return SupplierBookingResult(
+            status="FAILED",
+            error_code="DEADLINE_EXCEEDED",
+            error_message=f"Supplier booking budget of {self._booking_budget}s exhausted",
+        )
+
+    async def _record_result(
+        self,
+        event,
+        reservation_code: str,
+        supplier_req,
+        booking_result: SupplierBookingResult,
+        attempt_number: int,
+        expected_lock_version: int,
+        now: datetime,
+    ) -> dict:
         if booking_result.status == "SUCCESS":
+            if not await self._outbox_repo.mark_done(event.id, locked_by=event.locked_by):
+                return await self._lease_lost(event, reservation_code, supplier_req, booking_result)
             await self._supplier_request_repo.mark_success(
                 request_id=supplier_req.id,
                 response_payload=booking_result.payload,
@@ -100,12 +315,9 @@ class ProcessOutboxBookSupplierUseCase:
             await self._reservation_repo.mark_confirmed(
                 reservation_code=reservation_code,
                 supplier_reservation_code=booking_result.supplier_reservation_code or "",
-                supplier_confirmed_at=booking_result.payload.get("confirmed_at", "")
-                if booking_result.payload
-                else "",
+                supplier_confirmed_at=_confirmed_at(booking_result),
                 expected_lock_version=expected_lock_version,
             )
-            await self._outbox_repo.mark_done(event.id)
             self._logger.info(
                 "Supplier booking success",
                 extra={
@@ -120,44 +332,58 @@ class ProcessOutboxBookSupplierUseCase:
                 "supplier_reservation_code": booking_result.supplier_reservation_code,
             }
 
-        attempts = attempt_number
-        backoff_seconds = min(BASE_BACKOFF_SECONDS * (2 ** (attempts - 1)), 300)
-        next_attempt_at = now + timedelta(seconds=backoff_seconds)
-        if attempts >= MAX_ATTEMPTS:
-            # Move to Dead Letter Queue for manual intervention
-            await self._outbox_repo.move_to_dlq(
+        decision = self._retry_policy.decide(
+            attempt_number,
+            error_code=booking_result.error_code,
+            http_status=booking_result.http_status,
+            retry_after_seconds=booking_result.retry_after_seconds,
+        )
+        attempts = decision.attempts
+        next_attempt_at = decision.next_attempt_at(now)
+        if not decision.retry:
+            # Non-retryable error or MAX_ATTEMPTS reached: DLQ for manual intervention
+            owned = await self._outbox_repo.move_to_dlq(
                 event=event,
                 error_code=booking_result.error_code,
                 error_message=booking_result.error_message,
+                locked_by=event.locked_by,
             )
-            self._logger.critical(
-                "Event moved to Dead Letter Queue - REQUIRES MANUAL INTERVENTION",
-                extra={
-                    "reservation_code": reservation_code,
-                    "outbox_event_id": event.id,
-                    "attempts": attempts,
-                    "error_code": booking_result.error_code,
-                    "error_message": booking_result.error_message,
-                }
-            )
+            if owned:
+                self._logger.critical(
+                    "Event moved to Dead Letter Queue - REQUIRES MANUAL INTERVENTION",
+                    extra={
+                        "reservation_code": reservation_code,
+                        "outbox_event_id": event.id,
+                        "attempts": attempts,
+                        "reason": decision.reason,
+                        "error_class": decision.error_class,
+                        "error_code": booking_result.error_code,
+                        "error_message": booking_result.error_message,
+                    }
+                )
         else:
-            await self._outbox_repo.mark_retry(
+            owned = await self._outbox_repo.mark_retry(
                 event_id=event.id,
                 attempts=attempts,
                 next_attempt_at=next_attempt_at,
                 error_code=booking_result.error_code,
                 error_message=booking_result.error_message,
+                locked_by=event.locked_by,
             )
-            self._logger.warning(
-                "Supplier booking retry scheduled",
-                extra={
-                    "reservation_code": reservation_code,
-                    "outbox_event_id": event.id,
-                    "attempt": attempts,
-                    "next_attempt_at": next_attempt_at.isoformat(),
-                    "error_code": booking_result.error_code,
-                },
-            )
+            if owned:
+                self._logger.warning(
+                    "Supplier booking retry scheduled",
+                    extra={
+                        "reservation_code": reservation_code,
+                        "outbox_event_id": event.id,
+                        "attempt": attempts,
+                        "next_attempt_at": next_attempt_at.isoformat(),
+                        "error_class": decision.error_class,
+                        "error_code": booking_result.error_code,
+                    },
+                )
+        if not owned:
+            return await self._lease_lost(event, reservation_code, supplier_req, booking_result)
         await self._supplier_request_repo.mark_failed(
             request_id=supplier_req.id,
             error_code=booking_result.error_code,
@@ -167,6 +393,87 @@ class ProcessOutboxBookSupplierUseCase:
         )
         return {
             "status": RESERVATION_STATUS_ON_REQUEST,
-            "next_attempt_at": next_attempt_at.isoformat() if attempts < MAX_ATTEMPTS else None,
+            "next_attempt_at": next_attempt_at.isoformat() if next_attempt_at else None,
             "attempts": attempts,
+            "retry_reason": decision.reason,
         }
+
+    async def _lease_lost(
+        self,
+        event,
+        reservation_code: str,
+        supplier_req,
+        booking_result: SupplierBookingResult,
+    ) -> dict:
+        """
+        Fencing failed: keep this attempt's supplier request and leave the event to
+        the owner. A booking the supplier accepted is still recorded on the
+        reservation, otherwise the new owner would book it a second time.
+        """
+        confirmed = False
+        if booking_result.status == "SUCCESS":
+            await self._supplier_request_repo.mark_success(
+                request_id=supplier_req.id,
+                response_payload=booking_result.payload,
+                supplier_reservation_code=booking_result.supplier_reservation_code or "",
+            )
+            confirmed = await self._confirm_without_lease(reservation_code, booking_result)
+        else:
+            await self._supplier_request_repo.mark_failed(
+                request_id=supplier_req.id,
+                error_code=booking_result.error_code,
+                error_message=booking_result.error_message,
+                http_status=booking_result.http_status,
+                response_payload=booking_result.payload,
+            )
+        self._logger.warning(
+            "Outbox lease lost before recording supplier result",
+            extra={
+                "reservation_code": reservation_code,
+                "outbox_event_id": event.id,
+                "locked_by": event.locked_by,
+                "supplier_status": booking_result.status,
+                "reservation_confirmed": confirmed,
+            },
+        )
+        if confirmed:
+            return {
+                "status": RESERVATION_STATUS_CONFIRMED,
+                "supplier_reservation_code": booking_result.supplier_reservation_code,
+                "lease_lost": True,
+            }
+        return {"status": RESERVATION_STATUS_ON_REQUEST, "lease_lost": True}
+
+    async def _confirm_without_lease(
+        self, reservation_code: str, booking_result: SupplierBookingResult
+    ) -> bool:
+        """
+        Confirms the reservation unless it already is. Conditional on the current
+        lock_version rather than on the outbox lease, so it is idempotent per
+        reservation_code whichever worker gets there first.
+        """
+        reservation = await self._reservation_repo.get_by_code(reservation_code)
+        if reservation.status == RESERVATION_STATUS_CONFIRMED:
+            if reservation.supplier_reservation_code != booking_result.supplier_reservation_code:
+                self._logger.critical(
+                    "Reservation booked twice with the supplier - REQUIRES MANUAL INTERVENTION",
+                    extra={
+                        "reservation_code": reservation_code,
+                        "supplier_reservation_code": reservation.supplier_reservation_code,
+                        "duplicate_supplier_reservation_code": (
+                            booking_result.supplier_reservation_code
+                        ),
+                    },
+                )
+            return False
+        await self._reservation_repo.mark_confirmed(
+            reservation_code=reservation_code,
+            supplier_reservation_code=booking_result.supplier_reservation_code or "",
+            supplier_confirmed_at=_confirmed_at(booking_result),
+            expected_lock_version=reservation.lock_version,
+        )
+        return True
+
+
+def _confirmed_at(booking_result: SupplierBookingResult) -> str:
+    return booking_result.payload.get("confirmed_at", "") if booking_result.payload else ""
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+
+from app.application.interfaces.dlq_replay_repo import (
+    REPLAY_COMPLETED,
+    REPLAY_FAILED,
+    REPLAY_RUNNING,
+    DeadLetterFilter,
+    DlqReplay,
+    DlqReplayRepo,
+)
+
+
+class ReplayDeadLettersUseCase:
+    """
+    Re-enqueues dead letters in bulk, paced so a recovered supplier isn't flooded.
+
+    Matching dead letters are walked in id order, `batch_size` per transaction
+    (DlqReplayRepo.requeue_batch). Replayed events get staggered next_attempt_at
+    values, `1 / rate_per_second` apart, so workers pick them up at that rate
+    no matter how fast the batches are written; the loop itself stays at most
+    one batch ahead of that schedule.
+
+    Progress (cursor and counters) is committed with every batch: run() on an
+    interrupted replay continues after the last committed batch.
+    """
+
+    def __init__(
+        self,
+        replay_repo: DlqReplayRepo,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self._replay_repo = replay_repo
+        self._sleep = sleep
+        self._logger = logging.getLogger(__name__)
+
+    async def start(
+        self, filters: DeadLetterFilter, rate_per_second: float, batch_size: int
+    ) -> DlqReplay:
+        """Records a new replay; run() does the work."""
+        if rate_per_second <= 0 or batch_size <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="rate_per_second and batch_size must be positive",
+            )
+        replay = await self._replay_repo.create(filters, rate_per_second, batch_size)
+        self._logger.info(
+            "DLQ replay created",
+            extra={"replay_id": replay.id, "total": replay.total, "filters": vars(filters)},
+        )
+        return replay
+
+    async def get(self, replay_id: int) -> DlqReplay:
+        replay = await self._replay_repo.get(replay_id)
+        if replay is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="DLQ replay not found"
+            )
+        return replay
+
+    async def resume(self, replay_id: int) -> DlqReplay:
+        """Marks an interrupted/failed replay RUNNING again; run() picks up at its cursor."""
+        replay = await self.get(replay_id)
+        if replay.status == REPLAY_COMPLETED:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT, detail="DLQ replay already completed"
+            )
+        return await self._replay_repo.set_status(replay_id, REPLAY_RUNNING)
+
+    async def run(self, replay_id: int) -> DlqReplay:
+        replay = await self.get(replay_id)
+        if replay.status != REPLAY_RUNNING:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"DLQ replay is {replay.status}",
+            )
+        try:
+            return await self._run(replay)
+        except Exception as exc:
+            self._logger.exception("DLQ replay failed", extra={"replay_id": replay_id})
+            await self._replay_repo.set_status(replay_id, REPLAY_FAILED, str(exc))
+            raise
+
+    async def _run(self, replay: DlqReplay) -> DlqReplay:
+        interval = 1.0 / replay.rate_per_second
+        next_slot = datetime.now(timezone.utc)
+        while True:
+            batch = await self._replay_repo.next_batch(replay)
+            if not batch:
+                break
+
+            now = datetime.now(timezone.utc)
+            next_slot = max(next_slot, now)
+            schedule = [next_slot + timedelta(seconds=i * interval) for i in range(len(batch))]
+            next_slot = schedule[-1] + timedelta(seconds=interval)
+
+            advanced = await self._replay_repo.requeue_batch(replay, batch, schedule)
+            if advanced is None:
+                # Another runner (or a status change) moved the replay on
+                self._logger.warning(
+                    "DLQ replay superseded, stopping", extra={"replay_id": replay.id}
+                )
+                return await self.get(replay.id)
+            replay = advanced
+            self._logger.info(
+                "DLQ replay batch re-enqueued",
+                extra={
+                    "replay_id": replay.id,
+                    "batch": len(batch),
+                    "replayed": replay.replayed,
+                    "skipped": replay.skipped,
+                    "total": replay.total,
+                    "last_dead_letter_id": replay.last_dead_letter_id,
+                },
+            )
+            ahead = (next_slot - now).total_seconds() - len(batch) * interval
+            if ahead > 0:
+                await self._sleep(ahead)
+
+        replay = await self._replay_repo.set_status(replay.id, REPLAY_COMPLETED)
+        self._logger.info(
+            "DLQ replay completed",
+            extra={"replay_id": replay.id, "replayed": replay.replayed, "skipped": replay.skipped},
+        )
+        return replay
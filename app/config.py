@@ -13,11 +13,70 @@ class Settings(BaseSettings):
     use_in_memory: bool = True
     supplier_base_url: str | None = None
     supplier_timeout_seconds: float = 5.0
+    # Process-wide gateways re-read Settings this often and rebuild on change (0 = never)
+    supplier_gateway_reload_interval_seconds: float = 30.0
     americagroup_endpoint: str | None = None
     americagroup_requestor_id: str | None = None
     americagroup_timeout_seconds: float = 5.0
     americagroup_retry_times: int = 2
     americagroup_retry_sleep_ms: int = 300
+    # Shared pooled httpx clients, one per supplier host (gateways/http_clients.py)
+    supplier_http_max_connections: int = 20  # per host and process
+    supplier_http_max_keepalive_connections: int = 10
+    supplier_http_keepalive_expiry_seconds: float = 30.0
+    supplier_http2: bool = False  # needs the h2 package (httpx[http2])
+    # Per-supplier circuit breakers (infrastructure/circuit_breaker.py)
+    supplier_breaker_window_seconds: float = 60.0  # sliding window for the failure rate
+    supplier_breaker_min_calls: int = 10  # calls in the window before the rate counts
+    supplier_breaker_failure_rate: float = 0.5  # open at this failure ratio
+    supplier_breaker_reset_timeout_seconds: float = 60.0  # OPEN -> HALF_OPEN
+    supplier_breaker_half_open_max_calls: int = 2  # concurrent probes while HALF_OPEN
+    # Per-supplier limits on outbound bookings, per process (gateways/supplier_limiter.py)
+    supplier_max_concurrency: int = 10  # 0 = unlimited
+    supplier_rate_per_second: float = 0.0  # token bucket refill; 0 = unlimited
+    supplier_rate_burst: int = 5
+    supplier_limit_max_wait_seconds: float = 10.0  # then SUPPLIER_RATE_LIMITED, retried later
+    # JSON objects keyed by supplier_id, e.g. {"93": 4} / {"93": 2.5}
+    supplier_max_concurrency_overrides: dict[int, int] = Field(default_factory=dict)
+    supplier_rate_per_second_overrides: dict[int, float] = Field(default_factory=dict)
+    # Time budget per outbox BOOK_SUPPLIER event (limiter wait + every gateway attempt);
+    # keep it below OUTBOX_WORKER_EVENT_TIMEOUT_SECONDS. 0 = no budget
+    supplier_booking_budget_seconds: float = 60.0
+    # Hedged requests for suppliers with idempotent booking, keyed by gateway factory
+    # section, e.g. {"europcargroup": 2.0}: second request if no answer after N seconds
+    supplier_hedge_after_seconds: dict[str, float] = Field(default_factory=dict)
+    # Load testing only: points every simulated gateway at scripts/supplier_simulator.py,
+    # e.g. http://localhost:8099 (overrides the real endpoints)
+    supplier_simulator_url: str = ""
+    # Supplier payload storage in reservation_supplier_requests (db/payload_store.py)
+    supplier_payload_inline_max_bytes: int = 512  # larger values are stored zlib-compressed
+    supplier_payload_spill_bytes: int = 65536  # compressed blobs above this go to the blob dir
+    supplier_payload_blob_dir: str | None = None  # content-addressed files; None = keep inline
+    # local (asyncio, same process) | socket (UDP); socket is required for the API to
+    # wake the multi-process runner (python -m app.infrastructure.messaging)
+    outbox_notify_backend: str = "local"
+    outbox_notify_host: str = "127.0.0.1"
+    outbox_notify_port: int = 8765  # worker process i listens on port + i
+    # Runner worker processes publish their in-process metrics here for /workers/outbox/metrics
+    outbox_metrics_dir: str | None = None
+    outbox_retention_mode: str = "archive"  # archive | delete
+    outbox_retention_days: int = 7  # DONE/FAILED events older than this leave outbox_events
+    outbox_dlq_retention_days: int = 90
+    outbox_retention_batch_size: int = 1000
+    outbox_retention_pause_seconds: float = 0.2
+    # Bulk DLQ replay (POST /workers/outbox/dlq/replays, scripts/replay_dlq.py)
+    outbox_dlq_replay_rate_per_second: float = 5.0  # replayed events become due at this rate
+    outbox_dlq_replay_batch_size: int = 100  # dead letters per transaction
+    outbox_worker_processes: int = 2  # python -m app.infrastructure.messaging
+    outbox_worker_max_in_flight: int = 4  # per process
+    outbox_worker_event_timeout_seconds: float = 120.0
+    outbox_worker_drain_timeout_seconds: float = 60.0  # SIGTERM -> kill
+    # Per-supplier fair scheduling in the worker (SupplierFairScheduler)
+    outbox_supplier_fair_scheduling: bool = True
+    outbox_supplier_max_in_flight: int = 2  # per supplier and process
+    # JSON objects keyed by supplier_id, e.g. {"1": 0.5, "93": 0.5} / {"1": 1}
+    outbox_supplier_weights: dict[int, float] = Field(default_factory=dict)
+    outbox_supplier_max_in_flight_overrides: dict[int, int] = Field(default_factory=dict)
     
     google_api_key: str | None = None
 
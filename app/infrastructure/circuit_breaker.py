@@ -3,6 +3,9 @@ Circuit Breaker configuration for external service calls.
 
 This module provides pre-configured Circuit Breakers for external services
 (Stripe, Suppliers) to prevent cascading failures and resource exhaustion.
+Stripe's SDK is synchronous and uses pybreaker; suppliers are async and get
+one AsyncCircuitBreaker each, so an outage at one partner fails fast for that
+partner only.
 
 Circuit Breaker Pattern:
 - CLOSED: Normal operation, requests pass through
@@ -10,15 +13,27 @@ Circuit Breaker Pattern:
 - HALF_OPEN: Testing if service recovered, limited requests allowed
 
 Configuration:
-- fail_max: Number of consecutive failures before opening circuit
+- fail_max: Number of consecutive failures before opening circuit (Stripe)
+- failure rate over a sliding time window, with a minimum number of calls (suppliers)
 - reset_timeout: Seconds to wait before attempting recovery (HALF_OPEN)
-- exclude: Exceptions that don't count as failures
+- half_open_max_calls: Concurrent probe calls allowed while HALF_OPEN (suppliers)
 """
 
+import functools
 import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from typing import Any, TypeVar
+from urllib.parse import urlsplit
 
 from pybreaker import CircuitBreaker, CircuitBreakerError
 
+from app.application.interfaces.supplier_gateway import SupplierBookingResult
+from app.application.retry_policy import DEFAULT_RETRY_POLICY, PERMANENT
+from app.config import get_settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,17 +46,6 @@ stripe_breaker = CircuitBreaker(
 )
 
 
-# Supplier Circuit Breaker Configuration
-# Using separate breakers per supplier would be ideal in production,
-# but for this implementation we use a shared one for simplicity
-supplier_breaker = CircuitBreaker(
-    fail_max=5,  # Open circuit after 5 consecutive failures
-    reset_timeout=60,  # Wait 60 seconds before attempting recovery
-    name="supplier_circuit_breaker",
-    listeners=[],
-)
-
-
 def log_circuit_state_change(breaker_name: str, old_state: str, new_state: str):
     """
     Log circuit breaker state changes for monitoring and alerting.
@@ -76,32 +80,280 @@ class CircuitBreakerListener(CircuitBreaker.Listener if hasattr(CircuitBreaker,
 
 
 stripe_breaker.add_listener(CircuitBreakerListener("stripe"))
-supplier_breaker.add_listener(CircuitBreakerListener("supplier"))
+
+
+
+
+T = TypeVar("T")
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class AsyncCircuitBreaker:
+    """
+    Circuit breaker for coroutines, tracking the failure rate of a sliding window.
+
+    CLOSED: calls pass; outcomes are counted in one-second buckets covering
+    the last `window_seconds`. Once the window holds at least `min_calls`
+    calls and the failed ratio reaches `failure_rate_threshold`, the circuit
+    opens. OPEN: calls fail fast with CircuitBreakerError for
+    `reset_timeout_seconds`. HALF_OPEN: up to `half_open_max_calls` probes run
+    concurrently (the rest still fail fast); one failed probe re-opens the
+    circuit, `half_open_max_calls` successful ones close it.
+
+    Outcomes of calls started before a state change are ignored, so a slow
+    request that fails after the circuit opened can't extend the outage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 60.0,
+        min_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        reset_timeout_seconds: float = 60.0,
+        half_open_max_calls: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = max(1, min_calls)
+        self.failure_rate_threshold = failure_rate_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = STATE_CLOSED
+        self.opened_count = 0
+        self.rejected_count = 0
+        self._generation = 0
+        self._opened_at = 0.0
+        self._buckets: deque[list[int]] = deque()  # [second, calls, failures]
+        self._calls = 0
+        self._failures = 0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    @property
+    def failure_rate(self) -> float:
+        self._evict(self._clock())
+        return self._failures / self._calls if self._calls else 0.0
+
+    def retry_after_seconds(self) -> float | None:
+        """Seconds until an open circuit lets a probe through."""
+        if self.state != STATE_OPEN:
+            return None
+        return max(0.0, self._opened_at + self.reset_timeout_seconds - self._clock())
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[T]],
+        *args: Any,
+        is_failure: Callable[[T], bool] | None = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Await `func(*args, **kwargs)` through the breaker.
+
+        Exceptions count as failures and are re-raised; `is_failure` lets a
+        returned value (e.g. a FAILED booking result) count as one too.
+        Raises CircuitBreakerError without calling `func` while open.
+        """
+        generation, probe = self._acquire()
+        try:
+            result = await func(*args, **kwargs)
+        except Exception:
+            self._record(generation, probe, failed=True)
+            raise
+        except BaseException:
+            # Cancelled: no verdict on the supplier, just free the probe slot
+            if probe and generation == self._generation:
+                self._probes_in_flight -= 1
+            raise
+        self._record(generation, probe, failed=bool(is_failure and is_failure(result)))
+        return result
+
+    def snapshot(self) -> dict:
+        now = self._clock()
+        self._evict(now)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "calls": self._calls,
+            "failures": self._failures,
+            "failure_rate": round(self._failures / self._calls, 4) if self._calls else 0.0,
+            "opened_total": self.opened_count,
+            "rejected_total": self.rejected_count,
+            "retry_after_seconds": self.retry_after_seconds(),
+        }
+
+    def _acquire(self) -> tuple[int, bool]:
+        if self.state == STATE_OPEN:
+            if self._clock() - self._opened_at < self.reset_timeout_seconds:
+                self.rejected_count += 1
+                raise CircuitBreakerError(f"Circuit {self.name} is open")
+            self._transition(STATE_HALF_OPEN)
+        if self.state == STATE_HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_max_calls:
+                self.rejected_count += 1
+                raise CircuitBreakerError(f"Circuit {self.name} is half-open, probes busy")
+            self._probes_in_flight += 1
+            return self._generation, True
+        return self._generation, False
+
+    def _record(self, generation: int, probe: bool, failed: bool) -> None:
+        if generation != self._generation:
+            return
+        if probe:
+            self._probes_in_flight -= 1
+            if failed:
+                self._open()
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_max_calls:
+                    self._transition(STATE_CLOSED)
+            return
+
+        now = self._clock()
+        second = int(now)
+        if self._buckets and self._buckets[-1][0] == second:
+            bucket = self._buckets[-1]
+        else:
+            bucket = [second, 0, 0]
+            self._buckets.append(bucket)
+        bucket[1] += 1
+        bucket[2] += failed
+        self._calls += 1
+        self._failures += failed
+        self._evict(now)
+        if (
+            failed
+            and self._calls >= self.min_calls
+            and self._failures >= self.failure_rate_threshold * self._calls
+        ):
+            self._open()
+
+    def _evict(self, now: float) -> None:
+        oldest = now - self.window_seconds
+        while self._buckets and self._buckets[0][0] + 1 <= oldest:
+            _, calls, failures = self._buckets.popleft()
+            self._calls -= calls
+            self._failures -= failures
+
+    def _open(self) -> None:
+        self._opened_at = self._clock()
+        self.opened_count += 1
+        self._transition(STATE_OPEN)
+
+    def _transition(self, new_state: str) -> None:
+        old_state, self.state = self.state, new_state
+        self._generation += 1
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if new_state != STATE_OPEN:
+            # A fresh window: failures from before the outage don't count again
+            self._buckets.clear()
+            self._calls = self._failures = 0
+        if old_state != new_state:
+            log_circuit_state_change(self.name, old_state, new_state)
+
+
+class SupplierBreakerRegistry:
+    """One AsyncCircuitBreaker per supplier, created on first use."""
+
+    def __init__(self, **breaker_options: Any) -> None:
+        self._options = breaker_options
+        self._breakers: dict[str, AsyncCircuitBreaker] = {}
+
+    def get(self, name: str) -> AsyncCircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = AsyncCircuitBreaker(name, **self._options)
+        return breaker
+
+    def snapshot(self) -> list[dict]:
+        return [self._breakers[name].snapshot() for name in sorted(self._breakers)]
+
+    def reset(self) -> None:
+        for breaker in self._breakers.values():
+            breaker.reset()
+
+
+@lru_cache(maxsize=1)
+def get_supplier_breakers() -> SupplierBreakerRegistry:
+    settings = get_settings()
+    return SupplierBreakerRegistry(
+        window_seconds=settings.supplier_breaker_window_seconds,
+        min_calls=settings.supplier_breaker_min_calls,
+        failure_rate_threshold=settings.supplier_breaker_failure_rate,
+        reset_timeout_seconds=settings.supplier_breaker_reset_timeout_seconds,
+        half_open_max_calls=settings.supplier_breaker_half_open_max_calls,
+    )
+
+
+def supplier_breaker_key(gateway: Any) -> str:
+    """
+    Breaker name of a gateway: its `circuit_breaker_key` attribute if set,
+    else the class (one class per supplier integration).
+    """
+    return getattr(gateway, "circuit_breaker_key", None) or type(gateway).__name__
+
+
+def breaker_key_for_url(url: str) -> str:
+    """Breaker name for generic gateways that are told apart only by host."""
+    return urlsplit(url).netloc.lower() or url
+
+
+def is_supplier_failure(result: SupplierBookingResult) -> bool:
+    """
+    A FAILED booking counts against the supplier unless it's our own
+    permanent error (missing data, rejected request): timeouts, network
+    errors, 5xx and throttling do.
+    """
+    return result.status == "FAILED" and (
+        DEFAULT_RETRY_POLICY.classify(result.error_code, result.http_status) != PERMANENT
+    )
+
+
+def circuit_open_result(breaker: AsyncCircuitBreaker) -> SupplierBookingResult:
+    return SupplierBookingResult(
+        status="FAILED",
+        error_code="CIRCUIT_OPEN",
+        error_message=f"Supplier circuit {breaker.name} is {breaker.state}",
+        retry_after_seconds=breaker.retry_after_seconds(),
+    )
 
 
 def async_supplier_breaker(func):
-    """Decorator for async supplier calls with circuit breaker."""
-    async def wrapper(*args, **kwargs):
-        # We use the breaker to wrap the execution. 
-        # Since pybreaker's call_async is buggy, we use the synchronous call 
-        # but manage the async execution ourselves while letting the breaker 
-        # track failures.
-        
+    """
+    Decorator for a gateway's async `book`, guarded by that supplier's breaker.
+
+    While the circuit is open the call returns a FAILED result with
+    error_code CIRCUIT_OPEN (and retry_after_seconds) instead of reaching the
+    supplier; the retry policy treats it as throttling.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        breaker = get_supplier_breakers().get(supplier_breaker_key(self))
         try:
-            # This will trip the breaker if an exception is raised
-            return await supplier_breaker.call(func, *args, **kwargs)
-        except Exception as e:
-            # If it's already a CircuitBreakerError, just re-raise
-            if isinstance(e, CircuitBreakerError):
-                raise e
-            # Otherwise, the breaker already recorded the failure in .call()
-            raise e
+            return await breaker.call(func, self, *args, is_failure=is_supplier_failure, **kwargs)
+        except CircuitBreakerError:
+            return circuit_open_result(breaker)
+
     return wrapper
 
 
 __all__ = [
     "stripe_breaker",
-    "supplier_breaker",
+    "AsyncCircuitBreaker",
+    "SupplierBreakerRegistry",
+    "get_supplier_breakers",
     "async_supplier_breaker",
+    "breaker_key_for_url",
     "CircuitBreakerError",
 ]
@@ -0,0 +1,165 @@
+"""
+Retention job for the outbox tables.
+
+Moves terminal (DONE/FAILED) outbox_events older than a configurable age into
+outbox_events_archive (or deletes them) and purges old outbox_dead_letters, so
+the hot table and its claim indexes stay small.
+
+Work is done in small keyset-paginated batches (by primary key), each in its
+own short transaction, with a pause between batches to avoid lock contention
+with the workers that claim and enqueue events.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import Table, delete, insert, literal, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.infrastructure.db.tables import outbox_dead_letters, outbox_events, outbox_events_archive
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("DONE", "FAILED")
+ARCHIVED_COLUMNS = [
+    c.name for c in outbox_events_archive.columns if c.name != "archived_at"
+]
+
+
+@dataclass
+class RetentionReport:
+    table: str
+    rows: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+class OutboxRetentionJob:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        retention_days: int = 7,
+        dlq_retention_days: int = 90,
+        mode: str = "archive",
+        batch_size: int = 1000,
+        pause_seconds: float = 0.2,
+        max_rows_per_second: float | None = None,
+    ) -> None:
+        """
+        Args:
+            session_maker: Session factory (one short transaction per batch).
+            retention_days: Minimum age (updated_at) of DONE/FAILED events to move.
+            dlq_retention_days: Minimum age (moved_at) of dead letters to delete.
+            mode: "archive" (copy to outbox_events_archive, then delete) or "delete".
+            batch_size: Rows per batch/transaction.
+            pause_seconds: Minimum pause between batches.
+            max_rows_per_second: Rate cap (None = pause_seconds only).
+        """
+        if mode not in ("archive", "delete"):
+            raise ValueError(f"Unsupported retention mode: {mode}")
+        self._session_maker = session_maker
+        self._retention = timedelta(days=retention_days)
+        self._dlq_retention = timedelta(days=dlq_retention_days)
+        self._mode = mode
+        self._batch_size = batch_size
+        self._pause = pause_seconds
+        self._max_rate = max_rows_per_second
+        self._running = False
+
+    async def run_once(self, now: datetime | None = None) -> list[RetentionReport]:
+        """Runs a full retention pass over both tables."""
+        now = now or datetime.utcnow()
+        events = await self._drain(
+            table=outbox_events,
+            conditions=[
+                outbox_events.c.status.in_(TERMINAL_STATUSES),
+                outbox_events.c.updated_at < now - self._retention,
+            ],
+            archive=self._mode == "archive",
+            now=now,
+        )
+        dead_letters = await self._drain(
+            table=outbox_dead_letters,
+            conditions=[outbox_dead_letters.c.moved_at < now - self._dlq_retention],
+            archive=False,
+            now=now,
+        )
+        reports = [events, dead_letters]
+        for report in reports:
+            logger.info(
+                "Outbox retention pass finished",
+                extra={
+                    "table": report.table,
+                    "mode": self._mode if report.table == "outbox_events" else "delete",
+                    "rows": report.rows,
+                    "batches": report.batches,
+                    "rows_per_second": round(report.rows_per_second, 1),
+                },
+            )
+        return reports
+
+    async def run_forever(self, interval_seconds: float = 3600) -> None:
+        """Runs a retention pass every `interval_seconds` until stop() is called."""
+        self._running = True
+        while self._running:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.exception(f"Outbox retention pass failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+    def stop(self) -> None:
+        self._running = False
+
+    async def _drain(
+        self, table: Table, conditions: list, archive: bool, now: datetime
+    ) -> RetentionReport:
+        report = RetentionReport(table=table.name)
+        started = time.perf_counter()
+        last_id = 0
+        while True:
+            batch_started = time.perf_counter()
+            async with self._session_maker() as session, session.begin():
+                result = await session.execute(
+                    select(table.c.id)
+                    .where(table.c.id > last_id, *conditions)
+                    .order_by(table.c.id)
+                    .limit(self._batch_size)
+                )
+                ids = [row[0] for row in result.all()]
+                if not ids:
+                    break
+                if archive:
+                    await session.execute(
+                        insert(outbox_events_archive).from_select(
+                            ARCHIVED_COLUMNS + ["archived_at"],
+                            select(
+                                *[table.c[name] for name in ARCHIVED_COLUMNS],
+                                literal(now, outbox_events_archive.c.archived_at.type),
+                            ).where(table.c.id.in_(ids)),
+                        )
+                    )
+                await session.execute(delete(table).where(table.c.id.in_(ids)))
+
+            last_id = ids[-1]
+            report.rows += len(ids)
+            report.batches += 1
+            await asyncio.sleep(self._throttle(len(ids), time.perf_counter() - batch_started))
+            if len(ids) < self._batch_size:
+                break
+
+        report.elapsed_seconds = time.perf_counter() - started
+        return report
+
+    def _throttle(self, rows: int, batch_seconds: float) -> float:
+        pause = self._pause
+        if self._max_rate:
+            pause = max(pause, rows / self._max_rate - batch_seconds)
+        return pause
@@ -0,0 +1,164 @@
+"""
+Compact storage for supplier request/response payloads.
+
+Gateways return the raw supplier body in SupplierBookingResult.payload
+({"raw": response.text}, {"response": ..., "request": ...}) and every attempt
+used to write it verbatim into reservation_supplier_requests.response_payload.
+PayloadStore.compact() keeps small values (the fields the gateway extracted:
+codes, ids, statuses) inline and replaces large ones with a blob reference:
+
+    {"$blob": "sha256:<hex>", "codec": "zlib", "kind": "text", "size": 48213,
+     "data": "<base64 of the compressed bytes>"}
+
+Blobs whose compressed size exceeds spill_bytes go to a content-addressed
+FileBlobStore instead of "data" (same digest = same file, so retries that get
+the same response from the supplier store it once). expand() reverses it for
+audits; rows written before this change have no references and pass through.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+BLOB_KEY = "$blob"
+CODEC = "zlib"
+KIND_TEXT = "text"
+KIND_JSON = "json"
+
+
+class FileBlobStore:
+    """Content-addressed files: <root>/<2 hex>/<2 hex>/<sha256 hex>.zz"""
+
+    def __init__(self, root: str | os.PathLike) -> None:
+        self.root = Path(root)
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}.zz"
+
+    def put(self, digest: str, data: bytes) -> bool:
+        """Write the blob unless it already exists. Returns True if written."""
+        path = self.path(digest)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write + rename so concurrent writers and readers never see a partial file
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return True
+
+    def get(self, digest: str) -> bytes | None:
+        try:
+            return self.path(digest).read_bytes()
+        except FileNotFoundError:
+            return None
+
+
+class PayloadStore:
+    def __init__(
+        self,
+        inline_max_bytes: int = 512,
+        spill_bytes: int = 64 * 1024,
+        blob_store: FileBlobStore | None = None,
+        compress_level: int = 6,
+    ) -> None:
+        """
+        Args:
+            inline_max_bytes: Values up to this size (UTF-8 / JSON) stay inline as-is.
+            spill_bytes: Compressed blobs above this go to blob_store (if configured).
+            blob_store: Content-addressed file store; None keeps every blob inline.
+        """
+        self.inline_max_bytes = inline_max_bytes
+        self.spill_bytes = spill_bytes
+        self.blob_store = blob_store
+        self.compress_level = compress_level
+
+    async def compact(self, payload: dict[str, Any] | None) -> dict[str, Any] | None:
+        if not payload:
+            return payload
+        compacted: dict[str, Any] = {}
+        for key, value in payload.items():
+            encoded = self._encode(value)
+            if encoded is None or len(encoded[1]) <= self.inline_max_bytes:
+                compacted[key] = value
+            else:
+                compacted[key] = await self._blob(*encoded)
+        return compacted
+
+    async def expand(self, stored: dict[str, Any] | None) -> dict[str, Any] | None:
+        if not stored:
+            return stored
+        expanded: dict[str, Any] = {}
+        for key, value in stored.items():
+            if is_blob_ref(value):
+                value = await self._load(value)
+            expanded[key] = value
+        return expanded
+
+    def _encode(self, value: Any) -> tuple[str, bytes] | None:
+        if isinstance(value, str):
+            return KIND_TEXT, value.encode()
+        if isinstance(value, (dict, list)):
+            return KIND_JSON, json.dumps(value, separators=(",", ":"), default=str).encode()
+        return None
+
+    async def _blob(self, kind: str, raw: bytes) -> dict[str, Any]:
+        digest = hashlib.sha256(raw).hexdigest()
+        data = zlib.compress(raw, self.compress_level)
+        ref: dict[str, Any] = {
+            BLOB_KEY: f"sha256:{digest}",
+            "codec": CODEC,
+            "kind": kind,
+            "size": len(raw),
+        }
+        if self.blob_store is not None and len(data) > self.spill_bytes:
+            await asyncio.to_thread(self.blob_store.put, digest, data)
+        else:
+            ref["data"] = base64.b64encode(data).decode("ascii")
+        return ref
+
+    async def _load(self, ref: dict[str, Any]) -> Any:
+        if "data" in ref:
+            data = base64.b64decode(ref["data"])
+        else:
+            digest = ref[BLOB_KEY].partition(":")[2]
+            data = None
+            if self.blob_store is not None:
+                data = await asyncio.to_thread(self.blob_store.get, digest)
+            if data is None:
+                logger.warning("Supplier payload blob not found", extra={"blob": ref[BLOB_KEY]})
+                return ref
+        raw = zlib.decompress(data)
+        return json.loads(raw) if ref.get("kind") == KIND_JSON else raw.decode()
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and BLOB_KEY in value
+
+
+@lru_cache(maxsize=1)
+def get_payload_store() -> PayloadStore:
+    settings = get_settings()
+    blob_dir = settings.supplier_payload_blob_dir
+    return PayloadStore(
+        inline_max_bytes=settings.supplier_payload_inline_max_bytes,
+        spill_bytes=settings.supplier_payload_spill_bytes,
+        blob_store=FileBlobStore(blob_dir) if blob_dir else None,
+    )
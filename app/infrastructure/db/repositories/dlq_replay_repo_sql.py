@@ -0,0 +1,279 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.application.interfaces.dlq_replay_repo import (
+    REPLAY_RUNNING,
+    DeadLetter,
+    DeadLetterFilter,
+    DlqReplay,
+    DlqReplayRepo,
+)
+from app.application.interfaces.outbox_repo import outbox_shard_key
+from app.infrastructure.db.mysql_engine import session_scope
+from app.infrastructure.db.repositories.outbox_repo_sql import _insert_ignoring_duplicates
+from app.infrastructure.db.tables import outbox_dead_letters, outbox_dlq_replays, outbox_events
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    """Columns are naive UTC; callers may pass aware datetimes."""
+    if value is not None and value.tzinfo:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _filter_conditions(filters: DeadLetterFilter) -> list:
+    conditions = [outbox_dead_letters.c.replayed_at.is_(None)]
+    if filters.supplier_id is not None:
+        conditions.append(outbox_dead_letters.c.supplier_id == filters.supplier_id)
+    if filters.error_code is not None:
+        conditions.append(outbox_dead_letters.c.error_code == filters.error_code)
+    if filters.event_type is not None:
+        conditions.append(outbox_dead_letters.c.event_type == filters.event_type)
+    if filters.moved_from is not None:
+        conditions.append(outbox_dead_letters.c.moved_at >= _naive_utc(filters.moved_from))
+    if filters.moved_to is not None:
+        conditions.append(outbox_dead_letters.c.moved_at < _naive_utc(filters.moved_to))
+    return conditions
+
+
+def _row_to_replay(data: Any) -> DlqReplay:
+    return DlqReplay(
+        id=data["id"],
+        status=data["status"],
+        filters=DeadLetterFilter(
+            supplier_id=data["supplier_id"],
+            error_code=data["error_code"],
+            event_type=data["event_type"],
+            moved_from=data["moved_from"],
+            moved_to=data["moved_to"],
+        ),
+        rate_per_second=data["rate_per_second"],
+        batch_size=data["batch_size"],
+        total=data["total"],
+        last_dead_letter_id=data["last_dead_letter_id"],
+        replayed=data["replayed"],
+        skipped=data["skipped"],
+        error_message=data["error_message"],
+        created_at=data["created_at"],
+        updated_at=data["updated_at"],
+        finished_at=data["finished_at"],
+    )
+
+
+def _row_to_dead_letter(data: Any) -> DeadLetter:
+    return DeadLetter(
+        id=data["id"],
+        original_event_id=data["original_event_id"],
+        event_type=data["event_type"],
+        aggregate_type=data["aggregate_type"],
+        reservation_code=data["reservation_code"],
+        payload=data["payload"],
+        error_code=data["error_code"],
+        attempts=data["attempts"],
+        moved_at=data["moved_at"],
+        supplier_id=data["supplier_id"] or 0,
+    )
+
+
+class DlqReplayRepoSQL(DlqReplayRepo):
+    """
+    DlqReplayRepo that opens its own short transaction per call.
+
+    A replay runs for minutes or hours: each batch commits on its own so
+    progress survives a crash and no lock is held between batches.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker) -> None:
+        self._session_maker = session_maker
+
+    async def create(
+        self, filters: DeadLetterFilter, rate_per_second: float, batch_size: int
+    ) -> DlqReplay:
+        now = datetime.utcnow()
+        async with session_scope(self._session_maker) as session:
+            total = await session.scalar(
+                select(func.count()).select_from(outbox_dead_letters).where(
+                    *_filter_conditions(filters)
+                )
+            )
+            result = await session.execute(
+                insert(outbox_dlq_replays).values(
+                    status=REPLAY_RUNNING,
+                    supplier_id=filters.supplier_id,
+                    error_code=filters.error_code,
+                    event_type=filters.event_type,
+                    moved_from=_naive_utc(filters.moved_from),
+                    moved_to=_naive_utc(filters.moved_to),
+                    rate_per_second=rate_per_second,
+                    batch_size=batch_size,
+                    total=total or 0,
+                    last_dead_letter_id=0,
+                    replayed=0,
+                    skipped=0,
+                    created_at=now,
+                    updated_at=now,
+                )
+            )
+            return await self._get(session, result.inserted_primary_key[0])
+
+    async def get(self, replay_id: int) -> DlqReplay | None:
+        async with session_scope(self._session_maker) as session:
+            return await self._get(session, replay_id)
+
+    async def next_batch(self, replay: DlqReplay) -> list[DeadLetter]:
+        async with session_scope(self._session_maker) as session:
+            result = await session.execute(
+                select(outbox_dead_letters)
+                .where(
+                    outbox_dead_letters.c.id > replay.last_dead_letter_id,
+                    *_filter_conditions(replay.filters),
+                )
+                .order_by(outbox_dead_letters.c.id)
+                .limit(replay.batch_size)
+            )
+            return [_row_to_dead_letter(row) for row in result.mappings().all()]
+
+    async def requeue_batch(
+        self,
+        replay: DlqReplay,
+        dead_letters: list[DeadLetter],
+        next_attempt_at: list[datetime],
+    ) -> DlqReplay | None:
+        now = datetime.utcnow()
+        async with session_scope(self._session_maker) as session:
+            # Fence on the cursor first: the row lock serializes concurrent runners
+            advanced = await session.execute(
+                update(outbox_dlq_replays)
+                .where(
+                    outbox_dlq_replays.c.id == replay.id,
+                    outbox_dlq_replays.c.status == REPLAY_RUNNING,
+                    outbox_dlq_replays.c.last_dead_letter_id == replay.last_dead_letter_id,
+                )
+                .values(last_dead_letter_id=dead_letters[-1].id, updated_at=now)
+            )
+            if advanced.rowcount != 1:
+                return None
+
+            schedule = {
+                dead_letter.original_event_id: _naive_utc(when)
+                for dead_letter, when in zip(dead_letters, next_attempt_at, strict=True)
+            }
+            result = await session.execute(
+                select(outbox_events.c.id, outbox_events.c.status).where(
+                    outbox_events.c.id.in_(schedule)
+                )
+            )
+            statuses = dict(result.all())
+            failed_ids = [event_id for event_id, status in statuses.items() if status == "FAILED"]
+            replayed = 0
+            if failed_ids:
+                reset = await session.execute(
+                    update(outbox_events)
+                    .where(outbox_events.c.id.in_(failed_ids), outbox_events.c.status == "FAILED")
+                    .values(
+                        **self._reset_values(now),
+                        next_attempt_at=case(schedule, value=outbox_events.c.id),
+                    )
+                )
+                replayed = reset.rowcount
+
+            # Originals already purged by retention: re-create them
+            for dead_letter in dead_letters:
+                if dead_letter.original_event_id not in statuses:
+                    replayed += await self._recreate(
+                        session, dead_letter, schedule[dead_letter.original_event_id], now
+                    )
+
+            await session.execute(
+                update(outbox_dead_letters)
+                .where(outbox_dead_letters.c.id.in_([dl.id for dl in dead_letters]))
+                .values(replay_id=replay.id, replayed_at=now)
+            )
+            await session.execute(
+                update(outbox_dlq_replays)
+                .where(outbox_dlq_replays.c.id == replay.id)
+                .values(
+                    replayed=outbox_dlq_replays.c.replayed + replayed,
+                    skipped=outbox_dlq_replays.c.skipped + len(dead_letters) - replayed,
+                )
+            )
+            return await self._get(session, replay.id)
+
+    async def set_status(
+        self, replay_id: int, status: str, error_message: str | None = None
+    ) -> DlqReplay | None:
+        now = datetime.utcnow()
+        async with session_scope(self._session_maker) as session:
+            await session.execute(
+                update(outbox_dlq_replays)
+                .where(outbox_dlq_replays.c.id == replay_id)
+                .values(
+                    status=status,
+                    error_message=error_message[:500] if error_message else None,
+                    updated_at=now,
+                    finished_at=None if status == REPLAY_RUNNING else now,
+                )
+            )
+            return await self._get(session, replay_id)
+
+    @staticmethod
+    def _reset_values(now: datetime) -> dict[str, Any]:
+        # attempts=0: the replayed event gets the full retry budget again
+        return dict(
+            status="RETRY",
+            attempts=0,
+            locked_by=None,
+            locked_at=None,
+            lock_expires_at=None,
+            updated_at=now,
+        )
+
+    async def _recreate(
+        self, session: AsyncSession, dead_letter: DeadLetter, when: datetime, now: datetime
+    ) -> int:
+        code = dead_letter.reservation_code
+        if not code:
+            return 0
+        result = await session.execute(
+            select(outbox_events.c.id, outbox_events.c.status).where(
+                outbox_events.c.aggregate_code == code,
+                outbox_events.c.event_type == dead_letter.event_type,
+            )
+        )
+        existing = result.first()
+        if existing is not None:
+            # Re-created under a new id since it was dead-lettered
+            if existing.status != "FAILED":
+                return 0
+            await session.execute(
+                update(outbox_events)
+                .where(outbox_events.c.id == existing.id)
+                .values(**self._reset_values(now), next_attempt_at=when)
+            )
+            return 1
+        values = dict(
+            event_type=dead_letter.event_type,
+            aggregate_type=dead_letter.aggregate_type,
+            aggregate_code=code,
+            payload=dead_letter.payload,
+            status="RETRY",
+            attempts=0,
+            next_attempt_at=when,
+            created_at=now,
+            updated_at=now,
+            shard_key=outbox_shard_key(code),
+            supplier_id=dead_letter.supplier_id,
+        )
+        dialect_name = session.get_bind().dialect.name
+        await session.execute(_insert_ignoring_duplicates(dialect_name, values))
+        return 1
+
+    async def _get(self, session: AsyncSession, replay_id: int) -> DlqReplay | None:
+        result = await session.execute(
+            select(outbox_dlq_replays).where(outbox_dlq_replays.c.id == replay_id)
+        )
+        row = result.mappings().first()
+        return _row_to_replay(row) if row else None
@@ -1,15 +1,122 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from sqlalchemy import insert, or_, update
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.application.interfaces.outbox_repo import OutboxEvent, OutboxRepo
-from app.infrastructure.db.tables import outbox_dead_letters, outbox_events
+from app.application.interfaces.outbox_repo import (
+    NO_SUPPLIER,
+    PENDING_STATUSES,
+    OutboxEvent,
+    OutboxQueueStats,
+    OutboxRepo,
+    outbox_shard_key,
+)
+from app.infrastructure.db.mysql_engine import session_scope
+from app.infrastructure.db.tables import outbox_dead_letters, outbox_events, reservations
 
 logger = logging.getLogger(__name__)
 
+READY_STATUSES = ("NEW", "RETRY")
+# Dialects that support SELECT ... FOR UPDATE SKIP LOCKED
+SKIP_LOCKED_DIALECTS = {"mysql", "mariadb", "postgresql"}
+
+
+def _ready_conditions(now: datetime) -> list:
+    """Due NEW/RETRY events, plus IN_PROGRESS ones whose lease expired (crashed worker)."""
+    return [
+        or_(
+            outbox_events.c.status.in_(READY_STATUSES),
+            and_(
+                outbox_events.c.status == "IN_PROGRESS",
+                outbox_events.c.lock_expires_at <= now,
+            ),
+        ),
+        or_(
+            outbox_events.c.next_attempt_at.is_(None),
+            outbox_events.c.next_attempt_at <= now,
+        ),
+        or_(
+            outbox_events.c.lock_expires_at.is_(None),
+            outbox_events.c.lock_expires_at <= now,
+        ),
+    ]
+
+
+def _shard_condition(shard: tuple[int, int]):
+    """shard_key % total == index; legacy rows without shard_key belong to shard 0."""
+    index, total = shard
+    in_shard = (outbox_events.c.shard_key % total) == index
+    if index == 0:
+        return or_(in_shard, outbox_events.c.shard_key.is_(None))
+    return in_shard
+
+
+def _reservation_supplier(reservation_code: str):
+    """supplier_id of the reservation (NO_SUPPLIER if missing), evaluated inside the INSERT."""
+    return func.coalesce(
+        select(reservations.c.supplier_id)
+        .where(reservations.c.reservation_code == reservation_code)
+        .scalar_subquery(),
+        NO_SUPPLIER,
+    )
+
+
+def _owned_by(event_id: int, locked_by: str) -> list:
+    """Fencing: the event is still IN_PROGRESS and leased by this worker."""
+    return [
+        outbox_events.c.id == event_id,
+        outbox_events.c.locked_by == locked_by,
+        outbox_events.c.status == "IN_PROGRESS",
+    ]
+
+
+def _claim_candidates(conditions: list, limit: int):
+    """Served by idx_outbox_worker_claim (status, next_attempt_at, id)."""
+    return (
+        select(outbox_events.c.id)
+        .where(*conditions)
+        .order_by(outbox_events.c.next_attempt_at, outbox_events.c.id)
+        .limit(limit)
+    )
+
+
+def _insert_ignoring_duplicates(dialect_name: str, values: dict[str, Any]):
+    """INSERT that is a no-op (rowcount 0) when uq_outbox_aggregate_event already matches."""
+    if dialect_name in ("mysql", "mariadb"):
+        # INSERT IGNORE reports 0 affected rows on a duplicate even with CLIENT_FOUND_ROWS,
+        # unlike ON DUPLICATE KEY UPDATE id = id (1 found row)
+        return mysql_insert(outbox_events).values(**values).prefix_with("IGNORE")
+    if dialect_name == "sqlite":
+        return sqlite_insert(outbox_events).values(**values).on_conflict_do_nothing(
+            index_elements=["aggregate_code", "event_type"]
+        )
+    if dialect_name == "postgresql":
+        return postgresql_insert(outbox_events).values(**values).on_conflict_do_nothing(
+            index_elements=["aggregate_code", "event_type"]
+        )
+    return insert(outbox_events).values(**values)
+
+
+def _row_to_event(data: Any) -> OutboxEvent:
+    return OutboxEvent(
+        id=data["id"],
+        event_type=data["event_type"],
+        aggregate_type=data["aggregate_type"],
+        aggregate_code=data["aggregate_code"],
+        payload=data["payload"],
+        status=data["status"],
+        attempts=data.get("attempts", 0),
+        next_attempt_at=data.get("next_attempt_at"),
+        locked_by=data.get("locked_by"),
+        lock_expires_at=data.get("lock_expires_at"),
+        supplier_id=data.get("supplier_id") or NO_SUPPLIER,
+    )
+
 
 class OutboxRepoSQL(OutboxRepo):
     def __init__(self, session: AsyncSession) -> None:
@@ -21,9 +128,27 @@ class OutboxRepoSQL(OutboxRepo):
         aggregate_type: str,
         aggregate_code: str,
         payload: dict[str, Any],
+        supplier_id: int | None = None,
     ) -> OutboxEvent:
+        """
+        Insert the event, coalescing on (aggregate_code, event_type).
+
+        Backed by the uq_outbox_aggregate_event unique key: if the aggregate
+        already has an event of this type (in any status) nothing is inserted
+        and the existing event is returned, so a reservation is never booked
+        twice with the supplier.
+
+        Without an explicit supplier_id, reservation events copy it from the
+        reservation row in the same statement.
+        """
+        if supplier_id is None:
+            supplier_id = (
+                _reservation_supplier(aggregate_code)
+                if aggregate_type == "reservation"
+                else NO_SUPPLIER
+            )
         now = datetime.utcnow()
-        stmt = insert(outbox_events).values(
+        values = dict(
             event_type=event_type,
             aggregate_type=aggregate_type,
             aggregate_code=aggregate_code,
@@ -32,21 +157,31 @@ class OutboxRepoSQL(OutboxRepo):
             attempts=0,
             next_attempt_at=now,
             created_at=now,
+            shard_key=outbox_shard_key(aggregate_code),
+            supplier_id=supplier_id,
         )
+        stmt = _insert_ignoring_duplicates(self._session.get_bind().dialect.name, values)
         result = await self._session.execute(stmt)
-        event_id = result.inserted_primary_key[0]
-        return OutboxEvent(
-            id=event_id,
-            event_type=event_type,
-            aggregate_type=aggregate_type,
-            aggregate_code=aggregate_code,
-            payload=payload,
-            status="NEW",
-            attempts=0,
-            next_attempt_at=now,
-            locked_by=None,
-            lock_expires_at=None,
+
+        # Read back the canonical row: the one just inserted or the one we coalesced with
+        existing = await self._session.execute(
+            select(outbox_events).where(
+                outbox_events.c.aggregate_code == aggregate_code,
+                outbox_events.c.event_type == event_type,
+            )
         )
+        event = _row_to_event(existing.mappings().one())
+        if result.rowcount == 0:
+            logger.info(
+                "Outbox enqueue coalesced with existing event",
+                extra={
+                    "event_id": event.id,
+                    "event_type": event_type,
+                    "aggregate_code": aggregate_code,
+                    "status": event.status,
+                },
+            )
+        return event
 
     async def claim(
         self,
@@ -61,15 +196,7 @@ class OutboxRepoSQL(OutboxRepo):
             .where(
                 outbox_events.c.aggregate_code == aggregate_code,
                 outbox_events.c.event_type == event_type,
-                outbox_events.c.status.in_(("NEW", "RETRY")),
-                or_(
-                    outbox_events.c.next_attempt_at.is_(None),
-                    outbox_events.c.next_attempt_at <= now,
-                ),
-                or_(
-                    outbox_events.c.lock_expires_at.is_(None),
-                    outbox_events.c.lock_expires_at <= now,
-                ),
+                *_ready_conditions(now),
             )
             .values(
                 locked_by=locked_by,
@@ -84,28 +211,184 @@ class OutboxRepoSQL(OutboxRepo):
         row = result.first()
         if not row:
             return None
-        data = row._mapping
-        return OutboxEvent(
-            id=data["id"],
-            event_type=data["event_type"],
-            aggregate_type=data["aggregate_type"],
-            aggregate_code=data["aggregate_code"],
-            payload=data["payload"],
-            status=data["status"],
-            attempts=data.get("attempts", 0),
-            next_attempt_at=data.get("next_attempt_at"),
-            locked_by=data.get("locked_by"),
-            lock_expires_at=data.get("lock_expires_at"),
-        )
-
-    async def mark_done(self, event_id: int) -> None:
-        now = datetime.utcnow()
+        return _row_to_event(row._mapping)
+
+    async def claim_ready(
+        self,
+        limit: int,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+        event_type: str | None = None,
+        shard: tuple[int, int] | None = None,
+        supplier_id: int | None = None,
+    ) -> list[OutboxEvent]:
+        """
+        Lease a batch of ready events for this worker.
+
+        MySQL/PostgreSQL: SELECT ... FOR UPDATE SKIP LOCKED picks candidate ids
+        without blocking on rows another worker is claiming, then one UPDATE
+        leases them. Other dialects (SQLite) serialize writers, so the same
+        SELECT without the lock hint is followed by a guarded UPDATE that
+        re-checks readiness; only rows this worker actually leased are returned.
+        """
+        if limit <= 0:
+            return []
+
+        conditions = _ready_conditions(now)
+        if event_type:
+            conditions.append(outbox_events.c.event_type == event_type)
+        if shard:
+            conditions.append(_shard_condition(shard))
+        if supplier_id is not None:
+            conditions.append(outbox_events.c.supplier_id == supplier_id)
+        candidates = _claim_candidates(conditions, limit)
+        if self._session.get_bind().dialect.name in SKIP_LOCKED_DIALECTS:
+            candidates = candidates.with_for_update(skip_locked=True)
+
+        result = await self._session.execute(candidates)
+        ids = [row[0] for row in result.all()]
+        if not ids:
+            return []
+
+        lease = (
+            update(outbox_events)
+            .where(outbox_events.c.id.in_(ids), *conditions)
+            .values(
+                locked_by=locked_by,
+                locked_at=now,
+                lock_expires_at=now + timedelta(seconds=lock_ttl_seconds),
+                updated_at=now,
+                status="IN_PROGRESS",
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._session.execute(lease)
+
+        leased = (
+            select(outbox_events)
+            .where(
+                outbox_events.c.id.in_(ids),
+                outbox_events.c.locked_by == locked_by,
+                outbox_events.c.status == "IN_PROGRESS",
+            )
+            .order_by(outbox_events.c.next_attempt_at, outbox_events.c.id)
+        )
+        result = await self._session.execute(leased)
+        return [_row_to_event(row) for row in result.mappings().all()]
+
+    async def count_ready_by_supplier(
+        self,
+        now: datetime,
+        event_type: str | None = None,
+        shard: tuple[int, int] | None = None,
+    ) -> dict[int, int]:
+        """Covered by idx_outbox_supplier_claim; no locks taken (a hint for the scheduler)."""
+        conditions = _ready_conditions(now)
+        if event_type:
+            conditions.append(outbox_events.c.event_type == event_type)
+        if shard:
+            conditions.append(_shard_condition(shard))
+        stmt = (
+            select(outbox_events.c.supplier_id, func.count())
+            .where(*conditions)
+            .group_by(outbox_events.c.supplier_id)
+        )
+        result = await self._session.execute(stmt)
+        return {supplier_id or NO_SUPPLIER: count for supplier_id, count in result.all()}
+
+    async def queue_stats(
+        self, now: datetime, dlq_windows: tuple[int, ...] = (300, 3600)
+    ) -> OutboxQueueStats:
+        """
+        - counts: GROUP BY covered by idx_outbox_status_type_supplier; DONE rows not read
+        - lag: MIN(next_attempt_at) per ready status, one probe of idx_outbox_worker_claim
+        - DLQ inflow: COUNT over an idx_outbox_dlq_moved_at range per window
+        """
+        if now.tzinfo:
+            now = now.astimezone(timezone.utc).replace(tzinfo=None)  # columns are naive UTC
+
+        result = await self._session.execute(
+            select(
+                outbox_events.c.event_type,
+                outbox_events.c.supplier_id,
+                outbox_events.c.status,
+                func.count(),
+            )
+            .where(outbox_events.c.status.in_(PENDING_STATUSES))
+            .group_by(
+                outbox_events.c.status, outbox_events.c.event_type, outbox_events.c.supplier_id
+            )
+        )
+        counts = {
+            (event_type, supplier_id or NO_SUPPLIER, status): count
+            for event_type, supplier_id, status, count in result.all()
+        }
+
+        oldest = None
+        for status in READY_STATUSES:
+            value = await self._session.scalar(
+                select(func.min(outbox_events.c.next_attempt_at)).where(
+                    outbox_events.c.status == status
+                )
+            )
+            if value is not None and (oldest is None or value < oldest):
+                oldest = value
+
+        dead_letters_moved = {}
+        for window in dlq_windows:
+            dead_letters_moved[window] = await self._session.scalar(
+                select(func.count()).where(
+                    outbox_dead_letters.c.moved_at >= now - timedelta(seconds=window)
+                )
+            )
+
+        return OutboxQueueStats(
+            counts=counts,
+            oldest_ready_age_seconds=(
+                max(0.0, (now - oldest).total_seconds()) if oldest is not None else None
+            ),
+            dead_letters_moved=dead_letters_moved,
+        )
+
+    async def get_by_id(self, event_id: int) -> OutboxEvent | None:
+        stmt = select(outbox_events).where(outbox_events.c.id == event_id)
+        result = await self._session.execute(stmt)
+        row = result.mappings().first()
+        return _row_to_event(row) if row else None
+
+    async def renew_lease(
+        self,
+        event_id: int,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+    ) -> bool:
         stmt = (
             update(outbox_events)
-            .where(outbox_events.c.id == event_id)
-            .values(status="DONE", locked_by=None, lock_expires_at=None, updated_at=now)
+            .where(*_owned_by(event_id, locked_by))
+            .values(lock_expires_at=now + timedelta(seconds=lock_ttl_seconds), updated_at=now)
+        )
+        result = await self._session.execute(stmt)
+        return result.rowcount > 0
+
+    async def _transition(self, event_id: int, fence: str | None, **values) -> bool:
+        """UPDATE the event; with a fence (lease holder), only while it still holds the lease."""
+        conditions = _owned_by(event_id, fence) if fence else [outbox_events.c.id == event_id]
+        stmt = update(outbox_events).where(*conditions).values(**values)
+        result = await self._session.execute(stmt)
+        return result.rowcount > 0 if fence else True
+
+    async def mark_done(self, event_id: int, locked_by: str | None = None) -> bool:
+        now = datetime.utcnow()
+        return await self._transition(
+            event_id,
+            locked_by,
+            status="DONE",
+            locked_by=None,
+            lock_expires_at=None,
+            updated_at=now,
         )
-        await self._session.execute(stmt)
 
     async def mark_failed(
         self,
@@ -115,20 +398,18 @@ class OutboxRepoSQL(OutboxRepo):
         event_type: str,
         error_code: str | None,
         error_message: str | None,
-    ) -> None:
+        locked_by: str | None = None,
+    ) -> bool:
         now = datetime.utcnow()
-        stmt = (
-            update(outbox_events)
-            .where(outbox_events.c.id == event_id)
-            .values(
-                status="FAILED",
-                attempts=attempts,
-                locked_by=None,
-                lock_expires_at=None,
-                updated_at=now,
-            )
+        return await self._transition(
+            event_id,
+            locked_by,
+            status="FAILED",
+            attempts=attempts,
+            locked_by=None,
+            lock_expires_at=None,
+            updated_at=now,
         )
-        await self._session.execute(stmt)
 
     async def mark_retry(
         self,
@@ -137,40 +418,51 @@ class OutboxRepoSQL(OutboxRepo):
         next_attempt_at: datetime,
         error_code: str | None,
         error_message: str | None,
-    ) -> None:
+        locked_by: str | None = None,
+    ) -> bool:
         now = datetime.utcnow()
-        stmt = (
-            update(outbox_events)
-            .where(outbox_events.c.id == event_id)
-            .values(
-                status="RETRY",
-                attempts=attempts,
-                next_attempt_at=next_attempt_at,
-                locked_by=None,
-                lock_expires_at=None,
-                updated_at=now,
-            )
+        return await self._transition(
+            event_id,
+            locked_by,
+            status="RETRY",
+            attempts=attempts,
+            next_attempt_at=next_attempt_at,
+            locked_by=None,
+            lock_expires_at=None,
+            updated_at=now,
         )
-        await self._session.execute(stmt)
 
     async def move_to_dlq(
         self,
         event: OutboxEvent,
         error_code: str | None = None,
         error_message: str | None = None,
-    ) -> None:
+        locked_by: str | None = None,
+    ) -> bool:
         """
         Move a permanently failed event to the Dead Letter Queue.
 
         This method:
-        1. Inserts the event into outbox_dead_letters table
-        2. Marks the original event as FAILED
+        1. Marks the original event as FAILED (fenced by locked_by if given)
+        2. Inserts the event into outbox_dead_letters table
         3. Logs the operation for monitoring
 
         The DLQ preserves all event data for manual intervention and analysis.
         """
         now = datetime.utcnow()
 
+        # Mark original event as FAILED; a worker that lost the lease stops here
+        marked = await self._transition(
+            event.id,
+            locked_by,
+            status="FAILED",
+            updated_at=now,
+            locked_by=None,
+            lock_expires_at=None,
+        )
+        if not marked:
+            return False
+
         # Extract reservation_code from payload if available
         reservation_code = event.payload.get("reservation_code") if event.payload else None
 
@@ -187,22 +479,10 @@ class OutboxRepoSQL(OutboxRepo):
             attempts=event.attempts,
             moved_at=now,
             created_at=now,
+            supplier_id=event.supplier_id,
         )
         await self._session.execute(dlq_stmt)
 
-        # Mark original event as FAILED
-        update_stmt = (
-            update(outbox_events)
-            .where(outbox_events.c.id == event.id)
-            .values(
-                status="FAILED",
-                updated_at=now,
-                locked_by=None,
-                lock_expires_at=None,
-            )
-        )
-        await self._session.execute(update_stmt)
-
         # Log for monitoring/alerting
         logger.warning(
             "Event moved to Dead Letter Queue - requires manual intervention",
@@ -214,3 +494,152 @@ class OutboxRepoSQL(OutboxRepo):
                 "error_code": error_code or event.error_code,
             }
         )
+        return True
+
+
+class ScopedOutboxRepoSQL(OutboxRepo):
+    """
+    OutboxRepo that opens its own short transaction per call.
+
+    For long-running workers: every claim/mark commits immediately and no
+    session is shared between concurrently processed events.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker) -> None:
+        self._session_maker = session_maker
+
+    async def enqueue(
+        self,
+        event_type: str,
+        aggregate_type: str,
+        aggregate_code: str,
+        payload: dict[str, Any],
+        supplier_id: int | None = None,
+    ) -> OutboxEvent:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).enqueue(
+                event_type, aggregate_type, aggregate_code, payload, supplier_id=supplier_id
+            )
+
+    async def claim(
+        self,
+        aggregate_code: str,
+        event_type: str,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+    ) -> OutboxEvent | None:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).claim(
+                aggregate_code, event_type, locked_by, now, lock_ttl_seconds
+            )
+
+    async def claim_ready(
+        self,
+        limit: int,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+        event_type: str | None = None,
+        shard: tuple[int, int] | None = None,
+        supplier_id: int | None = None,
+    ) -> list[OutboxEvent]:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).claim_ready(
+                limit=limit,
+                locked_by=locked_by,
+                now=now,
+                lock_ttl_seconds=lock_ttl_seconds,
+                event_type=event_type,
+                shard=shard,
+                supplier_id=supplier_id,
+            )
+
+    async def count_ready_by_supplier(
+        self,
+        now: datetime,
+        event_type: str | None = None,
+        shard: tuple[int, int] | None = None,
+    ) -> dict[int, int]:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).count_ready_by_supplier(
+                now, event_type=event_type, shard=shard
+            )
+
+    async def queue_stats(
+        self, now: datetime, dlq_windows: tuple[int, ...] = (300, 3600)
+    ) -> OutboxQueueStats:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).queue_stats(now, dlq_windows)
+
+    async def get_by_id(self, event_id: int) -> OutboxEvent | None:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).get_by_id(event_id)
+
+    async def renew_lease(
+        self,
+        event_id: int,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+    ) -> bool:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).renew_lease(
+                event_id, locked_by, now, lock_ttl_seconds
+            )
+
+    async def mark_done(self, event_id: int, locked_by: str | None = None) -> bool:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).mark_done(event_id, locked_by=locked_by)
+
+    async def mark_failed(
+        self,
+        event_id: int,
+        attempts: int,
+        aggregate_code: str,
+        event_type: str,
+        error_code: str | None,
+        error_message: str | None,
+        locked_by: str | None = None,
+    ) -> bool:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).mark_failed(
+                event_id,
+                attempts,
+                aggregate_code,
+                event_type,
+                error_code,
+                error_message,
+                locked_by=locked_by,
+            )
+
+    async def mark_retry(
+        self,
+        event_id: int,
+        attempts: int,
+        next_attempt_at: datetime,
+        error_code: str | None,
+        error_message: str | None,
+        locked_by: str | None = None,
+    ) -> bool:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).mark_retry(
+                event_id,
+                attempts,
+                next_attempt_at,
+                error_code,
+                error_message,
+                locked_by=locked_by,
+            )
+
+    async def move_to_dlq(
+        self,
+        event: OutboxEvent,
+        error_code: str | None = None,
+        error_message: str | None = None,
+        locked_by: str | None = None,
+    ) -> bool:
+        async with session_scope(self._session_maker) as session:
+            return await OutboxRepoSQL(session).move_to_dlq(
+                event, error_code, error_message, locked_by=locked_by
+            )
@@ -7,12 +7,15 @@ from app.application.interfaces.supplier_request_repo import (
     SupplierRequestRecord,
     SupplierRequestRepo,
 )
+from app.infrastructure.db.payload_store import PayloadStore, get_payload_store
 from app.infrastructure.db.tables import reservation_supplier_requests, reservations
 
 
 class SupplierRequestRepoSQL(SupplierRequestRepo):
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, payload_store: PayloadStore | None = None) -> None:
         self._session = session
+        # Raw supplier bodies are stored compressed / spilled (db/payload_store.py)
+        self._payload_store = payload_store or get_payload_store()
 
     async def _reservation_id(self, reservation_code: str) -> int | None:
         stmt = select(reservations.c.id).where(reservations.c.reservation_code == reservation_code)
@@ -59,7 +62,10 @@ class SupplierRequestRepoSQL(SupplierRequestRepo):
         stmt = (
             update(reservation_supplier_requests)
             .where(reservation_supplier_requests.c.id == request_id)
-            .values(status="SUCCESS", response_payload=response_payload)
+            .values(
+                status="SUCCESS",
+                response_payload=await self._payload_store.compact(response_payload),
+            )
         )
         await self._session.execute(stmt)
         return await self._fetch(request_id)
@@ -80,12 +86,39 @@ class SupplierRequestRepoSQL(SupplierRequestRepo):
                 error_code=error_code,
                 error_message=error_message,
                 http_status=http_status,
-                response_payload=response_payload,
+                response_payload=await self._payload_store.compact(response_payload),
             )
         )
         await self._session.execute(stmt)
         return await self._fetch(request_id)
 
+    async def list_for_reservation(
+        self, reservation_code: str, with_payloads: bool = True
+    ) -> list[SupplierRequestRecord]:
+        """
+        Uses idx_supplier_requests_reservation. Without payloads the JSON column
+        is not even read; with them, blob references are expanded.
+        """
+        table = reservation_supplier_requests
+        columns = list(table.c) if with_payloads else [
+            c for c in table.c if c.name != "response_payload"
+        ]
+        stmt = (
+            select(*columns)
+            .where(table.c.reservation_code == reservation_code)
+            .order_by(table.c.id)
+        )
+        result = await self._session.execute(stmt)
+        records = []
+        for row in result.mappings().all():
+            record = self._to_record(row)
+            if with_payloads:
+                record.response_payload = await self._payload_store.expand(
+                    record.response_payload
+                )
+            records.append(record)
+        return records
+
     async def _fetch(self, request_id: int) -> SupplierRequestRecord:
         stmt = select(reservation_supplier_requests).where(
             reservation_supplier_requests.c.id == request_id
@@ -94,6 +127,10 @@ class SupplierRequestRepoSQL(SupplierRequestRepo):
         row = result.mappings().first()
         if not row:
             raise ValueError("Supplier request not found")
+        return self._to_record(row)
+
+    @staticmethod
+    def _to_record(row) -> SupplierRequestRecord:
         return SupplierRequestRecord(
             id=row["id"],
             reservation_code=row.get("reservation_code") or "",
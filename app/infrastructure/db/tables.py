@@ -1,4 +1,15 @@
-from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, Numeric, String, Table
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+)
 
 metadata = MetaData()
 
@@ -118,6 +129,38 @@ outbox_events = Table(
     Column("lock_expires_at", DateTime),
     Column("created_at", DateTime),
     Column("updated_at", DateTime),
+    # crc32(aggregate_code): partitions the queue between worker processes
+    Column("shard_key", Integer),
+    # reservations.supplier_id copied on enqueue (0 = no supplier): per-supplier scheduling
+    Column("supplier_id", Integer, nullable=False, default=0, server_default="0"),
+    # Batch poller: status IN (...) AND next_attempt_at <= now ORDER BY next_attempt_at, id
+    Index("idx_outbox_worker_claim", "status", "next_attempt_at", "id"),
+    # Per-supplier claim (supplier_id = ? AND status IN (...) ORDER BY next_attempt_at, id)
+    # and the ready-count GROUP BY supplier_id of the fair scheduler
+    Index("idx_outbox_supplier_claim", "supplier_id", "status", "next_attempt_at", "id"),
+    # Metrics: per-status counts grouped by event_type/supplier without reading DONE rows
+    Index("idx_outbox_status_type_supplier", "status", "event_type", "supplier_id"),
+    # One event per (aggregate, type): enqueue coalesces on it; also serves the
+    # per-reservation claim (aggregate_code = ? AND event_type = ?)
+    Index("uq_outbox_aggregate_event", "aggregate_code", "event_type", unique=True),
+)
+
+# Terminal (DONE/FAILED) events moved out of the hot table by OutboxRetentionJob
+outbox_events_archive = Table(
+    "outbox_events_archive",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=False),
+    Column("event_type", String(64), nullable=False),
+    Column("aggregate_type", String(32), nullable=False),
+    Column("aggregate_id", Integer),
+    Column("aggregate_code", String(50)),
+    Column("payload", JSON, nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("archived_at", DateTime, nullable=False),
+    Index("idx_outbox_archive_aggregate", "aggregate_code"),
 )
 
 reservation_supplier_requests = Table(
@@ -135,7 +178,10 @@ reservation_supplier_requests = Table(
     Column("error_code", String(64)),
     Column("error_message", String(255)),
     Column("request_payload", JSON),
+    # Large values are stored as compressed blob references (db/payload_store.py)
     Column("response_payload", JSON),
+    # Audit trail: reservation_code = ? ORDER BY id
+    Index("idx_supplier_requests_reservation", "reservation_code", "id"),
 )
 
 suppliers = Table(
@@ -197,4 +243,36 @@ outbox_dead_letters = Table(
     Column("attempts", Integer, nullable=False),
     Column("moved_at", DateTime, nullable=False),
     Column("created_at", DateTime, nullable=False),
+    # outbox_events.supplier_id of the event (0 = no supplier): replay selection
+    Column("supplier_id", Integer, nullable=False, default=0, server_default="0"),
+    # Set when a DlqReplay re-enqueued the event
+    Column("replay_id", Integer),
+    Column("replayed_at", DateTime),
+    # DLQ inflow metrics and retention purge (moved_at >= / < cutoff)
+    Index("idx_outbox_dlq_moved_at", "moved_at"),
+    # Replay of one supplier's dead letters, keyset-paginated by id
+    Index("idx_outbox_dlq_supplier", "supplier_id", "id"),
+)
+
+# Bulk DLQ replays (ReplayDeadLettersUseCase): filters, rate and resumable cursor
+outbox_dlq_replays = Table(
+    "outbox_dlq_replays",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("status", String(16), nullable=False),
+    Column("supplier_id", Integer),
+    Column("error_code", String(64)),
+    Column("event_type", String(64)),
+    Column("moved_from", DateTime),
+    Column("moved_to", DateTime),
+    Column("rate_per_second", Float, nullable=False),
+    Column("batch_size", Integer, nullable=False),
+    Column("total", Integer, nullable=False, default=0),
+    Column("last_dead_letter_id", Integer, nullable=False, default=0),
+    Column("replayed", Integer, nullable=False, default=0),
+    Column("skipped", Integer, nullable=False, default=0),
+    Column("error_message", String(500)),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("finished_at", DateTime),
 )
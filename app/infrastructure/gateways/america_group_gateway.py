@@ -1,10 +1,47 @@
 import logging
 from typing import Any
-from xml.etree.ElementTree import Element, SubElement, fromstring, tostring
 
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.retry_policy import parse_retry_after
+from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.xml_response import (
+    ResponseTooLarge,
+    response_too_large_result,
+    scan_ota_response,
+)
+from app.infrastructure.gateways.xml_templates import XmlTemplate, xml_attr
+
+VEH_RES_RQ = XmlTemplate(
+    """
+    <OTA_VehResRQ Version="1.00">
+        <POS><Source><RequestorID ID="{requestor_id}"/></Source></POS>
+        <BookingReferenceID><UniqueID_Type ID="{booking_reference}"/></BookingReferenceID>
+        <VehResRQCore>
+            <VehRentalCore PickUpDateTime="{pickup_dt}" ReturnDateTime="{dropoff_dt}">
+                <PickUpLocation LocationCode="{pickup_code}"/>
+                <ReturnLocation LocationCode="{dropoff_code}"/>
+            </VehRentalCore>
+            <VehPref VendorCarType="{car_type}">
+                <VehClass>{car_type}</VehClass>
+                <VehType/>
+            </VehPref>
+            <RateQualifier{rate_id_attr}/>
+            <Customer>
+                <Primary>
+                    <PersonName>
+                        <GivenName>{first_name}</GivenName>
+                        <Surname>{last_name}</Surname>
+                    </PersonName>
+                    <Email><Value>{email}</Value></Email>
+                </Primary>
+            </Customer>
+        </VehResRQCore>
+    </OTA_VehResRQ>
+    """
+)
 
 
 class AmericaGroupGateway(SupplierGateway):
@@ -28,6 +65,7 @@ class AmericaGroupGateway(SupplierGateway):
         self._retry_sleep_ms = retry_sleep_ms
         self._logger = logging.getLogger(__name__)
 
+    @async_supplier_breaker
     async def book(
         self,
         reservation_code: str,
@@ -86,7 +124,7 @@ class AmericaGroupGateway(SupplierGateway):
         params = {"XML": xml_payload}
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
+            async with supplier_http_client(self._endpoint, timeout=self._timeout) as client:
                 response = await client.get(self._endpoint, params=params)
         except httpx.TimeoutException as exc:
             return SupplierBookingResult(
@@ -110,9 +148,13 @@ class AmericaGroupGateway(SupplierGateway):
                 error_code="NON_2XX",
                 error_message=response.text,
                 http_status=response.status_code,
+                retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
             )
 
-        conf_id = self._extract_conf_id(response.text)
+        try:
+            conf_id = self._extract_conf_id(response.content)
+        except ResponseTooLarge as exc:
+            return response_too_large_result(exc, response.status_code)
         if not conf_id:
             self._logger.warning(
                 "AmericaGroup: missing ConfID in response",
@@ -144,54 +186,22 @@ class AmericaGroupGateway(SupplierGateway):
         booking_reference: str,
         reservation_snapshot: dict[str, Any],
     ) -> str:
-        root = Element("OTA_VehResRQ", Version="1.00")
-        pos = SubElement(root, "POS")
-        source = SubElement(pos, "Source")
-        requestor = SubElement(source, "RequestorID")
-        requestor.set("ID", self._requestor_id)
-
-        booking_ref = SubElement(root, "BookingReferenceID")
-        unique_id = SubElement(booking_ref, "UniqueID_Type")
-        unique_id.set("ID", booking_reference)
-
-        core = SubElement(root, "VehResRQCore")
-        rental_core = SubElement(core, "VehRentalCore")
-        rental_core.set("PickUpDateTime", str(pickup_dt or ""))
-        rental_core.set("ReturnDateTime", str(dropoff_dt or ""))
-        SubElement(rental_core, "PickUpLocation").set("LocationCode", str(pickup_code))
-        SubElement(rental_core, "ReturnLocation").set("LocationCode", str(dropoff_code))
-
-        # VehPref
-        veh_pref = SubElement(core, "VehPref")
-        veh_pref.set("VendorCarType", car_type)
-        SubElement(veh_pref, "VehClass", car_type)
-        SubElement(veh_pref, "VehType")
-
-        # RateQualifier
-        rate_qualifier = SubElement(core, "RateQualifier")
-        if rate_id:
-            rate_qualifier.set("VendorRateID", str(rate_id))
-
-        # Customer
-        customer = SubElement(core, "Customer")
-        primary = SubElement(customer, "Primary")
-        person_name = SubElement(primary, "PersonName")
-        
-        # Extract from snapshot or use defaults
-        first_name = reservation_snapshot.get("first_name") or "Customer"
-        last_name = reservation_snapshot.get("last_name") or "Primary"
-        email_val = (
-            reservation_snapshot.get("customer_email") or "reservations@mexicocarrental.com.mx"
-        )
-        
-        SubElement(person_name, "GivenName", first_name)
-        SubElement(person_name, "Surname", last_name)
-        email = SubElement(primary, "Email")
-        SubElement(email, "Value", email_val)
-
-        # Serialize
-        xml_bytes = tostring(root, encoding="utf-8", xml_declaration=True)
-        return xml_bytes.decode()
+        email = reservation_snapshot.get("customer_email") or "reservations@mexicocarrental.com.mx"
+        # Viaja en el query string (?XML=...), por eso se devuelve str
+        return VEH_RES_RQ.render(
+            declaration=True,
+            requestor_id=self._requestor_id,
+            booking_reference=booking_reference,
+            pickup_dt=pickup_dt,
+            dropoff_dt=dropoff_dt,
+            pickup_code=pickup_code,
+            dropoff_code=dropoff_code,
+            car_type=car_type,
+            rate_id_attr=xml_attr("VendorRateID", rate_id),
+            first_name=reservation_snapshot.get("first_name") or "Customer",
+            last_name=reservation_snapshot.get("last_name") or "Primary",
+            email=email,
+        ).decode()
 
     async def confirm_booking(self, reservation_code: str, details: dict[str, Any]) -> str:
         """
@@ -206,14 +216,10 @@ class AmericaGroupGateway(SupplierGateway):
             return result.supplier_reservation_code or "SUCCESS"
         raise Exception(result.error_message or "AmericaGroup booking failed")
 
-    def _extract_conf_id(self, xml_str: str) -> str | None:
+    def _extract_conf_id(self, content: bytes) -> str | None:
         try:
-            root = fromstring(xml_str)
-            conf_nodes = root.findall(".//ConfID")
-            for node in conf_nodes:
-                conf_id = node.attrib.get("ID")
-                if conf_id:
-                    return conf_id
+            return scan_ota_response(content).conf_id
+        except ResponseTooLarge:
+            raise
         except Exception:
             return None
-        return None
@@ -1,11 +1,50 @@
 import xml.etree.ElementTree as ET
 from datetime import datetime, timezone
 from typing import Any
-from xml.sax.saxutils import escape
-
-import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierGateway
+from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.xml_templates import OTA_NS, XmlTemplate, soap_envelope
+
+AVIS_AUTH_NS = "http://wsg.avis.com/wsbang/authInAny"
+AVIS_REQUEST_NS = "http://wsg.avis.com/wsbang"
+
+OTA_VEH_RES_RQ = XmlTemplate(
+    f"""
+    <OTA_VehResRQ xmlns="{OTA_NS}" Version="1.0" Target="{{target}}" TimeStamp="{{timestamp}}">
+        <POS>
+            <Source>
+                <RequestorID Type="1" ID="MexicoCarRental"/>
+            </Source>
+        </POS>
+        <VehResRQCore>
+            <VehRentalCore PickUpDateTime="{{pickup_dt}}" ReturnDateTime="{{return_dt}}">
+                <PickUpLocation LocationCode="{{pickup_code}}"/>
+            </VehRentalCore>
+            <Customer>
+                <Primary>
+                    <PersonName>
+                        <GivenName>{{first_name}}</GivenName>
+                        <Surname>{{last_name}}</Surname>
+                    </PersonName>
+                    <Email>{{email}}</Email>
+                </Primary>
+            </Customer>
+            <VendorPref CompanyShortName="Avis"/>
+        </VehResRQCore>
+    </OTA_VehResRQ>
+    """
+)
+CREDENTIALS = XmlTemplate(
+    """
+    <ns:credentials>
+        <ns:userID>{user}</ns:userID>
+        <ns:password>{password}</ns:password>
+    </ns:credentials>
+    """
+)
+REQUEST = XmlTemplate(f'<ns:Request xmlns:ns="{AVIS_REQUEST_NS}">{{payload}}</ns:Request>')
 
 
 class AvisAdapter(SupplierGateway):
@@ -21,12 +60,12 @@ class AvisAdapter(SupplierGateway):
         Strictly for reservation confirmation.
         """
         # 1. Prepare Data (Mapping from details or defaults)
-        pickup_code = escape(str(details.get("pickup_office_code", "MIA")))
-        pickup_dt = escape(str(details.get("pickup_datetime", datetime.now().isoformat())))
-        return_dt = escape(str(details.get("dropoff_datetime", datetime.now().isoformat())))
-        email = escape(str(details.get("customer_email", "test@example.com")))
-        first_name = escape(str(details.get("first_name", "QA")))
-        last_name = escape(str(details.get("last_name", "Tester")))
+        pickup_code = details.get("pickup_office_code", "MIA")
+        pickup_dt = details.get("pickup_datetime", datetime.now().isoformat())
+        return_dt = details.get("dropoff_datetime", datetime.now().isoformat())
+        email = details.get("customer_email", "test@example.com")
+        first_name = details.get("first_name", "QA")
+        last_name = details.get("last_name", "Tester")
         
         # 2. Build OTA_VehResRQ (Legacy Logic)
         ota_payload = self._build_ota_res_rq(
@@ -34,14 +73,14 @@ class AvisAdapter(SupplierGateway):
         )
         
         # 3. Wrap in SOAP Envelope (Legacy Logic)
-        soap_envelope = self._build_soap_envelope(ota_payload)
+        envelope = self._build_soap_envelope(ota_payload)
         
         # 4. Send Request
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with supplier_http_client(self.endpoint, timeout=30.0) as client:
             try:
                 response = await client.post(
                     self.endpoint,
-                    content=soap_envelope,
+                    content=envelope,
                     headers={"Content-Type": "text/xml; charset=utf-8"}
                 )
                 response.raise_for_status()
@@ -51,6 +90,7 @@ class AvisAdapter(SupplierGateway):
                 msg = f"Avis Supplier Error: {str(e)}"
                 raise Exception(msg) from e
 
+    @async_supplier_breaker
     async def book(
         self,
         reservation_code: str,
@@ -79,55 +119,24 @@ class AvisAdapter(SupplierGateway):
 
     def _build_ota_res_rq(
         self, pickup_code, pickup_dt, return_dt, email, first_name, last_name
-    ) -> str:
-        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
-        return f"""
-        <OTA_VehResRQ xmlns="http://www.opentravel.org/OTA/2003/05" 
-                      Version="1.0" 
-                      Target="{self.target}" 
-                      TimeStamp="{timestamp}">
-            <POS>
-                <Source>
-                    <RequestorID Type="1" ID="MexicoCarRental"/>
-                </Source>
-            </POS>
-            <VehResRQCore>
-                <VehRentalCore PickUpDateTime="{pickup_dt}" ReturnDateTime="{return_dt}">
-                    <PickUpLocation LocationCode="{pickup_code}"/>
-                </VehRentalCore>
-                <Customer>
-                    <Primary>
-                        <PersonName>
-                            <GivenName>{first_name}</GivenName>
-                            <Surname>{last_name}</Surname>
-                        </PersonName>
-                        <Email>{email}</Email>
-                    </Primary>
-                </Customer>
-                <VendorPref CompanyShortName="Avis"/>
-            </VehResRQCore>
-        </OTA_VehResRQ>
-        """
+    ) -> bytes:
+        return OTA_VEH_RES_RQ.render(
+            target=self.target,
+            timestamp=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+            pickup_dt=pickup_dt,
+            return_dt=return_dt,
+            pickup_code=pickup_code,
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+        )
 
-    def _build_soap_envelope(self, payload: str) -> str:
-        user = escape(self.user)
-        password = escape(self.password)
-        return f"""<?xml version="1.0" encoding="UTF-8"?>
-<SOAP-ENV:Envelope xmlns:SOAP-ENV="http://schemas.xmlsoap.org/soap/envelope/"
-                   xmlns:ns="http://wsg.avis.com/wsbang/authInAny">
-  <SOAP-ENV:Header>
-    <ns:credentials>
-      <ns:userID>{user}</ns:userID>
-      <ns:password>{password}</ns:password>
-    </ns:credentials>
-  </SOAP-ENV:Header>
-  <SOAP-ENV:Body>
-    <ns:Request xmlns:ns="http://wsg.avis.com/wsbang">
-      {payload}
-    </ns:Request>
-  </SOAP-ENV:Body>
-</SOAP-ENV:Envelope>
-"""
+    def _build_soap_envelope(self, payload: bytes) -> bytes:
+        return soap_envelope(
+            REQUEST.render(payload=payload),
+            header=CREDENTIALS.render(user=self.user, password=self.password),
+            namespaces={"ns": AVIS_AUTH_NS},
+        )
 
     def _parse_confirmation_code(self, response_xml: str) -> str:
         """
@@ -1,10 +1,14 @@
 import logging
-from datetime import datetime
 from typing import Any, Dict, Optional
 
-import httpx
-
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.token_cache import (
+    IssuedToken,
+    SupplierTokenCache,
+    parse_expires_in,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,15 +28,16 @@ class BudgetPaylessAdapter(SupplierGateway):
         self.client_id = client_id
         self.client_secret = client_secret
         self.token_ttl = token_ttl
-        self._token: Optional[str] = None
-        self._token_expires: Optional[datetime] = None
+        self._tokens = SupplierTokenCache(
+            self._login, "budget_payless", default_ttl_seconds=token_ttl
+        )
 
     async def _get_token(self) -> str:
-        # Simple in-memory token caching for this slice
-        if self._token and self._token_expires and datetime.now() < self._token_expires:
-            return self._token
+        # Cached until the login's expiration (or token_ttl); concurrent callers share one login
+        return await self._tokens.get()
 
-        async with httpx.AsyncClient() as client:
+    async def _login(self) -> IssuedToken:
+        async with supplier_http_client(self.base_url, timeout=30.0) as client:
             response = await client.post(
                 f"{self.base_url}/api/Authenticate/login",
                 json={
@@ -43,17 +48,26 @@ class BudgetPaylessAdapter(SupplierGateway):
             )
             response.raise_for_status()
             data = response.json()
-            self._token = data.get("token") or data.get("accessToken") or data.get("jwt")
-            if not self._token:
+            token = data.get("token") or data.get("accessToken") or data.get("jwt")
+            if not token:
                 raise RuntimeError("No token in Budget/Payless response")
-            
-            # We assume the token is valid for the TTL
-            from datetime import timedelta
-            self._token_expires = datetime.now() + timedelta(seconds=self.token_ttl - 60)
-            return self._token
+            return IssuedToken(token, parse_expires_in(data))
 
     async def _request(self, method: str, path: str, query: Optional[Dict] = None, body: Optional[Dict] = None) -> Any:
         token = await self._get_token()
+        response = await self._send(method, path, token, query, body)
+        if response.status_code == 401:
+            # Token revoked or expired early: log in again and retry once
+            self._tokens.invalidate(token)
+            token = await self._get_token()
+            response = await self._send(method, path, token, query, body)
+
+        response.raise_for_status()
+        return response.json()
+
+    async def _send(
+        self, method: str, path: str, token: str, query: Optional[Dict], body: Optional[Dict]
+    ) -> Any:
         headers = {
             "Authorization": f"Bearer {token}",
             "Accept": "text/plain",
@@ -66,22 +80,15 @@ class BudgetPaylessAdapter(SupplierGateway):
         if query:
             params.update(query)
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with supplier_http_client(self.base_url, timeout=30.0) as client:
             if method.upper() == "GET":
-                response = await client.get(f"{self.base_url}{path}", params=params, headers=headers)
-            else:
-                if body:
-                    headers["Content-Type"] = "application/json-patch+json"
-                    response = await client.post(f"{self.base_url}{path}", json=body, headers=headers)
-                else:
-                    response = await client.post(f"{self.base_url}{path}", params=params, headers=headers)
-            
-            if response.status_code == 401:
-                self._token = None # Force re-auth on next try
-                
-            response.raise_for_status()
-            return response.json()
+                return await client.get(f"{self.base_url}{path}", params=params, headers=headers)
+            if body:
+                headers["Content-Type"] = "application/json-patch+json"
+                return await client.post(f"{self.base_url}{path}", json=body, headers=headers)
+            return await client.post(f"{self.base_url}{path}", params=params, headers=headers)
 
+    @async_supplier_breaker
     async def book(
         self,
         reservation_code: str,
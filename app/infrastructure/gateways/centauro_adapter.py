@@ -1,15 +1,45 @@
 import logging
-import xml.etree.ElementTree as ET
 from datetime import datetime
 from typing import Any, Dict, Optional
-from xml.sax.saxutils import escape
-
-import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.xml_response import (
+    ResponseTooLarge,
+    find_first_text,
+    response_too_large_result,
+)
+from app.infrastructure.gateways.xml_templates import XmlTemplate
 
 logger = logging.getLogger(__name__)
 
+RESERVATION = XmlTemplate(
+    """
+    <RESERVATION>
+        <HEADER>
+            {agency_id}
+            <CODE>{code}</CODE>
+            <WHO><CONTACT_DATA><NAME>{name}</NAME><SURNAME>{surname}</SURNAME></CONTACT_DATA></WHO>
+            <WHERE>
+                <PICKUP><SERVICE_POINT_PICKUP><CODE>{pickup}</CODE></SERVICE_POINT_PICKUP></PICKUP>
+                <RETURN><SERVICE_POINT_RETURN><CODE>{dropoff}</CODE></SERVICE_POINT_RETURN></RETURN>
+            </WHERE>
+            <WHEN>
+                <CREATION_DATE>{created}</CREATION_DATE>
+                <START_DATE>{start}</START_DATE>
+                <END_DATE>{end}</END_DATE>
+            </WHEN>
+            <FLIGHT><NUMBER>{flight}</NUMBER></FLIGHT>
+        </HEADER>
+        <CAR><PROVIDER_CATEGORY>{category}</PROVIDER_CATEGORY></CAR>
+        {total}
+    </RESERVATION>
+    """
+)
+AGENCY_ID = XmlTemplate("<AGENCY_ID>{value}</AGENCY_ID>")
+TOTAL = XmlTemplate("<TOTAL><NET>{value}</NET></TOTAL>")
+
 class CentauroAdapter(SupplierGateway):
     def __init__(self, base_url: str, login: str, password: str, agency: int):
         self.base_url = base_url
@@ -17,6 +47,7 @@ class CentauroAdapter(SupplierGateway):
         self.password = password
         self.agency = agency
 
+    @async_supplier_breaker
     async def book(
         self,
         reservation_code: str,
@@ -44,11 +75,11 @@ class CentauroAdapter(SupplierGateway):
                 "xml": xml_payload
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with supplier_http_client(self.base_url, timeout=30.0) as client:
                 response = await client.post(self.base_url, data=params)
                 response.raise_for_status()
                 
-                return self._parse_response(response.text)
+                return self._parse_response(response.content)
         except Exception as e:
             logger.error(f"Centauro booking error: {e}", exc_info=True)
             return SupplierBookingResult(
@@ -61,45 +92,22 @@ class CentauroAdapter(SupplierGateway):
         """
         Replicates buildReservationXml logic from legacy PHP.
         """
-        root = ET.Element("RESERVATION")
-        header = ET.SubElement(root, "HEADER")
-        
-        if d.get("agency_id"):
-            ET.SubElement(header, "AGENCY_ID").text = str(d["agency_id"])
-        
-        ET.SubElement(header, "CODE").text = escape(str(d.get("reservation_code", "")[:20]))
-        
-        # Passenger
-        who = ET.SubElement(ET.SubElement(header, "WHO"), "CONTACT_DATA")
         driver = d.get("drivers", [{}])[0]
-        ET.SubElement(who, "NAME").text = escape(driver.get("first_name", ""))
-        ET.SubElement(who, "SURNAME").text = escape(driver.get("last_name", ""))
-        
-        # Offices
-        where = ET.SubElement(header, "WHERE")
-        pickup = ET.SubElement(ET.SubElement(where, "PICKUP"), "SERVICE_POINT_PICKUP")
-        ET.SubElement(pickup, "CODE").text = escape(str(d.get("pickup_office_code", "")))
-        
-        dropoff = ET.SubElement(ET.SubElement(where, "RETURN"), "SERVICE_POINT_RETURN")
-        ET.SubElement(dropoff, "CODE").text = escape(str(d.get("dropoff_office_code", "")))
-        
-        # Dates
-        when = ET.SubElement(header, "WHEN")
-        ET.SubElement(when, "CREATION_DATE").text = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        ET.SubElement(when, "START_DATE").text = self._format_date(d.get("pickup_datetime"))
-        ET.SubElement(when, "END_DATE").text = self._format_date(d.get("dropoff_datetime"))
-        
-        # Flight
-        ET.SubElement(ET.SubElement(header, "FLIGHT"), "NUMBER").text = escape(d.get("flight_number", ""))
-        
-        # Car group
-        ET.SubElement(ET.SubElement(root, "CAR"), "PROVIDER_CATEGORY").text = escape(str(d.get("acriss_code", "")))
-        
-        # Net Price
-        if d.get("supplier_cost_total"):
-            ET.SubElement(ET.SubElement(root, "TOTAL"), "NET").text = str(d["supplier_cost_total"])
-
-        return ET.tostring(root, encoding="unicode")
+        net = d.get("supplier_cost_total")
+        return RESERVATION.render(
+            agency_id=AGENCY_ID.render(value=d["agency_id"]) if d.get("agency_id") else b"",
+            code=str(d.get("reservation_code", ""))[:20],
+            name=driver.get("first_name", ""),
+            surname=driver.get("last_name", ""),
+            pickup=d.get("pickup_office_code", ""),
+            dropoff=d.get("dropoff_office_code", ""),
+            created=datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            start=self._format_date(d.get("pickup_datetime")),
+            end=self._format_date(d.get("dropoff_datetime")),
+            flight=d.get("flight_number", ""),
+            category=d.get("acriss_code", ""),
+            total=TOTAL.render(value=net) if net else b"",
+        ).decode()
 
     def _format_date(self, dt_str: Optional[str]) -> str:
         if not dt_str:
@@ -110,29 +118,31 @@ class CentauroAdapter(SupplierGateway):
         except Exception:
             return dt_str
 
-    def _parse_response(self, response_xml: str) -> SupplierBookingResult:
+    def _parse_response(self, content: bytes) -> SupplierBookingResult:
         try:
-            root = ET.fromstring(response_xml)
             # Centauro usually returns confirmation in a specific tag
             # Based on legacy experience, it might be <ID_RESERVATION> or similar
-            conf_elem = root.find(".//ID_RESERVATION") or root.find(".//CODE")
-            
-            if conf_elem is not None and conf_elem.text:
-                return SupplierBookingResult(
-                    status="SUCCESS",
-                    supplier_reservation_code=conf_elem.text,
-                    payload={"raw_xml": response_xml}
-                )
-            
-            return SupplierBookingResult(
-                status="FAILED",
-                error_code="CENTAURO_REJECTED",
-                error_message="No confirmation ID in XML response",
-                payload={"raw_xml": response_xml}
-            )
+            conf_id = find_first_text(content, ("ID_RESERVATION", "CODE"))
+        except ResponseTooLarge as exc:
+            return response_too_large_result(exc)
         except Exception as e:
             return SupplierBookingResult(
                 status="FAILED",
                 error_code="CENTAURO_PARSE_ERROR",
                 error_message=f"Failed to parse Centauro response: {e}"
             )
+
+        raw_xml = content.decode(errors="replace")
+        if conf_id:
+            return SupplierBookingResult(
+                status="SUCCESS",
+                supplier_reservation_code=conf_id,
+                payload={"raw_xml": raw_xml}
+            )
+
+        return SupplierBookingResult(
+            status="FAILED",
+            error_code="CENTAURO_REJECTED",
+            error_message="No confirmation ID in XML response",
+            payload={"raw_xml": raw_xml}
+        )
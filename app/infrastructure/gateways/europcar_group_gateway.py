@@ -4,7 +4,10 @@ from typing import Any, Dict
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
-from app.infrastructure.circuit_breaker import supplier_breaker
+from app.application.retry_policy import parse_retry_after
+from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.supplier_retry import send_with_retries
 
 
 class EuropcarGroupGateway(SupplierGateway):
@@ -25,14 +28,16 @@ class EuropcarGroupGateway(SupplierGateway):
         timeout_seconds: float = 6.0,
         retry_times: int = 2,
         retry_sleep_ms: int = 300,
+        hedge_after_seconds: float | None = None,  # sólo si la reserva es idempotente
     ) -> None:
         self._endpoint = endpoint.rstrip("/")
         self._timeout = timeout_seconds
         self._retry_times = retry_times
+        self._hedge_after = hedge_after_seconds
         self._retry_sleep_ms = retry_sleep_ms
         self._logger = logging.getLogger(__name__)
 
-    @supplier_breaker
+    @async_supplier_breaker
     async def book(
         self,
         reservation_code: str,
@@ -97,20 +102,14 @@ class EuropcarGroupGateway(SupplierGateway):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                # Retries manuales simples o usar transporte con retries.
-                # Aquí simulamos el retry simple del legacy
-                response = None
-                for attempt in range(self._retry_times + 1):
-                    try:
-                        response = await client.post(self._endpoint, json=payload)
-                        if response.status_code < 500:
-                            break
-                    except httpx.RequestError:
-                        if attempt == self._retry_times:
-                            raise
-                        # Sleep simplificado (asyncio.sleep no importado arriba, asumimos retry inmediato o añadimos import)
-                        # Para no romper imports, confiamos en el retry del cliente o seguimos.
+            async with supplier_http_client(self._endpoint, timeout=self._timeout) as client:
+                # Reintentos con backoff dentro del presupuesto de la reserva
+                response = await send_with_retries(
+                    lambda timeout: client.post(self._endpoint, json=payload, timeout=timeout),
+                    retry_times=self._retry_times,
+                    timeout=self._timeout,
+                    hedge_after_seconds=self._hedge_after,
+                )
 
         except httpx.RequestError as exc:
             return SupplierBookingResult(
@@ -124,6 +123,9 @@ class EuropcarGroupGateway(SupplierGateway):
                 status="FAILED",
                 error_code="HTTP_ERROR",
                 http_status=response.status_code if response else 0,
+                retry_after_seconds=(
+                    parse_retry_after(response.headers.get("Retry-After")) if response else None
+                ),
                 payload={"raw_response": response.text if response else None},
             )
 
@@ -41,6 +41,7 @@ class SupplierGatewayFactory:
                 self._adapters["europcar_group"] = EuropcarGroupGateway(
                     endpoint=conf.get("endpoint", ""),
                     timeout_seconds=float(conf.get("timeout_seconds", 6.0)),
+                    hedge_after_seconds=conf.get("hedge_after_seconds"),
                 )
             return self._adapters["europcar_group"]
 
@@ -54,7 +55,8 @@ class SupplierGatewayFactory:
                     username=conf.get("username", ""),
                     password=conf.get("password", ""),
                     client_id=conf.get("client_id", ""),
-                    grant_type=conf.get("grant_type", "password")
+                    grant_type=conf.get("grant_type", "password"),
+                    hedge_after_seconds=conf.get("hedge_after_seconds"),
                 )
             return self._adapters["hertz_ar"]
 
@@ -64,7 +66,8 @@ class SupplierGatewayFactory:
                 conf = self.config.get("infinity", {})
                 self._adapters["infinity"] = InfinityGroupGateway(
                     endpoint=conf.get("endpoint", ""),
-                    requestor_id=conf.get("requestor_id", "92")
+                    requestor_id=conf.get("requestor_id", "92"),
+                    hedge_after_seconds=conf.get("hedge_after_seconds"),
                 )
             return self._adapters["infinity"]
 
@@ -77,7 +80,8 @@ class SupplierGatewayFactory:
                     username=conf.get("username", ""),
                     password=conf.get("password", ""),
                     echo_token=conf.get("echo_token", ""),
-                    requestor_id=conf.get("requestor_id", "")
+                    requestor_id=conf.get("requestor_id", ""),
+                    hedge_after_seconds=conf.get("hedge_after_seconds"),
                 )
             return self._adapters["localiza"]
 
@@ -88,7 +92,8 @@ class SupplierGatewayFactory:
                 self._adapters["mex"] = MexGroupGateway(
                     endpoint=conf.get("endpoint", ""),
                     user=conf.get("user", ""),
-                    password=conf.get("password", "")
+                    password=conf.get("password", ""),
+                    hedge_after_seconds=conf.get("hedge_after_seconds"),
                 )
             return self._adapters["mex"]
 
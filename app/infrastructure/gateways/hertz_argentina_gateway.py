@@ -5,7 +5,15 @@ from typing import Any, Dict
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.retry_policy import parse_retry_after
 from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.supplier_retry import send_with_retries
+from app.infrastructure.gateways.token_cache import (
+    IssuedToken,
+    SupplierTokenCache,
+    parse_expires_in,
+)
 
 
 class HertzArgentinaGateway(SupplierGateway):
@@ -30,6 +38,7 @@ class HertzArgentinaGateway(SupplierGateway):
         grant_type: str,
         timeout_seconds: float = 30.0,
         retry_times: int = 2,
+        hedge_after_seconds: float | None = None,  # sólo si la reserva es idempotente
     ) -> None:
         self._base_url = base_url.rstrip("/")
         self._auth_url = auth_url
@@ -39,13 +48,18 @@ class HertzArgentinaGateway(SupplierGateway):
         self._grant_type = grant_type
         self._timeout = timeout_seconds
         self._retry_times = retry_times
+        self._hedge_after = hedge_after_seconds
         self._logger = logging.getLogger(__name__)
+        self._tokens = SupplierTokenCache(self._login, "hertz_argentina")
 
     async def _get_token(self) -> str:
         """
-        Obtiene el token Bearer para autenticación.
+        Token Bearer vigente (cacheado hasta `expires_in`).
         Mapea: HertzArgentinaRepository::getToken
         """
+        return await self._tokens.get()
+
+    async def _login(self) -> IssuedToken:
         payload = {
             "username": self._username,
             "password": self._password,
@@ -54,11 +68,11 @@ class HertzArgentinaGateway(SupplierGateway):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
+            async with supplier_http_client(self._auth_url, timeout=self._timeout) as client:
                 response = await client.post(self._auth_url, data=payload)
                 response.raise_for_status()
                 data = response.json()
-                return str(data.get("access_token", ""))
+                return IssuedToken(str(data.get("access_token", "")), parse_expires_in(data))
         except Exception as e:
             self._logger.error(f"HertzAR Auth failed: {str(e)}")
             raise
@@ -155,31 +169,22 @@ class HertzArgentinaGateway(SupplierGateway):
         }
 
         # 3. Enviar Request
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/json"
-        }
-        
         url = f"{self._base_url}/Booking"
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                # Retries simples
-                response = None
-                last_exception = None
-                for attempt in range(self._retry_times + 1):
-                    try:
-                        response = await client.post(url, json=request_body, headers=headers)
-                        if response.status_code < 500: # Break on non-server errors
-                            break
-                    except httpx.RequestError as exc:
-                        last_exception = exc
-                        if attempt == self._retry_times:
-                            pass # Raise after loop or handle
-                
-                if last_exception and not response:
-                     raise last_exception
-
+            response = await self._post_booking(url, request_body, token)
+            if response is not None and response.status_code == 401:
+                # Token revocado o vencido antes de tiempo: un login nuevo y un reintento
+                self._tokens.invalidate(token)
+                try:
+                    token = await self._get_token()
+                except Exception as e:
+                    return SupplierBookingResult(
+                        status="FAILED",
+                        error_code="AUTH_ERROR",
+                        error_message=f"Could not authenticate with Hertz: {str(e)}",
+                    )
+                response = await self._post_booking(url, request_body, token)
         except httpx.RequestError as exc:
             return SupplierBookingResult(
                 status="FAILED",
@@ -195,6 +200,7 @@ class HertzArgentinaGateway(SupplierGateway):
                 status="FAILED",
                 error_code="HTTP_ERROR",
                 http_status=response.status_code,
+                retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
                 payload={"raw_response": response.text, "request": request_body},
             )
 
@@ -222,6 +228,24 @@ class HertzArgentinaGateway(SupplierGateway):
             http_status=response.status_code,
         )
 
+    async def _post_booking(
+        self, url: str, request_body: dict[str, Any], token: str
+    ) -> httpx.Response | None:
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json"
+        }
+        async with supplier_http_client(url, timeout=self._timeout) as client:
+            # Reintentos con backoff dentro del presupuesto de la reserva
+            return await send_with_retries(
+                lambda timeout: client.post(
+                    url, json=request_body, headers=headers, timeout=timeout
+                ),
+                retry_times=self._retry_times,
+                timeout=self._timeout,
+                hedge_after_seconds=self._hedge_after,
+            )
+
     async def confirm_booking(self, reservation_code: str, details: Dict[str, Any]) -> str:
         """
         Wrapper de compatibilidad.
@@ -0,0 +1,109 @@
+"""
+Clientes httpx compartidos por los gateways de suppliers.
+
+Un `httpx.AsyncClient` por host de supplier (y timeout), creado al primer uso
+y reutilizado por todas las llamadas del proceso: el pool mantiene las
+conexiones keep-alive, así cada reserva ya no paga DNS + TCP + TLS (y el token
+otra vez). Se cierran en el shutdown de la app / del proceso worker.
+"""
+
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class SupplierHttpClients:
+    """Registro de clientes pooled, uno por (origen, timeout)."""
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry_seconds: float = 30.0,
+        http2: bool = False,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """
+        Args:
+            max_connections: Conexiones simultáneas por host (las demás esperan en el pool).
+            max_keepalive_connections: Conexiones ociosas que se conservan por host.
+            keepalive_expiry_seconds: Tiempo que una conexión ociosa sigue abierta.
+            http2: Negocia HTTP/2 si el supplier lo soporta (requiere el paquete `h2`).
+            transport: Transporte para todos los clientes, p. ej. httpx.ASGITransport
+                del simulador de suppliers para correr los gateways en proceso.
+        """
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry_seconds,
+        )
+        self._http2 = http2 and self._h2_available()
+        self._transport = transport
+        self._clients: dict[tuple[str, float | None], httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _h2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested for supplier clients but h2 is not installed")
+            return False
+        return True
+
+    def get(self, url: str, timeout: float | None = None) -> httpx.AsyncClient:
+        """Cliente del host de `url`; se recrea si fue cerrado (p. ej. tras un shutdown)."""
+        key = (_origin(url), timeout)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=timeout, limits=self._limits, http2=self._http2, transport=self._transport
+            )
+            self._clients[key] = client
+        return client
+
+    @asynccontextmanager
+    async def client(
+        self, url: str, timeout: float | None = None
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        Reemplazo de `async with httpx.AsyncClient(...) as client` en los gateways:
+        al salir del bloque el cliente sigue abierto para la siguiente llamada.
+        """
+        yield self.get(url, timeout)
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception:
+                logger.exception("Error closing supplier HTTP client")
+
+
+@lru_cache(maxsize=1)
+def get_supplier_http_clients() -> SupplierHttpClients:
+    settings = get_settings()
+    return SupplierHttpClients(
+        max_connections=settings.supplier_http_max_connections,
+        max_keepalive_connections=settings.supplier_http_max_keepalive_connections,
+        keepalive_expiry_seconds=settings.supplier_http_keepalive_expiry_seconds,
+        http2=settings.supplier_http2,
+    )
+
+
+def supplier_http_client(url: str, timeout: float | None = None):
+    """`async with supplier_http_client(url, timeout) as client:` con el registro del proceso."""
+    return get_supplier_http_clients().client(url, timeout)
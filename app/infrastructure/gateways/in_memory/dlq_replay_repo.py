@@ -0,0 +1,122 @@
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any
+
+from app.application.interfaces.dlq_replay_repo import (
+    REPLAY_RUNNING,
+    DeadLetter,
+    DeadLetterFilter,
+    DlqReplay,
+    DlqReplayRepo,
+)
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+
+
+def _matches(dead_letter: dict[str, Any], filters: DeadLetterFilter) -> bool:
+    return (
+        dead_letter["replayed_at"] is None
+        and filters.supplier_id in (None, dead_letter["supplier_id"])
+        and filters.error_code in (None, dead_letter["error_code"])
+        and filters.event_type in (None, dead_letter["event_type"])
+        and (filters.moved_from is None or dead_letter["moved_at"] >= filters.moved_from)
+        and (filters.moved_to is None or dead_letter["moved_at"] < filters.moved_to)
+    )
+
+
+class InMemoryDlqReplayRepo(DlqReplayRepo):
+    """Replays the dead letters kept by an InMemoryOutboxRepo."""
+
+    def __init__(self, outbox_repo: InMemoryOutboxRepo) -> None:
+        self._outbox_repo = outbox_repo
+        self._replays: dict[int, DlqReplay] = {}
+
+    async def create(
+        self, filters: DeadLetterFilter, rate_per_second: float, batch_size: int
+    ) -> DlqReplay:
+        now = datetime.now(timezone.utc)
+        replay = DlqReplay(
+            id=len(self._replays) + 1,
+            status=REPLAY_RUNNING,
+            filters=filters,
+            rate_per_second=rate_per_second,
+            batch_size=batch_size,
+            total=sum(1 for dl in self._outbox_repo.dead_letters if _matches(dl, filters)),
+            created_at=now,
+            updated_at=now,
+        )
+        self._replays[replay.id] = replay
+        return replace(replay)
+
+    async def get(self, replay_id: int) -> DlqReplay | None:
+        replay = self._replays.get(replay_id)
+        return replace(replay) if replay else None
+
+    async def next_batch(self, replay: DlqReplay) -> list[DeadLetter]:
+        batch = [
+            dl
+            for dl in self._outbox_repo.dead_letters
+            if dl["id"] > replay.last_dead_letter_id and _matches(dl, replay.filters)
+        ]
+        return [
+            DeadLetter(
+                id=dl["id"],
+                original_event_id=dl["original_event_id"],
+                event_type=dl["event_type"],
+                aggregate_type=dl["aggregate_type"],
+                reservation_code=dl["reservation_code"],
+                payload=dl["payload"],
+                error_code=dl["error_code"],
+                attempts=dl["attempts"],
+                moved_at=dl["moved_at"],
+                supplier_id=dl["supplier_id"],
+            )
+            for dl in batch[: replay.batch_size]
+        ]
+
+    async def requeue_batch(
+        self,
+        replay: DlqReplay,
+        dead_letters: list[DeadLetter],
+        next_attempt_at: list[datetime],
+    ) -> DlqReplay | None:
+        stored = self._replays.get(replay.id)
+        if (
+            stored is None
+            or stored.status != REPLAY_RUNNING
+            or stored.last_dead_letter_id != replay.last_dead_letter_id
+        ):
+            return None
+        now = datetime.now(timezone.utc)
+        replayed = 0
+        for dead_letter, when in zip(dead_letters, next_attempt_at, strict=True):
+            # No retention job in memory: the original event is always still there
+            event = await self._outbox_repo.get_by_id(dead_letter.original_event_id)
+            if event is not None and event.status == "FAILED":
+                event.status = "RETRY"
+                event.attempts = 0
+                event.next_attempt_at = when
+                event.locked_by = None
+                event.lock_expires_at = None
+                replayed += 1
+        replayed_ids = {dead_letter.id for dead_letter in dead_letters}
+        for dl in self._outbox_repo.dead_letters:
+            if dl["id"] in replayed_ids:
+                dl["replay_id"], dl["replayed_at"] = replay.id, now
+        stored.last_dead_letter_id = dead_letters[-1].id
+        stored.replayed += replayed
+        stored.skipped += len(dead_letters) - replayed
+        stored.updated_at = now
+        return replace(stored)
+
+    async def set_status(
+        self, replay_id: int, status: str, error_message: str | None = None
+    ) -> DlqReplay | None:
+        stored = self._replays.get(replay_id)
+        if stored is None:
+            return None
+        now = datetime.now(timezone.utc)
+        stored.status = status
+        stored.error_message = error_message
+        stored.updated_at = now
+        stored.finished_at = None if status == REPLAY_RUNNING else now
+        return replace(stored)
@@ -1,14 +1,27 @@
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from app.application.interfaces.outbox_repo import OutboxEvent, OutboxRepo
+from app.application.interfaces.outbox_repo import (
+    NO_SUPPLIER,
+    PENDING_STATUSES,
+    OutboxEvent,
+    OutboxQueueStats,
+    OutboxRepo,
+    outbox_shard_key,
+)
+from app.application.interfaces.reservation_repo import ReservationRepo
 
 
 class InMemoryOutboxRepo(OutboxRepo):
-    def __init__(self) -> None:
+    def __init__(self, reservation_repo: ReservationRepo | None = None) -> None:
+        # Only needed to copy supplier_id from the reservation on enqueue (the SQL
+        # repo reads it from reservations in the INSERT)
+        self._reservation_repo = reservation_repo
         self._events: dict[int, OutboxEvent] = {}
         self._by_aggregate_event: dict[tuple[str, str], int] = {}
         self._next_id = 1
+        self.dead_letters: list[dict[str, Any]] = []
 
     async def enqueue(
         self,
@@ -16,7 +29,12 @@ class InMemoryOutboxRepo(OutboxRepo):
         aggregate_type: str,
         aggregate_code: str,
         payload: dict[str, Any],
+        supplier_id: int | None = None,
     ) -> OutboxEvent:
+        existing_id = self._by_aggregate_event.get((aggregate_code, event_type))
+        if existing_id:
+            # Coalesce: one event per (aggregate_code, event_type), like the SQL unique key
+            return self._events[existing_id]
         now = datetime.now(timezone.utc)
         event = OutboxEvent(
             id=self._next_id,
@@ -27,6 +45,7 @@ class InMemoryOutboxRepo(OutboxRepo):
             status="NEW",
             attempts=0,
             next_attempt_at=now,
+            supplier_id=await self._supplier_of(aggregate_type, aggregate_code, supplier_id),
         )
         self._events[self._next_id] = event
         self._by_aggregate_event[(aggregate_code, event_type)] = event.id
@@ -46,27 +65,141 @@ class InMemoryOutboxRepo(OutboxRepo):
         if not event_id:
             return None
         event = self._events[event_id]
-        if event.status not in {"NEW", "RETRY"}:
-            return None
-        if event.next_attempt_at and event.next_attempt_at > now:
-            return None
-        if event.lock_expires_at and event.lock_expires_at > now:
+        if not self._is_ready(event, now):
             return None
 
         event.locked_by = locked_by
         event.lock_expires_at = now + timedelta(seconds=lock_ttl_seconds)
         event.status = "IN_PROGRESS"
-        self._events[event_id] = event
-        return event
+        # Snapshot, like a DB row: a later reclaim must not rewrite this lease holder
+        return replace(event)
+
+    async def claim_ready(
+        self,
+        limit: int,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+        event_type: str | None = None,
+        shard: tuple[int, int] | None = None,
+        supplier_id: int | None = None,
+    ) -> list[OutboxEvent]:
+        ready = [
+            event
+            for event in self._events.values()
+            if self._is_ready(event, now)
+            and (not event_type or event.event_type == event_type)
+            and (not shard or outbox_shard_key(event.aggregate_code) % shard[1] == shard[0])
+            and (supplier_id is None or event.supplier_id == supplier_id)
+        ]
+        ready.sort(key=lambda e: (e.next_attempt_at or now, e.id))
+        claimed = ready[: max(limit, 0)]
+        for event in claimed:
+            event.locked_by = locked_by
+            event.lock_expires_at = now + timedelta(seconds=lock_ttl_seconds)
+            event.status = "IN_PROGRESS"
+        return [replace(event) for event in claimed]
 
-    async def mark_done(self, event_id: int) -> None:
+    async def count_ready_by_supplier(
+        self,
+        now: datetime,
+        event_type: str | None = None,
+        shard: tuple[int, int] | None = None,
+    ) -> dict[int, int]:
+        counts: dict[int, int] = {}
+        for event in self._events.values():
+            if not self._is_ready(event, now):
+                continue
+            if event_type and event.event_type != event_type:
+                continue
+            if shard and outbox_shard_key(event.aggregate_code) % shard[1] != shard[0]:
+                continue
+            counts[event.supplier_id] = counts.get(event.supplier_id, 0) + 1
+        return counts
+
+    async def _supplier_of(
+        self, aggregate_type: str, aggregate_code: str, supplier_id: int | None
+    ) -> int:
+        if supplier_id is not None:
+            return supplier_id
+        if aggregate_type != "reservation" or not self._reservation_repo:
+            return NO_SUPPLIER
+        reservation = await self._reservation_repo.get_by_code(aggregate_code)
+        return reservation.supplier_id if reservation else NO_SUPPLIER
+
+    async def queue_stats(
+        self, now: datetime, dlq_windows: tuple[int, ...] = (300, 3600)
+    ) -> OutboxQueueStats:
+        counts: dict[tuple[str, int, str], int] = {}
+        oldest = None
+        for event in self._events.values():
+            if event.status not in PENDING_STATUSES:
+                continue
+            key = (event.event_type, event.supplier_id, event.status)
+            counts[key] = counts.get(key, 0) + 1
+            if event.status in {"NEW", "RETRY"} and event.next_attempt_at:
+                oldest = min(oldest or event.next_attempt_at, event.next_attempt_at)
+        return OutboxQueueStats(
+            counts=counts,
+            oldest_ready_age_seconds=(
+                max(0.0, (now - oldest).total_seconds()) if oldest is not None else None
+            ),
+            dead_letters_moved={
+                window: sum(
+                    1
+                    for dead_letter in self.dead_letters
+                    if dead_letter["moved_at"] >= now - timedelta(seconds=window)
+                )
+                for window in dlq_windows
+            },
+        )
+
+    async def get_by_id(self, event_id: int) -> OutboxEvent | None:
+        return self._events.get(event_id)
+
+    @staticmethod
+    def _is_ready(event: OutboxEvent, now: datetime) -> bool:
+        expired_lease = event.status == "IN_PROGRESS" and (
+            event.lock_expires_at is not None and event.lock_expires_at <= now
+        )
+        if event.status not in {"NEW", "RETRY"} and not expired_lease:
+            return False
+        if event.next_attempt_at and event.next_attempt_at > now:
+            return False
+        if event.lock_expires_at and event.lock_expires_at > now:
+            return False
+        return True
+
+    async def renew_lease(
+        self,
+        event_id: int,
+        locked_by: str,
+        now: datetime,
+        lock_ttl_seconds: int = 30,
+    ) -> bool:
+        event = self._owned(event_id, locked_by)
+        if not event:
+            return False
+        event.lock_expires_at = now + timedelta(seconds=lock_ttl_seconds)
+        return True
+
+    def _owned(self, event_id: int, locked_by: str | None) -> OutboxEvent | None:
+        """Event to transition; with locked_by, only while it still holds the lease."""
         event = self._events.get(event_id)
+        if not event or not locked_by:
+            return event
+        if event.status != "IN_PROGRESS" or event.locked_by != locked_by:
+            return None
+        return event
+
+    async def mark_done(self, event_id: int, locked_by: str | None = None) -> bool:
+        event = self._owned(event_id, locked_by)
         if not event:
-            return
+            return False
         event.status = "DONE"
         event.locked_by = None
         event.lock_expires_at = None
-        self._events[event_id] = event
+        return True
 
     async def mark_failed(
         self,
@@ -76,17 +209,18 @@ class InMemoryOutboxRepo(OutboxRepo):
         event_type: str,
         error_code: str | None,
         error_message: str | None,
-    ) -> None:
-        event = self._events.get(event_id)
+        locked_by: str | None = None,
+    ) -> bool:
+        event = self._owned(event_id, locked_by)
         if not event:
-            return
+            return False
         event.status = "FAILED"
         event.attempts = attempts
         event.error_code = error_code
         event.error_message = error_message
         event.locked_by = None
         event.lock_expires_at = None
-        self._events[event_id] = event
+        return True
 
     async def mark_retry(
         self,
@@ -95,10 +229,11 @@ class InMemoryOutboxRepo(OutboxRepo):
         next_attempt_at: datetime,
         error_code: str | None,
         error_message: str | None,
-    ) -> None:
-        event = self._events.get(event_id)
+        locked_by: str | None = None,
+    ) -> bool:
+        event = self._owned(event_id, locked_by)
         if not event:
-            return
+            return False
         event.status = "RETRY"
         event.attempts = attempts
         event.next_attempt_at = next_attempt_at
@@ -106,4 +241,36 @@ class InMemoryOutboxRepo(OutboxRepo):
         event.error_message = error_message
         event.locked_by = None
         event.lock_expires_at = None
-        self._events[event_id] = event
+        return True
+
+    async def move_to_dlq(
+        self,
+        event: OutboxEvent,
+        error_code: str | None = None,
+        error_message: str | None = None,
+        locked_by: str | None = None,
+    ) -> bool:
+        stored = self._owned(event.id, locked_by)
+        if not stored:
+            return False
+        stored.status = "FAILED"
+        stored.locked_by = None
+        stored.lock_expires_at = None
+        self.dead_letters.append(
+            {
+                "id": len(self.dead_letters) + 1,
+                "original_event_id": event.id,
+                "event_type": event.event_type,
+                "aggregate_type": event.aggregate_type,
+                "reservation_code": (event.payload or {}).get("reservation_code"),
+                "payload": event.payload,
+                "error_code": error_code or event.error_code or "MAX_ATTEMPTS_EXCEEDED",
+                "error_message": error_message or event.error_message,
+                "attempts": event.attempts,
+                "moved_at": datetime.now(timezone.utc),
+                "supplier_id": event.supplier_id,
+                "replay_id": None,
+                "replayed_at": None,
+            }
+        )
+        return True
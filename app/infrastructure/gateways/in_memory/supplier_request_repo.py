@@ -1,3 +1,5 @@
+from dataclasses import replace
+
 from app.application.interfaces.supplier_request_repo import (
     SupplierRequestRecord,
     SupplierRequestRepo,
@@ -62,3 +64,11 @@ class InMemorySupplierRequestRepo(SupplierRequestRepo):
         record.http_status = http_status
         record.response_payload = response_payload
         return record
+
+    async def list_for_reservation(
+        self, reservation_code: str, with_payloads: bool = True
+    ) -> list[SupplierRequestRecord]:
+        records = [self._records[i] for i in self._by_reservation.get(reservation_code, [])]
+        if with_payloads:
+            return records
+        return [replace(record, response_payload=None) for record in records]
@@ -6,7 +6,55 @@ from typing import Any, Dict
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.retry_policy import parse_retry_after
 from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.supplier_retry import send_with_retries
+from app.infrastructure.gateways.xml_response import (
+    ResponseTooLarge,
+    response_too_large_result,
+    scan_ota_response,
+)
+from app.infrastructure.gateways.xml_templates import XmlTemplate
+
+# Estructura exacta del legacy: 'OTA_VehResRQ' con 'Version="1.00"' y sin namespace
+VEH_RES_RQ = XmlTemplate(
+    """
+    <?xml version="1.0"?>
+    <OTA_VehResRQ Version="1.00">
+        <POS>
+            <Source>
+                <RequestorID ID="{requestor_id}"/>
+            </Source>
+        </POS>
+        <BookingReferenceID>
+            <UniqueID_Type ID="{ref_id}"/>
+        </BookingReferenceID>
+        <VehResRQCore>
+            <VehRentalCore PickUpDateTime="{pu_datetime}" ReturnDateTime="{do_datetime}">
+                <PickUpLocation LocationCode="{pu_loc_code}"/>
+                <ReturnLocation LocationCode="{do_loc_code}"/>
+            </VehRentalCore>
+            <VehPref VendorCarType="{car_type}">
+                <VehClass>{car_type}</VehClass>
+                <VehType/>
+            </VehPref>
+            <RateQualifier VendorRateID="{vendor_rate_id}"/>
+            <Customer>
+                <Primary>
+                    <PersonName>
+                        <GivenName>{first_name}</GivenName>
+                        <Surname>{last_name}</Surname>
+                    </PersonName>
+                    <Email>
+                        <Value>{email}</Value>
+                    </Email>
+                </Primary>
+            </Customer>
+        </VehResRQCore>
+    </OTA_VehResRQ>
+    """
+)
 
 
 class InfinityGroupGateway(SupplierGateway):
@@ -27,11 +75,13 @@ class InfinityGroupGateway(SupplierGateway):
         requestor_id: str = "92",
         timeout_seconds: float = 30.0,
         retry_times: int = 2,
+        hedge_after_seconds: float | None = None,  # sólo si la reserva es idempotente
     ) -> None:
         self._endpoint = endpoint
         self._requestor_id = requestor_id
         self._timeout = timeout_seconds
         self._retry_times = retry_times
+        self._hedge_after = hedge_after_seconds
         self._logger = logging.getLogger(__name__)
 
     @async_supplier_breaker
@@ -106,41 +156,19 @@ class InfinityGroupGateway(SupplierGateway):
         ref_id = reservation_snapshot.get("token_id") or reservation_code
 
         # 2. Construir XML
-        # Usamos f-string para replicar la estructura exacta del legacy
-        # Nota: Legacy 'OTA_VehResRQ' con 'Version="1.00"'
-        xml_payload = f"""<?xml version="1.0"?>
-<OTA_VehResRQ Version="1.00">
-    <POS>
-        <Source>
-            <RequestorID ID="{self._requestor_id}"/>
-        </Source>
-    </POS>
-    <BookingReferenceID>
-        <UniqueID_Type ID="{ref_id}"/>
-    </BookingReferenceID>
-    <VehResRQCore>
-        <VehRentalCore PickUpDateTime="{pu_datetime}" ReturnDateTime="{do_datetime}">
-            <PickUpLocation LocationCode="{pu_loc_code}"/>
-            <ReturnLocation LocationCode="{do_loc_code}"/>
-        </VehRentalCore>
-        <VehPref VendorCarType="{car_type}">
-            <VehClass>{car_type}</VehClass>
-            <VehType/>
-        </VehPref>
-        <RateQualifier VendorRateID="{vendor_rate_id}"/>
-        <Customer>
-            <Primary>
-                <PersonName>
-                    <GivenName>{first_name}</GivenName>
-                    <Surname>{last_name}</Surname>
-                </PersonName>
-                <Email>
-                    <Value>{email}</Value>
-                </Email>
-            </Primary>
-        </Customer>
-    </VehResRQCore>
-</OTA_VehResRQ>"""
+        xml_payload = VEH_RES_RQ.render(
+            requestor_id=self._requestor_id,
+            ref_id=ref_id,
+            pu_datetime=pu_datetime,
+            do_datetime=do_datetime,
+            pu_loc_code=pu_loc_code,
+            do_loc_code=do_loc_code,
+            car_type=car_type,
+            vendor_rate_id=vendor_rate_id,
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+        )
 
         # 3. Enviar Request (GET ?XML=...)
         encoded_xml = urllib.parse.quote(xml_payload)
@@ -149,20 +177,14 @@ class InfinityGroupGateway(SupplierGateway):
         headers = {'Accept': 'application/xml'}
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                response = None
-                for attempt in range(self._retry_times + 1):
-                    try:
-                        response = await client.get(url, headers=headers)
-                        # Break si es success o error del cliente (4xx), retry si es server error (5xx)
-                        if response.status_code < 500:
-                            break
-                    except httpx.RequestError:
-                         if attempt == self._retry_times:
-                            raise
-                
-                if not response:
-                     raise httpx.RequestError("No response received")
+            async with supplier_http_client(url, timeout=self._timeout) as client:
+                # Reintenta 5xx / errores de red con backoff dentro del presupuesto de la reserva
+                response = await send_with_retries(
+                    lambda timeout: client.get(url, headers=headers, timeout=timeout),
+                    retry_times=self._retry_times,
+                    timeout=self._timeout,
+                    hedge_after_seconds=self._hedge_after,
+                )
 
         except httpx.RequestError as exc:
              return SupplierBookingResult(
@@ -176,68 +198,16 @@ class InfinityGroupGateway(SupplierGateway):
                 status="FAILED",
                 error_code="HTTP_ERROR",
                 http_status=response.status_code,
+                retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
                 payload={"raw_response": response.text},
             )
 
-        # 4. Parsear Respuesta XML
+        # 4. Parsear Respuesta XML (sobre los bytes, corta al encontrar ConfID o Errors)
+        # Path: VehResRSCore -> VehReservation -> VehSegmentCore -> ConfID -> @ID
         try:
-            # Limpiar response (legacy hace ltrim si empieza con <)
-            content = response.text.strip()
-            # A veces viene con BOM o espacios
-            if not content.startswith("<"):
-                # Intentar buscar donde empieza
-                start = content.find("<")
-                if start != -1:
-                    content = content[start:]
-            
-            root = ET.fromstring(content)
-            
-            # Buscar ConfID
-            # Path: VehResRSCore -> VehReservation -> VehSegmentCore -> ConfID -> @ID
-            # Namespaces suelen ser un dolor en OTA, el legacy no parecia usar namespaces estrictos
-            # pero ET.fromstring los parsea si existen.
-            # Haremos una busqueda agnostica o directa.
-            
-            # Intentar buscar namespace si existe
-            if 'xmlns' in content:
-                 # simple hack, if needed. For now assume no NS or ignore it via find
-                 pass
-
-            # Navegacion manual segura
-            conf_id = None
-            veh_res_core = root.find("VehResRSCore")
-            if veh_res_core is not None:
-                veh_reservation = veh_res_core.find("VehReservation")
-                if veh_reservation is not None:
-                    veh_seg_core = veh_reservation.find("VehSegmentCore")
-                    if veh_seg_core is not None:
-                        conf_node = veh_seg_core.find("ConfID")
-                        if conf_node is not None:
-                            conf_id = conf_node.get("ID")
-            
-            # Verificar errores si no hay ID
-            if not conf_id:
-                errors = root.find("Errors")
-                error_msg = "Unknown error"
-                if errors is not None:
-                    err = errors.find("Error")
-                    if err is not None:
-                        error_msg = err.get("ShortText") or err.text or "Error node found"
-                
-                return SupplierBookingResult(
-                    status="FAILED",
-                    error_code="SUPPLIER_ERROR",
-                    error_message=error_msg,
-                    payload={"response": content}
-                )
-
-            return SupplierBookingResult(
-                status="SUCCESS",
-                supplier_reservation_code=conf_id,
-                payload={"response": content},
-                http_status=response.status_code
-            )
-
+            parsed = scan_ota_response(response.content)
+        except ResponseTooLarge as exc:
+            return response_too_large_result(exc, response.status_code)
         except ET.ParseError:
             return SupplierBookingResult(
                 status="FAILED",
@@ -251,6 +221,25 @@ class InfinityGroupGateway(SupplierGateway):
                 error_message=str(e),
             )
 
+        content = response.text.strip()
+        if not parsed.conf_id:
+            error_msg = "Unknown error"
+            if parsed.errors:
+                error_msg = parsed.errors[0] or "Error node found"
+            return SupplierBookingResult(
+                status="FAILED",
+                error_code="SUPPLIER_ERROR",
+                error_message=error_msg,
+                payload={"response": content}
+            )
+
+        return SupplierBookingResult(
+            status="SUCCESS",
+            supplier_reservation_code=parsed.conf_id,
+            payload={"response": content},
+            http_status=response.status_code
+        )
+
     async def confirm_booking(self, reservation_code: str, details: Dict[str, Any]) -> str:
         """Compatibility wrapper."""
         result = await self.book(
@@ -5,7 +5,53 @@ from typing import Any, Dict
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.retry_policy import parse_retry_after
 from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.supplier_retry import send_with_retries
+from app.infrastructure.gateways.xml_response import (
+    ResponseTooLarge,
+    response_too_large_result,
+    scan_ota_response,
+)
+from app.infrastructure.gateways.xml_templates import OTA_NS, XmlTemplate, soap_envelope, xml_attr
+
+# Namespace OTA 2003/05 según legacy
+VEH_RES_RQ = XmlTemplate(
+    f"""
+    <OTA_VehResRQ EchoToken="{{echo_token}}" Version="2.001" xmlns="{OTA_NS}">
+        <POS>
+            <Source>
+                <RequestorID Type="5" ID="{{requestor_id}}"/>
+            </Source>
+        </POS>
+        <VehResRQCore>
+            <VehRentalCore PickUpDateTime="{{pu_date}}" ReturnDateTime="{{do_date}}">
+                <PickUpLocation LocationCode="{{pu_loc}}"/>
+                <ReturnLocation LocationCode="{{do_loc}}"/>
+            </VehRentalCore>
+            {{veh_pref}}
+            <Customer>
+                <Primary>
+                    <PersonName>
+                        <GivenName>{{first_name}}</GivenName>
+                        <Surname>{{last_name}}</Surname>
+                    </PersonName>
+                    <Email>{{email}}</Email>
+                </Primary>
+            </Customer>
+        </VehResRQCore>
+    </OTA_VehResRQ>
+    """
+)
+VEH_PREF = XmlTemplate(
+    """
+    <VehPref>
+        <VehClass{size_attr}/>
+        <VehType{category_attr}/>
+    </VehPref>
+    """
+)
 
 
 class LocalizaGateway(SupplierGateway):
@@ -28,6 +74,7 @@ class LocalizaGateway(SupplierGateway):
         requestor_id: str,
         timeout_seconds: float = 30.0,
         retry_times: int = 2,
+        hedge_after_seconds: float | None = None,  # sólo si la reserva es idempotente
     ) -> None:
         self._endpoint = endpoint
         self._username = username
@@ -36,6 +83,7 @@ class LocalizaGateway(SupplierGateway):
         self._requestor_id = requestor_id
         self._timeout = timeout_seconds
         self._retry_times = retry_times
+        self._hedge_after = hedge_after_seconds
         self._logger = logging.getLogger(__name__)
 
     @async_supplier_breaker
@@ -79,47 +127,26 @@ class LocalizaGateway(SupplierGateway):
         email = customer.get("email") or "reservaciones@mexicocarrental.com.mx"
 
         # 2. Construir XML Payload (OTA_VehResRQ dentro de SOAP)
-        # Namespace OTA 2003/05 según legacy
-        
-        veh_pref_xml = ""
+        veh_pref = b""
         if veh_size or veh_category:
-            size_attr = f' Size="{veh_size}"' if veh_size else ""
-            cat_attr = f' VehicleCategory="{veh_category}"' if veh_category else ""
-            veh_pref_xml = f"""<VehPref>
-                    <VehClass{size_attr}/>
-                    <VehType{cat_attr}/>
-                </VehPref>"""
-
-        xml_body = f"""<OTA_VehResRQ EchoToken="{self._echo_token}" Version="2.001" xmlns="http://www.opentravel.org/OTA/2003/05">
-            <POS>
-                <Source>
-                    <RequestorID Type="5" ID="{self._requestor_id}"/>
-                </Source>
-            </POS>
-            <VehResRQCore>
-                <VehRentalCore PickUpDateTime="{pu_date}" ReturnDateTime="{do_date}">
-                    <PickUpLocation LocationCode="{pu_loc}"/>
-                    <ReturnLocation LocationCode="{do_loc}"/>
-                </VehRentalCore>
-                {veh_pref_xml}
-                <Customer>
-                    <Primary>
-                        <PersonName>
-                            <GivenName>{first_name}</GivenName>
-                            <Surname>{last_name}</Surname>
-                        </PersonName>
-                        <Email>{email}</Email>
-                    </Primary>
-                </Customer>
-            </VehResRQCore>
-        </OTA_VehResRQ>"""
-
-        envelope = f"""<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ota="http://www.opentravel.org/OTA/2003/05">
-    <soapenv:Header/>
-    <soapenv:Body>
-        {xml_body}
-    </soapenv:Body>
-</soapenv:Envelope>"""
+            veh_pref = VEH_PREF.render(
+                size_attr=xml_attr("Size", veh_size),
+                category_attr=xml_attr("VehicleCategory", veh_category),
+            )
+
+        xml_body = VEH_RES_RQ.render(
+            echo_token=self._echo_token,
+            requestor_id=self._requestor_id,
+            pu_date=pu_date,
+            do_date=do_date,
+            pu_loc=pu_loc,
+            do_loc=do_loc,
+            veh_pref=veh_pref,
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+        )
+        envelope = soap_envelope(xml_body, namespaces={"ota": OTA_NS}, declaration=False)
 
         # 3. Enviar Request
         headers = {
@@ -130,19 +157,16 @@ class LocalizaGateway(SupplierGateway):
         auth = (self._username, self._password)
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                response = None
-                for attempt in range(self._retry_times + 1):
-                    try:
-                        response = await client.post(self._endpoint, content=envelope, headers=headers, auth=auth)
-                        if response.status_code < 500:
-                            break
-                    except httpx.RequestError:
-                        if attempt == self._retry_times:
-                            raise
-                
-                if not response:
-                     raise httpx.RequestError("No response received")
+            async with supplier_http_client(self._endpoint, timeout=self._timeout) as client:
+                response = await send_with_retries(
+                    lambda timeout: client.post(
+                        self._endpoint, content=envelope, headers=headers, auth=auth,
+                        timeout=timeout,
+                    ),
+                    retry_times=self._retry_times,
+                    timeout=self._timeout,
+                    hedge_after_seconds=self._hedge_after,
+                )
 
         except httpx.RequestError as exc:
             return SupplierBookingResult(status="FAILED", error_code="NETWORK_ERROR", error_message=str(exc))
@@ -152,85 +176,45 @@ class LocalizaGateway(SupplierGateway):
                 status="FAILED",
                 error_code="HTTP_ERROR",
                 http_status=response.status_code,
+                retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
                 payload={"raw_response": response.text},
             )
 
-        # 4. Parsear Respuesta (OTA_VehResRS)
+        # 4. Parsear Respuesta (OTA_VehResRS) sobre los bytes, ignorando prefijos de namespace
         try:
-            # Eliminar namespaces para facilitar parseo
-            # O usar lógica robusta con namespaces
-            content = response.text
-            root = ET.fromstring(content)
-            
-            # Buscar Body -> OTA_VehResRS
-            # Debido a variaciones de prefijos, buscamos OTA_VehResRS donde sea
-            res_rs = None
-            for elem in root.iter():
-                if "OTA_VehResRS" in elem.tag:
-                    res_rs = elem
-                    break
-            
-            if res_rs is None:
-                return SupplierBookingResult(status="FAILED", error_code="INVALID_SOAP", payload={"response": content})
-
-            # Check Success/Errors
-            # OTA standard: <Success/> element present means success
-            is_success = False
-            for child in res_rs:
-                if "Success" in child.tag:
-                    is_success = True
-                    break
-            
-            if not is_success:
-                # Buscar errores
-                errors_node = None
-                for child in res_rs:
-                    if "Errors" in child.tag:
-                        errors_node = child
-                        break
-                
-                msg = "Unknown Error"
-                if errors_node is not None:
-                     for err in errors_node:
-                         msg = err.get("ShortText") or err.text or msg
-                
-                return SupplierBookingResult(status="FAILED", error_code="SUPPLIER_ERROR", error_message=msg)
-
-            # Extraer ConfID
-            # Path: VehResRSCore/VehReservation/VehSegmentCore/ConfID
-            conf_id = None
-            
-            # Helper recursivo simple para buscar ConfID ignorando NS
-            def find_conf_id(element):
-                for child in element:
-                    if "ConfID" in child.tag:
-                        return child.get("ID")
-                    res = find_conf_id(child)
-                    if res: return res
-                return None
-
-            conf_id = find_conf_id(res_rs)
-            
-            if not conf_id:
-                 # A veces Localiza devuelve confirmación en otro lado o status
-                 return SupplierBookingResult(
-                     status="FAILED", 
-                     error_code="NO_CONFIRMATION_ID", 
-                     payload={"response": content}
-                )
-
-            return SupplierBookingResult(
-                status="SUCCESS",
-                supplier_reservation_code=conf_id,
-                payload={"response": content},
-                http_status=response.status_code
-            )
-
+            parsed = scan_ota_response(response.content, root_tag="OTA_VehResRS")
+        except ResponseTooLarge as exc:
+            return response_too_large_result(exc, response.status_code)
         except ET.ParseError:
             return SupplierBookingResult(status="FAILED", error_code="INVALID_XML", payload={"raw_response": response.text})
         except Exception as e:
             return SupplierBookingResult(status="FAILED", error_code="PROCESSING_ERROR", error_message=str(e))
 
+        content = response.text
+        if not parsed.root_found:
+            return SupplierBookingResult(status="FAILED", error_code="INVALID_SOAP", payload={"response": content})
+
+        # OTA standard: <Success/> element present means success
+        if not parsed.success:
+            msg = next((err for err in reversed(parsed.errors) if err), "Unknown Error")
+            return SupplierBookingResult(status="FAILED", error_code="SUPPLIER_ERROR", error_message=msg)
+
+        # Path: VehResRSCore/VehReservation/VehSegmentCore/ConfID
+        if not parsed.conf_id:
+            # A veces Localiza devuelve confirmación en otro lado o status
+            return SupplierBookingResult(
+                status="FAILED",
+                error_code="NO_CONFIRMATION_ID",
+                payload={"response": content}
+            )
+
+        return SupplierBookingResult(
+            status="SUCCESS",
+            supplier_reservation_code=parsed.conf_id,
+            payload={"response": content},
+            http_status=response.status_code
+        )
+
     async def confirm_booking(self, reservation_code: str, details: Dict[str, Any]) -> str:
         result = await self.book(
             reservation_code=reservation_code,
@@ -4,7 +4,15 @@ from typing import Any, Dict
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.retry_policy import parse_retry_after
 from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.supplier_retry import send_with_retries
+from app.infrastructure.gateways.token_cache import (
+    IssuedToken,
+    SupplierTokenCache,
+    parse_expires_in,
+)
 
 
 class MexGroupGateway(SupplierGateway):
@@ -26,37 +34,42 @@ class MexGroupGateway(SupplierGateway):
         password: str,
         timeout_seconds: float = 30.0,
         retry_times: int = 2,
+        token_ttl_seconds: float = 3600.0,
+        hedge_after_seconds: float | None = None,  # sólo si la reserva es idempotente
     ) -> None:
         self._endpoint = endpoint.rstrip("/") + "/"
         self._user = user
         self._password = password
         self._timeout = timeout_seconds
         self._retry_times = retry_times
+        self._hedge_after = hedge_after_seconds
         self._logger = logging.getLogger(__name__)
-        # Token cache simple en memoria de la instancia
-        self._token = None
+        # Token compartido por las reservas de la instancia; si el login no indica
+        # vigencia se asume token_ttl_seconds, y un 401 fuerza el re-login
+        self._tokens = SupplierTokenCache(
+            self._login, "mex_group", default_ttl_seconds=token_ttl_seconds
+        )
 
     async def _get_token(self) -> str:
         """
-        Obtiene token de autenticación.
+        Obtiene token de autenticación (cacheado, refresh single-flight).
         Mapea: MexGroupRepository::login / getToken
-        Nota: Implementación simplificada sin cache persistente distribuido por ahora.
         """
-        if self._token:
-            return self._token
+        return await self._tokens.get()
 
+    async def _login(self) -> IssuedToken:
         url = f"{self._endpoint}api/brokers/login"
         payload = {"user": self._user, "password": self._password}
         
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
+            async with supplier_http_client(url, timeout=self._timeout) as client:
                 response = await client.post(url, json=payload)
                 response.raise_for_status()
                 data = response.json()
                 
                 if data.get("type") == "success":
-                    self._token = data.get("data", {}).get("token")
-                    return self._token
+                    token_data = data.get("data", {})
+                    return IssuedToken(token_data.get("token"), parse_expires_in(token_data))
                 else:
                     raise Exception(f"Login failed: {data.get('message')}")
         except Exception as e:
@@ -151,27 +164,19 @@ class MexGroupGateway(SupplierGateway):
 
         # 3. Enviar Request
         url = f"{self._endpoint}api/brokers/booking-engine/reserve"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                response = None
-                for attempt in range(self._retry_times + 1):
-                    try:
-                        response = await client.post(url, json=payload, headers=headers)
-                        if response.status_code < 500:
-                            break
-                    except httpx.RequestError:
-                        if attempt == self._retry_times:
-                            raise
-                        # retry logic managed by loop
-                
-                if not response:
-                     raise httpx.RequestError("No response received")
+            response = await self._post_reserve(url, payload, token)
+            if response.status_code == 401:
+                # Token revocado o vencido: re-login y un reintento
+                self._tokens.invalidate(token)
+                try:
+                    token = await self._get_token()
+                except Exception as e:
+                    return SupplierBookingResult(
+                        status="FAILED", error_code="AUTH_ERROR", error_message=str(e)
+                    )
+                response = await self._post_reserve(url, payload, token)
 
         except httpx.RequestError as exc:
             return SupplierBookingResult(status="FAILED", error_code="NETWORK_ERROR", error_message=str(exc))
@@ -181,6 +186,7 @@ class MexGroupGateway(SupplierGateway):
                 status="FAILED",
                 error_code="HTTP_ERROR",
                 http_status=response.status_code,
+                retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
                 payload={"raw_response": response.text},
             )
 
@@ -207,6 +213,22 @@ class MexGroupGateway(SupplierGateway):
         except Exception as e:
             return SupplierBookingResult(status="FAILED", error_code="PROCESSING_ERROR", error_message=str(e))
 
+    async def _post_reserve(
+        self, url: str, payload: dict[str, Any], token: str
+    ) -> httpx.Response:
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        }
+        async with supplier_http_client(url, timeout=self._timeout) as client:
+            return await send_with_retries(
+                lambda timeout: client.post(url, json=payload, headers=headers, timeout=timeout),
+                retry_times=self._retry_times,
+                timeout=self._timeout,
+                hedge_after_seconds=self._hedge_after,
+            )
+
     async def confirm_booking(self, reservation_code: str, details: Dict[str, Any]) -> str:
         result = await self.book(
             reservation_code=reservation_code,
@@ -4,7 +4,9 @@ from typing import Any, Dict
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.retry_policy import parse_retry_after
 from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
 
 
 class NationalGroupGateway(SupplierGateway):
@@ -106,7 +108,7 @@ class NationalGroupGateway(SupplierGateway):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
+            async with supplier_http_client(url, timeout=self._timeout) as client:
                 response = None
                 for attempt in range(self._retry_times + 1):
                     try:
@@ -128,6 +130,7 @@ class NationalGroupGateway(SupplierGateway):
                 status="FAILED",
                 error_code="HTTP_ERROR",
                 http_status=response.status_code,
+                retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
                 payload={"raw_response": response.text},
             )
 
@@ -5,7 +5,38 @@ from typing import Any, Dict
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.retry_policy import parse_retry_after
 from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.xml_templates import XmlTemplate, soap_envelope
+
+NIZA_NS = "http://www.jimpisoft.pt/Rentway_Reservations_WS/Create_Reservation"
+CREATE_RESERVATION = XmlTemplate(
+    f"""
+    <Create_Reservation xmlns="{NIZA_NS}">
+        <CompanyCode>{{company_code}}</CompanyCode>
+        <ClienteCode>{{customer_code}}</ClienteCode>
+        <Username>{{username}}</Username>
+        <Password>{{password}}</Password>
+        <MessageType>N</MessageType>
+        <Group>{{group}}</Group>
+        <RateCode>{{rate_code}}</RateCode>
+        <PickUp>
+            <Date>{{pickup_date}}</Date>
+            <Rental_Station>{{pickup_station}}</Rental_Station>
+        </PickUp>
+        <DropOff>
+            <Date>{{dropoff_date}}</Date>
+            <Rental_Station>{{dropoff_station}}</Rental_Station>
+        </DropOff>
+        <Driver>
+            <Name>{{name}}</Name>
+            <Email>{{email}}</Email>
+            <Date_of_Birth>{{birth_date}}</Date_of_Birth>
+        </Driver>
+    </Create_Reservation>
+    """
+)
 
 
 class NizaCarsGateway(SupplierGateway):
@@ -89,41 +120,29 @@ class NizaCarsGateway(SupplierGateway):
         dob = reservation_snapshot.get("birth_date") or "1990-01-01"
 
         # 5. Construir XML
-        ns = "http://www.jimpisoft.pt/Rentway_Reservations_WS/Create_Reservation"
-        action = f"{ns}/Create_Reservation"
+        action = f"{NIZA_NS}/Create_Reservation"
         endpoint = f"{self._base_url}/Create_Reservation.asmx"
         
         # RateCode fallback logic from legacy (uses plan 'FF' if missing)
         final_rate_code = rate_code or "FF"
         
-        xml_body = f"""<Create_Reservation xmlns="{ns}">
-            <CompanyCode>{self._company_code}</CompanyCode>
-            <ClienteCode>{self._customer_code}</ClienteCode>
-            <Username>{self._username}</Username>
-            <Password>{self._password}</Password>
-            <MessageType>N</MessageType>
-            <Group>{group}</Group>
-            <RateCode>{final_rate_code}</RateCode>
-            <PickUp>
-                <Date>{pu_date}</Date>
-                <Rental_Station>{pu_station}</Rental_Station>
-            </PickUp>
-            <DropOff>
-                <Date>{do_date}</Date>
-                <Rental_Station>{do_station}</Rental_Station>
-            </DropOff>
-            <Driver>
-                <Name>{full_name}</Name>
-                <Email>{email}</Email>
-                <Date_of_Birth>{dob}</Date_of_Birth>
-            </Driver>
-        </Create_Reservation>"""
-
-        envelope = f"""<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xmlns:xsd="http://www.w3.org/2001/XMLSchema">
-    <soap:Body>
-        {xml_body}
-    </soap:Body>
-</soap:Envelope>"""
+        envelope = soap_envelope(
+            CREATE_RESERVATION.render(
+                company_code=self._company_code,
+                customer_code=self._customer_code,
+                username=self._username,
+                password=self._password,
+                group=group,
+                rate_code=final_rate_code,
+                pickup_date=pu_date,
+                pickup_station=pu_station,
+                dropoff_date=do_date,
+                dropoff_station=do_station,
+                name=full_name,
+                email=email,
+                birth_date=dob,
+            )
+        )
 
         # 6. Enviar
         headers = {
@@ -132,7 +151,7 @@ class NizaCarsGateway(SupplierGateway):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
+            async with supplier_http_client(endpoint, timeout=self._timeout) as client:
                 response = None
                 for attempt in range(self._retry_times + 1):
                     try:
@@ -154,6 +173,7 @@ class NizaCarsGateway(SupplierGateway):
                 status="FAILED",
                 error_code="HTTP_ERROR",
                 http_status=response.status_code,
+                retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
                 payload={"raw_response": response.text},
             )
 
@@ -6,7 +6,51 @@ from typing import Any, Dict
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.retry_policy import parse_retry_after
 from app.infrastructure.circuit_breaker import async_supplier_breaker
+from app.infrastructure.gateways.http_clients import supplier_http_client
+from app.infrastructure.gateways.xml_response import (
+    ResponseTooLarge,
+    response_too_large_result,
+    scan_ota_response,
+)
+from app.infrastructure.gateways.xml_templates import OTA_NS, XmlTemplate, soap_envelope
+
+VEH_RES_RQ = XmlTemplate(
+    f"""
+    <ns:OTA_VehResRQ Version="{{version}}" Target="{{target}}" TimeStamp="{{pu_date}}"
+                     EchoToken="{{echo_token}}" xmlns:ns="{OTA_NS}">
+        <ns:POS>
+            <ns:Source>
+                <ns:RequestorID ID="{{username}}" MessagePassword="{{password}}">
+                    <ns:CompanyName>{{company}}</ns:CompanyName>
+                </ns:RequestorID>
+            </ns:Source>
+        </ns:POS>
+        <ns:VehResRQCore>
+            <ns:VehRentalCore PickUpDateTime="{{pu_date}}" ReturnDateTime="{{do_date}}">
+                <ns:PickUpLocation LocationCode="{{pu_loc}}"/>
+                <ns:ReturnLocation LocationCode="{{do_loc}}"/>
+            </ns:VehRentalCore>
+            <ns:Customer>
+                <ns:Primary>
+                    <ns:PersonName>
+                        <ns:GivenName>{{first_name}}</ns:GivenName>
+                        <ns:Surname>{{last_name}}</ns:Surname>
+                    </ns:PersonName>
+                    <ns:Telephone PhoneTechType="1" PhoneNumber="{{phone}}"/>
+                    <ns:Email>{{email}}</ns:Email>
+                </ns:Primary>
+            </ns:Customer>
+            <ns:VehPref Code="{{sipp_code}}"/>
+        </ns:VehResRQCore>
+        <ns:VehResRQInfo>{{arrival_details}}</ns:VehResRQInfo>
+    </ns:OTA_VehResRQ>
+    """
+)
+ARRIVAL_DETAILS = XmlTemplate(
+    '<ns:ArrivalDetails Number="{flight_no}" ArrivalDateTime="{pu_date}"/>'
+)
 
 
 class NoleggiareGateway(SupplierGateway):
@@ -92,54 +136,29 @@ class NoleggiareGateway(SupplierGateway):
         flight_no = reservation_snapshot.get("flight") or ""
         
         # 6. Construir XML OTA
-        echo_token = str(uuid.uuid4())
-        ns_ota = "http://www.opentravel.org/OTA/2003/05"
-        
-        # POS Block
-        pos = f"""<ns:POS>
-          <ns:Source>
-            <ns:RequestorID ID="{self._username}" MessagePassword="{self._password}">
-                <ns:CompanyName>{self._company}</ns:CompanyName>
-            </ns:RequestorID>
-          </ns:Source>
-        </ns:POS>"""
-        
-        # Info Block
-        arrival_details = ""
+        arrival_details = b""
         if flight_no:
-            arrival_details = f'<ns:ArrivalDetails Number="{flight_no}" ArrivalDateTime="{pu_date}"/>'
-            
-        xml_body = f"""<ns:OTA_VehResRQ Version="{self._version}" Target="{self._target}" TimeStamp="{pu_date}" EchoToken="{echo_token}" xmlns:ns="{ns_ota}">
-            {pos}
-            <ns:VehResRQCore>
-                <ns:VehRentalCore PickUpDateTime="{pu_date}" ReturnDateTime="{do_date}">
-                  <ns:PickUpLocation LocationCode="{pu_loc}"/>
-                  <ns:ReturnLocation LocationCode="{do_loc}"/>
-                </ns:VehRentalCore>
-                <ns:Customer>
-                  <ns:Primary>
-                    <ns:PersonName>
-                      <ns:GivenName>{first_name}</ns:GivenName>
-                      <ns:Surname>{last_name}</ns:Surname>
-                    </ns:PersonName>
-                    <ns:Telephone PhoneTechType="1" PhoneNumber="{phone}"/>
-                    <ns:Email>{email}</ns:Email>
-                  </ns:Primary>
-                </ns:Customer>
-                <ns:VehPref Code="{sipp_code}" />
-            </ns:VehResRQCore>
-            <ns:VehResRQInfo>
-                {arrival_details}
-            </ns:VehResRQInfo>
-        </ns:OTA_VehResRQ>"""
-
-        envelope = f"""<?xml version="1.0" encoding="UTF-8"?>
-<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" xmlns:ns="{ns_ota}">
-  <soapenv:Header/>
-  <soapenv:Body>
-    {xml_body}
-  </soapenv:Body>
-</soapenv:Envelope>"""
+            arrival_details = ARRIVAL_DETAILS.render(flight_no=flight_no, pu_date=pu_date)
+
+        xml_body = VEH_RES_RQ.render(
+            version=self._version,
+            target=self._target,
+            echo_token=str(uuid.uuid4()),
+            username=self._username,
+            password=self._password,
+            company=self._company,
+            pu_date=pu_date,
+            do_date=do_date,
+            pu_loc=pu_loc,
+            do_loc=do_loc,
+            first_name=first_name,
+            last_name=last_name,
+            phone=phone,
+            email=email,
+            sipp_code=sipp_code,
+            arrival_details=arrival_details,
+        )
+        envelope = soap_envelope(xml_body, namespaces={"ns": OTA_NS})
 
         # 7. Enviar
         headers = {
@@ -149,7 +168,7 @@ class NoleggiareGateway(SupplierGateway):
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
+            async with supplier_http_client(self._endpoint, timeout=self._timeout) as client:
                 response = None
                 for attempt in range(self._retry_times + 1):
                     try:
@@ -171,70 +190,46 @@ class NoleggiareGateway(SupplierGateway):
                 status="FAILED",
                 error_code="HTTP_ERROR",
                 http_status=response.status_code,
+                retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
                 payload={"raw_response": response.text},
             )
 
-        # 8. Parsear
+        # 8. Parsear (sobre los bytes, corta al encontrar ConfID o Errors)
         try:
-            content = response.text
-            # Sanitize minimal (legacy did complex sanitization)
-            if content.strip().startswith("<?xml"):
-                content = content[content.find("?>")+2:]
-            
-            root = ET.fromstring(content)
-            
-            # Find OTA_VehResRS (ignoring NS logic for simplicity or using wildcard)
-            res_rs = None
-            for elem in root.iter():
-                if "OTA_VehResRS" in elem.tag:
-                    res_rs = elem
-                    break
-            
-            if res_rs is None:
-                 return SupplierBookingResult(status="FAILED", error_code="INVALID_SOAP", payload={"response": content})
-
-            # Check Errors
-            errors = []
-            for elem in res_rs.iter():
-                if "Errors" in elem.tag:
-                    for err in elem:
-                        if "Error" in err.tag:
-                            errors.append(err.get("ShortText") or err.text or "Unknown OTA Error")
-            
-            if errors:
-                return SupplierBookingResult(
-                    status="FAILED",
-                    error_code="SUPPLIER_ERROR",
-                    error_message="; ".join(errors),
-                    payload={"response": content}
-                )
-            
-            # Find ConfID
-            conf_id = None
-            for elem in res_rs.iter():
-                if "ConfID" in elem.tag:
-                    conf_id = elem.get("ID")
-                    if conf_id: break
-            
-            if not conf_id:
-                return SupplierBookingResult(
-                    status="FAILED", 
-                    error_code="NO_CONFIRMATION_ID", 
-                    payload={"response": content}
-                )
-
-            return SupplierBookingResult(
-                status="SUCCESS",
-                supplier_reservation_code=str(conf_id),
-                payload={"response": content},
-                http_status=response.status_code
-            )
-
+            parsed = scan_ota_response(response.content, root_tag="OTA_VehResRS")
+        except ResponseTooLarge as exc:
+            return response_too_large_result(exc, response.status_code)
         except ET.ParseError:
             return SupplierBookingResult(status="FAILED", error_code="INVALID_XML", payload={"raw_response": response.text})
         except Exception as e:
             return SupplierBookingResult(status="FAILED", error_code="PROCESSING_ERROR", error_message=str(e))
 
+        content = response.text
+        if not parsed.root_found:
+            return SupplierBookingResult(status="FAILED", error_code="INVALID_SOAP", payload={"response": content})
+
+        if parsed.errors:
+            return SupplierBookingResult(
+                status="FAILED",
+                error_code="SUPPLIER_ERROR",
+                error_message="; ".join(err or "Unknown OTA Error" for err in parsed.errors),
+                payload={"response": content}
+            )
+
+        if not parsed.conf_id:
+            return SupplierBookingResult(
+                status="FAILED",
+                error_code="NO_CONFIRMATION_ID",
+                payload={"response": content}
+            )
+
+        return SupplierBookingResult(
+            status="SUCCESS",
+            supplier_reservation_code=parsed.conf_id,
+            payload={"response": content},
+            http_status=response.status_code
+        )
+
     async def confirm_booking(self, reservation_code: str, details: Dict[str, Any]) -> str:
         result = await self.book(
             reservation_code=reservation_code,
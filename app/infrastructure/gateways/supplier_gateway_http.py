@@ -5,7 +5,13 @@ from typing import Any
 import httpx
 
 from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
-from app.infrastructure.circuit_breaker import CircuitBreakerError, supplier_breaker
+from app.application.retry_policy import parse_retry_after
+from app.infrastructure.circuit_breaker import (
+    CircuitBreakerError,
+    breaker_key_for_url,
+    get_supplier_breakers,
+)
+from app.infrastructure.gateways.http_clients import supplier_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +27,8 @@ class SupplierGatewayHTTP(SupplierGateway):
         """
         self._base_url = base_url.rstrip("/")
         self._timeout = timeout_seconds
+        # One breaker per supplier host: a generic gateway may front several partners
+        self.circuit_breaker_key = breaker_key_for_url(self._base_url)
 
     async def book(
         self, reservation_code: str, idem_key: str, reservation_snapshot=None
@@ -40,13 +48,15 @@ class SupplierGatewayHTTP(SupplierGateway):
 
         # Define the HTTP call as a callable for the circuit breaker
         async def _make_request():
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
+            async with supplier_http_client(url, timeout=self._timeout) as client:
                 return await client.post(url, json=payload, headers=headers)
 
+        breaker = get_supplier_breakers().get(self.circuit_breaker_key)
         try:
-            # Wrap the HTTP call with circuit breaker protection
-            # Note: pybreaker doesn't natively support async, so we use call_async
-            response = await supplier_breaker.call_async(_make_request)
+            # Wrap the HTTP call with this supplier's circuit breaker; 5xx count as failures
+            response = await breaker.call(
+                _make_request, is_failure=lambda response: response.status_code >= 500
+            )
         except CircuitBreakerError as exc:
             logger.error(
                 "Supplier circuit breaker is open - service unavailable",
@@ -62,6 +72,7 @@ class SupplierGatewayHTTP(SupplierGateway):
                 error_code="CIRCUIT_OPEN",
                 error_message="Supplier service temporarily unavailable (circuit breaker open)",
                 http_status=None,
+                retry_after_seconds=breaker.retry_after_seconds(),
             )
         except httpx.TimeoutException as exc:  # pragma: no cover - real gateway path
             logger.warning(
@@ -117,6 +128,7 @@ class SupplierGatewayHTTP(SupplierGateway):
             error_code="NON_2XX",
             error_message=response.text,
             http_status=response.status_code,
+            retry_after_seconds=parse_retry_after(response.headers.get("Retry-After")),
         )
 
     async def confirm_booking(self, reservation_code: str, details: dict[str, Any]) -> str:
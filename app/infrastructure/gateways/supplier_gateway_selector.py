@@ -1,9 +1,32 @@
-from typing import Dict, Tuple
+import logging
+import time
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any, Dict, Tuple
 
 from app.application.interfaces.supplier_gateway import SupplierGateway
+from app.config import Settings, get_settings
+from app.infrastructure.gateways.america_group_gateway import AmericaGroupGateway
+from app.infrastructure.gateways.factory import SupplierGatewayFactory
+from app.infrastructure.gateways.in_memory.supplier_gateway import StubSupplierGateway
+from app.infrastructure.gateways.supplier_gateway_http import SupplierGatewayHTTP
+from app.infrastructure.gateways.supplier_simulator import simulator_factory_config
+
+logger = logging.getLogger(__name__)
+
+# Settings read by build_supplier_gateway_selector: a change in any of them rebuilds the gateways
+GATEWAY_SETTINGS = (
+    "supplier_base_url",
+    "supplier_timeout_seconds",
+    "americagroup_endpoint",
+    "americagroup_requestor_id",
+    "americagroup_timeout_seconds",
+    "americagroup_retry_times",
+    "americagroup_retry_sleep_ms",
+    "supplier_hedge_after_seconds",
+    "supplier_simulator_url",
+)
 
-# Importamos la Factory solo para typing si es necesario, o usamos Any para evitar ciclos circulares si están en mismo paquete
-# from app.infrastructure.gateways.factory import SupplierGatewayFactory 
 
 class SupplierGatewaySelector:
     def __init__(
@@ -32,4 +55,129 @@ class SupplierGatewaySelector:
 
         # 3. Fallback genérico
         fallback_key = (supplier_id, "*")
-        return self._mapping.get(fallback_key, self._default)
\ No newline at end of file
+        return self._mapping.get(fallback_key, self._default)
+
+
+def build_supplier_gateway_selector(settings: Settings) -> SupplierGatewaySelector:
+    """Selector con la Factory y los mappings configurados en Settings (API y workers)."""
+    # Configuración preliminar para la Factory (se debe expandir Settings en el futuro)
+    factory_config = {
+        "avis": {"endpoint": settings.supplier_base_url},
+        "europcargroup": {"endpoint": settings.supplier_base_url},
+        "americagroup": {
+            "endpoint": settings.americagroup_endpoint,
+            "requestor_id": settings.americagroup_requestor_id,
+            "timeout_seconds": settings.americagroup_timeout_seconds,
+            "retry_times": settings.americagroup_retry_times,
+            "retry_sleep_ms": settings.americagroup_retry_sleep_ms,
+        },
+        # Placeholders para nuevos proveedores (requieren variables de entorno reales)
+        "hertzargentina": {"base_url": "https://hertz.test"},
+        "infinity": {"endpoint": "https://infinity.test"},
+        "localiza": {"endpoint": "https://localiza.test"},
+        "mexgroup": {"endpoint": "https://mex.test"},
+        "nationalgroup": {"endpoint": "https://national.test"},
+        "nizacars": {"base_url": "https://niza.test"},
+        "noleggiare": {"endpoint": "https://noleggiare.test"},
+    }
+    # Pruebas de carga: todos los suppliers simulados van al simulador, nunca a los reales
+    if settings.supplier_simulator_url:
+        for name, conf in simulator_factory_config(settings.supplier_simulator_url).items():
+            factory_config.setdefault(name, {}).update(conf)
+    # Hedging sólo para suppliers con reserva idempotente (clave = sección de la Factory)
+    for name, hedge_after in settings.supplier_hedge_after_seconds.items():
+        factory_config.setdefault(name, {})["hedge_after_seconds"] = hedge_after
+
+    selector = SupplierGatewaySelector(
+        default_gateway=StubSupplierGateway(),
+        factory=SupplierGatewayFactory(config=factory_config),
+    )
+
+    if settings.supplier_base_url:
+        selector.register(
+            supplier_id=0,  # fallback mapping; real mappings deberían ser específicos
+            country_code="*",
+            gateway=SupplierGatewayHTTP(
+                base_url=settings.supplier_base_url,
+                timeout_seconds=settings.supplier_timeout_seconds,
+            ),
+        )
+    americagroup_endpoint = factory_config["americagroup"]["endpoint"]
+    if americagroup_endpoint:
+        selector.register(
+            supplier_id=32,  # America Group
+            country_code="MX",
+            gateway=AmericaGroupGateway(
+                endpoint=americagroup_endpoint,
+                requestor_id=settings.americagroup_requestor_id or "13",
+                timeout_seconds=settings.americagroup_timeout_seconds,
+                retry_times=settings.americagroup_retry_times,
+                retry_sleep_ms=settings.americagroup_retry_sleep_ms,
+            ),
+        )
+    return selector
+
+
+def _gateway_config(settings: Settings) -> dict[str, Any]:
+    return {name: getattr(settings, name) for name in GATEWAY_SETTINGS}
+
+
+class SupplierGatewayRegistry(SupplierGatewaySelector):
+    """
+    Selector compartido por todo el proceso (requests de la API y workers).
+
+    Los adapters se construyen una sola vez, así su estado (tokens, clientes
+    HTTP) sobrevive entre requests. Cada `reload_interval_seconds` se vuelven a
+    leer los Settings (variables de entorno / .env) y, si cambió la
+    configuración de suppliers, se reconstruye el selector; los eventos en
+    curso terminan con el adapter que ya tenían.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        load_settings: Callable[[], Settings] = Settings,
+        reload_interval_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._load_settings = load_settings
+        self._reload_interval = reload_interval_seconds
+        self._clock = clock
+        self._config = _gateway_config(settings)
+        self._selector = build_supplier_gateway_selector(settings)
+        self._checked_at = clock()
+
+    def for_supplier(self, supplier_id: int, country_code: str | None) -> SupplierGateway | None:
+        return self.current().for_supplier(supplier_id, country_code)
+
+    def register(self, supplier_id: int, country_code: str, gateway: SupplierGateway) -> None:
+        """Solo hasta el siguiente reload; la configuración permanente va en Settings."""
+        self.current().register(supplier_id, country_code, gateway)
+
+    def current(self) -> SupplierGatewaySelector:
+        if self._reload_interval > 0 and self._clock() - self._checked_at >= self._reload_interval:
+            self._checked_at = self._clock()
+            try:
+                self.reload(self._load_settings())
+            except Exception:
+                logger.exception("Supplier gateway reload failed; keeping current gateways")
+        return self._selector
+
+    def reload(self, settings: Settings) -> bool:
+        """Reconstruye los gateways si cambió su configuración. True si hubo cambio."""
+        config = _gateway_config(settings)
+        if config == self._config:
+            return False
+        self._selector = build_supplier_gateway_selector(settings)
+        changed = sorted(name for name in config if config[name] != self._config.get(name))
+        self._config = config
+        logger.info("Supplier gateways reloaded", extra={"changed_settings": changed})
+        return True
+
+
+@lru_cache(maxsize=1)
+def get_supplier_gateway_registry() -> SupplierGatewayRegistry:
+    settings = get_settings()
+    return SupplierGatewayRegistry(
+        settings, reload_interval_seconds=settings.supplier_gateway_reload_interval_seconds
+    )
@@ -0,0 +1,217 @@
+"""
+Límites por supplier para las reservas salientes (concurrencia y tasa).
+
+Cada supplier tiene un semáforo (llamadas simultáneas) y un token bucket
+(llamadas por segundo, con ráfaga). Una reserva que encuentra el límite
+espera en cola hasta `max_wait_seconds`; si no consigue turno a tiempo se
+devuelve SUPPLIER_RATE_LIMITED y el RetryPolicy la reprograma, en vez de
+mandarle al partner cientos de llamadas a la vez (ráfaga de pagos, replay de
+la DLQ) y recibir throttling.
+
+Los límites son por proceso: con N procesos worker el supplier recibe hasta
+N veces la concurrencia/tasa configurada. El tiempo en cola se registra en un
+histograma por supplier que se exporta con las métricas del outbox.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from app.application.deadline import remaining_budget
+from app.config import get_settings
+from app.infrastructure.messaging.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class SupplierLimitExceeded(Exception):
+    """No hubo turno antes del deadline de la cola."""
+
+    def __init__(self, supplier_id: int, waited_seconds: float, retry_after_seconds: float):
+        super().__init__(
+            f"Supplier {supplier_id} limit reached, waited {waited_seconds:.2f}s"
+        )
+        self.supplier_id = supplier_id
+        self.waited_seconds = waited_seconds
+        self.retry_after_seconds = retry_after_seconds
+
+
+class SupplierLimiter:
+    """Semáforo + token bucket de un supplier, con cola acotada por deadline."""
+
+    def __init__(
+        self,
+        supplier_id: int,
+        max_concurrency: int = 0,
+        rate_per_second: float = 0.0,
+        burst: int = 1,
+        max_wait_seconds: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        """
+        Args:
+            max_concurrency: Llamadas simultáneas (0 = sin límite).
+            rate_per_second: Recarga del token bucket (0 = sin límite de tasa).
+            burst: Capacidad del bucket (llamadas seguidas tras un rato sin tráfico).
+            max_wait_seconds: Espera máxima en cola antes de SupplierLimitExceeded.
+        """
+        self.supplier_id = supplier_id
+        self.max_concurrency = max_concurrency
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._sleep = sleep
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self._tokens = float(self.burst)
+        self._refilled_at = clock()
+        self.wait_seconds = Histogram()
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """
+        `async with limiter.slot() as waited:` alrededor de la llamada al supplier.
+
+        Raises:
+            SupplierLimitExceeded: si el turno no llega en max_wait_seconds (o antes
+                de que se acabe el presupuesto de la reserva, si es menor).
+        """
+        started = self._clock()
+        # La espera en cola también consume el presupuesto de la reserva
+        budget = remaining_budget()
+        max_wait = self.max_wait_seconds if budget is None else min(self.max_wait_seconds, budget)
+        deadline = started + max_wait
+        self.waiting += 1
+        try:
+            await self._acquire_slot(started, deadline)
+            try:
+                await self._acquire_token(started, deadline)
+            except BaseException:
+                self._release_slot()
+                raise
+        finally:
+            self.waiting -= 1
+
+        waited = self._clock() - started
+        self.wait_seconds.observe(waited)
+        self.in_flight += 1
+        try:
+            yield waited
+        finally:
+            self.in_flight -= 1
+            self._release_slot()
+
+    def snapshot(self) -> dict:
+        return {
+            "supplier_id": self.supplier_id,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": self.rate_per_second,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected_total": self.rejected,
+            "wait_seconds": self.wait_seconds.snapshot(),
+        }
+
+    async def _acquire_slot(self, started: float, deadline: float) -> None:
+        if self._semaphore is None:
+            return
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(), timeout=max(0.0, deadline - self._clock())
+            )
+        except asyncio.TimeoutError:
+            raise self._exceeded(started, retry_after=self.max_wait_seconds) from None
+
+    def _release_slot(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    async def _acquire_token(self, started: float, deadline: float) -> None:
+        if self.rate_per_second <= 0:
+            return
+        now = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled_at) * self.rate_per_second
+        )
+        self._refilled_at = now
+        # Tokens negativos = turnos ya reservados por llamadas que esperan antes que ésta
+        delay = max(0.0, (1 - self._tokens) / self.rate_per_second)
+        if now + delay > deadline:
+            raise self._exceeded(started, retry_after=delay)
+        self._tokens -= 1
+        if delay > 0:
+            try:
+                await self._sleep(delay)
+            except BaseException:
+                self._tokens += 1  # cancelada: devuelve el turno reservado
+                raise
+
+    def _exceeded(self, started: float, retry_after: float) -> SupplierLimitExceeded:
+        self.rejected += 1
+        waited = self._clock() - started
+        logger.warning(
+            "Supplier limit reached",
+            extra={"supplier_id": self.supplier_id, "waited_seconds": round(waited, 3)},
+        )
+        return SupplierLimitExceeded(self.supplier_id, waited, retry_after)
+
+
+class SupplierLimiterRegistry:
+    """Un SupplierLimiter por supplier_id, creado al primer uso."""
+
+    def __init__(
+        self,
+        max_concurrency: int = 0,
+        rate_per_second: float = 0.0,
+        burst: int = 1,
+        max_wait_seconds: float = 10.0,
+        max_concurrency_overrides: Mapping[int, int] | None = None,
+        rate_per_second_overrides: Mapping[int, float] | None = None,
+    ) -> None:
+        self._max_concurrency = max_concurrency
+        self._rate_per_second = rate_per_second
+        self._burst = burst
+        self._max_wait_seconds = max_wait_seconds
+        self._concurrency_overrides = dict(max_concurrency_overrides or {})
+        self._rate_overrides = dict(rate_per_second_overrides or {})
+        self._limiters: dict[int, SupplierLimiter] = {}
+
+    def get(self, supplier_id: int) -> SupplierLimiter:
+        limiter = self._limiters.get(supplier_id)
+        if limiter is None:
+            limiter = self._limiters[supplier_id] = SupplierLimiter(
+                supplier_id,
+                max_concurrency=self._concurrency_overrides.get(
+                    supplier_id, self._max_concurrency
+                ),
+                rate_per_second=self._rate_overrides.get(supplier_id, self._rate_per_second),
+                burst=self._burst,
+                max_wait_seconds=self._max_wait_seconds,
+            )
+        return limiter
+
+    def slot(self, supplier_id: int):
+        return self.get(supplier_id).slot()
+
+    def snapshot(self) -> list[dict]:
+        return [self._limiters[key].snapshot() for key in sorted(self._limiters)]
+
+
+@lru_cache(maxsize=1)
+def get_supplier_limiters() -> SupplierLimiterRegistry:
+    settings = get_settings()
+    return SupplierLimiterRegistry(
+        max_concurrency=settings.supplier_max_concurrency,
+        rate_per_second=settings.supplier_rate_per_second,
+        burst=settings.supplier_rate_burst,
+        max_wait_seconds=settings.supplier_limit_max_wait_seconds,
+        max_concurrency_overrides=settings.supplier_max_concurrency_overrides,
+        rate_per_second_overrides=settings.supplier_rate_per_second_overrides,
+    )
@@ -0,0 +1,114 @@
+"""
+Reintentos HTTP de los gateways acotados por el presupuesto de la reserva.
+
+`send_with_retries` reemplaza los `for attempt in range(retry_times + 1)` que
+reintentaban los 5xx / errores de red al instante y sin límite de tiempo:
+
+- Cada intento usa min(timeout del gateway, presupuesto restante) como timeout
+  de httpx (ver app/application/deadline.py).
+- Entre intentos hay backoff exponencial con jitter; si la espera más otro
+  intento no entran en el presupuesto, no se reintenta.
+- Sin presupuesto para un intento útil se corta: se devuelve la última
+  respuesta 5xx o se lanza httpx.TimeoutException (NETWORK_ERROR en los gateways).
+
+Hedging (opcional, sólo para suppliers cuya reserva es idempotente, p. ej. por
+referencia externa): si un intento no respondió en `hedge_after_seconds` se lanza
+un segundo en paralelo y gana la primera respuesta < 500; el otro se cancela.
+"""
+
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+
+import httpx
+
+from app.application.deadline import remaining_budget
+
+logger = logging.getLogger(__name__)
+
+# Por debajo de esto no vale la pena empezar un intento (ni un hedge)
+MIN_ATTEMPT_SECONDS = 0.5
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 4.0
+
+Send = Callable[[float], Awaitable[httpx.Response]]
+
+
+def attempt_timeout(timeout: float) -> float:
+    remaining = remaining_budget()
+    return timeout if remaining is None else min(timeout, remaining)
+
+
+async def send_with_retries(
+    send: Send,
+    retry_times: int,
+    timeout: float,
+    hedge_after_seconds: float | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> httpx.Response:
+    """
+    Args:
+        send: Hace la petición con el timeout (segundos) indicado.
+        retry_times: Reintentos tras el primer intento (5xx o httpx.RequestError).
+        timeout: Timeout por intento del gateway, antes de acotarlo al presupuesto.
+
+    Raises:
+        httpx.RequestError: error de red del último intento, o TimeoutException
+            si el presupuesto no alcanzó para ningún intento.
+    """
+    response: httpx.Response | None = None
+    error: httpx.RequestError | None = None
+    for attempt in range(retry_times + 1):
+        if attempt:
+            backoff = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt)
+            delay = random.uniform(0, backoff)
+            remaining = remaining_budget()
+            if remaining is not None and delay + MIN_ATTEMPT_SECONDS > remaining:
+                break
+            await sleep(delay)
+        per_attempt = attempt_timeout(timeout)
+        if per_attempt <= 0 or (attempt and per_attempt < MIN_ATTEMPT_SECONDS):
+            break
+        try:
+            response, error = await _attempt(send, per_attempt, hedge_after_seconds), None
+        except httpx.RequestError as exc:
+            response, error = None, exc
+            continue
+        if response.status_code < 500:
+            return response
+    if response is not None:
+        return response
+    if error is not None:
+        raise error
+    raise httpx.TimeoutException("Supplier booking budget exhausted before the request")
+
+
+async def _attempt(
+    send: Send, timeout: float, hedge_after_seconds: float | None
+) -> httpx.Response:
+    if not hedge_after_seconds or timeout - hedge_after_seconds < MIN_ATTEMPT_SECONDS:
+        return await send(timeout)
+
+    tasks = [asyncio.ensure_future(send(timeout))]
+    primary = tasks[0]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after_seconds)
+        if done:
+            return primary.result()
+
+        logger.info(
+            "Supplier request hedged", extra={"hedge_after_seconds": hedge_after_seconds}
+        )
+        tasks.append(asyncio.ensure_future(send(attempt_timeout(timeout - hedge_after_seconds))))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result().status_code < 500:
+                    return task.result()
+        # Ninguno respondió bien: resultado del original (respuesta 5xx o su excepción)
+        return primary.result()
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,416 @@
+"""
+Simulador local de suppliers para pruebas de carga y latencia.
+
+App ASGI (FastAPI) que responde con el protocolo de cada adapter, para correr el
+pipeline de reservas de punta a punta sin partners reales:
+
+    GET  /americagroup?XML=...                      OTA_VehResRQ -> OTA_VehResRS (ConfID)
+    POST /nizacars/Create_Reservation.asmx          SOAP Create_Reservation (Rentway)
+    POST /localiza                                  SOAP OTA_VehResRQ -> OTA_VehResRS
+    POST /hertzargentina/token, /Booking            token (form) + reserva JSON con Bearer
+    POST /mexgroup/api/brokers/login, .../reserve   token + reserva JSON con Bearer
+    POST /avis                                      SOAP OTA (UniqueID Type="14")
+    POST /centauro                                  form-post login/pwd/agency/action/xml
+
+Cada supplier tiene un SimulatorProfile: distribución de latencia y tasas de
+timeout (la respuesta no llega antes de hang_seconds), 5xx, 429 con Retry-After
+y rechazo de negocio (en el formato de error propio del protocolo). Los perfiles
+se cambian en caliente con PUT /_profiles/{supplier} (p. ej. para abrir el
+breaker de un supplier a mitad de una corrida) y GET /_stats devuelve los
+contadores por supplier y resultado.
+
+Correr con `python scripts/supplier_simulator.py` y apuntar los gateways con
+SUPPLIER_SIMULATOR_URL (ver simulator_factory_config).
+"""
+
+import asyncio
+import itertools
+import math
+import random
+import secrets
+import xml.etree.ElementTree as ET
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import Any
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+
+from app.infrastructure.gateways.niza_cars_gateway import NIZA_NS
+from app.infrastructure.gateways.xml_templates import OTA_NS, XmlTemplate, soap_envelope
+
+SUPPLIERS = (
+    "americagroup",
+    "nizacars",
+    "localiza",
+    "hertzargentina",
+    "mexgroup",
+    "avis",
+    "centauro",
+)
+
+LATENCY_FIXED = "fixed"
+LATENCY_UNIFORM = "uniform"
+LATENCY_LOGNORMAL = "lognormal"
+LATENCY_DISTRIBUTIONS = (LATENCY_FIXED, LATENCY_UNIFORM, LATENCY_LOGNORMAL)
+
+OUTCOME_SUCCESS = "success"
+OUTCOME_REJECTED = "rejected"
+OUTCOME_ERROR = "error"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_TIMEOUT = "timeout"
+
+OTA_SUCCESS_RS = XmlTemplate(
+    f"""
+    <OTA_VehResRS xmlns="{OTA_NS}" Version="1.00">
+        <Success/>
+        <VehResRSCore>
+            <VehReservation>
+                <VehSegmentCore><ConfID Type="14" ID="{{conf_id}}"/></VehSegmentCore>
+            </VehReservation>
+        </VehResRSCore>
+    </OTA_VehResRS>
+    """
+)
+OTA_ERROR_RS = XmlTemplate(
+    f"""
+    <OTA_VehResRS xmlns="{OTA_NS}" Version="1.00">
+        <Errors><Error Type="1" ShortText="{{message}}"/></Errors>
+    </OTA_VehResRS>
+    """
+)
+AVIS_SUCCESS_RS = XmlTemplate(
+    f"""
+    <OTA_VehResRS xmlns="{OTA_NS}" Version="1.00">
+        <Success/>
+        <VehResRSCore>
+            <VehReservation><UniqueID Type="14" ID="{{conf_id}}"/></VehReservation>
+        </VehResRSCore>
+    </OTA_VehResRS>
+    """
+)
+NIZA_CONFIRMED_RS = XmlTemplate(
+    f"""
+    <Create_ReservationResponse xmlns="{NIZA_NS}">
+        <Create_ReservationResult><ReservationID>{{conf_id}}</ReservationID></Create_ReservationResult>
+    </Create_ReservationResponse>
+    """
+)
+NIZA_ERROR_RS = XmlTemplate(
+    f"""
+    <Create_ReservationResponse xmlns="{NIZA_NS}">
+        <Create_ReservationResult><Error>{{message}}</Error></Create_ReservationResult>
+    </Create_ReservationResponse>
+    """
+)
+CENTAURO_CONFIRMED_RS = XmlTemplate(
+    "<RESPONSE><ID_RESERVATION>{conf_id}</ID_RESERVATION></RESPONSE>"
+)
+CENTAURO_ERROR_RS = XmlTemplate("<RESPONSE><ERROR>{message}</ERROR></RESPONSE>")
+
+
+_RATE_FIELDS = ("timeout_rate", "error_rate", "rate_limit_rate", "reject_rate")
+
+
+@dataclass(frozen=True)
+class SimulatorProfile:
+    """Comportamiento de un supplier simulado. Las tasas son probabilidades por reserva."""
+
+    latency: str = LATENCY_LOGNORMAL
+    latency_ms: float = 0.0  # fixed: valor; uniform: centro; lognormal: mediana
+    latency_jitter_ms: float = 0.0  # uniform: ± jitter
+    latency_sigma: float = 0.5  # lognormal: dispersión (0.5 ≈ p99 3.2x la mediana)
+    timeout_rate: float = 0.0
+    hang_seconds: float = 60.0  # un "timeout" responde 504 recién después de esto
+    error_rate: float = 0.0  # 5xx
+    error_status: int = 503
+    rate_limit_rate: float = 0.0  # 429
+    retry_after_seconds: int = 5
+    reject_rate: float = 0.0  # rechazo de negocio (sin disponibilidad, datos inválidos)
+
+    def __post_init__(self) -> None:
+        """Valida y normaliza los valores (llegan como JSON desde PUT /_profiles)."""
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"latency must be one of {', '.join(LATENCY_DISTRIBUTIONS)}, got {self.latency!r}"
+            )
+        for f in fields(self):
+            if f.name == "latency":
+                continue
+            value = getattr(self, f.name)
+            if isinstance(value, bool) or not isinstance(value, int | float):
+                raise TypeError(f"{f.name} must be a number, got {value!r}")
+            if f.type is int:
+                if value != int(value):
+                    raise ValueError(f"{f.name} must be an integer, got {value!r}")
+                value = int(value)
+            else:
+                value = float(value)
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f"{f.name} must be a finite non-negative number, got {value!r}")
+            object.__setattr__(self, f.name, value)
+        for name in _RATE_FIELDS:
+            if getattr(self, name) > 1:
+                raise ValueError(f"{name} is a probability and must be between 0 and 1")
+        if sum(getattr(self, name) for name in _RATE_FIELDS) > 1:
+            raise ValueError(f"{' + '.join(_RATE_FIELDS)} must not exceed 1")
+        if not 500 <= self.error_status <= 599:
+            raise ValueError(f"error_status must be a 5xx status, got {self.error_status}")
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Latencia en segundos de una respuesta."""
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.latency == LATENCY_FIXED:
+            millis = self.latency_ms
+        elif self.latency == LATENCY_UNIFORM:
+            millis = rng.uniform(
+                self.latency_ms - self.latency_jitter_ms, self.latency_ms + self.latency_jitter_ms
+            )
+        elif self.latency == LATENCY_LOGNORMAL:
+            millis = rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma)
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
+        return max(0.0, millis) / 1000
+
+    def draw_outcome(self, rng: random.Random) -> str:
+        roll = rng.random()
+        for outcome, rate in (
+            (OUTCOME_TIMEOUT, self.timeout_rate),
+            (OUTCOME_ERROR, self.error_rate),
+            (OUTCOME_RATE_LIMITED, self.rate_limit_rate),
+            (OUTCOME_REJECTED, self.reject_rate),
+        ):
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return OUTCOME_SUCCESS
+
+
+@dataclass
+class SimulatorConfig:
+    default: SimulatorProfile = field(default_factory=SimulatorProfile)
+    profiles: dict[str, SimulatorProfile] = field(default_factory=dict)
+    seed: int | None = None
+    token_ttl_seconds: int = 3600
+
+    def profile(self, supplier: str) -> SimulatorProfile:
+        return self.profiles.get(supplier, self.default)
+
+
+class SupplierSimulator:
+    """Estado del simulador: perfiles, RNG, tokens emitidos y contadores."""
+
+    def __init__(
+        self,
+        config: SimulatorConfig | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        config = config or SimulatorConfig()
+        # Copia: PUT /_profiles no modifica la configuración de quien creó la app
+        self.config = replace(config, profiles=dict(config.profiles))
+        self._rng = random.Random(self.config.seed)
+        self._sleep = sleep
+        self._tokens: set[str] = set()
+        self._conf_ids = itertools.count(100001)
+        self.stats: dict[str, Counter] = {}
+
+    def issue_token(self) -> dict[str, Any]:
+        token = secrets.token_urlsafe(16)
+        self._tokens.add(token)
+        return {
+            "access_token": token,
+            "token_type": "Bearer",
+            "expires_in": self.config.token_ttl_seconds,
+        }
+
+    def check_token(self, request: Request) -> None:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or token not in self._tokens:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+
+    def next_conf_id(self) -> int:
+        return next(self._conf_ids)
+
+    async def delay(self, supplier: str) -> None:
+        seconds = self.config.profile(supplier).sample_latency(self._rng)
+        if seconds:
+            await self._sleep(seconds)
+
+    async def booking(
+        self,
+        supplier: str,
+        success: Callable[[], Response],
+        reject: Callable[[], Response],
+    ) -> Response:
+        """Aplica latencia y fallas del perfil y responde con `success` o `reject`."""
+        profile = self.config.profile(supplier)
+        outcome = profile.draw_outcome(self._rng)
+        self.stats.setdefault(supplier, Counter())[outcome] += 1
+        await self.delay(supplier)
+        if outcome == OUTCOME_TIMEOUT:
+            await self._sleep(profile.hang_seconds)
+            return Response(status_code=504)
+        if outcome == OUTCOME_ERROR:
+            return Response(status_code=profile.error_status, content=b"Simulated supplier error")
+        if outcome == OUTCOME_RATE_LIMITED:
+            return Response(
+                status_code=429, headers={"Retry-After": str(profile.retry_after_seconds)}
+            )
+        if outcome == OUTCOME_REJECTED:
+            return reject()
+        return success()
+
+
+def _xml(content: bytes, status_code: int = 200) -> Response:
+    return Response(content=content, status_code=status_code, media_type="text/xml; charset=utf-8")
+
+
+def _require_xml(content: bytes | str) -> None:
+    """400 si el request no es XML bien formado (como haría el supplier real)."""
+    try:
+        ET.fromstring(content)
+    except ET.ParseError as exc:
+        raise HTTPException(status_code=400, detail=f"Malformed XML: {exc}") from exc
+
+
+def create_supplier_simulator(
+    config: SimulatorConfig | None = None,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> FastAPI:
+    sim = SupplierSimulator(config, sleep=sleep)
+    app = FastAPI(title="Supplier simulator")
+    app.state.simulator = sim
+
+    @app.get("/americagroup")
+    async def america_group(XML: str) -> Response:  # noqa: N803 - nombre del parámetro legacy
+        _require_xml(XML)
+        return await sim.booking(
+            "americagroup",
+            lambda: _xml(
+                OTA_SUCCESS_RS.render(declaration=True, conf_id=f"AG{sim.next_conf_id()}")
+            ),
+            lambda: _xml(OTA_ERROR_RS.render(declaration=True, message="Vehicle not available")),
+        )
+
+    @app.post("/nizacars/Create_Reservation.asmx")
+    async def niza_cars(request: Request) -> Response:
+        _require_xml(await request.body())
+        return await sim.booking(
+            "nizacars",
+            lambda: _xml(soap_envelope(NIZA_CONFIRMED_RS.render(conf_id=sim.next_conf_id()))),
+            lambda: _xml(soap_envelope(NIZA_ERROR_RS.render(message="Group not available"))),
+        )
+
+    @app.post("/localiza")
+    async def localiza(request: Request) -> Response:
+        _require_xml(await request.body())
+        return await sim.booking(
+            "localiza",
+            lambda: _xml(soap_envelope(OTA_SUCCESS_RS.render(conf_id=f"LZ{sim.next_conf_id()}"))),
+            lambda: _xml(soap_envelope(OTA_ERROR_RS.render(message="Vehicle not available"))),
+        )
+
+    @app.post("/hertzargentina/token")
+    async def hertz_token() -> dict[str, Any]:
+        await sim.delay("hertzargentina")
+        return sim.issue_token()
+
+    @app.post("/hertzargentina/Booking")
+    async def hertz_booking(request: Request) -> Response:
+        sim.check_token(request)
+        await request.json()
+        return await sim.booking(
+            "hertzargentina",
+            lambda: JSONResponse({"id": f"HZ{sim.next_conf_id()}", "status": "CONFIRMED"}),
+            lambda: JSONResponse({"message": "Model not available"}, status_code=422),
+        )
+
+    @app.post("/mexgroup/api/brokers/login")
+    async def mex_login() -> dict[str, Any]:
+        await sim.delay("mexgroup")
+        issued = sim.issue_token()
+        return {
+            "type": "success",
+            "data": {"token": issued["access_token"], "expires_in": issued["expires_in"]},
+        }
+
+    @app.post("/mexgroup/api/brokers/booking-engine/reserve")
+    async def mex_reserve(request: Request) -> Response:
+        sim.check_token(request)
+        await request.json()
+        return await sim.booking(
+            "mexgroup",
+            lambda: JSONResponse(
+                {"type": "success", "data": {"noConfirmation": f"MX{sim.next_conf_id()}"}}
+            ),
+            lambda: JSONResponse({"type": "error", "message": "Rate not available", "data": {}}),
+        )
+
+    @app.post("/avis")
+    async def avis(request: Request) -> Response:
+        _require_xml(await request.body())
+        return await sim.booking(
+            "avis",
+            lambda: _xml(soap_envelope(AVIS_SUCCESS_RS.render(conf_id=f"AV{sim.next_conf_id()}"))),
+            lambda: _xml(soap_envelope(OTA_ERROR_RS.render(message="Vehicle not available"))),
+        )
+
+    @app.post("/centauro")
+    async def centauro(request: Request) -> Response:
+        # Form urlencoded (como lo manda el adapter); sin depender de python-multipart
+        form = {key: values[0] for key, values in parse_qs((await request.body()).decode()).items()}
+        if not form.get("login") or not form.get("pwd"):
+            return _xml(CENTAURO_ERROR_RS.render(message="Invalid credentials"), 401)
+        _require_xml(form.get("xml", ""))
+        return await sim.booking(
+            "centauro",
+            lambda: _xml(CENTAURO_CONFIRMED_RS.render(conf_id=sim.next_conf_id())),
+            lambda: _xml(CENTAURO_ERROR_RS.render(message="Category not available")),
+        )
+
+    @app.get("/_stats")
+    async def stats() -> dict[str, dict[str, int]]:
+        return {supplier: dict(counter) for supplier, counter in sorted(sim.stats.items())}
+
+    @app.delete("/_stats", status_code=204)
+    async def reset_stats() -> None:
+        sim.stats.clear()
+
+    @app.get("/_profiles")
+    async def profiles() -> dict[str, dict[str, Any]]:
+        return {supplier: asdict(sim.config.profile(supplier)) for supplier in SUPPLIERS}
+
+    @app.put("/_profiles/{supplier}")
+    async def update_profile(supplier: str, changes: dict[str, Any]) -> dict[str, Any]:
+        if supplier not in SUPPLIERS:
+            raise HTTPException(status_code=404, detail=f"Unknown supplier: {supplier}")
+        try:
+            profile = replace(sim.config.profile(supplier), **changes)
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=422, detail=str(exc)) from exc
+        sim.config.profiles[supplier] = profile
+        return asdict(profile)
+
+    return app
+
+
+def simulator_factory_config(base_url: str) -> dict[str, dict[str, Any]]:
+    """Secciones de la SupplierGatewayFactory apuntando al simulador en `base_url`."""
+    base = base_url.rstrip("/")
+    return {
+        "americagroup": {"endpoint": f"{base}/americagroup"},
+        "avis": {"endpoint": f"{base}/avis", "user": "sim", "password": "sim"},
+        "centauro": {"base_url": f"{base}/centauro", "login": "sim", "password": "sim"},
+        "hertzargentina": {
+            "base_url": f"{base}/hertzargentina",
+            "auth_url": f"{base}/hertzargentina/token",
+            "username": "sim",
+            "password": "sim",
+        },
+        "localiza": {"endpoint": f"{base}/localiza", "username": "sim", "password": "sim"},
+        "mexgroup": {"endpoint": f"{base}/mexgroup", "user": "sim", "password": "sim"},
+        "nizacars": {"base_url": f"{base}/nizacars", "user": "sim", "pass": "sim"},
+    }
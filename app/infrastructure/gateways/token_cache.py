@@ -0,0 +1,132 @@
+"""
+Cache de tokens de autenticación de suppliers (Hertz AR, Mex, Budget/Payless).
+
+Un token por gateway, reutilizado hasta poco antes de expirar: cada reserva
+hace una sola llamada HTTP en vez de login + reserva. El refresh es
+single-flight (las reservas concurrentes esperan el mismo login en vez de
+golpear todas el endpoint de auth) y se adelanta a la expiración en segundo
+plano. Un 401 del supplier invalida el token para forzar un login nuevo.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Margen contra latencia / desfase de reloj: el token se da por vencido antes
+_EXPIRY_MARGIN_SECONDS = 5.0
+# Pausa entre refresh en segundo plano fallidos mientras el token actual siga vigente
+_REFRESH_RETRY_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class IssuedToken:
+    value: str
+    expires_in: float | None = None  # segundos; None = TTL por defecto del cache
+
+
+def parse_expires_in(data: Mapping[str, Any]) -> float | None:
+    """
+    Vigencia en segundos según la respuesta de login: `expires_in` (OAuth2)
+    o `expiration` / `expires_at` (fecha ISO, naive = UTC).
+    """
+    expires_in = data.get("expires_in")
+    if expires_in is not None:
+        try:
+            return float(expires_in)
+        except (TypeError, ValueError):
+            return None
+    expires_at = data.get("expiration") or data.get("expires_at")
+    if not isinstance(expires_at, str):
+        return None
+    try:
+        moment = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - datetime.now(timezone.utc)).total_seconds()
+
+
+class SupplierTokenCache:
+    """Token vigente de un supplier con refresh single-flight."""
+
+    def __init__(
+        self,
+        fetch: Callable[[], Awaitable[IssuedToken]],
+        name: str,
+        default_ttl_seconds: float = 300.0,
+        refresh_ahead_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            fetch: Hace el login y devuelve el token emitido.
+            name: Supplier, para los logs.
+            default_ttl_seconds: Vigencia si la respuesta de login no la indica.
+            refresh_ahead_seconds: Anticipación del refresh en segundo plano
+                (como máximo la mitad de la vigencia).
+        """
+        self._fetch = fetch
+        self._name = name
+        self._default_ttl = default_ttl_seconds
+        self._refresh_ahead = refresh_ahead_seconds
+        self._clock = clock
+        self._token: str | None = None
+        self._expires_at = 0.0
+        self._refresh_at = 0.0
+        self._refreshing: asyncio.Task | None = None
+
+    async def get(self) -> str:
+        now = self._clock()
+        if self._token is not None and now < self._expires_at:
+            if now >= self._refresh_at:
+                self._refresh_task()
+            return self._token
+        # shield: si un llamador se cancela, el login compartido sigue para los demás
+        return await asyncio.shield(self._refresh_task())
+
+    def invalidate(self, token: str | None = None) -> None:
+        """
+        Descarta el token (p. ej. tras un 401). Con `token`, sólo si sigue siendo
+        el actual: no tira uno que otra reserva ya renovó.
+        """
+        if token is None or token == self._token:
+            self._token = None
+            self._expires_at = self._refresh_at = 0.0
+
+    def _refresh_task(self) -> asyncio.Task:
+        task = self._refreshing
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._refresh())
+            task.add_done_callback(self._refresh_done)
+            self._refreshing = task
+        return task
+
+    async def _refresh(self) -> str:
+        issued = await self._fetch()
+        if not issued.value:
+            raise RuntimeError(f"{self._name} login returned no token")
+        ttl = issued.expires_in if issued.expires_in and issued.expires_in > 0 else None
+        ttl = ttl or self._default_ttl
+        now = self._clock()
+        self._token = issued.value
+        self._expires_at = now + ttl - min(_EXPIRY_MARGIN_SECONDS, ttl / 10)
+        self._refresh_at = now + ttl - min(self._refresh_ahead, ttl / 2)
+        logger.info("Supplier token refreshed", extra={"supplier": self._name, "ttl": ttl})
+        return issued.value
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.warning(
+            "Supplier token refresh failed",
+            extra={"supplier": self._name, "error": str(task.exception())},
+        )
+        if self._token is not None:
+            self._refresh_at = self._clock() + _REFRESH_RETRY_SECONDS
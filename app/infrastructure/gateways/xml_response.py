@@ -0,0 +1,132 @@
+"""
+Lectura incremental y acotada de las respuestas XML de los suppliers.
+
+En vez de `fromstring(response.text)` + `findall('.//...')` (decodificar todo
+el body, armar el árbol completo con reglas de tarifa y extras y recorrerlo),
+los bytes de la respuesta se pasan por un XMLPullParser en bloques y la lectura
+se corta en cuanto aparece el ConfID o el bloque de errores. Los elementos ya
+procesados se vacían, y una respuesta que supera `max_bytes` se rechaza sin
+parsear (ResponseTooLarge -> RESPONSE_TOO_LARGE, se reintenta como cualquier
+fallo transitorio).
+
+Un XML mal formado sigue lanzando ET.ParseError, salvo que el error esté
+después del dato buscado.
+"""
+
+import xml.etree.ElementTree as ET
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+
+from app.application.interfaces.supplier_gateway import SupplierBookingResult
+
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024
+_CHUNK_BYTES = 16 * 1024
+
+
+class ResponseTooLarge(ValueError):
+    def __init__(self, size: int, max_bytes: int) -> None:
+        super().__init__(f"Supplier response of {size} bytes exceeds {max_bytes} bytes")
+        self.size = size
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class OtaResponse:
+    """Lo que interesa de un OTA_VehResRS (o similar) para resolver la reserva."""
+
+    root_found: bool = False  # apareció root_tag (True si no se pidió ninguno)
+    success: bool = False  # hay un elemento <Success/>
+    conf_id: str | None = None
+    errors: list[str] = field(default_factory=list)  # ShortText o texto de cada <Error>
+
+
+def local_name(tag: str) -> str:
+    """Tag sin namespace: '{http://...}ConfID' -> 'ConfID'."""
+    return tag.rpartition("}")[2]
+
+
+def scan_ota_response(
+    content: bytes,
+    root_tag: str | None = None,
+    max_bytes: int = MAX_RESPONSE_BYTES,
+) -> OtaResponse:
+    """
+    Busca ConfID@ID, <Success/> y <Errors>/<Error> ignorando namespaces.
+
+    Se detiene en el primer ConfID con ID o al cerrar <Errors> (en OTA son
+    excluyentes y <Success/> va antes que ambos).
+
+    Raises:
+        ResponseTooLarge: si el body supera max_bytes.
+        ET.ParseError: si el XML está mal formado antes de encontrar el dato.
+    """
+    result = OtaResponse(root_found=root_tag is None)
+    in_errors = False
+    for event, elem in _events(content, max_bytes):
+        name = local_name(elem.tag)
+        if event == "start":
+            if name == root_tag:
+                result.root_found = True
+            elif name == "Success":
+                result.success = True
+            elif name == "Errors":
+                in_errors = True
+            elif name == "ConfID" and elem.get("ID"):
+                result.conf_id = elem.get("ID")
+                break
+            continue
+        if in_errors and name == "Error":
+            result.errors.append(elem.get("ShortText") or (elem.text or "").strip())
+        elif name == "Errors":
+            break
+        elem.clear()
+    return result
+
+
+def find_first_text(
+    content: bytes,
+    tags: Sequence[str],
+    max_bytes: int = MAX_RESPONSE_BYTES,
+) -> str | None:
+    """
+    Texto del primer elemento con alguno de `tags`, en orden de prioridad:
+    se detiene en cuanto aparece el primero de la lista; los demás sólo se
+    usan si ése no está en la respuesta.
+    """
+    found: dict[str, str] = {}
+    for _, elem in _events(content, max_bytes, events=("end",)):
+        name = local_name(elem.tag)
+        if name in tags and name not in found and elem.text and elem.text.strip():
+            found[name] = elem.text.strip()
+            if name == tags[0]:
+                break
+        elem.clear()
+    return next((found[tag] for tag in tags if tag in found), None)
+
+
+def response_too_large_result(
+    exc: ResponseTooLarge, http_status: int | None = None
+) -> SupplierBookingResult:
+    return SupplierBookingResult(
+        status="FAILED",
+        error_code="RESPONSE_TOO_LARGE",
+        error_message=str(exc),
+        http_status=http_status,
+    )
+
+
+def _events(
+    content: bytes, max_bytes: int, events: Sequence[str] = ("start", "end")
+) -> Iterator[tuple[str, ET.Element]]:
+    if len(content) > max_bytes:
+        raise ResponseTooLarge(len(content), max_bytes)
+    # Algunos suppliers anteponen espacios / BOM a la declaración XML
+    start = content.find(b"<")
+    if start > 0:
+        content = content[start:]
+    parser = ET.XMLPullParser(events=events)
+    for offset in range(0, len(content), _CHUNK_BYTES):
+        parser.feed(content[offset : offset + _CHUNK_BYTES])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
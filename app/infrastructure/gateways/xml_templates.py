@@ -0,0 +1,113 @@
+"""
+Plantillas XML precompiladas para los payloads OTA / SOAP de los suppliers.
+
+Cada plantilla se parte una sola vez (al importar el gateway) en literales ya
+codificados a UTF-8 y huecos `{nombre}`. Renderizar sólo escapa los valores y
+concatena bytes en un buffer: sin árbol ElementTree por reserva y sin
+f-strings que dejan pasar un `&` o `<` del nombre del cliente y producen XML
+inválido (rechazos del supplier que luego se reintentan).
+
+Valores:
+- str / números: se escapan (`& < > "` y caracteres de control no válidos en XML 1.0).
+- bytes: fragmento ya renderizado (otra plantilla, `xml_attr`), se inserta tal cual.
+- None: vacío.
+"""
+
+import re
+from collections.abc import Mapping
+from typing import Any
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_NEEDS_ESCAPE = re.compile(r'[&<>"\x00-\x08\x0b\x0c\x0e-\x1f]')
+_INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+# Espacios entre etiquetas de la plantilla (indentación del código fuente)
+_INTER_TAG_WHITESPACE = re.compile(r"(?<=>)\s+(?=[<{])|(?<=})\s+(?=<)")
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8"?>'
+SOAP_ENV_NS = "http://schemas.xmlsoap.org/soap/envelope/"
+OTA_NS = "http://www.opentravel.org/OTA/2003/05"
+
+
+def xml_escape(value: Any) -> bytes:
+    """Texto o valor de atributo (entre comillas dobles) listo para el buffer."""
+    if value is None:
+        return b""
+    if isinstance(value, bytes):
+        return value
+    text = value if isinstance(value, str) else str(value)
+    if _NEEDS_ESCAPE.search(text) is None:
+        return text.encode()
+    text = _INVALID_XML_CHARS.sub("", text)
+    text = (
+        text.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+        .replace('"', "&quot;")
+    )
+    return text.encode()
+
+
+def xml_attr(name: str, value: Any) -> bytes:
+    """` name="valor"` para atributos opcionales; vacío si no hay valor."""
+    if value is None or value == "":
+        return b""
+    return b" " + name.encode() + b'="' + xml_escape(value) + b'"'
+
+
+class XmlTemplate:
+    """Plantilla `{nombre}` compilada a segmentos de bytes."""
+
+    __slots__ = ("_literals", "_fields", "fields")
+
+    def __init__(self, source: str, compact: bool = True) -> None:
+        """
+        Args:
+            source: XML con huecos `{nombre}` (en texto o en valores de atributo).
+            compact: Quita la indentación entre etiquetas (no cambia el documento).
+        """
+        if compact:
+            source = _INTER_TAG_WHITESPACE.sub("", source.strip())
+        parts = _PLACEHOLDER.split(source)
+        self._literals = tuple(part.encode() for part in parts[0::2])
+        self._fields = tuple(parts[1::2])
+        self.fields = frozenset(self._fields)
+
+    def render_into(self, buffer: bytearray, values: Mapping[str, Any]) -> None:
+        literals = self._literals
+        buffer += literals[0]
+        for i, name in enumerate(self._fields, start=1):
+            buffer += xml_escape(values[name])
+            buffer += literals[i]
+
+    def render(self, declaration: bool = False, **values: Any) -> bytes:
+        missing = self.fields.difference(values)
+        if missing:
+            raise KeyError(f"Missing template values: {', '.join(sorted(missing))}")
+        buffer = bytearray(XML_DECLARATION) if declaration else bytearray()
+        self.render_into(buffer, values)
+        return bytes(buffer)
+
+
+SOAP_ENVELOPE = XmlTemplate(
+    f"""
+    <soapenv:Envelope xmlns:soapenv="{SOAP_ENV_NS}"{{namespaces}}>
+        <soapenv:Header>{{header}}</soapenv:Header>
+        <soapenv:Body>{{body}}</soapenv:Body>
+    </soapenv:Envelope>
+    """
+)
+
+
+def soap_envelope(
+    body: bytes,
+    header: bytes = b"",
+    namespaces: Mapping[str, str] | None = None,
+    declaration: bool = True,
+) -> bytes:
+    """Envelope SOAP 1.1 alrededor de un body ya renderizado."""
+    ns_attrs = b"".join(
+        xml_attr(f"xmlns:{prefix}", uri) for prefix, uri in (namespaces or {}).items()
+    )
+    return SOAP_ENVELOPE.render(
+        declaration=declaration, namespaces=ns_attrs, header=header, body=body
+    )
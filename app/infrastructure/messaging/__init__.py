@@ -1,7 +1,15 @@
 """Módulo de mensajería y workers."""
 
+from app.infrastructure.messaging.notifier import (
+    InProcessOutboxNotifier,
+    LocalSocketOutboxNotifier,
+    get_outbox_notifier,
+)
 from app.infrastructure.messaging.outbox_worker import OutboxWorker
 
 __all__ = [
     "OutboxWorker",
+    "InProcessOutboxNotifier",
+    "LocalSocketOutboxNotifier",
+    "get_outbox_notifier",
 ]
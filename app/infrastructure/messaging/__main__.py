@@ -0,0 +1,69 @@
+"""
+Procesos worker del outbox.
+
+Uso:
+    python -m app.infrastructure.messaging                      # valores de Settings
+    python -m app.infrastructure.messaging --processes 4 --max-in-flight 8
+    python -m app.infrastructure.messaging --no-shard           # todos compiten por la cola
+    python -m app.infrastructure.messaging --supplier-max-in-flight 1
+
+La API debe correr con OUTBOX_NOTIFY_BACKEND=socket (mismo OUTBOX_NOTIFY_HOST /
+OUTBOX_NOTIFY_PORT) para despertar a estos procesos al encolar; con el backend
+local solo los despierta el polling.
+"""
+
+import argparse
+import logging
+
+from app.config import get_settings
+from app.infrastructure.messaging.runner import RunnerConfig, WorkerSupervisor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Multi-process outbox worker runner")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--max-in-flight", type=int, default=None, help="per process")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--poll-interval", type=float, default=None)
+    parser.add_argument("--event-timeout", type=float, default=None)
+    parser.add_argument("--drain-timeout", type=float, default=None)
+    parser.add_argument(
+        "--no-shard",
+        dest="shard",
+        action="store_false",
+        help="do not partition events by aggregate_code between processes",
+    )
+    parser.add_argument(
+        "--supplier-max-in-flight", type=int, default=None, help="per supplier and process"
+    )
+    parser.add_argument(
+        "--no-fair-scheduling",
+        dest="fair_scheduling",
+        action="store_const",
+        const=False,
+        default=None,
+        help="claim in plain FIFO order instead of per-supplier round robin",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - runner - %(name)s - %(levelname)s - %(message)s",
+    )
+    config = RunnerConfig.from_settings(
+        get_settings(),
+        processes=args.processes,
+        max_in_flight=args.max_in_flight,
+        batch_size=args.batch_size,
+        poll_interval_seconds=args.poll_interval,
+        event_timeout_seconds=args.event_timeout,
+        drain_timeout_seconds=args.drain_timeout,
+        shard=args.shard,
+        fair_scheduling=args.fair_scheduling,
+        supplier_max_in_flight=args.supplier_max_in_flight,
+    )
+    WorkerSupervisor(config).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""ProcessOutboxBookSupplierUseCase con una sesión propia por evento (workers y drain)."""
+
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.application.use_cases.process_outbox_book_supplier import (
+    BOOKING_BUDGET_SECONDS,
+    ProcessOutboxBookSupplierUseCase,
+)
+from app.infrastructure.db.repositories.outbox_repo_sql import OutboxRepoSQL
+from app.infrastructure.db.repositories.reservation_repo_sql import ReservationRepoSQL
+from app.infrastructure.db.repositories.supplier_request_repo_sql import SupplierRequestRepoSQL
+from app.infrastructure.db.transaction_manager import SQLAlchemyTransactionManager
+from app.infrastructure.gateways.supplier_gateway_selector import SupplierGatewaySelector
+
+
+def book_supplier_use_case_scope(
+    session_maker: async_sessionmaker,
+    selector: SupplierGatewaySelector,
+    booking_budget_seconds: float | None = BOOKING_BUDGET_SECONDS,
+) -> Callable[[], AbstractAsyncContextManager[ProcessOutboxBookSupplierUseCase]]:
+    """Factory de use cases; cada uno vive en su propia AsyncSession (seguro en concurrencia)."""
+
+    @asynccontextmanager
+    async def scope() -> AsyncIterator[ProcessOutboxBookSupplierUseCase]:
+        async with session_maker() as session:
+            yield ProcessOutboxBookSupplierUseCase(
+                outbox_repo=OutboxRepoSQL(session),
+                reservation_repo=ReservationRepoSQL(session),
+                supplier_gateway_selector=selector,
+                supplier_request_repo=SupplierRequestRepoSQL(session),
+                transaction_manager=SQLAlchemyTransactionManager(session),
+                booking_budget_seconds=booking_budget_seconds,
+            )
+
+    return scope
@@ -0,0 +1,74 @@
+"""Renovación del lease de un evento outbox mientras su handler sigue vivo."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseHeartbeat:
+    """
+    Tarea en segundo plano que llama `renew()` cada `interval_seconds`.
+
+    `renew` extiende lock_expires_at y retorna False si el lease ya no es
+    nuestro (expiró y otro worker reclamó el evento): entonces se marca
+    `lost` y se deja de renovar; el resultado se descarta en el fencing de
+    mark_done/mark_retry. Un error transitorio de BD se registra y se
+    reintenta en el siguiente tick.
+
+    Al salir del contexto se espera a que termine la renovación en curso
+    (no se cancela a mitad), así puede compartir sesión con el handler
+    siempre que este no la use mientras el heartbeat está activo.
+
+        async with LeaseHeartbeat(renew, interval_seconds=ttl / 3, event_id=event.id):
+            await handler(event)
+    """
+
+    def __init__(
+        self,
+        renew: Callable[[], Awaitable[bool]],
+        interval_seconds: float,
+        event_id: int | None = None,
+    ) -> None:
+        self._renew = renew
+        self._interval = max(interval_seconds, 0.01)
+        self._event_id = event_id
+        self._stopped = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.lost = False
+        self.renewals = 0
+
+    @staticmethod
+    def interval_for(lock_ttl_seconds: float) -> float:
+        """Renueva 3 veces por TTL: tolera perder un tick sin que expire el lease."""
+        return lock_ttl_seconds / 3
+
+    async def __aenter__(self) -> "LeaseHeartbeat":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._stopped.set()
+        if self._task:
+            await self._task
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=self._interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                renewed = await self._renew()
+            except Exception as e:
+                logger.warning(f"No se pudo renovar el lease del evento {self._event_id}: {e}")
+                continue
+            if not renewed:
+                self.lost = True
+                logger.warning(
+                    f"Lease perdido para evento {self._event_id}: otro worker lo reclamó"
+                )
+                return
+            self.renewals += 1
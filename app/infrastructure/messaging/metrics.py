@@ -0,0 +1,279 @@
+"""
+Métricas en proceso del outbox: histogramas de latencia de claim y duración
+de handlers, y contadores por resultado.
+
+Son contadores incrementales en memoria (costo O(1) por evento, sin tocar la
+BD); cada proceso tiene los suyos. Los procesos worker del runner publican un
+snapshot periódico en OUTBOX_METRICS_DIR (MetricsSnapshotStore, un archivo
+JSON por pid) y la API los suma al reportar. Las métricas de cola (conteos por
+estado, antigüedad, entrada a la DLQ) salen de la BD en GetOutboxMetricsUseCase.
+`render_prometheus` serializa el reporte completo en formato de texto de
+Prometheus, incluido el estado de los circuit breakers y de las colas de los
+limitadores de suppliers.
+"""
+
+import bisect
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATES = ("closed", "open", "half_open")
+
+# Segundos; cubren desde un claim indexado (ms) hasta una llamada lenta a supplier
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class Histogram:
+    """Histograma de buckets fijos (acumulados al exportar, como Prometheus)."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self._bounds = sorted(buckets)
+        self._counts = [0] * (len(self._bounds) + 1)  # el último es +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        cumulative, buckets = 0, []
+        for bound, count in zip([*self._bounds, float("inf")], self._counts, strict=True):
+            cumulative += count
+            buckets.append(["+Inf" if bound == float("inf") else bound, cumulative])
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+
+class OutboxMetrics:
+    """Registro de métricas del outbox de este proceso."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self._buckets = tuple(buckets)
+        self.reset()
+
+    def reset(self) -> None:
+        self.claim_latency = Histogram(self._buckets)
+        self.claimed_events = 0
+        self.handler_duration: dict[tuple[str, str], Histogram] = {}
+
+    def observe_claim(self, seconds: float, claimed: int) -> None:
+        """Una llamada a claim_ready (incluye las que no devolvieron eventos)."""
+        self.claim_latency.observe(seconds)
+        self.claimed_events += claimed
+
+    def observe_handler(self, event_type: str, seconds: float, outcome: str) -> None:
+        """Duración de un evento procesado; outcome: ok/error o el estado resultante."""
+        key = (event_type, outcome)
+        histogram = self.handler_duration.get(key)
+        if histogram is None:
+            histogram = self.handler_duration[key] = Histogram(self._buckets)
+        histogram.observe(seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "claim_latency_seconds": self.claim_latency.snapshot(),
+            "claimed_events": self.claimed_events,
+            "handler_duration_seconds": [
+                {"event_type": event_type, "outcome": outcome, **histogram.snapshot()}
+                for (event_type, outcome), histogram in sorted(self.handler_duration.items())
+            ],
+        }
+
+
+# Registro compartido por los workers/drains de este proceso
+outbox_metrics = OutboxMetrics()
+
+
+def has_observations(snapshot: dict) -> bool:
+    """False para un snapshot de OutboxMetrics sin ningún claim ni evento."""
+    return bool(snapshot["claim_latency_seconds"]["count"] or snapshot["handler_duration_seconds"])
+
+
+def merge_histograms(snapshots: list[dict]) -> dict:
+    """Suma snapshots de Histogram con los mismos buckets."""
+    counts: dict = {}
+    for snapshot in snapshots:
+        for bound, count in snapshot["buckets"]:
+            counts[bound] = counts.get(bound, 0) + count
+    return {
+        "count": sum(s["count"] for s in snapshots),
+        "sum": round(sum(s["sum"] for s in snapshots), 6),
+        "buckets": [[bound, count] for bound, count in counts.items()],
+    }
+
+
+def merge_outbox_snapshots(snapshots: list[dict]) -> dict:
+    """Suma snapshots de OutboxMetrics de varios procesos."""
+    handlers: dict[tuple[str, str], list[dict]] = {}
+    for snapshot in snapshots:
+        for entry in snapshot["handler_duration_seconds"]:
+            handlers.setdefault((entry["event_type"], entry["outcome"]), []).append(entry)
+    return {
+        "claim_latency_seconds": merge_histograms(
+            [s["claim_latency_seconds"] for s in snapshots]
+        ),
+        "claimed_events": sum(s["claimed_events"] for s in snapshots),
+        "handler_duration_seconds": [
+            {"event_type": event_type, "outcome": outcome, **merge_histograms(entries)}
+            for (event_type, outcome), entries in sorted(handlers.items())
+        ],
+    }
+
+
+class MetricsSnapshotStore:
+    """
+    Snapshots de métricas por proceso en un directorio compartido.
+
+    Cada proceso worker escribe `outbox-<pid>.json` (reemplazo atómico) cada
+    `interval_seconds`; `collect` devuelve los que no están vencidos (más de
+    3 intervalos sin actualizar: proceso muerto o colgado).
+    """
+
+    STALE_INTERVALS = 3
+
+    def __init__(self, directory: str | Path, clock=time.time) -> None:
+        self._directory = Path(directory)
+        self._clock = clock
+
+    def _path(self, pid: int) -> Path:
+        return self._directory / f"outbox-{pid}.json"
+
+    def publish(self, snapshot: dict, interval_seconds: float, pid: int | None = None) -> None:
+        pid = pid or os.getpid()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(pid)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "pid": pid,
+                    "published_at": self._clock(),
+                    "interval_seconds": interval_seconds,
+                    **snapshot,
+                }
+            )
+        )
+        os.replace(tmp, path)
+
+    def remove(self, pid: int | None = None) -> None:
+        self._path(pid or os.getpid()).unlink(missing_ok=True)
+
+    def collect(self) -> list[dict]:
+        now = self._clock()
+        snapshots = []
+        for path in sorted(self._directory.glob("outbox-*.json")):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError) as exc:
+                logger.warning(f"Snapshot de métricas ilegible {path.name}: {exc}")
+                continue
+            age = now - snapshot["published_at"]
+            if age <= snapshot["interval_seconds"] * self.STALE_INTERVALS:
+                snapshots.append(snapshot)
+        return snapshots
+
+
+def _labels(**labels) -> str:
+    body = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    return f"{{{body}}}" if body else ""
+
+
+def _pid(entry: dict) -> dict:
+    """Etiqueta pid de las entradas que vienen del snapshot de otro proceso."""
+    return {"pid": entry["pid"]} if "pid" in entry else {}
+
+
+def _histogram_lines(name: str, snapshot: dict, **labels) -> list[str]:
+    lines = [
+        f"{name}_bucket{_labels(**labels, le=bound)} {count}"
+        for bound, count in snapshot["buckets"]
+    ]
+    lines.append(f"{name}_sum{_labels(**labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_labels(**labels)} {snapshot['count']}")
+    return lines
+
+
+def render_prometheus(report: dict) -> str:
+    """
+    Reporte de GetOutboxMetricsUseCase en formato de texto de Prometheus.
+
+    Sin métricas de workers (report["worker"] None) no se emiten histogramas;
+    breakers y limitadores de otros procesos llevan la etiqueta pid.
+    """
+    queue, dlq, worker = report["queue"], report["dlq"], report["worker"]
+    lines = ["# TYPE outbox_events gauge"]
+    for event_type, statuses in queue["by_event_type"].items():
+        for status, count in statuses.items():
+            lines.append(f"outbox_events{_labels(event_type=event_type, status=status)} {count}")
+    lines.append("# TYPE outbox_events_by_supplier gauge")
+    for supplier_id, statuses in queue["by_supplier"].items():
+        for status, count in statuses.items():
+            labels = _labels(supplier_id=supplier_id, status=status)
+            lines.append(f"outbox_events_by_supplier{labels} {count}")
+    lines.append("# TYPE outbox_oldest_ready_age_seconds gauge")
+    lines.append(f"outbox_oldest_ready_age_seconds {queue['oldest_ready_age_seconds'] or 0}")
+    lines.append("# TYPE outbox_dlq_moved gauge")
+    for window, count in dlq["moved"].items():
+        lines.append(f"outbox_dlq_moved{_labels(window=window)} {count}")
+    if worker:
+        lines.append("# TYPE outbox_worker_processes gauge")
+        lines.append(f"outbox_worker_processes {len(worker['processes'])}")
+        lines.append("# TYPE outbox_claim_latency_seconds histogram")
+        lines.extend(
+            _histogram_lines("outbox_claim_latency_seconds", worker["claim_latency_seconds"])
+        )
+        lines.append("# TYPE outbox_claimed_events_total counter")
+        lines.append(f"outbox_claimed_events_total {worker['claimed_events']}")
+        lines.append("# TYPE outbox_handler_duration_seconds histogram")
+        for entry in worker["handler_duration_seconds"]:
+            lines.extend(
+                _histogram_lines(
+                    "outbox_handler_duration_seconds",
+                    entry,
+                    event_type=entry["event_type"],
+                    outcome=entry["outcome"],
+                )
+            )
+    breakers = report.get("circuit_breakers", [])
+    lines.append("# TYPE supplier_circuit_state gauge")
+    for breaker in breakers:
+        for state in BREAKER_STATES:
+            value = int(breaker["state"] == state)
+            labels = _labels(supplier=breaker["name"], state=state, **_pid(breaker))
+            lines.append(f"supplier_circuit_state{labels} {value}")
+    lines.append("# TYPE supplier_circuit_failure_rate gauge")
+    for breaker in breakers:
+        labels = _labels(supplier=breaker["name"], **_pid(breaker))
+        lines.append(f"supplier_circuit_failure_rate{labels} {breaker['failure_rate']}")
+    for counter in ("opened_total", "rejected_total"):
+        lines.append(f"# TYPE supplier_circuit_{counter} counter")
+        for breaker in breakers:
+            labels = _labels(supplier=breaker["name"], **_pid(breaker))
+            lines.append(f"supplier_circuit_{counter}{labels} {breaker[counter]}")
+    limiters = report.get("supplier_limiters", [])
+    for gauge in ("in_flight", "waiting"):
+        lines.append(f"# TYPE supplier_limiter_{gauge} gauge")
+        for limiter in limiters:
+            labels = _labels(supplier_id=limiter["supplier_id"], **_pid(limiter))
+            lines.append(f"supplier_limiter_{gauge}{labels} {limiter[gauge]}")
+    lines.append("# TYPE supplier_limiter_rejected_total counter")
+    for limiter in limiters:
+        labels = _labels(supplier_id=limiter["supplier_id"], **_pid(limiter))
+        lines.append(f"supplier_limiter_rejected_total{labels} {limiter['rejected_total']}")
+    lines.append("# TYPE supplier_limiter_wait_seconds histogram")
+    for limiter in limiters:
+        lines.extend(
+            _histogram_lines(
+                "supplier_limiter_wait_seconds",
+                limiter["wait_seconds"],
+                supplier_id=limiter["supplier_id"],
+                **_pid(limiter),
+            )
+        )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,141 @@
+"""Canales de notificación para despertar al OutboxWorker sin esperar al polling."""
+
+import asyncio
+import logging
+import socket
+from functools import lru_cache
+
+from app.application.interfaces.outbox_notifier import OutboxNotifier
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(True)
+
+
+class InProcessOutboxNotifier(OutboxNotifier):
+    """
+    Señal asyncio dentro del proceso.
+
+    Una notificación sin workers esperando queda pendiente y la consume el
+    siguiente `wait`, así no se pierde un evento encolado entre dos polls.
+    Seguro entre event loops/hilos (p. ej. API y worker en el mismo proceso).
+    """
+
+    def __init__(self) -> None:
+        self._waiters: set[asyncio.Future] = set()
+        self._pending = False
+
+    async def notify(self, event_type: str, aggregate_code: str | None = None) -> None:
+        self.signal()
+
+    def signal(self) -> None:
+        """Despierta a todos los workers que esperan (o deja la señal pendiente)."""
+        if not self._waiters:
+            self._pending = True
+            return
+        for waiter in list(self._waiters):
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+    async def wait(self, timeout: float) -> bool:
+        if self._pending:
+            self._pending = False
+            return True
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.discard(waiter)
+
+
+class _DatagramListener(asyncio.DatagramProtocol):
+    def __init__(self, notifier: InProcessOutboxNotifier) -> None:
+        self._notifier = notifier
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self._notifier.signal()
+
+
+class LocalSocketOutboxNotifier(InProcessOutboxNotifier):
+    """
+    Backend entre procesos sobre UDP local.
+
+    `notify` despierta a los workers del propio proceso y envía un datagrama
+    (fire-and-forget) a cada uno de los `listeners` puertos port, port+1, ...
+    El proceso worker i del runner llama `listen(i)` y recibe en port+i: un
+    puerto por proceso, así cada notificación despierta a todos los shards (con
+    un puerto compartido vía SO_REUSEPORT el kernel la entrega a uno solo).
+    Si el datagrama se pierde, el polling del worker sigue cubriendo el caso.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, listeners: int = 1) -> None:
+        super().__init__()
+        self._host = host
+        self._port = port
+        self._listeners = max(1, listeners)
+        self._sender: socket.socket | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+
+    async def notify(self, event_type: str, aggregate_code: str | None = None) -> None:
+        self.signal()
+        message = f"{event_type}:{aggregate_code or ''}".encode()
+        try:
+            if self._sender is None:
+                self._sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._sender.setblocking(False)
+        except OSError as exc:
+            logger.warning(
+                "Outbox notification not delivered, workers will pick it up on poll",
+                extra={"event_type": event_type, "error": str(exc)},
+            )
+            return
+        for index in range(self._listeners):
+            try:
+                self._sender.sendto(message, (self._host, self._port + index))
+            except OSError as exc:
+                logger.warning(
+                    "Outbox notification not delivered, workers will pick it up on poll",
+                    extra={
+                        "event_type": event_type,
+                        "port": self._port + index,
+                        "error": str(exc),
+                    },
+                )
+
+    async def listen(self, index: int = 0) -> None:
+        """Empieza a recibir notificaciones de otros procesos en port + index."""
+        if self._transport is not None:
+            return
+        address = (self._host, self._port + index)
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramListener(self), local_addr=address
+        )
+        logger.info(f"Outbox notifier escuchando en {address[0]}:{address[1]}")
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._sender is not None:
+            self._sender.close()
+            self._sender = None
+
+
+@lru_cache(maxsize=1)
+def get_outbox_notifier() -> InProcessOutboxNotifier:
+    """Notifier compartido por el proceso, según OUTBOX_NOTIFY_BACKEND."""
+    settings = get_settings()
+    if settings.outbox_notify_backend == "socket":
+        return LocalSocketOutboxNotifier(
+            host=settings.outbox_notify_host,
+            port=settings.outbox_notify_port,
+            listeners=settings.outbox_worker_processes,
+        )
+    return InProcessOutboxNotifier()
@@ -2,13 +2,20 @@
 
 import asyncio
 import logging
-from datetime import timedelta
+import time
+from collections import Counter
+from dataclasses import replace
 from typing import Callable
 from uuid import uuid4
 
 from app.application.interfaces.clock import Clock
+from app.application.interfaces.outbox_notifier import OutboxNotifier
 from app.application.interfaces.outbox_repo import OutboxRepo
 from app.application.interfaces.supplier_gateway import SupplierGateway
+from app.application.retry_policy import DEFAULT_RETRY_POLICY, RetryPolicy
+from app.infrastructure.messaging.lease import LeaseHeartbeat
+from app.infrastructure.messaging.metrics import OutboxMetrics, outbox_metrics
+from app.infrastructure.messaging.supplier_scheduler import SupplierFairScheduler
 
 logger = logging.getLogger(__name__)
 
@@ -21,22 +28,41 @@ class OutboxWorker:
     consistencia eventual entre la base de datos y servicios externos.
 
     Características:
+    - Wake-up inmediato vía OutboxNotifier (el polling queda como red de seguridad)
     - Polling configurable
-    - Backoff exponencial en reintentos
-    - Locking distribuido para evitar procesamiento duplicado
+    - Reintentos según la RetryPolicy compartida (backoff exponencial con
+      jitter; los errores no reintentables fallan a la primera)
+    - Locking distribuido para evitar procesamiento duplicado, con heartbeat
+      que renueva el lease mientras el handler corre y fencing al completar
+    - Procesamiento concurrente acotado (max_in_flight) con timeout por evento
+    - Scheduling justo por supplier opcional (SupplierFairScheduler): cola de
+      listos por supplier, Deficit Round Robin y tope de eventos en vuelo por
+      supplier, para que un supplier lento no acapare los slots
+    - Métricas en proceso (latencia de claim, duración por evento)
     - Graceful shutdown
+
+    Con max_in_flight > 1 el repositorio y los handlers no deben compartir
+    una misma AsyncSession (usar una sesión por operación/evento).
     """
 
     def __init__(
         self,
         outbox_repo: OutboxRepo,
-        supplier_gateway: SupplierGateway,
+        supplier_gateway: SupplierGateway | None,
         clock: Clock,
         worker_id: str | None = None,
         poll_interval_seconds: float = 5.0,
         batch_size: int = 10,
         lock_duration_seconds: int = 300,
-        max_retries: int = 5,
+        max_retries: int | None = None,
+        max_in_flight: int = 1,
+        event_timeout_seconds: float | None = None,
+        notifier: OutboxNotifier | None = None,
+        shard: tuple[int, int] | None = None,
+        heartbeat_interval_seconds: float | None = None,
+        scheduler: SupplierFairScheduler | None = None,
+        retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY,
+        metrics: OutboxMetrics = outbox_metrics,
     ) -> None:
         """
         Inicializa el worker.
@@ -49,7 +75,17 @@ class OutboxWorker:
             poll_interval_seconds: Intervalo entre polls en segundos.
             batch_size: Número máximo de eventos a procesar por ciclo.
             lock_duration_seconds: Duración del lock en segundos.
-            max_retries: Número máximo de reintentos por evento.
+            max_retries: Número máximo de intentos por evento (por defecto el
+                max_attempts de retry_policy).
+            max_in_flight: Límite global de eventos procesándose a la vez.
+            event_timeout_seconds: Timeout por evento (None = sin límite).
+            notifier: Canal para despertar al worker cuando se encola un evento.
+            shard: Partición (index, total) de la cola que reclama este worker.
+            heartbeat_interval_seconds: Cada cuánto renovar el lease
+                (por defecto lock_duration_seconds / 3).
+            scheduler: Reparto de slots por supplier (None = una sola cola FIFO).
+            retry_policy: Decide reintento/backoff o fallo definitivo.
+            metrics: Registro de métricas (por defecto el del proceso).
         """
         self._outbox_repo = outbox_repo
         self._supplier_gateway = supplier_gateway
@@ -58,9 +94,23 @@ class OutboxWorker:
         self._poll_interval = poll_interval_seconds
         self._batch_size = batch_size
         self._lock_duration = lock_duration_seconds
-        self._max_retries = max_retries
+        if max_retries is not None:
+            retry_policy = replace(retry_policy, max_attempts=max_retries)
+        self._retry_policy = retry_policy
+        self._metrics = metrics
+        self._max_in_flight = max(1, max_in_flight)
+        self._event_timeout = event_timeout_seconds
+        self._notifier = notifier
+        self._shard = shard
+        self._heartbeat_interval = heartbeat_interval_seconds or LeaseHeartbeat.interval_for(
+            lock_duration_seconds
+        )
         self._running = False
         self._handlers: dict[str, Callable] = {}
+        self._self_managed: set[str] = set()
+        self._scheduler = scheduler
+        self._in_flight: set[asyncio.Task] = set()
+        self._in_flight_by_supplier: Counter[int] = Counter()
 
     @property
     def worker_id(self) -> str:
@@ -72,31 +122,58 @@ class OutboxWorker:
         """Verifica si el worker está corriendo."""
         return self._running
 
-    def register_handler(self, event_type: str, handler: Callable) -> None:
+    @property
+    def in_flight(self) -> int:
+        """Número de eventos procesándose en este momento."""
+        return len(self._in_flight)
+
+    def register_handler(
+        self, event_type: str, handler: Callable, manages_status: bool = False
+    ) -> None:
         """
         Registra un handler para un tipo de evento.
 
         Args:
             event_type: Tipo de evento (ej: BOOK_SUPPLIER_REQUESTED).
             handler: Función async que procesa el evento.
+            manages_status: El handler marca el evento (DONE/RETRY/DLQ) por sí
+                mismo; el worker no lo marca como DONE al terminar, solo aplica
+                el reintento si el handler lanza una excepción.
         """
         self._handlers[event_type] = handler
+        if manages_status:
+            self._self_managed.add(event_type)
+        else:
+            self._self_managed.discard(event_type)
         logger.info(f"Handler registrado para evento: {event_type}")
 
     async def start(self) -> None:
-        """Inicia el worker en modo polling."""
+        """
+        Inicia el worker.
+
+        Mantiene hasta max_in_flight eventos en proceso: mientras haya slots
+        libres sigue reclamando trabajo; cuando no hay slots espera a que
+        termine alguno, y cuando no hay trabajo espera una notificación
+        (o poll_interval como máximo).
+        """
         self._running = True
-        logger.info(f"OutboxWorker {self._worker_id} iniciado")
+        logger.info(
+            f"OutboxWorker {self._worker_id} iniciado (max_in_flight={self._max_in_flight})"
+        )
 
         while self._running:
             try:
-                processed = await self._process_batch()
-                if processed == 0:
-                    await asyncio.sleep(self._poll_interval)
+                claimed = await self._fill_slots()
+                if self._free_slots() == 0 or (claimed == 0 and self._in_flight):
+                    await self._wait_for_slot()
+                elif claimed == 0:
+                    await self._wait_for_work()
             except Exception as e:
                 logger.exception(f"Error en ciclo del worker: {e}")
                 await asyncio.sleep(self._poll_interval)
 
+        await self._drain()
+
     async def stop(self) -> None:
         """Detiene el worker de forma graceful."""
         self._running = False
@@ -120,31 +197,121 @@ class OutboxWorker:
 
     async def _process_batch(self) -> int:
         """
-        Procesa un batch de eventos pendientes.
+        Procesa un batch de eventos pendientes (hasta max_in_flight a la vez).
 
         Returns:
             Número de eventos procesados.
         """
-        now = self._clock.now()
-        events = await self._outbox_repo.claim_ready(
-            limit=self._batch_size,
-            locked_by=self._worker_id,
-            now=now,
-        )
-
+        events = await self._claim(self._batch_size)
         if not events:
             return 0
 
-        processed = 0
+        semaphore = asyncio.Semaphore(self._max_in_flight)
+
+        async def run(event) -> bool:
+            async with semaphore:
+                return await self._safe_process(event)
+
+        results = await asyncio.gather(*(run(event) for event in events))
+        return sum(1 for success in results if success)
+
+    async def _claim(self, limit: int) -> list:
+        started = time.perf_counter()
+        if self._scheduler:
+            events = await self._claim_fair(limit)
+        else:
+            events = await self._outbox_repo.claim_ready(
+                limit=limit,
+                locked_by=self._worker_id,
+                now=self._clock.now(),
+                lock_ttl_seconds=self._lock_duration,
+                shard=self._shard,
+            )
+        self._metrics.observe_claim(time.perf_counter() - started, len(events))
+        return events
+
+    async def _claim_fair(self, limit: int) -> list:
+        """Reclama por supplier lo que asigna el scheduler (un claim por supplier)."""
+        now = self._clock.now()
+        ready = await self._outbox_repo.count_ready_by_supplier(now, shard=self._shard)
+        allocation = self._scheduler.allocate(limit, ready, self._in_flight_by_supplier)
+        events = []
+        for supplier_id, count in allocation.items():
+            events.extend(
+                await self._outbox_repo.claim_ready(
+                    limit=count,
+                    locked_by=self._worker_id,
+                    now=now,
+                    lock_ttl_seconds=self._lock_duration,
+                    shard=self._shard,
+                    supplier_id=supplier_id,
+                )
+            )
+        return events
+
+    def _free_slots(self) -> int:
+        return self._max_in_flight - len(self._in_flight)
+
+    async def _fill_slots(self) -> int:
+        """Reclama eventos para los slots libres y los lanza como tasks."""
+        free = self._free_slots()
+        if free <= 0:
+            return 0
+        events = await self._claim(min(self._batch_size, free))
         for event in events:
-            try:
-                success = await self._process_event(event)
-                if success:
-                    processed += 1
-            except Exception as e:
-                logger.exception(f"Error procesando evento {event.id}: {e}")
+            self._launch(event)
+        return len(events)
+
+    def _launch(self, event) -> None:
+        supplier_id = event.supplier_id
+        self._in_flight_by_supplier[supplier_id] += 1
+
+        def done(task: asyncio.Task) -> None:
+            self._in_flight.discard(task)
+            self._in_flight_by_supplier[supplier_id] -= 1
+            if self._in_flight_by_supplier[supplier_id] <= 0:
+                del self._in_flight_by_supplier[supplier_id]
+
+        task = asyncio.create_task(self._safe_process(event))
+        self._in_flight.add(task)
+        task.add_done_callback(done)
+
+    async def _wait_for_work(self) -> None:
+        """Espera una notificación de nuevo evento, como máximo poll_interval."""
+        if self._notifier:
+            await self._notifier.wait(timeout=self._poll_interval)
+        else:
+            await asyncio.sleep(self._poll_interval)
+
+    async def _wait_for_slot(self) -> None:
+        """Espera a que termine algún evento en proceso (o poll_interval)."""
+        if not self._in_flight:
+            return
+        await asyncio.wait(
+            set(self._in_flight),
+            timeout=self._poll_interval,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
 
-        return processed
+    async def _drain(self) -> None:
+        """Espera a que terminen los eventos en proceso antes de salir."""
+        if self._in_flight:
+            logger.info(
+                f"OutboxWorker {self._worker_id} esperando {len(self._in_flight)} eventos"
+            )
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def _safe_process(self, event) -> bool:
+        started = time.perf_counter()
+        success = False
+        try:
+            success = await self._process_event(event)
+        except Exception as e:
+            logger.exception(f"Error procesando evento {event.id}: {e}")
+        self._metrics.observe_handler(
+            event.event_type, time.perf_counter() - started, "ok" if success else "error"
+        )
+        return success
 
     async def _process_event(self, event) -> bool:
         """
@@ -159,58 +326,104 @@ class OutboxWorker:
         event_type = event.event_type
         logger.info(
             f"Procesando evento {event.id} tipo={event_type} "
-            f"aggregate={event.aggregate_type}:{event.aggregate_id}"
+            f"aggregate={event.aggregate_type}:{event.aggregate_code}"
         )
 
         handler = self._handlers.get(event_type)
         if not handler:
             logger.warning(f"No hay handler para evento tipo: {event_type}")
-            await self._outbox_repo.mark_done(event.id)
+            await self._outbox_repo.mark_done(event.id, locked_by=event.locked_by)
             return True
 
         try:
-            await handler(event)
-            await self._outbox_repo.mark_done(event.id)
+            await self._run_handler(handler, event)
+            if event_type not in self._self_managed:
+                if not await self._outbox_repo.mark_done(event.id, locked_by=event.locked_by):
+                    self._log_lease_lost(event)
+                    return False
             logger.info(f"Evento {event.id} procesado exitosamente")
             return True
 
         except Exception as e:
             logger.exception(f"Error en handler para evento {event.id}: {e}")
-            await self._handle_failure(event)
+            await self._handle_failure(event, e)
             return False
 
-    async def _handle_failure(self, event) -> None:
+    async def _run_handler(self, handler: Callable, event) -> None:
+        """Ejecuta el handler (con timeout) renovando el lease mientras corre."""
+        call = handler(event)
+        if self._event_timeout:
+            call = asyncio.wait_for(call, timeout=self._event_timeout)
+        if not event.locked_by:
+            await call
+            return
+
+        async def renew() -> bool:
+            return await self._outbox_repo.renew_lease(
+                event_id=event.id,
+                locked_by=event.locked_by,
+                now=self._clock.now(),
+                lock_ttl_seconds=self._lock_duration,
+            )
+
+        async with LeaseHeartbeat(renew, self._heartbeat_interval, event_id=event.id):
+            await call
+
+    def _log_lease_lost(self, event) -> None:
+        logger.warning(
+            f"Evento {event.id}: lease de {event.locked_by} perdido, "
+            "resultado descartado (otro worker es el dueño)"
+        )
+
+    async def _handle_failure(self, event, error: Exception | None = None) -> None:
         """
         Maneja el fallo de un evento.
 
-        Implementa backoff exponencial para reintentos.
+        La RetryPolicy decide: reintento con backoff exponencial + jitter, o
+        DLQ (outbox_dead_letters) si el error no es reintentable o se agotaron
+        los intentos.
 
         Args:
             event: Evento que falló.
+            error: Excepción lanzada por el handler (si existe).
         """
-        attempts = event.attempts + 1
+        decision = self._retry_policy.decide_for_exception(event.attempts + 1, error)
+        attempts = decision.attempts
+        error_code = type(error).__name__ if error else None
+        error_message = str(error)[:255] if error else None
 
-        if attempts >= self._max_retries:
+        if not decision.retry:
             logger.error(
-                f"Evento {event.id} excedió máximo de reintentos ({self._max_retries})"
+                f"Evento {event.id} falló definitivamente en el intento {attempts} "
+                f"({decision.reason}, {decision.error_class})"
+            )
+            marked = await self._outbox_repo.move_to_dlq(
+                event=replace(event, attempts=attempts),
+                error_code=error_code,
+                error_message=error_message,
+                locked_by=event.locked_by,
             )
-            await self._outbox_repo.mark_failed(event.id)
+            if not marked:
+                self._log_lease_lost(event)
             return
 
-        # Backoff exponencial: 30s, 60s, 120s, 240s, 480s
-        backoff_seconds = 30 * (2 ** (attempts - 1))
-        next_attempt = self._clock.now() + timedelta(seconds=backoff_seconds)
+        next_attempt = decision.next_attempt_at(self._clock.now())
 
         logger.info(
-            f"Evento {event.id} reintento {attempts}/{self._max_retries} "
+            f"Evento {event.id} reintento {attempts}/{self._retry_policy.max_attempts} "
             f"programado para {next_attempt.isoformat()}"
         )
 
-        await self._outbox_repo.mark_retry(
+        marked = await self._outbox_repo.mark_retry(
             event_id=event.id,
             next_attempt_at=next_attempt,
             attempts=attempts,
+            error_code=error_code,
+            error_message=error_message,
+            locked_by=event.locked_by,
         )
+        if not marked:
+            self._log_lease_lost(event)
 
 
 class OutboxWorkerFactory:
@@ -0,0 +1,400 @@
+"""
+Runner multi-proceso del OutboxWorker.
+
+El proceso padre lanza N procesos hijos (spawn) y los supervisa: si un hijo
+termina sin que se haya pedido parar, se relanza con backoff exponencial.
+Cada hijo tiene su propio event loop, engine y pool de conexiones, y procesa
+hasta max_in_flight eventos a la vez.
+
+Con scheduling justo (por defecto) cada hijo reparte sus slots entre suppliers
+con SupplierFairScheduler: tope de eventos en vuelo por supplier y Deficit
+Round Robin ponderado, para que un supplier lento no retrase al resto.
+
+Con sharding (por defecto), el hijo i solo reclama eventos con
+shard_key % N == i (shard_key = crc32(aggregate_code)), así los eventos de una
+misma reserva los procesa siempre el mismo proceso. Sin sharding todos los
+hijos compiten por la cola (SKIP LOCKED evita el doble procesamiento).
+
+SIGTERM/SIGINT: el padre lo reenvía a los hijos, que dejan de reclamar,
+terminan los eventos en curso y salen; pasado drain_timeout se les mata.
+
+Notificaciones: los hijos siempre escuchan en el backend socket, porque el
+backend local (asyncio) no cruza procesos; el hijo i en UDP
+OUTBOX_NOTIFY_HOST:OUTBOX_NOTIFY_PORT+i, y la API envía cada notificación a los
+OUTBOX_WORKER_PROCESSES puertos, así se despierta a todos los shards. La API
+debe correr con OUTBOX_NOTIFY_BACKEND=socket y el mismo OUTBOX_WORKER_PROCESSES;
+si no, el supervisor lo advierte al arrancar y los eventos de los hijos que no
+reciben la notificación esperan al polling (poll_interval_seconds).
+
+Métricas: con OUTBOX_METRICS_DIR cada hijo publica ahí sus histogramas,
+breakers y limitadores cada metrics_publish_interval_seconds, y
+GET /workers/outbox/metrics de la API los suma (mismo directorio en ambos).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from multiprocessing.process import BaseProcess
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import Settings, get_settings
+from app.infrastructure.circuit_breaker import get_supplier_breakers
+from app.infrastructure.db.mysql_engine import build_engine, build_sessionmaker
+from app.infrastructure.db.repositories.outbox_repo_sql import ScopedOutboxRepoSQL
+from app.infrastructure.gateways.http_clients import get_supplier_http_clients
+from app.infrastructure.gateways.supplier_gateway_selector import (
+    SupplierGatewaySelector,
+    get_supplier_gateway_registry,
+)
+from app.infrastructure.gateways.supplier_limiter import get_supplier_limiters
+from app.infrastructure.messaging.book_supplier import book_supplier_use_case_scope
+from app.infrastructure.messaging.metrics import MetricsSnapshotStore, outbox_metrics
+from app.infrastructure.messaging.notifier import LocalSocketOutboxNotifier
+from app.infrastructure.messaging.outbox_worker import OutboxWorker
+from app.infrastructure.messaging.supplier_scheduler import SupplierFairScheduler
+from app.infrastructure.services.clock_impl import ClockImpl
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RunnerConfig:
+    processes: int = 2
+    shard: bool = True
+    batch_size: int = 10
+    max_in_flight: int = 4
+    poll_interval_seconds: float = 5.0
+    lock_duration_seconds: int = 300
+    event_timeout_seconds: float | None = 120.0
+    booking_budget_seconds: float | None = 60.0  # presupuesto de la llamada al supplier
+    drain_timeout_seconds: float = 60.0
+    check_interval_seconds: float = 1.0
+    restart_backoff_seconds: float = 1.0
+    max_restart_backoff_seconds: float = 30.0
+    stable_after_seconds: float = 60.0  # uptime que resetea el backoff de reinicio
+    metrics_log_interval_seconds: float = 60.0  # 0 = no registrar métricas
+    metrics_dir: str | None = None  # snapshots por proceso para el endpoint de métricas
+    metrics_publish_interval_seconds: float = 10.0
+    fair_scheduling: bool = True
+    supplier_max_in_flight: int = 2
+    supplier_weights: dict[int, float] = field(default_factory=dict)
+    supplier_max_in_flight_overrides: dict[int, int] = field(default_factory=dict)
+    notify_backend: str = "socket"  # OUTBOX_NOTIFY_BACKEND con el que corre la API
+    notify_listeners: int | None = None  # puertos a los que notifica la API; None = processes
+
+    @classmethod
+    def from_settings(cls, settings: Settings, **overrides) -> "RunnerConfig":
+        values = dict(
+            processes=settings.outbox_worker_processes,
+            max_in_flight=settings.outbox_worker_max_in_flight,
+            event_timeout_seconds=settings.outbox_worker_event_timeout_seconds,
+            booking_budget_seconds=settings.supplier_booking_budget_seconds,
+            drain_timeout_seconds=settings.outbox_worker_drain_timeout_seconds,
+            fair_scheduling=settings.outbox_supplier_fair_scheduling,
+            supplier_max_in_flight=settings.outbox_supplier_max_in_flight,
+            supplier_weights=dict(settings.outbox_supplier_weights),
+            supplier_max_in_flight_overrides=dict(
+                settings.outbox_supplier_max_in_flight_overrides
+            ),
+            notify_backend=settings.outbox_notify_backend,
+            notify_listeners=settings.outbox_worker_processes,
+            metrics_dir=settings.outbox_metrics_dir,
+        )
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+    @property
+    def effective_booking_budget(self) -> float | None:
+        """El presupuesto del supplier debe vencer antes que el timeout del evento,
+        para que la reserva se registre como DEADLINE_EXCEEDED y no se cancele a ciegas."""
+        budget = self.booking_budget_seconds
+        if self.event_timeout_seconds and (not budget or budget >= self.event_timeout_seconds):
+            return self.event_timeout_seconds * 0.8
+        return budget
+
+    def build_scheduler(self) -> SupplierFairScheduler | None:
+        if not self.fair_scheduling:
+            return None
+        return SupplierFairScheduler(
+            max_in_flight_per_supplier=self.supplier_max_in_flight,
+            weights=self.supplier_weights,
+            max_in_flight_overrides=self.supplier_max_in_flight_overrides,
+        )
+
+
+def book_supplier_handler(
+    session_maker: async_sessionmaker,
+    selector: SupplierGatewaySelector,
+    worker_id: str,
+    booking_budget_seconds: float | None = None,
+) -> Callable:
+    """Handler BOOK_SUPPLIER: una sesión por evento, el use case marca el evento."""
+    use_case_scope = book_supplier_use_case_scope(
+        session_maker, selector, booking_budget_seconds=booking_budget_seconds
+    )
+
+    async def handle(event) -> None:
+        async with use_case_scope() as use_case:
+            await use_case.execute(
+                reservation_code=event.aggregate_code,
+                idem_key=f"outbox-{event.id}",
+                worker_id=worker_id,
+                event=event,
+            )
+
+    return handle
+
+
+def build_worker(
+    index: int,
+    config: RunnerConfig,
+    session_maker: async_sessionmaker,
+    selector: SupplierGatewaySelector,
+    notifier=None,
+) -> OutboxWorker:
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-w{index}"
+    worker = OutboxWorker(
+        outbox_repo=ScopedOutboxRepoSQL(session_maker),
+        supplier_gateway=None,
+        clock=ClockImpl(),
+        worker_id=worker_id,
+        poll_interval_seconds=config.poll_interval_seconds,
+        batch_size=config.batch_size,
+        lock_duration_seconds=config.lock_duration_seconds,
+        max_in_flight=config.max_in_flight,
+        event_timeout_seconds=config.event_timeout_seconds,
+        notifier=notifier,
+        shard=(index, config.processes) if config.shard and config.processes > 1 else None,
+        scheduler=config.build_scheduler(),
+    )
+    worker.register_handler(
+        "BOOK_SUPPLIER",
+        book_supplier_handler(
+            session_maker, selector, worker_id, config.effective_booking_budget
+        ),
+        manages_status=True,
+    )
+    return worker
+
+
+async def serve(index: int, config: RunnerConfig) -> None:
+    """Corre un OutboxWorker en este proceso hasta recibir SIGTERM/SIGINT."""
+    settings = get_settings()
+    engine = build_engine(settings)
+    # El backend local no cruza procesos: un hijo solo puede despertarse por socket,
+    # en su propio puerto (port + index) para que cada notificación llegue a todos
+    notifier = LocalSocketOutboxNotifier(
+        host=settings.outbox_notify_host,
+        port=settings.outbox_notify_port,
+        listeners=config.processes,
+    )
+    await notifier.listen(index)
+    worker = build_worker(
+        index=index,
+        config=config,
+        session_maker=build_sessionmaker(engine),
+        selector=get_supplier_gateway_registry(),
+        notifier=notifier,
+    )
+
+    def request_stop() -> None:
+        asyncio.ensure_future(worker.stop())
+        notifier.signal()  # corta la espera de trabajo en curso
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, request_stop)
+
+    metrics_tasks = []
+    if config.metrics_log_interval_seconds > 0:
+        metrics_tasks.append(
+            asyncio.create_task(_log_metrics(config.metrics_log_interval_seconds))
+        )
+    snapshot_store = MetricsSnapshotStore(config.metrics_dir) if config.metrics_dir else None
+    if snapshot_store:
+        metrics_tasks.append(
+            asyncio.create_task(
+                _publish_metrics(snapshot_store, config.metrics_publish_interval_seconds)
+            )
+        )
+    try:
+        await worker.start()
+    finally:
+        for task in metrics_tasks:
+            task.cancel()
+        if snapshot_store:
+            snapshot_store.remove()
+        notifier.close()
+        await get_supplier_http_clients().aclose()
+        await engine.dispose()
+
+
+async def _log_metrics(interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        logger.info("Outbox worker metrics", extra={"outbox_metrics": outbox_metrics.snapshot()})
+
+
+def publish_metrics_snapshot(store: MetricsSnapshotStore, interval_seconds: float) -> None:
+    """Métricas en proceso de este hijo, para que la API las sume al reportar."""
+    store.publish(
+        {
+            "outbox": outbox_metrics.snapshot(),
+            "circuit_breakers": get_supplier_breakers().snapshot(),
+            "supplier_limiters": get_supplier_limiters().snapshot(),
+        },
+        interval_seconds,
+    )
+
+
+async def _publish_metrics(store: MetricsSnapshotStore, interval_seconds: float) -> None:
+    while True:
+        try:
+            publish_metrics_snapshot(store, interval_seconds)
+        except OSError as exc:
+            logger.warning(f"No se pudo publicar el snapshot de métricas: {exc}")
+        await asyncio.sleep(interval_seconds)
+
+
+def run_worker_process(index: int, config: RunnerConfig) -> None:
+    """Punto de entrada de cada proceso hijo."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s - w{index} - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(serve(index, config))
+
+
+class WorkerSupervisor:
+    """Lanza y vigila los procesos worker; los relanza si terminan inesperadamente."""
+
+    def __init__(
+        self,
+        config: RunnerConfig,
+        target: Callable[[int, RunnerConfig], None] = run_worker_process,
+        start_method: str = "spawn",
+    ) -> None:
+        self._config = config
+        self._target = target
+        self._ctx = multiprocessing.get_context(start_method)
+        self._children: dict[int, BaseProcess] = {}
+        self._started_at: dict[int, float] = {}
+        self._next_start: dict[int, float] = {}
+        self._crashes: dict[int, int] = {}
+        self._stopping = False
+        self.restarts = 0
+
+    @property
+    def children(self) -> dict[int, BaseProcess]:
+        return dict(self._children)
+
+    def run(self) -> None:
+        """Bloquea hasta stop() (o SIGTERM/SIGINT) y el drenado de los hijos."""
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+        self.check_notify_backend()
+        logger.info(
+            f"Outbox runner: {self._config.processes} procesos "
+            f"(shard={self._config.shard}, max_in_flight={self._config.max_in_flight}, "
+            f"fair_scheduling={self._config.fair_scheduling})"
+        )
+        while not self._stopping:
+            self.supervise()
+            time.sleep(self._config.check_interval_seconds)
+        self.shutdown()
+
+    def check_notify_backend(self) -> bool:
+        """Advierte si la API no puede despertar a todos los hijos."""
+        config = self._config
+        if config.notify_backend != "socket":
+            logger.warning(
+                f"OUTBOX_NOTIFY_BACKEND={config.notify_backend}: las notificaciones de la "
+                "API no llegan a los procesos worker y los eventos nuevos esperan al polling "
+                f"(hasta {config.poll_interval_seconds}s). Configura "
+                "OUTBOX_NOTIFY_BACKEND=socket en la API y en los workers."
+            )
+            return False
+        listeners = config.notify_listeners or config.processes
+        if listeners < config.processes:
+            logger.warning(
+                f"La API notifica a {listeners} puertos y el runner tiene {config.processes} "
+                "procesos: los demás solo se despiertan por polling. Configura "
+                f"OUTBOX_WORKER_PROCESSES={config.processes} en la API."
+            )
+            return False
+        return True
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    def supervise(self) -> None:
+        """Arranca los hijos que faltan y programa el reinicio de los caídos."""
+        now = time.monotonic()
+        for index in range(self._config.processes):
+            process = self._children.get(index)
+            if process is not None:
+                if process.is_alive():
+                    continue
+                self._on_exit(index, process, now)
+            if not self._stopping and now >= self._next_start.get(index, 0.0):
+                self._spawn(index, now)
+
+    def shutdown(self) -> None:
+        """SIGTERM a los hijos, espera drain_timeout y mata a los que sigan vivos."""
+        self._stopping = True
+        alive = [p for p in self._children.values() if p.is_alive()]
+        for process in alive:
+            process.terminate()
+        deadline = time.monotonic() + self._config.drain_timeout_seconds
+        for process in alive:
+            process.join(max(0.0, deadline - time.monotonic()))
+        for process in alive:
+            if process.is_alive():
+                logger.warning(f"Worker pid={process.pid} no terminó a tiempo, se mata")
+                process.kill()
+                process.join()
+        self._children.clear()
+        logger.info("Outbox runner detenido")
+
+    def _spawn(self, index: int, now: float) -> None:
+        process = self._ctx.Process(
+            target=self._target,
+            args=(index, self._config),
+            name=f"outbox-worker-{index}",
+        )
+        process.start()
+        self._children[index] = process
+        self._started_at[index] = now
+        logger.info(f"Worker {index} iniciado (pid={process.pid})")
+
+    def _on_exit(self, index: int, process: BaseProcess, now: float) -> None:
+        del self._children[index]
+        if self._stopping:
+            return
+        uptime = now - self._started_at.get(index, now)
+        if uptime >= self._config.stable_after_seconds:
+            crashes = 1
+        else:
+            crashes = self._crashes.get(index, 0) + 1
+        self._crashes[index] = crashes
+        delay = min(
+            self._config.restart_backoff_seconds * (2 ** (crashes - 1)),
+            self._config.max_restart_backoff_seconds,
+        )
+        self._next_start[index] = now + delay
+        self.restarts += 1
+        logger.error(
+            f"Worker {index} (pid={process.pid}) terminó con exitcode={process.exitcode} "
+            f"tras {uptime:.1f}s; reinicio en {delay:.1f}s"
+        )
+
+    def _on_signal(self, signum, frame) -> None:
+        logger.info(f"Señal {signal.Signals(signum).name} recibida, drenando workers")
+        self._stopping = True
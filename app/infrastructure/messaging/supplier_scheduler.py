@@ -0,0 +1,115 @@
+"""
+Scheduling justo por supplier para el OutboxWorker.
+
+Sin él, todos los BOOK_SUPPLIER salen de una sola cola FIFO: un backlog de un
+supplier lento o caído (p. ej. timeouts de Europcar) ocupa todos los slots del
+worker y retrasa las confirmaciones de los suppliers sanos.
+
+El worker pide al repositorio cuántos eventos listos hay por supplier
+(count_ready_by_supplier) y `SupplierFairScheduler.allocate` reparte los slots
+libres con Deficit Round Robin: cada ronda, cada supplier con trabajo suma
+`quantum * peso` a su déficit y toma tantos eventos como la parte entera del
+déficit, sin pasar de su tope de eventos en vuelo. Después el worker reclama
+exactamente esa cantidad por supplier (claim_ready(supplier_id=...)).
+
+Así un supplier lento nunca tiene más de `max_in_flight_per_supplier` eventos
+en proceso en este worker, y el resto de slots se reparte entre los demás.
+"""
+
+from collections.abc import Mapping
+
+
+class SupplierFairScheduler:
+    """
+    Reparto de slots entre suppliers con Deficit Round Robin y tope por supplier.
+
+    El déficit de cada supplier persiste entre llamadas (los pesos < 1 también
+    reciben turno, cada varias rondas) y se reinicia cuando el supplier se queda
+    sin trabajo o llega a su tope, para que no acumule ráfagas. La ronda empieza
+    después del último supplier atendido, así ninguno tiene prioridad fija.
+    """
+
+    def __init__(
+        self,
+        max_in_flight_per_supplier: int = 2,
+        weights: Mapping[int, float] | None = None,
+        max_in_flight_overrides: Mapping[int, int] | None = None,
+        quantum: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            max_in_flight_per_supplier: Tope de eventos en proceso por supplier.
+            weights: Peso por supplier_id (por defecto 1.0); un peso 2 recibe el
+                doble de eventos por ronda que uno de peso 1.
+            max_in_flight_overrides: Tope específico por supplier_id.
+            quantum: Crédito por ronda de un supplier de peso 1.
+        """
+        weights = dict(weights or {})
+        if quantum <= 0 or any(w <= 0 for w in weights.values()):
+            raise ValueError("quantum y pesos deben ser > 0")
+        self._default_cap = max(1, max_in_flight_per_supplier)
+        self._caps = {k: max(1, v) for k, v in (max_in_flight_overrides or {}).items()}
+        self._weights = weights
+        self._quantum = quantum
+        self._deficit: dict[int, float] = {}
+        self._last_served: int | None = None
+
+    def cap(self, supplier_id: int) -> int:
+        """Máximo de eventos en proceso para este supplier."""
+        return self._caps.get(supplier_id, self._default_cap)
+
+    def weight(self, supplier_id: int) -> float:
+        return self._weights.get(supplier_id, 1.0)
+
+    def allocate(
+        self,
+        free_slots: int,
+        ready: Mapping[int, int],
+        in_flight: Mapping[int, int],
+    ) -> dict[int, int]:
+        """
+        Decide cuántos eventos reclamar de cada supplier.
+
+        Args:
+            free_slots: Slots libres del worker.
+            ready: Eventos listos por supplier_id.
+            in_flight: Eventos en proceso por supplier_id en este worker.
+
+        Returns:
+            {supplier_id: n} con n > 0; la suma no supera free_slots.
+        """
+        room = {
+            supplier_id: min(count, self.cap(supplier_id) - in_flight.get(supplier_id, 0))
+            for supplier_id, count in ready.items()
+        }
+        active = self._round_order([s for s, r in room.items() if r > 0])
+        for supplier_id in set(self._deficit) - set(active):
+            del self._deficit[supplier_id]
+
+        allocation: dict[int, int] = {}
+        while free_slots > 0 and active:
+            for supplier_id in list(active):
+                deficit = self._deficit.get(supplier_id, 0.0)
+                deficit += self._quantum * self.weight(supplier_id)
+                take = min(int(deficit), room[supplier_id], free_slots)
+                if take:
+                    allocation[supplier_id] = allocation.get(supplier_id, 0) + take
+                    room[supplier_id] -= take
+                    free_slots -= take
+                    deficit -= take
+                    self._last_served = supplier_id
+                if room[supplier_id] == 0:
+                    active.remove(supplier_id)
+                    deficit = 0.0
+                self._deficit[supplier_id] = deficit
+                if free_slots == 0:
+                    break
+        return allocation
+
+    def _round_order(self, suppliers: list[int]) -> list[int]:
+        """Orden de la ronda: empieza por el siguiente al último supplier atendido."""
+        suppliers.sort()
+        if self._last_served is None:
+            return suppliers
+        after = [s for s in suppliers if s > self._last_served]
+        return after + [s for s in suppliers if s <= self._last_served]
@@ -10,6 +10,7 @@ from app.api.routers.health import router as health_router
 from app.api.routers.reservations import router as reservations_router
 from app.api.routers.worker import router as worker_router
 from app.infrastructure.db.tables import metadata
+from app.infrastructure.gateways.http_clients import get_supplier_http_clients
 
 # Configure structured logging
 logging.basicConfig(
@@ -26,6 +27,7 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(metadata.create_all)
     yield
     # Cleanup
+    await get_supplier_http_clients().aclose()
     await engine.dispose()
 
 app = FastAPI(
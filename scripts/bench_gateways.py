@@ -0,0 +1,428 @@
+"""
+Microbenchmarks de los gateways de suppliers, por adapter.
+
+Para cada adapter mide:
+- build: armar el payload de reserva (plantillas XML de bench_xml_payloads.py;
+  Europcar, Hertz, Mex y National arman el dict dentro de book(), así que se mide
+  su codificación JSON).
+- parse: interpretar una respuesta de confirmación (las mismas que devuelve el
+  simulador de suppliers; Europcar, Infinity, Noleggiare y National no están en
+  el simulador y usan respuestas enlatadas de su protocolo) con el código de
+  parseo del adapter.
+- alloc: pico de memoria (tracemalloc) de un build, un parse y un book().
+- book(): latencia p50/p99 de una reserva completa contra un httpx.MockTransport
+  en proceso (sin red; token cacheado como en producción) y throughput con
+  1/10/100 reservas en vuelo. --mock-latency-ms simula la demora del supplier.
+
+Los resultados se guardan en JSON (--output) para comparar entre commits;
+con --baseline se marcan las métricas que empeoraron más de --threshold
+(tiempos y memoria que suben, throughput que baja) y el script sale con 1.
+Comparar sólo corridas de la misma máquina y con la misma --mock-latency-ms.
+
+Uso:
+    python scripts/bench_gateways.py --output bench/gateways-$(git rev-parse --short HEAD).json
+    python scripts/bench_gateways.py --baseline bench/gateways-main.json --threshold 0.2
+    python scripts/bench_gateways.py --adapters localiza mex_group --mock-latency-ms 50
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+# Add project root to sys.path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+import httpx  # noqa: E402
+from bench_xml_payloads import BUILDERS  # noqa: E402
+
+from app.application.interfaces.supplier_gateway import SupplierGateway  # noqa: E402
+from app.infrastructure.circuit_breaker import get_supplier_breakers  # noqa: E402
+from app.infrastructure.gateways.america_group_gateway import AmericaGroupGateway  # noqa: E402
+from app.infrastructure.gateways.centauro_adapter import CentauroAdapter  # noqa: E402
+from app.infrastructure.gateways.europcar_group_gateway import EuropcarGroupGateway  # noqa: E402
+from app.infrastructure.gateways.factory import SupplierGatewayFactory  # noqa: E402
+from app.infrastructure.gateways.http_clients import SupplierHttpClients  # noqa: E402
+from app.infrastructure.gateways.infinity_group_gateway import InfinityGroupGateway  # noqa: E402
+from app.infrastructure.gateways.national_group_gateway import NationalGroupGateway  # noqa: E402
+from app.infrastructure.gateways.noleggiare_gateway import NoleggiareGateway  # noqa: E402
+from app.infrastructure.gateways.supplier_simulator import (  # noqa: E402
+    AVIS_SUCCESS_RS,
+    CENTAURO_CONFIRMED_RS,
+    NIZA_CONFIRMED_RS,
+    OTA_SUCCESS_RS,
+    simulator_factory_config,
+)
+from app.infrastructure.gateways.xml_response import scan_ota_response  # noqa: E402
+from app.infrastructure.gateways.xml_templates import soap_envelope  # noqa: E402
+
+BASE_URL = "http://bench"
+CONCURRENCY = (1, 10, 100)
+# Métricas donde un valor mayor es mejor (el resto: menor es mejor)
+HIGHER_IS_BETTER = ("throughput_",)
+
+SNAPSHOT = {
+    "reservation_code": "MCR-1",
+    "pickup_location_code": "CUN",
+    "dropoff_location_code": "CUN",
+    "pickup_office_code": "CUN",
+    "dropoff_office_code": "CUN",
+    "acriss_code": "ECAR",
+    "supplier_car_product_id": "RATE-1",
+    "pickup_datetime": "2026-11-01T10:00:00",
+    "dropoff_datetime": "2026-11-08T10:00:00",
+    "pickup_date": "2026-11-01",
+    "dropoff_date": "2026-11-08",
+    "supplier_specific_data": {
+        "Group": "A",
+        "rate_code": "R",
+        "class_code": "C",
+        "rate_id": 1,
+        "book_id": "BK-1",  # Europcar
+        "session_id": "SESSION-1",
+        "car_type": "ECAR",  # Infinity
+        "vendor_rate_id": "RATE-1",
+    },
+    "customer": {"first_name": "José & Ana", "last_name": "O'Brien <VIP>", "email": "c@e.com"},
+    "drivers": [{"first_name": "José & Ana", "last_name": "O'Brien <VIP>"}],
+    "supplier_cost_total": "100.00",
+}
+
+RESPONSES: dict[str, tuple[str, bytes]] = {
+    "/americagroup": ("text/xml", OTA_SUCCESS_RS.render(declaration=True, conf_id="AG100001")),
+    "/avis": ("text/xml", soap_envelope(AVIS_SUCCESS_RS.render(conf_id="AV100001"))),
+    "/centauro": ("text/xml", CENTAURO_CONFIRMED_RS.render(conf_id="100001")),
+    "/europcar": ("application/json", b'{"result": {"BookingNumber": "EC100001"}}'),
+    "/hertzargentina/token": (
+        "application/json",
+        b'{"access_token": "bench", "token_type": "Bearer", "expires_in": 86400}',
+    ),
+    "/hertzargentina/Booking": (
+        "application/json",
+        b'{"id": "HZ100001", "status": "CONFIRMED"}',
+    ),
+    "/infinity": ("text/xml", OTA_SUCCESS_RS.render(declaration=True, conf_id="IN100001")),
+    "/localiza": ("text/xml", soap_envelope(OTA_SUCCESS_RS.render(conf_id="LZ100001"))),
+    "/mexgroup/api/brokers/login": (
+        "application/json",
+        b'{"type": "success", "data": {"token": "bench", "expires_in": 86400}}',
+    ),
+    "/mexgroup/api/brokers/booking-engine/reserve": (
+        "application/json",
+        b'{"type": "success", "data": {"noConfirmation": "MX100001"}}',
+    ),
+    "/national/otas/reservaciones": ("application/json", b'{"data": {"id": 100001}}'),
+    "/nizacars/Create_Reservation.asmx": (
+        "text/xml",
+        soap_envelope(NIZA_CONFIRMED_RS.render(conf_id="100001")),
+    ),
+    "/noleggiare": ("text/xml", soap_envelope(OTA_SUCCESS_RS.render(conf_id="NL100001"))),
+}
+
+
+class CentauroBench(CentauroAdapter):
+    async def confirm_booking(self, reservation_code, details):
+        raise NotImplementedError
+
+
+@dataclass
+class AdapterBench:
+    gateway: SupplierGateway
+    response_path: str  # respuesta de confirmación que se parsea
+    parse: Callable[[bytes], Any]
+    build: Callable[[], bytes] | None = None  # None: JSON capturado del book()
+
+
+def _niza_parse(content: bytes) -> str | None:
+    # Mismo recorrido que NizaCarsGateway.book (parseo inline con ElementTree)
+    for elem in ET.fromstring(content).iter():
+        if elem.tag.endswith("ReservationID") and elem.text and elem.text.isdigit():
+            return elem.text
+    return None
+
+
+def _adapters() -> dict[str, AdapterBench]:
+    conf = simulator_factory_config(BASE_URL)
+    factory = SupplierGatewayFactory(conf)
+    america = AmericaGroupGateway(conf["americagroup"]["endpoint"], "5")
+    avis = factory.get_adapter("16")
+    centauro = CentauroBench(conf["centauro"]["base_url"], "bench", "bench", 1)
+    europcar = EuropcarGroupGateway(f"{BASE_URL}/europcar")
+    return {
+        "america_group": AdapterBench(
+            america, "/americagroup", america._extract_conf_id, BUILDERS["america_group"]
+        ),
+        "avis": AdapterBench(
+            avis, "/avis", lambda content: avis._parse_confirmation_code(content.decode()),
+            BUILDERS["avis"],
+        ),
+        "centauro": AdapterBench(
+            centauro, "/centauro", centauro._parse_response, BUILDERS["centauro"]
+        ),
+        "europcar_group": AdapterBench(
+            europcar, "/europcar",
+            lambda content: europcar._extract_booking_number(json.loads(content)),
+        ),
+        "hertz_argentina": AdapterBench(
+            factory.get_adapter("128"), "/hertzargentina/Booking", json.loads
+        ),
+        "infinity_group": AdapterBench(
+            InfinityGroupGateway(f"{BASE_URL}/infinity"), "/infinity", scan_ota_response,
+            BUILDERS["infinity_group"],
+        ),
+        "localiza": AdapterBench(
+            factory.get_adapter("localiza"), "/localiza",
+            lambda content: scan_ota_response(content, root_tag="OTA_VehResRS"),
+            BUILDERS["localiza"],
+        ),
+        "mex_group": AdapterBench(
+            factory.get_adapter("28"), "/mexgroup/api/brokers/booking-engine/reserve", json.loads
+        ),
+        "national_group": AdapterBench(
+            NationalGroupGateway(f"{BASE_URL}/national", "bench"),
+            "/national/otas/reservaciones",
+            json.loads,
+        ),
+        "niza_cars": AdapterBench(
+            factory.get_adapter("126"), "/nizacars/Create_Reservation.asmx", _niza_parse,
+            BUILDERS["niza_cars"],
+        ),
+        "noleggiare": AdapterBench(
+            NoleggiareGateway(f"{BASE_URL}/noleggiare", "bench", "bench", "bench"),
+            "/noleggiare",
+            lambda content: scan_ota_response(content, root_tag="OTA_VehResRS"),
+            BUILDERS["noleggiare"],
+        ),
+    }
+
+
+class MockSupplier:
+    """Handler del httpx.MockTransport: respuestas enlatadas por path."""
+
+    def __init__(self, latency_seconds: float = 0.0) -> None:
+        self.latency_seconds = latency_seconds
+        self.last_bodies: dict[str, bytes] = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        self.last_bodies[request.url.path] = request.content
+        content_type, body = RESPONSES[request.url.path]
+        return httpx.Response(200, content=body, headers={"Content-Type": content_type})
+
+
+def _per_call_us(func: Callable[[], Any], iterations: int, repeats: int) -> float:
+    # Como timeit: sin GC durante la medición y la mejor repetición, lo más estable
+    # entre corridas en máquinas con ruido
+    samples = []
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            samples.append((time.perf_counter() - started) / iterations * 1e6)
+    finally:
+        gc.enable()
+    return min(samples)
+
+
+def _peak_bytes(func: Callable[[], Any]) -> int:
+    func()  # warm-up: cachés, imports perezosos
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base
+
+
+async def _peak_bytes_async(func: Callable[[], Awaitable[Any]]) -> int:
+    await func()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base
+
+
+def _percentile(sorted_samples: list[float], pct: float) -> float:
+    index = min(len(sorted_samples) - 1, round(pct / 100 * (len(sorted_samples) - 1)))
+    return sorted_samples[index]
+
+
+async def _throughput(book: Callable[[], Awaitable[Any]], in_flight: int, total: int) -> float:
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def one() -> None:
+        async with semaphore:
+            await book()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def _bench_adapter(
+    bench: AdapterBench, mock: MockSupplier, args: argparse.Namespace
+) -> dict[str, float]:
+    async def book():
+        result = await bench.gateway.book("MCR-1", "bench", reservation_snapshot=SNAPSHOT)
+        if result.status != "SUCCESS":
+            raise RuntimeError(f"{result.error_code}: {result.error_message}")
+        return result
+
+    await book()  # warm-up: token, cliente HTTP, breaker
+    build = bench.build
+    if build is None:
+        body = json.loads(mock.last_bodies[bench.response_path])
+        build = lambda: json.dumps(body).encode()  # noqa: E731
+    response = RESPONSES[bench.response_path][1]
+    parse = lambda: bench.parse(response)  # noqa: E731
+
+    latencies = []
+    for _ in range(args.book_iterations):
+        started = time.perf_counter()
+        await book()
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+
+    metrics = {
+        "build_us": _per_call_us(build, args.iterations, args.repeats),
+        "build_bytes": len(build()),
+        "build_alloc_peak_bytes": _peak_bytes(build),
+        "parse_us": _per_call_us(parse, args.iterations, args.repeats),
+        "parse_alloc_peak_bytes": _peak_bytes(parse),
+        "book_us_p50": _percentile(latencies, 50),
+        "book_us_p99": _percentile(latencies, 99),
+        "book_alloc_peak_bytes": await _peak_bytes_async(book),
+    }
+    for in_flight in CONCURRENCY:
+        total = max(args.book_iterations, in_flight * 10)
+        metrics[f"throughput_{in_flight}"] = await _throughput(book, in_flight, total)
+    return metrics
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Métricas que empeoraron más de `threshold` (0.2 = 20%) respecto del baseline."""
+    regressions = []
+    for adapter, metrics in results.items():
+        previous = baseline.get(adapter, {})
+        for name, value in metrics.items():
+            old = previous.get(name)
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if name.startswith(HIGHER_IS_BETTER) else change
+            if worse > threshold:
+                regressions.append(f"{adapter}.{name}: {old:.1f} -> {value:.1f} ({change:+.0%})")
+    return regressions
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print(name: str, m: dict[str, float]) -> None:
+    throughput = " ".join(f"{m[f'throughput_{n}']:7.0f}" for n in CONCURRENCY)
+    print(
+        f"{name:<16} build {m['build_us']:7.1f}us  parse {m['parse_us']:7.1f}us  "
+        f"book p50 {m['book_us_p50']:7.0f}us p99 {m['book_us_p99']:7.0f}us  "
+        f"alloc {m['book_alloc_peak_bytes'] / 1024:6.1f}KiB  req/s {throughput}"
+    )
+
+
+async def _run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    mock = MockSupplier(latency_seconds=args.mock_latency_ms / 1000)
+    clients = SupplierHttpClients(
+        max_connections=max(CONCURRENCY), transport=httpx.MockTransport(mock)
+    )
+    adapters = _adapters()
+    results = {}
+    with patch(
+        "app.infrastructure.gateways.http_clients.get_supplier_http_clients",
+        return_value=clients,
+    ):
+        try:
+            for name in args.adapters or adapters:
+                results[name] = await _bench_adapter(adapters[name], mock, args)
+                _print(name, results[name])
+        finally:
+            await clients.aclose()
+            get_supplier_breakers().reset()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--adapters", nargs="*", help="por defecto todos")
+    parser.add_argument("--iterations", type=int, default=2_000, help="build/parse por repetición")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--book-iterations", type=int, default=500)
+    parser.add_argument("--mock-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, help="guardar resultados en JSON")
+    parser.add_argument("--baseline", type=Path, help="JSON de una corrida anterior")
+    parser.add_argument("--threshold", type=float, default=0.2, help="0.2 = 20%% peor")
+    args = parser.parse_args()
+
+    results = asyncio.run(_run(args))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        report = {
+            "commit": _commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "mock_latency_ms": args.mock_latency_ms,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2, sort_keys=True))
+        print(f"Resultados en {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("mock_latency_ms") != args.mock_latency_ms:
+            print("El baseline se corrió con otro --mock-latency-ms; no son comparables")
+            return 2
+        regressions = compare(results, baseline["results"], args.threshold)
+        for line in regressions:
+            print(f"REGRESIÓN {line}")
+        if regressions:
+            return 1
+        reference = baseline.get("commit") or args.baseline
+        print(f"Sin regresiones > {args.threshold:.0%} contra {reference}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
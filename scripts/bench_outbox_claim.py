@@ -0,0 +1,169 @@
+"""
+Benchmark de latencia de claim sobre outbox_events a medida que crece la tabla.
+
+Siembra filas DONE (históricas) hasta cada tamaño pedido, manteniendo un número
+fijo de eventos listos, y mide OutboxRepoSQL.claim_ready y OutboxRepoSQL.claim.
+Cada muestra corre en una transacción que se revierte, así el estado no cambia.
+Falla (exit 1) si la p50 en el tamaño mayor supera max-ratio veces la del menor.
+
+Uso:
+    python scripts/bench_outbox_claim.py --sizes 10000 100000 1000000
+    python scripts/bench_outbox_claim.py --database-url mysql+aiomysql://... (BD de pruebas)
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add project root to sys.path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import delete, func, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.infrastructure.db.repositories.outbox_repo_sql import OutboxRepoSQL  # noqa: E402
+from app.infrastructure.db.tables import metadata, outbox_events  # noqa: E402
+
+BENCH_PREFIX = "BENCH-"
+CHUNK = 20_000
+
+
+def _rows(start: int, count: int, status: str, now: datetime) -> list[dict]:
+    return [
+        {
+            "event_type": "BOOK_SUPPLIER",
+            "aggregate_type": "reservation",
+            "aggregate_code": f"{BENCH_PREFIX}{start + i}",
+            "payload": {"reservation_code": f"{BENCH_PREFIX}{start + i}"},
+            "status": status,
+            "attempts": 0 if status == "NEW" else 1,
+            "next_attempt_at": now - timedelta(minutes=1),
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+async def _count(engine) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(outbox_events))).scalar()
+
+
+async def _seed_done(engine, target: int, now: datetime) -> None:
+    current = await _count(engine)
+    while current < target:
+        count = min(CHUNK, target - current)
+        async with engine.begin() as conn:
+            await conn.execute(insert(outbox_events), _rows(current, count, "DONE", now))
+        current += count
+
+
+async def _sample(session_maker, fn) -> float:
+    session = session_maker()
+    try:
+        await session.begin()
+        started = time.perf_counter()
+        await fn(OutboxRepoSQL(session))
+        elapsed = time.perf_counter() - started
+        await session.rollback()
+        return elapsed * 1000
+    finally:
+        await session.close()
+
+
+async def run(database_url: str, sizes: list[int], ready: int, samples: int) -> dict:
+    engine = create_async_engine(database_url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    now = datetime.utcnow()
+    results: dict[int, dict[str, float]] = {}
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+            await conn.execute(
+                insert(outbox_events), _rows(10_000_000, ready, "NEW", now)
+            )
+        ready_code = f"{BENCH_PREFIX}{10_000_000 + ready // 2}"
+
+        for size in sorted(sizes):
+            await _seed_done(engine, size, now)
+            batch = [
+                await _sample(
+                    session_maker,
+                    lambda repo: repo.claim_ready(limit=10, locked_by="bench", now=now),
+                )
+                for _ in range(samples)
+            ]
+            single = [
+                await _sample(
+                    session_maker,
+                    lambda repo: repo.claim(
+                        aggregate_code=ready_code,
+                        event_type="BOOK_SUPPLIER",
+                        locked_by="bench",
+                        now=now,
+                    ),
+                )
+                for _ in range(samples)
+            ]
+            results[size] = {
+                "claim_ready_p50_ms": statistics.median(batch),
+                "claim_p50_ms": statistics.median(single),
+            }
+            print(
+                f"rows={await _count(engine):>9}  "
+                f"claim_ready p50={results[size]['claim_ready_p50_ms']:7.3f} ms  "
+                f"claim p50={results[size]['claim_p50_ms']:7.3f} ms"
+            )
+    finally:
+        if not database_url.startswith("sqlite"):
+            async with engine.begin() as conn:
+                await conn.execute(
+                    delete(outbox_events).where(
+                        outbox_events.c.aggregate_code.like(f"{BENCH_PREFIX}%")
+                    )
+                )
+        await engine.dispose()
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--ready", type=int, default=200, help="eventos NEW listos para claim")
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+
+    tmp_db = None
+    database_url = args.database_url
+    if not database_url:
+        tmp_db = os.path.join(tempfile.mkdtemp(), "bench_outbox.db")
+        database_url = f"sqlite+aiosqlite:///{tmp_db}"
+
+    try:
+        results = asyncio.run(run(database_url, args.sizes, args.ready, args.samples))
+    finally:
+        if tmp_db and os.path.exists(tmp_db):
+            os.remove(tmp_db)
+
+    smallest, largest = results[min(results)], results[max(results)]
+    failed = False
+    for metric in ("claim_ready_p50_ms", "claim_p50_ms"):
+        ratio = largest[metric] / max(smallest[metric], 1e-6)
+        status = "OK" if ratio <= args.max_ratio else "FAIL"
+        failed = failed or status == "FAIL"
+        print(f"{metric}: {ratio:.2f}x between {min(results)} and {max(results)} rows [{status}]")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Benchmark del costo de construir los payloads XML/SOAP de reserva por supplier.
+
+Renderiza con las plantillas precompiladas de cada adapter (OTA_VehResRQ, SOAP
+envelope, RESERVATION de Centauro) con datos representativos, incluyendo
+caracteres que hay que escapar, y reporta µs por payload y tamaño en bytes.
+Como referencia mide el mismo OTA_VehResRQ armado con ElementTree (el enfoque
+anterior de America Group). Falla (exit 1) si algún adapter supera --max-us.
+
+Uso:
+    python scripts/bench_xml_payloads.py
+    python scripts/bench_xml_payloads.py --iterations 50000 --max-us 50
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from xml.etree.ElementTree import Element, SubElement, tostring
+
+# Add project root to sys.path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from app.infrastructure.gateways import (  # noqa: E402
+    infinity_group_gateway,
+    localiza_gateway,
+    niza_cars_gateway,
+    noleggiare_gateway,
+)
+from app.infrastructure.gateways.america_group_gateway import AmericaGroupGateway  # noqa: E402
+from app.infrastructure.gateways.avis_adapter import AvisAdapter  # noqa: E402
+from app.infrastructure.gateways.centauro_adapter import RESERVATION  # noqa: E402
+from app.infrastructure.gateways.xml_templates import (  # noqa: E402
+    OTA_NS,
+    soap_envelope,
+    xml_attr,
+)
+
+FIRST_NAME = "José & Ana"
+LAST_NAME = "O'Brien <VIP>"
+EMAIL = "cliente@example.com"
+PICKUP = "2026-11-01T10:00:00"
+DROPOFF = "2026-11-08T10:00:00"
+
+SNAPSHOT = {"first_name": FIRST_NAME, "last_name": LAST_NAME, "customer_email": EMAIL}
+
+AMERICA = AmericaGroupGateway(endpoint="http://bench", requestor_id="5")
+AVIS = AvisAdapter("http://bench", "user", "p&ss")
+
+
+def _america() -> bytes:
+    return AMERICA._build_xml(
+        "MCR-1", "CUN", "CUN", "ECAR", "RATE-1", PICKUP, DROPOFF, "MCR-1", SNAPSHOT
+    ).encode()
+
+
+def _avis() -> bytes:
+    return AVIS._build_soap_envelope(
+        AVIS._build_ota_res_rq("MIA", PICKUP, DROPOFF, EMAIL, FIRST_NAME, LAST_NAME)
+    )
+
+
+def _localiza() -> bytes:
+    veh_pref = localiza_gateway.VEH_PREF.render(
+        size_attr=xml_attr("Size", "4"), category_attr=xml_attr("VehicleCategory", "1")
+    )
+    body = localiza_gateway.VEH_RES_RQ.render(
+        echo_token="echo", requestor_id="REQ", pu_date=PICKUP, do_date=DROPOFF,
+        pu_loc="GRU", do_loc="GRU", veh_pref=veh_pref,
+        first_name=FIRST_NAME, last_name=LAST_NAME, email=EMAIL,
+    )
+    return soap_envelope(body, namespaces={"ota": OTA_NS}, declaration=False)
+
+
+def _infinity() -> bytes:
+    return infinity_group_gateway.VEH_RES_RQ.render(
+        requestor_id="92", ref_id="MCR-1", pu_datetime=PICKUP, do_datetime=DROPOFF,
+        pu_loc_code="CUN", do_loc_code="CUN", car_type="ECAR", vendor_rate_id="RATE-1",
+        first_name=FIRST_NAME, last_name=LAST_NAME, email=EMAIL,
+    )
+
+
+def _noleggiare() -> bytes:
+    body = noleggiare_gateway.VEH_RES_RQ.render(
+        version="1.0", target="Test", echo_token="echo", username="user", password="p&ss",
+        company="MCR", pu_date=PICKUP, do_date=DROPOFF, pu_loc="FCO", do_loc="FCO",
+        first_name=FIRST_NAME, last_name=LAST_NAME, phone="000", email=EMAIL,
+        sipp_code="MBMR",
+        arrival_details=noleggiare_gateway.ARRIVAL_DETAILS.render(
+            flight_no="AZ610", pu_date=PICKUP
+        ),
+    )
+    return soap_envelope(body, namespaces={"ns": OTA_NS})
+
+
+def _niza() -> bytes:
+    body = niza_cars_gateway.CREATE_RESERVATION.render(
+        company_code="C", customer_code="K", username="user", password="p&ss",
+        group="A", rate_code="FF", pickup_date=PICKUP, pickup_station="LIS",
+        dropoff_date=DROPOFF, dropoff_station="LIS", name=f"{FIRST_NAME} {LAST_NAME}",
+        email=EMAIL, birth_date="1990-01-01",
+    )
+    return soap_envelope(body)
+
+
+def _centauro() -> bytes:
+    return RESERVATION.render(
+        agency_id=b"", code="MCR-1", name=FIRST_NAME, surname=LAST_NAME, pickup="AGP",
+        dropoff="AGP", created="01/11/2026 09:00:00", start="01/11/2026 10:00:00",
+        end="08/11/2026 10:00:00", flight="", category="ECAR",
+        total=b"<TOTAL><NET>100</NET></TOTAL>",
+    )
+
+
+def _etree_reference() -> bytes:
+    """El OTA_VehResRQ de America Group construido nodo a nodo con ElementTree."""
+    root = Element("OTA_VehResRQ", Version="1.00")
+    SubElement(SubElement(SubElement(root, "POS"), "Source"), "RequestorID", ID="5")
+    SubElement(SubElement(root, "BookingReferenceID"), "UniqueID_Type", ID="MCR-1")
+    core = SubElement(root, "VehResRQCore")
+    rental_core = SubElement(
+        core, "VehRentalCore", PickUpDateTime=PICKUP, ReturnDateTime=DROPOFF
+    )
+    SubElement(rental_core, "PickUpLocation", LocationCode="CUN")
+    SubElement(rental_core, "ReturnLocation", LocationCode="CUN")
+    veh_pref = SubElement(core, "VehPref", VendorCarType="ECAR")
+    SubElement(veh_pref, "VehClass").text = "ECAR"
+    SubElement(veh_pref, "VehType")
+    SubElement(core, "RateQualifier", VendorRateID="RATE-1")
+    primary = SubElement(SubElement(core, "Customer"), "Primary")
+    person_name = SubElement(primary, "PersonName")
+    SubElement(person_name, "GivenName").text = FIRST_NAME
+    SubElement(person_name, "Surname").text = LAST_NAME
+    SubElement(SubElement(primary, "Email"), "Value").text = EMAIL
+    return tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+BUILDERS = {
+    "america_group": _america,
+    "avis": _avis,
+    "localiza": _localiza,
+    "infinity_group": _infinity,
+    "noleggiare": _noleggiare,
+    "niza_cars": _niza,
+    "centauro": _centauro,
+    "elementtree_reference": _etree_reference,
+}
+
+
+def _measure(build, iterations: int, repeats: int) -> list[float]:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            build()
+        samples.append((time.perf_counter() - started) / iterations * 1e6)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-us", type=float, default=100.0, help="µs por payload")
+    args = parser.parse_args()
+
+    failed = False
+    for name, build in BUILDERS.items():
+        size = len(build())
+        samples = _measure(build, args.iterations, args.repeats)
+        best, median = min(samples), statistics.median(samples)
+        status = "OK"
+        if name != "elementtree_reference" and median > args.max_us:
+            status, failed = "SLOW", True
+        print(f"{name:<24} {median:8.2f} us/payload (best {best:.2f})  {size:5d} bytes [{status}]")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
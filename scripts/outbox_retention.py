@@ -0,0 +1,62 @@
+"""
+Archiva/borra eventos terminales del outbox y dead letters antiguos.
+
+Uso:
+    python scripts/outbox_retention.py                 # una pasada con valores de Settings
+    python scripts/outbox_retention.py --mode delete --days 3 --max-rate 5000
+    python scripts/outbox_retention.py --every 3600    # proceso continuo
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add project root to sys.path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from app.config import get_settings  # noqa: E402
+from app.infrastructure.db.mysql_engine import build_engine, build_sessionmaker  # noqa: E402
+from app.infrastructure.db.outbox_retention import OutboxRetentionJob  # noqa: E402
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    engine = build_engine(settings)
+    job = OutboxRetentionJob(
+        session_maker=build_sessionmaker(engine),
+        retention_days=args.days if args.days is not None else settings.outbox_retention_days,
+        dlq_retention_days=(
+            args.dlq_days if args.dlq_days is not None else settings.outbox_dlq_retention_days
+        ),
+        mode=args.mode or settings.outbox_retention_mode,
+        batch_size=args.batch_size or settings.outbox_retention_batch_size,
+        pause_seconds=(
+            args.pause if args.pause is not None else settings.outbox_retention_pause_seconds
+        ),
+        max_rows_per_second=args.max_rate,
+    )
+    try:
+        if args.every:
+            await job.run_forever(interval_seconds=args.every)
+        else:
+            for report in await job.run_once():
+                print(
+                    f"{report.table}: {report.rows} rows in {report.batches} batches "
+                    f"({report.rows_per_second:.0f} rows/s)"
+                )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Outbox retention / archival")
+    parser.add_argument("--mode", choices=["archive", "delete"], default=None)
+    parser.add_argument("--days", type=int, default=None)
+    parser.add_argument("--dlq-days", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=None)
+    parser.add_argument("--max-rate", type=float, default=None, help="max rows/s")
+    parser.add_argument("--every", type=float, default=None, help="run continuously (seconds)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""
+Reencola en bloque eventos del DLQ (outbox_dead_letters) a ritmo controlado.
+
+Uso:
+    python scripts/replay_dlq.py --supplier-id 93 --error-code TIMEOUT --rate 2
+    python scripts/replay_dlq.py --since 2026-10-17T08:00 --until 2026-10-17T10:00
+    python scripts/replay_dlq.py --resume 12       # continúa un replay interrumpido
+    python scripts/replay_dlq.py --status 12
+"""
+
+import argparse
+import asyncio
+import sys
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+
+# Add project root to sys.path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from app.application.interfaces.dlq_replay_repo import DeadLetterFilter  # noqa: E402
+from app.application.use_cases.replay_dead_letters import ReplayDeadLettersUseCase  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.infrastructure.db.mysql_engine import build_engine, build_sessionmaker  # noqa: E402
+from app.infrastructure.db.repositories.dlq_replay_repo_sql import DlqReplayRepoSQL  # noqa: E402
+
+
+def _print(replay) -> None:
+    print(
+        f"replay {replay.id} {replay.status}: {replay.replayed} replayed, "
+        f"{replay.skipped} skipped of {replay.total} (cursor {replay.last_dead_letter_id})"
+    )
+    if replay.error_message:
+        print(f"  error: {replay.error_message}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings = get_settings()
+    engine = build_engine(settings)
+    replays = ReplayDeadLettersUseCase(DlqReplayRepoSQL(build_sessionmaker(engine)))
+    try:
+        if args.status:
+            replay = await replays.get(args.status)
+            _print(replay)
+            print(asdict(replay)["filters"])
+            return
+        if args.resume:
+            replay = await replays.resume(args.resume)
+        else:
+            replay = await replays.start(
+                DeadLetterFilter(
+                    supplier_id=args.supplier_id,
+                    error_code=args.error_code,
+                    event_type=args.event_type,
+                    moved_from=args.since,
+                    moved_to=args.until,
+                ),
+                rate_per_second=args.rate or settings.outbox_dlq_replay_rate_per_second,
+                batch_size=args.batch_size or settings.outbox_dlq_replay_batch_size,
+            )
+            print(f"replay {replay.id}: {replay.total} dead letters match")
+        # Ctrl+C leaves the replay RUNNING at its last committed batch: --resume continues it
+        _print(await replays.run(replay.id))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk DLQ replay")
+    parser.add_argument("--supplier-id", type=int, default=None)
+    parser.add_argument("--error-code", default=None)
+    parser.add_argument("--event-type", default=None)
+    parser.add_argument("--since", type=datetime.fromisoformat, default=None, help="moved_at >=")
+    parser.add_argument("--until", type=datetime.fromisoformat, default=None, help="moved_at <")
+    parser.add_argument("--rate", type=float, default=None, help="replayed events/s")
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--resume", type=int, default=None, metavar="REPLAY_ID")
+    parser.add_argument("--status", type=int, default=None, metavar="REPLAY_ID")
+    asyncio.run(main(parser.parse_args()))
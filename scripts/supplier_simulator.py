@@ -0,0 +1,101 @@
+"""
+Levanta el simulador local de suppliers (app/infrastructure/gateways/supplier_simulator.py).
+
+Los gateways se apuntan al simulador con SUPPLIER_SIMULATOR_URL en el .env de
+la API / workers. Los perfiles se pueden cambiar en caliente:
+    curl -X PUT localhost:8099/_profiles/mexgroup -H 'Content-Type: application/json' \\
+         -d '{"error_rate": 1.0}'
+    curl localhost:8099/_stats
+
+Uso:
+    python scripts/supplier_simulator.py --latency-ms 300 --error-rate 0.02
+    python scripts/supplier_simulator.py --latency uniform --latency-ms 200 --jitter-ms 150
+    python scripts/supplier_simulator.py --profile 'localiza={"timeout_rate": 0.1}' --seed 7
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+# Add project root to sys.path
+project_root = Path(__file__).resolve().parent.parent
+sys.path.append(str(project_root))
+
+from app.infrastructure.gateways.supplier_simulator import (  # noqa: E402
+    LATENCY_FIXED,
+    LATENCY_LOGNORMAL,
+    LATENCY_UNIFORM,
+    SUPPLIERS,
+    SimulatorConfig,
+    SimulatorProfile,
+    create_supplier_simulator,
+)
+
+
+def _profile_override(value: str) -> tuple[str, dict]:
+    supplier, _, changes = value.partition("=")
+    if supplier not in SUPPLIERS:
+        raise argparse.ArgumentTypeError(f"supplier debe ser uno de {', '.join(SUPPLIERS)}")
+    try:
+        return supplier, json.loads(changes)
+    except json.JSONDecodeError as exc:
+        raise argparse.ArgumentTypeError(f"JSON inválido para {supplier}: {exc}") from exc
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument(
+        "--latency",
+        choices=(LATENCY_FIXED, LATENCY_UNIFORM, LATENCY_LOGNORMAL),
+        default=LATENCY_LOGNORMAL,
+    )
+    parser.add_argument("--latency-ms", type=float, default=250.0, help="mediana / valor / centro")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="± para --latency uniform")
+    parser.add_argument("--sigma", type=float, default=0.5, help="dispersión de lognormal")
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--hang-seconds", type=float, default=60.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--reject-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--profile",
+        type=_profile_override,
+        action="append",
+        default=[],
+        help='supplier={"campo": valor}; se aplica sobre el perfil por defecto',
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    try:
+        default = SimulatorProfile(
+            latency=args.latency,
+            latency_ms=args.latency_ms,
+            latency_jitter_ms=args.jitter_ms,
+            latency_sigma=args.sigma,
+            timeout_rate=args.timeout_rate,
+            hang_seconds=args.hang_seconds,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            reject_rate=args.reject_rate,
+        )
+        profiles = {supplier: replace(default, **changes) for supplier, changes in args.profile}
+    except (TypeError, ValueError) as exc:
+        parser.error(f"perfil inválido: {exc}")
+    config = SimulatorConfig(default=default, profiles=profiles, seed=args.seed)
+
+    import uvicorn
+
+    print(f"Supplier simulator on http://{args.host}:{args.port}")
+    print(f"  SUPPLIER_SIMULATOR_URL=http://{args.host}:{args.port}")
+    app = create_supplier_simulator(config)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+-- Migration: bulk DLQ replay (ReplayDeadLettersUseCase)
+-- Date: 2026-10-17
+--
+-- outbox_dead_letters gains the event's supplier_id (replay selection by
+-- supplier) and replay_id/replayed_at (a dead letter is replayed at most
+-- once). outbox_dlq_replays stores each replay's filters, rate and keyset
+-- cursor, advanced in the same transaction that re-enqueues each batch, so
+-- an interrupted replay resumes where it stopped.
+
+ALTER TABLE outbox_dead_letters
+    ADD COLUMN supplier_id INT NOT NULL DEFAULT 0,
+    ADD COLUMN replay_id INT NULL,
+    ADD COLUMN replayed_at DATETIME NULL,
+    ADD INDEX idx_outbox_dlq_supplier (supplier_id, id);
+
+UPDATE outbox_dead_letters d
+JOIN outbox_events o ON o.id = d.original_event_id
+SET d.supplier_id = o.supplier_id
+WHERE d.supplier_id = 0;
+
+CREATE TABLE outbox_dlq_replays (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    status VARCHAR(16) NOT NULL,
+    supplier_id INT NULL,
+    error_code VARCHAR(64) NULL,
+    event_type VARCHAR(64) NULL,
+    moved_from DATETIME NULL,
+    moved_to DATETIME NULL,
+    rate_per_second DOUBLE NOT NULL,
+    batch_size INT NOT NULL,
+    total INT NOT NULL DEFAULT 0,
+    last_dead_letter_id INT NOT NULL DEFAULT 0,
+    replayed INT NOT NULL DEFAULT 0,
+    skipped INT NOT NULL DEFAULT 0,
+    error_message VARCHAR(500) NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    finished_at DATETIME NULL
+);
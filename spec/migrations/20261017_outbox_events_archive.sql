@@ -0,0 +1,17 @@
+-- Migration: archive table for outbox retention (app/infrastructure/db/outbox_retention.py)
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS outbox_events_archive (
+  id INT NOT NULL PRIMARY KEY,
+  event_type VARCHAR(64) NOT NULL,
+  aggregate_type VARCHAR(32) NOT NULL,
+  aggregate_id INT NULL,
+  aggregate_code VARCHAR(50) NULL,
+  payload JSON NOT NULL,
+  status VARCHAR(16) NOT NULL,
+  attempts INT NOT NULL DEFAULT 0,
+  created_at DATETIME NULL,
+  updated_at DATETIME NULL,
+  archived_at DATETIME NOT NULL,
+  KEY idx_outbox_archive_aggregate (aggregate_code)
+);
@@ -0,0 +1,18 @@
+-- Migration: one outbox event per (aggregate_code, event_type)
+-- Date: 2026-10-17
+--
+-- OutboxRepoSQL.enqueue coalesces on this key (INSERT ... ON DUPLICATE KEY UPDATE
+-- no-op), so PayReservationUseCase and the Stripe webhook can both enqueue
+-- BOOK_SUPPLIER for the same reservation without a second supplier booking.
+-- Run after 20261017_outbox_events_indexes.sql.
+
+-- 1. Collapse existing duplicates, keeping the oldest event of each pair.
+DELETE dup FROM outbox_events dup
+JOIN outbox_events keep
+  ON keep.aggregate_code = dup.aggregate_code
+ AND keep.event_type = dup.event_type
+ AND keep.id < dup.id;
+
+-- 2. The unique key also serves the per-reservation claim lookup.
+CREATE UNIQUE INDEX uq_outbox_aggregate_event ON outbox_events (aggregate_code, event_type);
+DROP INDEX idx_outbox_aggregate_event ON outbox_events;
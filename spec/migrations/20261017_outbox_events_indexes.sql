@@ -0,0 +1,20 @@
+-- Migration: composite indexes for outbox_events claim queries
+-- Date: 2026-10-17
+--
+-- OutboxRepoSQL.claim_ready (batch poller):
+--   WHERE status IN ('NEW','RETRY') [OR status = 'IN_PROGRESS' AND lock_expires_at <= now]
+--     AND next_attempt_at <= now ... ORDER BY next_attempt_at, id LIMIT n
+--   -> range scan on idx_outbox_worker_claim; DONE/FAILED rows are never read.
+-- OutboxRepoSQL.claim (single reservation):
+--   WHERE aggregate_code = ? AND event_type = ? AND status IN (...)
+--   -> uq_outbox_aggregate_event (see 20261017_outbox_events_dedup.sql).
+--
+-- Indexes are defined in app/infrastructure/db/tables.py so create_all() builds
+-- them for SQLite/dev. idx_outbox_worker_claim (status, next_attempt_at, id)
+-- already comes from 20260115_outbox_events.sql with this exact definition, so
+-- it is not created again here (MySQL aborts on a duplicate key name).
+
+CREATE INDEX idx_outbox_aggregate_event ON outbox_events (aggregate_code, event_type, status);
+
+-- idx_outbox_status_next (status, next_attempt_at) is a prefix of idx_outbox_worker_claim
+DROP INDEX idx_outbox_status_next ON outbox_events;
@@ -0,0 +1,14 @@
+-- Migration: shard_key on outbox_events for the multi-process worker runner
+-- Date: 2026-10-17
+--
+-- shard_key = CRC32(aggregate_code) & 0x7FFFFFFF, computed on enqueue
+-- (app.application.interfaces.outbox_repo.outbox_shard_key, zlib.crc32 matches
+-- MySQL CRC32). `python -m app.infrastructure.messaging --processes N` makes
+-- process i claim only rows with shard_key % N = i. Rows left NULL are claimed
+-- by shard 0, so the backfill below can run after deploying.
+
+ALTER TABLE outbox_events ADD COLUMN shard_key INT NULL AFTER updated_at;
+
+UPDATE outbox_events
+SET shard_key = CRC32(COALESCE(aggregate_code, '')) & 2147483647
+WHERE shard_key IS NULL;
@@ -0,0 +1,19 @@
+-- Migration: supplier_id on outbox_events for per-supplier fair scheduling
+-- Date: 2026-10-17
+--
+-- Copy of reservations.supplier_id, set on enqueue (0 = event not tied to a
+-- supplier). The worker counts ready events per supplier and claims each
+-- supplier's share separately (SupplierFairScheduler), so a backlog for one
+-- slow supplier no longer holds every worker slot. Rows keep 0 until the
+-- backfill below runs; until then they are scheduled as a single bucket.
+
+ALTER TABLE outbox_events
+    ADD COLUMN supplier_id INT NOT NULL DEFAULT 0 AFTER shard_key,
+    ADD INDEX idx_outbox_supplier_claim (supplier_id, status, next_attempt_at, id);
+
+UPDATE outbox_events o
+JOIN reservations r ON r.reservation_code = o.aggregate_code
+SET o.supplier_id = r.supplier_id
+WHERE o.aggregate_type = 'reservation'
+  AND o.supplier_id = 0
+  AND o.status IN ('NEW', 'RETRY', 'IN_PROGRESS');
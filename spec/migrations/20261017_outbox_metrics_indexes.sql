@@ -0,0 +1,15 @@
+-- Migration: indexes for the outbox metrics endpoint
+-- Date: 2026-10-17
+--
+-- GET /workers/outbox/metrics is scraped every few seconds, so its queries
+-- must not scan the table:
+-- - depth per event_type/supplier/status: GROUP BY covered by
+--   idx_outbox_status_type_supplier, restricted to pending statuses (DONE
+--   rows, the bulk of the table, are never read)
+-- - DLQ inflow: COUNT over a moved_at range
+
+ALTER TABLE outbox_events
+    ADD INDEX idx_outbox_status_type_supplier (status, event_type, supplier_id);
+
+ALTER TABLE outbox_dead_letters
+    ADD INDEX idx_outbox_dlq_moved_at (moved_at);
@@ -0,0 +1,14 @@
+-- Migration: compact supplier payloads + audit index on reservation_supplier_requests
+-- Date: 2026-10-17
+--
+-- SupplierRequestRepoSQL now stores large response_payload values as
+-- zlib-compressed blob references (app/infrastructure/db/payload_store.py);
+-- with SUPPLIER_PAYLOAD_BLOB_DIR set, big blobs are written once per sha256 to
+-- that directory instead of the row. No column changes: existing rows keep
+-- their plain JSON and are read back as-is.
+--
+-- The index serves the audit lookup (list_for_reservation):
+-- reservation_code = ? ORDER BY id.
+
+ALTER TABLE reservation_supplier_requests
+    ADD INDEX idx_supplier_requests_reservation (reservation_code, id);
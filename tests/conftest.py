@@ -343,14 +343,14 @@ def reset_circuit_breakers():
     Reset circuit breakers antes de cada test.
     Evita que tests fallen por breakers abiertos de tests anteriores.
     """
-    from app.infrastructure.circuit_breaker import stripe_breaker, supplier_breaker
+    from app.infrastructure.circuit_breaker import get_supplier_breakers, stripe_breaker
 
     # Reset breakers
     stripe_breaker.close()
-    supplier_breaker.close()
+    get_supplier_breakers().reset()
 
     yield
 
     # Cleanup después del test
     stripe_breaker.close()
-    supplier_breaker.close()
+    get_supplier_breakers().reset()
@@ -250,21 +250,28 @@ class TestPROB007Integration:
     @pytest.mark.asyncio
     async def test_worker_endpoint_has_deadlock_retry(self):
         """
-        PROB-007: Verificar que worker endpoint usa retry_on_deadlock.
+        PROB-007: Verificar que el booking del worker usa retry_on_deadlock.
+
+        El retry vive en el use case y cubre sólo la transacción que registra
+        el resultado: reintentar el endpoint entero repetiría la llamada al supplier.
         """
         from pathlib import Path
 
-        worker_file = Path("app/api/routers/worker.py")
-        if not worker_file.exists():
-            pytest.skip("worker.py not found")
+        use_case_file = Path("app/application/use_cases/process_outbox_book_supplier.py")
+        if not use_case_file.exists():
+            pytest.skip("process_outbox_book_supplier.py not found")
 
-        content = worker_file.read_text()
+        content = use_case_file.read_text()
 
         assert "from app.infrastructure.db.retry import retry_on_deadlock" in content, \
-            "retry_on_deadlock no está importado en worker.py"
+            "retry_on_deadlock no está importado en process_outbox_book_supplier.py"
 
-        assert "retry_on_deadlock" in content, \
-            "retry_on_deadlock no se usa en worker.py"
+        assert "retry_on_deadlock(record_result" in content, \
+            "retry_on_deadlock debe envolver sólo el registro del resultado"
+
+        worker_content = Path("app/api/routers/worker.py").read_text()
+        assert "retry_on_deadlock" not in worker_content, \
+            "worker.py no debe reintentar la ejecución completa (llamada al supplier incluida)"
 
     @pytest.mark.asyncio
     async def test_retry_module_exists(self):
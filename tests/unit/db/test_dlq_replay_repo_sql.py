@@ -0,0 +1,119 @@
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.application.interfaces.dlq_replay_repo import DeadLetterFilter
+from app.infrastructure.db.repositories.dlq_replay_repo_sql import DlqReplayRepoSQL
+from app.infrastructure.db.tables import metadata, outbox_dead_letters, outbox_events
+
+
+class TestDlqReplayRepoSQL(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.now = datetime.utcnow()
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                insert(outbox_events),
+                [
+                    self._event(1, "RES-FAILED", "FAILED"),
+                    # Replayed by hand and already booked
+                    self._event(2, "RES-DONE", "DONE"),
+                    self._event(4, "RES-OTHER-SUPPLIER", "FAILED", supplier_id=1),
+                ],
+            )
+            # Event 3 (RES-ARCHIVED) was purged by the retention job
+            await conn.execute(
+                insert(outbox_dead_letters),
+                [
+                    self._dead_letter(1, "RES-FAILED"),
+                    self._dead_letter(2, "RES-DONE"),
+                    self._dead_letter(3, "RES-ARCHIVED"),
+                    self._dead_letter(4, "RES-OTHER-SUPPLIER", supplier_id=1),
+                ],
+            )
+        self.repo = DlqReplayRepoSQL(self.session_maker)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    def _event(self, event_id: int, code: str, status: str, supplier_id: int = 93) -> dict:
+        return {
+            "id": event_id,
+            "event_type": "BOOK_SUPPLIER",
+            "aggregate_type": "reservation",
+            "aggregate_code": code,
+            "payload": {"reservation_code": code},
+            "status": status,
+            "attempts": 5,
+            "created_at": self.now,
+            "supplier_id": supplier_id,
+        }
+
+    def _dead_letter(self, event_id: int, code: str, supplier_id: int = 93) -> dict:
+        return {
+            "original_event_id": event_id,
+            "event_type": "BOOK_SUPPLIER",
+            "aggregate_type": "reservation",
+            "aggregate_id": 0,
+            "reservation_code": code,
+            "payload": {"reservation_code": code},
+            "error_code": "TIMEOUT",
+            "attempts": 5,
+            "moved_at": self.now - timedelta(minutes=10),
+            "created_at": self.now,
+            "supplier_id": supplier_id,
+        }
+
+    async def _events(self) -> dict:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                select(
+                    outbox_events.c.aggregate_code,
+                    outbox_events.c.status,
+                    outbox_events.c.attempts,
+                    outbox_events.c.next_attempt_at,
+                )
+            )
+            return {row.aggregate_code: row for row in result}
+
+    async def test_requeue_resets_recreates_and_skips(self):
+        replay = await self.repo.create(DeadLetterFilter(supplier_id=93), 10, batch_size=10)
+        self.assertEqual(replay.total, 3)
+        batch = await self.repo.next_batch(replay)
+        schedule = [self.now + timedelta(seconds=i) for i in range(len(batch))]
+
+        replay = await self.repo.requeue_batch(replay, batch, schedule)
+
+        self.assertEqual((replay.replayed, replay.skipped), (2, 1))
+        self.assertEqual(replay.last_dead_letter_id, batch[-1].id)
+        events = await self._events()
+        self.assertEqual(
+            (events["RES-FAILED"].status, events["RES-FAILED"].attempts), ("RETRY", 0)
+        )
+        self.assertEqual(events["RES-FAILED"].next_attempt_at, schedule[0])
+        self.assertEqual(events["RES-DONE"].status, "DONE")
+        self.assertEqual(events["RES-ARCHIVED"].status, "RETRY")
+        self.assertEqual(events["RES-ARCHIVED"].next_attempt_at, schedule[2])
+        self.assertEqual(events["RES-OTHER-SUPPLIER"].status, "FAILED")
+        self.assertEqual(await self.repo.next_batch(replay), [])
+
+    async def test_stale_cursor_is_rejected(self):
+        replay = await self.repo.create(DeadLetterFilter(), 10, batch_size=2)
+        batch = await self.repo.next_batch(replay)
+        await self.repo.requeue_batch(replay, batch, [self.now] * len(batch))
+
+        self.assertIsNone(await self.repo.requeue_batch(replay, batch, [self.now] * len(batch)))
+        stored = await self.repo.get(replay.id)
+        self.assertEqual((stored.replayed, stored.last_dead_letter_id), (1, 2))
+
+    async def test_moved_at_range(self):
+        replay = await self.repo.create(
+            DeadLetterFilter(moved_from=self.now - timedelta(minutes=5)), 10, batch_size=10
+        )
+
+        self.assertEqual(replay.total, 0)
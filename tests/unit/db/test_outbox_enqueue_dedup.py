@@ -0,0 +1,70 @@
+import unittest
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure.db.repositories.outbox_repo_sql import (
+    OutboxRepoSQL,
+    _insert_ignoring_duplicates,
+)
+from app.infrastructure.db.tables import metadata, outbox_events
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+
+
+class TestInMemoryEnqueueDedup(unittest.IsolatedAsyncioTestCase):
+    async def test_second_enqueue_returns_existing_event(self):
+        repo = InMemoryOutboxRepo()
+        first = await repo.enqueue("BOOK_SUPPLIER", "reservation", "RES-1", {"source": "pay"})
+        await repo.mark_done(first.id)
+
+        second = await repo.enqueue("BOOK_SUPPLIER", "reservation", "RES-1", {"source": "hook"})
+
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(second.status, "DONE")
+        self.assertEqual(len(repo._events), 1)
+
+
+class TestSQLEnqueueDedup(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_enqueue_coalesces_on_aggregate_and_event_type(self):
+        async with self.session_maker() as session, session.begin():
+            first = await OutboxRepoSQL(session).enqueue(
+                "BOOK_SUPPLIER", "reservation", "RES-1", {"source": "pay"}
+            )
+        with self.assertLogs("app.infrastructure.db.repositories.outbox_repo_sql") as logs:
+            async with self.session_maker() as session, session.begin():
+                second = await OutboxRepoSQL(session).enqueue(
+                    "BOOK_SUPPLIER", "reservation", "RES-1", {"source": "hook"}
+                )
+                other_type = await OutboxRepoSQL(session).enqueue(
+                    "RESERVATION_CONFIRMED", "reservation", "RES-1", {}
+                )
+
+        self.assertEqual(second.id, first.id)
+        self.assertEqual(second.payload, {"source": "pay"})
+        self.assertNotEqual(other_type.id, first.id)
+        # Only the ignored INSERT (rowcount 0) is reported as coalesced
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].event_id, first.id)
+        async with self.engine.connect() as conn:
+            count = (
+                await conn.execute(select(func.count()).select_from(outbox_events))
+            ).scalar()
+        self.assertEqual(count, 2)
+
+    def test_mysql_uses_insert_ignore(self):
+        stmt = _insert_ignoring_duplicates("mysql", {"aggregate_code": "RES-1"})
+
+        sql = str(stmt.compile(dialect=mysql.dialect()))
+
+        self.assertTrue(sql.startswith("INSERT IGNORE INTO outbox_events"))
+        self.assertNotIn("ON DUPLICATE KEY UPDATE", sql)
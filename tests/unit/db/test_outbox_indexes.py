@@ -0,0 +1,94 @@
+import re
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.infrastructure.db.repositories.outbox_repo_sql import (
+    _claim_candidates,
+    _ready_conditions,
+)
+from app.infrastructure.db.tables import metadata
+
+
+class TestOutboxClaimQueryPlans(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def _plan(self, sql: str, params) -> str:
+        async with self.engine.connect() as conn:
+            if isinstance(params, dict):
+                result = await conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)
+            else:
+                result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+        return " | ".join(str(row[-1]) for row in result.all())
+
+    async def test_batch_claim_uses_worker_claim_index(self):
+        stmt = _claim_candidates(_ready_conditions(datetime.utcnow()), limit=10)
+        compiled = stmt.compile(
+            dialect=self.engine.dialect, compile_kwargs={"render_postcompile": True}
+        )
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+
+        plan = await self._plan(str(compiled), params)
+
+        self.assertIn("idx_outbox_worker_claim", plan)
+
+    async def test_single_claim_uses_aggregate_index(self):
+        plan = await self._plan(
+            "SELECT id FROM outbox_events WHERE aggregate_code = :code "
+            "AND event_type = :event_type AND status IN ('NEW', 'RETRY')",
+            {"code": "RES-1", "event_type": "BOOK_SUPPLIER"},
+        )
+
+        self.assertIn("uq_outbox_aggregate_event", plan)
+
+
+MIGRATIONS = Path(__file__).resolve().parents[3] / "spec" / "migrations"
+INDEX_STATEMENTS = (
+    (re.compile(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)", re.I), "create"),
+    (re.compile(r"DROP\s+INDEX\s+(\w+)\s+ON\s+(\w+)", re.I), "drop"),
+)
+
+
+class TestMigrationChain(unittest.TestCase):
+    """Replays the index DDL of spec/migrations in README order (no MySQL needed)."""
+
+    def _statements(self, path: Path):
+        sql = "\n".join(
+            line for line in path.read_text().splitlines() if not line.lstrip().startswith("--")
+        )
+        for statement in sql.split(";"):
+            table = re.search(r"ALTER\s+TABLE\s+(\w+)", statement, re.I)
+            for name in re.findall(r"ADD\s+(?:UNIQUE\s+)?INDEX\s+(\w+)", statement, re.I):
+                yield "create", name, table.group(1)
+            for pattern, action in INDEX_STATEMENTS:
+                for name, on_table in pattern.findall(statement):
+                    yield action, name, on_table
+
+    def test_readme_chain_applies_on_a_fresh_schema(self):
+        readme = (MIGRATIONS / "README.md").read_text()
+        order = list(dict.fromkeys(re.findall(r"spec/migrations/(\S+\.sql)", readme)))
+        indexes: set[tuple[str, str]] = set()
+
+        for migration in order:
+            for action, name, table in self._statements(MIGRATIONS / migration):
+                with self.subTest(migration=migration, index=name):
+                    if action == "create":
+                        self.assertNotIn((table, name), indexes, "duplicate key name")
+                        indexes.add((table, name))
+                    else:
+                        self.assertIn((table, name), indexes, "index does not exist")
+                        indexes.discard((table, name))
+
+        self.assertIn(("outbox_events", "idx_outbox_worker_claim"), indexes)
+        self.assertIn(("outbox_events", "uq_outbox_aggregate_event"), indexes)
+        self.assertNotIn(("outbox_events", "idx_outbox_aggregate_event"), indexes)
+        self.assertNotIn(("outbox_events", "idx_outbox_status_next"), indexes)
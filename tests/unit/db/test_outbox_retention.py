@@ -0,0 +1,111 @@
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure.db.outbox_retention import OutboxRetentionJob
+from app.infrastructure.db.tables import (
+    metadata,
+    outbox_dead_letters,
+    outbox_events,
+    outbox_events_archive,
+)
+
+
+class TestOutboxRetentionJob(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.now = datetime(2026, 10, 17, 12, 0, 0)
+        old = self.now - timedelta(days=30)
+        recent = self.now - timedelta(hours=1)
+        rows = []
+        for i in range(25):
+            rows.append(self._event(f"OLD-DONE-{i}", "DONE", old))
+        rows.append(self._event("OLD-FAILED", "FAILED", old))
+        rows.append(self._event("OLD-RETRY", "RETRY", old))
+        rows.append(self._event("RECENT-DONE", "DONE", recent))
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(outbox_events), rows)
+            await conn.execute(
+                insert(outbox_dead_letters),
+                [
+                    self._dead_letter("OLD-DLQ", self.now - timedelta(days=120)),
+                    self._dead_letter("RECENT-DLQ", self.now - timedelta(days=1)),
+                ],
+            )
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    @staticmethod
+    def _event(code: str, status: str, updated_at: datetime) -> dict:
+        return {
+            "event_type": "BOOK_SUPPLIER",
+            "aggregate_type": "reservation",
+            "aggregate_code": code,
+            "payload": {"reservation_code": code},
+            "status": status,
+            "attempts": 1,
+            "created_at": updated_at,
+            "updated_at": updated_at,
+        }
+
+    @staticmethod
+    def _dead_letter(code: str, moved_at: datetime) -> dict:
+        return {
+            "original_event_id": 0,
+            "event_type": "BOOK_SUPPLIER",
+            "aggregate_type": "reservation",
+            "aggregate_id": 0,
+            "reservation_code": code,
+            "payload": {},
+            "attempts": 5,
+            "moved_at": moved_at,
+            "created_at": moved_at,
+        }
+
+    async def _codes(self, table, column) -> set[str]:
+        async with self.engine.connect() as conn:
+            return set((await conn.execute(select(column))).scalars().all())
+
+    def _job(self, **kwargs) -> OutboxRetentionJob:
+        return OutboxRetentionJob(
+            session_maker=self.session_maker, batch_size=10, pause_seconds=0, **kwargs
+        )
+
+    async def test_archives_old_terminal_events_in_batches(self):
+        events_report, dlq_report = await self._job().run_once(now=self.now)
+
+        self.assertEqual(events_report.rows, 26)
+        self.assertEqual(events_report.batches, 3)
+        self.assertEqual(
+            await self._codes(outbox_events, outbox_events.c.aggregate_code),
+            {"OLD-RETRY", "RECENT-DONE"},
+        )
+        async with self.engine.connect() as conn:
+            archived = (
+                await conn.execute(select(func.count()).select_from(outbox_events_archive))
+            ).scalar()
+        self.assertEqual(archived, 26)
+        self.assertEqual(dlq_report.rows, 1)
+        self.assertEqual(
+            await self._codes(outbox_dead_letters, outbox_dead_letters.c.reservation_code),
+            {"RECENT-DLQ"},
+        )
+
+    async def test_delete_mode_skips_archive(self):
+        await self._job(mode="delete").run_once(now=self.now)
+
+        async with self.engine.connect() as conn:
+            archived = (
+                await conn.execute(select(func.count()).select_from(outbox_events_archive))
+            ).scalar()
+        self.assertEqual(archived, 0)
+        self.assertEqual(
+            await self._codes(outbox_events, outbox_events.c.aggregate_code),
+            {"OLD-RETRY", "RECENT-DONE"},
+        )
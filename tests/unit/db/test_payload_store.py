@@ -0,0 +1,116 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure.db.payload_store import (
+    FileBlobStore,
+    PayloadStore,
+    is_blob_ref,
+)
+from app.infrastructure.db.repositories.supplier_request_repo_sql import SupplierRequestRepoSQL
+from app.infrastructure.db.tables import metadata, reservation_supplier_requests
+
+RAW_XML = "<OTA_VehResRS>" + "<RateRule>no smoking</RateRule>" * 500 + "</OTA_VehResRS>"
+
+
+class TestPayloadStore(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.blobs = FileBlobStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_small_values_stay_inline_and_large_ones_are_compressed(self):
+        store = PayloadStore(inline_max_bytes=64)
+        payload = {"confirmation": "CONF-1", "http": 200, "raw": RAW_XML}
+
+        stored = await store.compact(payload)
+
+        self.assertEqual(stored["confirmation"], "CONF-1")
+        self.assertEqual(stored["http"], 200)
+        self.assertTrue(is_blob_ref(stored["raw"]))
+        self.assertLess(len(json.dumps(stored)), len(RAW_XML) / 10)
+        self.assertEqual(await store.expand(stored), payload)
+
+    async def test_json_values_round_trip(self):
+        store = PayloadStore(inline_max_bytes=16)
+        payload = {"response": {"rates": [{"code": "ECAR", "total": 10.5}] * 20}}
+
+        stored = await store.compact(payload)
+
+        self.assertEqual(stored["response"]["kind"], "json")
+        self.assertEqual(await store.expand(stored), payload)
+
+    async def test_large_blobs_spill_to_files_once_per_content(self):
+        store = PayloadStore(inline_max_bytes=64, spill_bytes=10, blob_store=self.blobs)
+
+        first = await store.compact({"raw": RAW_XML})
+        second = await store.compact({"raw_response": RAW_XML})
+
+        self.assertNotIn("data", first["raw"])
+        self.assertEqual(first["raw"]["$blob"], second["raw_response"]["$blob"])
+        self.assertEqual(len(list(Path(self.tmp.name).rglob("*.zz"))), 1)
+        self.assertEqual(await store.expand(second), {"raw_response": RAW_XML})
+
+    async def test_missing_blob_keeps_reference(self):
+        store = PayloadStore(inline_max_bytes=64, spill_bytes=10, blob_store=self.blobs)
+        stored = await store.compact({"raw": RAW_XML})
+        for path in Path(self.tmp.name).rglob("*.zz"):
+            path.unlink()
+
+        self.assertEqual(await store.expand(stored), stored)
+
+    async def test_legacy_payloads_pass_through(self):
+        store = PayloadStore()
+
+        self.assertIsNone(await store.compact(None))
+        self.assertEqual(await store.expand({"raw": "<xml/>"}), {"raw": "<xml/>"})
+
+
+class TestSupplierRequestRepoPayloads(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.store = PayloadStore(inline_max_bytes=64)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_stores_compact_payloads_and_expands_audit_trail(self):
+        async with self.session_maker() as session, session.begin():
+            repo = SupplierRequestRepoSQL(session, payload_store=self.store)
+            first = await repo.create_in_progress("RES-1", 93, "BOOK", "key", 1)
+            await repo.mark_failed(first.id, "TIMEOUT", "timed out", None, {"raw": RAW_XML})
+            second = await repo.create_in_progress("RES-1", 93, "BOOK", "key", 2)
+            await repo.mark_success(second.id, {"raw": RAW_XML, "id": "CONF-1"}, "CONF-1")
+            other = await repo.create_in_progress("RES-2", 93, "BOOK", "key2", 1)
+
+        async with self.engine.connect() as conn:
+            stored = (
+                await conn.execute(
+                    select(reservation_supplier_requests.c.response_payload).where(
+                        reservation_supplier_requests.c.id == second.id
+                    )
+                )
+            ).scalar_one()
+        self.assertTrue(is_blob_ref(stored["raw"]))
+        self.assertEqual(stored["id"], "CONF-1")
+
+        async with self.session_maker() as session:
+            repo = SupplierRequestRepoSQL(session, payload_store=self.store)
+            trail = await repo.list_for_reservation("RES-1")
+            summary = await repo.list_for_reservation("RES-1", with_payloads=False)
+
+        self.assertEqual([r.id for r in trail], [first.id, second.id])
+        self.assertNotIn(other.id, [r.id for r in trail])
+        self.assertEqual([r.status for r in trail], ["FAILED", "SUCCESS"])
+        self.assertEqual(trail[1].response_payload, {"raw": RAW_XML, "id": "CONF-1"})
+        self.assertEqual(trail[0].error_code, "TIMEOUT")
+        self.assertIsNone(summary[1].response_payload)
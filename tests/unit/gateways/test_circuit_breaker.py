@@ -0,0 +1,196 @@
+import asyncio
+import unittest
+
+from app.application.interfaces.supplier_gateway import SupplierBookingResult
+from app.infrastructure.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    AsyncCircuitBreaker,
+    CircuitBreakerError,
+    SupplierBreakerRegistry,
+    async_supplier_breaker,
+    get_supplier_breakers,
+    supplier_breaker_key,
+)
+from app.infrastructure.gateways.avis_adapter import AvisAdapter
+from app.infrastructure.gateways.noleggiare_gateway import NoleggiareGateway
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def ok():
+    return "ok"
+
+
+async def boom():
+    raise RuntimeError("supplier down")
+
+
+class TestAsyncCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = AsyncCircuitBreaker(
+            "test",
+            window_seconds=10,
+            min_calls=4,
+            failure_rate_threshold=0.5,
+            reset_timeout_seconds=30,
+            half_open_max_calls=2,
+            clock=self.clock,
+        )
+
+    async def _fail(self, times: int = 1):
+        for _ in range(times):
+            with self.assertRaises(RuntimeError):
+                await self.breaker.call(boom)
+
+    async def test_opens_on_failure_rate_after_min_calls(self):
+        await self.breaker.call(ok)
+        await self._fail(2)
+        self.assertEqual(self.breaker.state, STATE_CLOSED)  # 3 calls < min_calls
+
+        await self._fail()
+
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        with self.assertRaises(CircuitBreakerError):
+            await self.breaker.call(ok)
+        self.assertEqual(self.breaker.snapshot()["rejected_total"], 1)
+        self.assertEqual(self.breaker.retry_after_seconds(), 30)
+
+    async def test_old_failures_leave_the_window(self):
+        await self._fail(3)
+        self.clock.now += 11
+
+        await self.breaker.call(ok)
+        await self._fail()
+
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.assertEqual(self.breaker.failure_rate, 0.5)
+
+    async def test_result_predicate_counts_as_failure(self):
+        for _ in range(4):
+            await self.breaker.call(ok, is_failure=lambda result: result == "ok")
+
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+
+    async def test_half_open_limits_probes_and_closes_after_successes(self):
+        await self._fail(4)
+        self.clock.now += 30
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "ok"
+
+        probes = [asyncio.create_task(self.breaker.call(slow)) for _ in range(2)]
+        await asyncio.sleep(0)
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        with self.assertRaises(CircuitBreakerError):
+            await self.breaker.call(ok)
+
+        release.set()
+        await asyncio.gather(*probes)
+
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.assertEqual(self.breaker.snapshot()["calls"], 0)
+
+    async def test_failed_probe_reopens(self):
+        await self._fail(4)
+        self.clock.now += 30
+
+        await self._fail()
+
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        self.assertEqual(self.breaker.snapshot()["opened_total"], 2)
+
+    async def test_cancelled_probe_frees_its_slot(self):
+        await self._fail(4)
+        self.clock.now += 30
+        probe = asyncio.create_task(self.breaker.call(asyncio.sleep, 10))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await probe
+
+        self.assertEqual(await self.breaker.call(ok), "ok")
+
+
+class FlakyGateway:
+    def __init__(self, error_code: str) -> None:
+        self.error_code = error_code
+        self.calls = 0
+
+    @async_supplier_breaker
+    async def book(self, reservation_code, idem_key, reservation_snapshot=None):
+        self.calls += 1
+        return SupplierBookingResult(status="FAILED", error_code=self.error_code)
+
+
+class OtherGateway(FlakyGateway):
+    pass
+
+
+class TestSupplierBreakerDecorator(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        get_supplier_breakers().reset()
+
+    def tearDown(self):
+        get_supplier_breakers().reset()
+
+    async def test_breakers_are_per_supplier(self):
+        flaky, other = FlakyGateway("NETWORK_ERROR"), OtherGateway("NETWORK_ERROR")
+        breakers = get_supplier_breakers()
+        for _ in range(breakers.get("FlakyGateway").min_calls):
+            await flaky.book("RES", "key")
+
+        result = await flaky.book("RES", "key")
+        other_result = await other.book("RES", "key")
+
+        self.assertEqual(result.error_code, "CIRCUIT_OPEN")
+        self.assertIsNotNone(result.retry_after_seconds)
+        self.assertEqual(flaky.calls, breakers.get("FlakyGateway").min_calls)
+        self.assertEqual(other_result.error_code, "NETWORK_ERROR")
+        self.assertEqual(other.calls, 1)
+
+    async def test_permanent_errors_do_not_trip(self):
+        gateway = FlakyGateway("MISSING_DATA")
+        for _ in range(get_supplier_breakers().get("FlakyGateway").min_calls + 1):
+            result = await gateway.book("RES", "key")
+
+        self.assertEqual(result.error_code, "MISSING_DATA")
+
+    async def test_open_supplier_does_not_block_another(self):
+        noleggiare = NoleggiareGateway("https://noleggiare.test", "user", "secret", "ACME")
+        avis = AvisAdapter("https://avis.test", "user", "secret")
+        avis.confirm_booking = lambda reservation_code, details: asyncio.sleep(0, "AVIS-1")
+        breakers = get_supplier_breakers()
+        noleggiare_breaker = breakers.get(supplier_breaker_key(noleggiare))
+        for _ in range(noleggiare_breaker.min_calls):
+            with self.assertRaises(RuntimeError):
+                await noleggiare_breaker.call(boom)
+
+        blocked = await noleggiare.book("RES-1", "key")
+        result = await avis.book("RES-2", "key")
+
+        self.assertEqual(blocked.error_code, "CIRCUIT_OPEN")
+        self.assertEqual(result.status, "SUCCESS")
+        self.assertEqual(result.supplier_reservation_code, "AVIS-1")
+        self.assertEqual(noleggiare_breaker.snapshot()["rejected_total"], 1)
+        avis_breaker = breakers.get(supplier_breaker_key(avis)).snapshot()
+        self.assertEqual(avis_breaker["name"], "AvisAdapter")
+        self.assertEqual((avis_breaker["state"], avis_breaker["calls"]), (STATE_CLOSED, 1))
+
+    def test_registry_snapshot(self):
+        registry = SupplierBreakerRegistry(min_calls=1)
+        registry.get("b")
+        registry.get("a")
+
+        self.assertEqual([entry["name"] for entry in registry.snapshot()], ["a", "b"])
+        self.assertEqual(registry.snapshot()[0]["state"], STATE_CLOSED)
@@ -0,0 +1,37 @@
+import unittest
+
+from app.infrastructure.gateways.http_clients import SupplierHttpClients
+
+
+class TestSupplierHttpClients(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.clients = SupplierHttpClients(max_connections=5, max_keepalive_connections=2)
+
+    async def asyncTearDown(self):
+        await self.clients.aclose()
+
+    async def test_one_client_per_host(self):
+        booking = self.clients.get("https://api.supplier.test/Booking", timeout=10)
+        token = self.clients.get("https://API.supplier.test/token", timeout=10)
+        other = self.clients.get("https://other.test/Booking", timeout=10)
+
+        self.assertIs(booking, token)
+        self.assertIsNot(booking, other)
+        self.assertEqual(booking.timeout.read, 10)
+
+    async def test_context_manager_leaves_client_open(self):
+        async with self.clients.client("https://api.supplier.test/Booking", timeout=5) as client:
+            pass
+
+        self.assertFalse(client.is_closed)
+        self.assertIs(self.clients.get("https://api.supplier.test/x", timeout=5), client)
+
+    async def test_aclose_closes_and_next_use_recreates(self):
+        client = self.clients.get("https://api.supplier.test", timeout=5)
+
+        await self.clients.aclose()
+
+        self.assertTrue(client.is_closed)
+        fresh = self.clients.get("https://api.supplier.test", timeout=5)
+        self.assertIsNot(fresh, client)
+        self.assertFalse(fresh.is_closed)
@@ -48,6 +48,7 @@ class TestInfinityGroupGateway(unittest.IsolatedAsyncioTestCase):
         mock_resp.status_code = 200
         mock_resp.is_success = True
         mock_resp.text = success_xml
+        mock_resp.content = success_xml.encode()
         
         mock_client = AsyncMock()
         mock_client.__aenter__.return_value = mock_client
@@ -80,6 +81,7 @@ class TestInfinityGroupGateway(unittest.IsolatedAsyncioTestCase):
         mock_resp.status_code = 200
         mock_resp.is_success = True
         mock_resp.text = error_xml
+        mock_resp.content = error_xml.encode()
         
         mock_client = AsyncMock()
         mock_client.__aenter__.return_value = mock_client
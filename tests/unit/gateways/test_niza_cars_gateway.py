@@ -62,7 +62,7 @@ class TestNizaCarsGateway(unittest.IsolatedAsyncioTestCase):
         # Verify call
         args, kwargs = mock_client.post.call_args
         self.assertIn("Create_Reservation", kwargs["headers"]["SOAPAction"])
-        self.assertIn("<Group>A</Group>", kwargs["content"])
+        self.assertIn(b"<Group>A</Group>", kwargs["content"])
 
     @patch("httpx.AsyncClient")
     async def test_book_error(self, mock_client_cls):
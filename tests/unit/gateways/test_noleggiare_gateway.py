@@ -50,6 +50,7 @@ class TestNoleggiareGateway(unittest.IsolatedAsyncioTestCase):
         mock_resp.status_code = 200
         mock_resp.is_success = True
         mock_resp.text = success_xml
+        mock_resp.content = success_xml.encode()
         
         mock_client = AsyncMock()
         mock_client.__aenter__.return_value = mock_client
@@ -63,8 +64,8 @@ class TestNoleggiareGateway(unittest.IsolatedAsyncioTestCase):
         
         # Verify call
         args, kwargs = mock_client.post.call_args
-        self.assertIn('Code="MBMR"', kwargs["content"])
-        self.assertIn('ID="user"', kwargs["content"])
+        self.assertIn(b'Code="MBMR"', kwargs["content"])
+        self.assertIn(b'ID="user"', kwargs["content"])
 
     @patch("httpx.AsyncClient")
     async def test_book_ota_error(self, mock_client_cls):
@@ -83,6 +84,7 @@ class TestNoleggiareGateway(unittest.IsolatedAsyncioTestCase):
         mock_resp.status_code = 200
         mock_resp.is_success = True
         mock_resp.text = error_xml
+        mock_resp.content = error_xml.encode()
         
         mock_client = AsyncMock()
         mock_client.__aenter__.return_value = mock_client
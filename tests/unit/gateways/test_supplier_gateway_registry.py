@@ -0,0 +1,77 @@
+import unittest
+
+from app.config import Settings
+from app.infrastructure.gateways.america_group_gateway import AmericaGroupGateway
+from app.infrastructure.gateways.supplier_gateway_selector import SupplierGatewayRegistry
+
+
+class TestSupplierGatewayRegistry(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.settings = Settings(americagroup_endpoint="https://america-a.test")
+        self.loads = 0
+
+        def load_settings() -> Settings:
+            self.loads += 1
+            return self.settings
+
+        self.registry = SupplierGatewayRegistry(
+            self.settings,
+            load_settings=load_settings,
+            reload_interval_seconds=30,
+            clock=lambda: self.now,
+        )
+
+    def test_adapters_are_shared_between_calls(self):
+        first = self.registry.for_supplier(16, "MX")
+        second = self.registry.for_supplier(16, "MX")
+
+        self.assertIs(first, second)
+
+    def test_settings_are_reread_only_after_the_interval(self):
+        self.registry.for_supplier(32, "MX")
+        self.now = 29
+        self.registry.for_supplier(32, "MX")
+        self.assertEqual(self.loads, 0)
+
+        self.now = 30
+        gateway = self.registry.for_supplier(32, "MX")
+
+        self.assertEqual(self.loads, 1)
+        self.assertIs(gateway, self.registry.for_supplier(32, "MX"))
+
+    def test_rebuilds_when_supplier_config_changes(self):
+        before = self.registry.for_supplier(32, "MX")
+        self.settings = Settings(americagroup_endpoint="https://america-b.test")
+        self.now = 30
+
+        after = self.registry.for_supplier(32, "MX")
+
+        self.assertIsNot(before, after)
+        self.assertIsInstance(after, AmericaGroupGateway)
+        self.assertEqual(after._endpoint, "https://america-b.test")
+
+    def test_failed_reload_keeps_current_gateways(self):
+        before = self.registry.for_supplier(32, "MX")
+
+        def broken() -> Settings:
+            raise ValueError("invalid .env")
+
+        self.registry._load_settings = broken
+        self.now = 30
+
+        self.assertIs(self.registry.for_supplier(32, "MX"), before)
+
+    def test_simulator_url_replaces_supplier_endpoints(self):
+        self.settings = Settings(
+            americagroup_endpoint="https://america-a.test",
+            supplier_simulator_url="http://localhost:8099/",
+        )
+        self.now = 30
+
+        america = self.registry.for_supplier(32, "MX")
+        hertz = self.registry.for_supplier(128, "AR")
+
+        self.assertEqual(america._endpoint, "http://localhost:8099/americagroup")
+        self.assertEqual(hertz._base_url, "http://localhost:8099/hertzargentina")
+        self.assertEqual(hertz._auth_url, "http://localhost:8099/hertzargentina/token")
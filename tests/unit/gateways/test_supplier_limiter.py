@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+
+from app.infrastructure.gateways.supplier_limiter import (
+    SupplierLimiter,
+    SupplierLimiterRegistry,
+    SupplierLimitExceeded,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestSupplierLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_token_bucket_paces_after_burst(self):
+        clock = FakeClock()
+        limiter = SupplierLimiter(
+            1, rate_per_second=2, burst=2, max_wait_seconds=10, clock=clock, sleep=clock.sleep
+        )
+
+        for _ in range(4):
+            async with limiter.slot():
+                pass
+
+        self.assertEqual(clock.sleeps, [0.5, 0.5])
+        snapshot = limiter.snapshot()
+        self.assertEqual(snapshot["wait_seconds"]["count"], 4)
+        self.assertAlmostEqual(snapshot["wait_seconds"]["sum"], 1.0)
+
+    async def test_rate_wait_beyond_deadline_is_rejected(self):
+        clock = FakeClock()
+        limiter = SupplierLimiter(
+            1, rate_per_second=0.1, burst=1, max_wait_seconds=5, clock=clock, sleep=clock.sleep
+        )
+        async with limiter.slot():
+            pass
+
+        with self.assertRaises(SupplierLimitExceeded) as ctx:
+            async with limiter.slot():
+                pass
+
+        self.assertEqual(ctx.exception.retry_after_seconds, 10)
+        self.assertEqual(limiter.snapshot()["rejected_total"], 1)
+        self.assertEqual(clock.sleeps, [])
+
+    async def test_concurrency_cap_queues_until_a_slot_frees(self):
+        limiter = SupplierLimiter(1, max_concurrency=2, max_wait_seconds=5)
+        release = asyncio.Event()
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await release.wait()
+
+        tasks = [asyncio.create_task(call()) for _ in range(5)]
+        while limiter.in_flight < 2:
+            await asyncio.sleep(0)
+        self.assertEqual(limiter.snapshot()["waiting"], 3)
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.snapshot()["in_flight"], 0)
+
+    async def test_concurrency_deadline(self):
+        limiter = SupplierLimiter(1, max_concurrency=1, max_wait_seconds=0.01)
+
+        async with limiter.slot():
+            with self.assertRaises(SupplierLimitExceeded):
+                async with limiter.slot():
+                    pass
+
+        async with limiter.slot():  # the rejected call didn't keep the slot
+            pass
+
+    def test_registry_applies_overrides(self):
+        registry = SupplierLimiterRegistry(
+            max_concurrency=10,
+            rate_per_second=5,
+            max_concurrency_overrides={93: 2},
+            rate_per_second_overrides={93: 0.5},
+        )
+
+        self.assertEqual(registry.get(93).max_concurrency, 2)
+        self.assertEqual(registry.get(93).rate_per_second, 0.5)
+        self.assertEqual(registry.get(1).max_concurrency, 10)
+        self.assertEqual([s["supplier_id"] for s in registry.snapshot()], [1, 93])
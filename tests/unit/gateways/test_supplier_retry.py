@@ -0,0 +1,142 @@
+import asyncio
+import unittest
+
+import httpx
+
+from app.application.deadline import deadline_scope, remaining_budget
+from app.infrastructure.gateways.supplier_retry import send_with_retries
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _response(status_code: int) -> httpx.Response:
+    return httpx.Response(status_code, request=httpx.Request("POST", "http://supplier"))
+
+
+class TestDeadlineScope(unittest.TestCase):
+    def test_inner_scope_never_extends_outer_deadline(self):
+        clock = FakeClock()
+        with deadline_scope(10, clock=clock) as outer:
+            with deadline_scope(60, clock=clock) as inner:
+                self.assertIs(inner, outer)
+            with deadline_scope(2, clock=clock):
+                self.assertEqual(remaining_budget(), 2)
+            with deadline_scope(None, clock=clock):
+                self.assertEqual(remaining_budget(), 10)
+        self.assertIsNone(remaining_budget())
+
+
+class TestSendWithRetries(unittest.IsolatedAsyncioTestCase):
+    async def test_timeout_is_capped_by_remaining_budget(self):
+        clock = FakeClock()
+        timeouts: list[float] = []
+
+        async def send(timeout):
+            timeouts.append(timeout)
+            return _response(200)
+
+        with deadline_scope(3, clock=clock):
+            response = await send_with_retries(send, retry_times=2, timeout=30)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(timeouts, [3])
+
+    async def test_retries_5xx_with_backoff_until_success(self):
+        clock = FakeClock()
+        responses = [_response(503), _response(502), _response(201)]
+
+        async def send(timeout):
+            clock.now += 1
+            return responses.pop(0)
+
+        with deadline_scope(60, clock=clock):
+            response = await send_with_retries(
+                send, retry_times=3, timeout=30, sleep=clock.sleep
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(clock.sleeps), 2)
+        self.assertTrue(all(0 <= delay <= 4 for delay in clock.sleeps))
+
+    async def test_stops_retrying_when_budget_is_spent(self):
+        clock = FakeClock()
+        calls = 0
+
+        async def send(timeout):
+            nonlocal calls
+            calls += 1
+            clock.now += timeout
+            raise httpx.ReadTimeout("slow")
+
+        with deadline_scope(5, clock=clock):
+            with self.assertRaises(httpx.ReadTimeout):
+                await send_with_retries(send, retry_times=5, timeout=30, sleep=clock.sleep)
+
+        self.assertEqual(calls, 1)
+
+    async def test_exhausted_budget_raises_timeout_without_calling(self):
+        clock = FakeClock()
+
+        async def send(timeout):
+            raise AssertionError("must not be called")
+
+        with deadline_scope(1, clock=clock):
+            clock.now += 2
+            with self.assertRaises(httpx.TimeoutException):
+                await send_with_retries(send, retry_times=2, timeout=30)
+
+    async def test_returns_last_5xx_after_retries(self):
+        async def send(timeout):
+            return _response(500)
+
+        response = await send_with_retries(
+            send, retry_times=2, timeout=30, sleep=FakeClock().sleep
+        )
+
+        self.assertEqual(response.status_code, 500)
+
+    async def test_hedged_request_wins_over_slow_primary(self):
+        started: list[float] = []
+        primary_cancelled = asyncio.Event()
+
+        async def send(timeout):
+            started.append(timeout)
+            if len(started) == 1:
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    primary_cancelled.set()
+                    raise
+            return _response(200)
+
+        response = await send_with_retries(
+            send, retry_times=0, timeout=30, hedge_after_seconds=0.01
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(started), 2)
+        await asyncio.wait_for(primary_cancelled.wait(), 1)
+
+    async def test_fast_primary_is_not_hedged(self):
+        calls = 0
+
+        async def send(timeout):
+            nonlocal calls
+            calls += 1
+            return _response(200)
+
+        await send_with_retries(send, retry_times=0, timeout=30, hedge_after_seconds=5)
+
+        self.assertEqual(calls, 1)
+
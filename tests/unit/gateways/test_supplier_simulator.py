@@ -0,0 +1,209 @@
+import random
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from app.infrastructure.circuit_breaker import get_supplier_breakers
+from app.infrastructure.gateways.america_group_gateway import AmericaGroupGateway
+from app.infrastructure.gateways.centauro_adapter import CentauroAdapter
+from app.infrastructure.gateways.factory import SupplierGatewayFactory
+from app.infrastructure.gateways.http_clients import SupplierHttpClients
+from app.infrastructure.gateways.supplier_simulator import (
+    LATENCY_FIXED,
+    LATENCY_LOGNORMAL,
+    LATENCY_UNIFORM,
+    SimulatorConfig,
+    SimulatorProfile,
+    create_supplier_simulator,
+    simulator_factory_config,
+)
+
+BASE_URL = "http://simulator"
+SNAPSHOT = {
+    "reservation_code": "RES-1",
+    "pickup_location_code": "MEX",
+    "dropoff_location_code": "MEX",
+    "pickup_office_code": "MEX",
+    "dropoff_office_code": "MEX",
+    "acriss_code": "ECAR",
+    "pickup_datetime": "2026-11-01T10:00:00",
+    "dropoff_datetime": "2026-11-05T10:00:00",
+    "pickup_date": "2026-11-01",
+    "dropoff_date": "2026-11-05",
+    "supplier_specific_data": {"Group": "A", "rate_code": "R", "class_code": "C", "rate_id": 1},
+    "customer": {"first_name": "Ana", "last_name": "O'Neil & Co", "email": "ana@example.com"},
+    "drivers": [{"first_name": "Ana", "last_name": "O'Neil"}],
+}
+
+
+class CentauroStub(CentauroAdapter):
+    async def confirm_booking(self, reservation_code, details):
+        raise NotImplementedError
+
+
+class NoSleep:
+    def __init__(self) -> None:
+        self.sleeps: list[float] = []
+
+    async def __call__(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+
+
+class SimulatorTestCase(unittest.IsolatedAsyncioTestCase):
+    config = SimulatorConfig()
+
+    async def asyncSetUp(self):
+        self.sleep = NoSleep()
+        self.app = create_supplier_simulator(self.config, sleep=self.sleep)
+        self.clients = SupplierHttpClients(transport=httpx.ASGITransport(app=self.app))
+        patcher = patch(
+            "app.infrastructure.gateways.http_clients.get_supplier_http_clients",
+            return_value=self.clients,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = self.clients.get(BASE_URL)
+
+    async def asyncTearDown(self):
+        await self.clients.aclose()
+        get_supplier_breakers().reset()
+
+
+class TestGatewaysAgainstSimulator(SimulatorTestCase):
+    async def test_every_protocol_books_through_its_real_gateway(self):
+        conf = simulator_factory_config(BASE_URL)
+        factory = SupplierGatewayFactory(conf)
+        gateways = {
+            "americagroup": AmericaGroupGateway(conf["americagroup"]["endpoint"], "13"),
+            "avis": factory.get_adapter("16"),
+            "centauro": CentauroStub(conf["centauro"]["base_url"], "sim", "sim", 1),
+            "hertzargentina": factory.get_adapter("128"),
+            "localiza": factory.get_adapter("localiza"),
+            "mexgroup": factory.get_adapter("28"),
+            "nizacars": factory.get_adapter("126"),
+        }
+
+        for name, gateway in gateways.items():
+            with self.subTest(supplier=name):
+                result = await gateway.book("RES-1", "key", reservation_snapshot=SNAPSHOT)
+                self.assertEqual(result.status, "SUCCESS", result.error_message)
+                self.assertTrue(result.supplier_reservation_code)
+
+        stats = (await self.client.get(f"{BASE_URL}/_stats")).json()
+        self.assertEqual(stats, {name: {"success": 1} for name in sorted(gateways)})
+
+    async def test_business_rejection_uses_the_protocol_error_format(self):
+        await self.client.put(f"{BASE_URL}/_profiles/localiza", json={"reject_rate": 1.0})
+        gateway = SupplierGatewayFactory(simulator_factory_config(BASE_URL)).get_adapter(
+            "localiza"
+        )
+
+        result = await gateway.book("RES-1", "key", reservation_snapshot=SNAPSHOT)
+
+        self.assertEqual(result.status, "FAILED")
+        self.assertEqual(result.error_code, "SUPPLIER_ERROR")
+        self.assertEqual(result.error_message, "Vehicle not available")
+
+
+class TestSimulatorFaults(SimulatorTestCase):
+    config = SimulatorConfig(
+        profiles={
+            "nizacars": SimulatorProfile(error_rate=1.0, error_status=502),
+            "avis": SimulatorProfile(rate_limit_rate=1.0, retry_after_seconds=7),
+            "centauro": SimulatorProfile(timeout_rate=1.0, hang_seconds=30),
+            "americagroup": SimulatorProfile(latency=LATENCY_FIXED, latency_ms=250),
+        }
+    )
+
+    async def test_injected_faults(self):
+        error = await self.client.post(
+            f"{BASE_URL}/nizacars/Create_Reservation.asmx", content=b"<x/>"
+        )
+        throttled = await self.client.post(f"{BASE_URL}/avis", content=b"<x/>")
+        hung = await self.client.post(
+            f"{BASE_URL}/centauro", data={"login": "l", "pwd": "p", "xml": "<R/>"}
+        )
+
+        self.assertEqual(error.status_code, 502)
+        self.assertEqual(throttled.status_code, 429)
+        self.assertEqual(throttled.headers["Retry-After"], "7")
+        self.assertEqual(hung.status_code, 504)
+        self.assertEqual(self.sleep.sleeps, [30])
+
+    async def test_latency_is_applied(self):
+        response = await self.client.get(f"{BASE_URL}/americagroup", params={"XML": "<RQ/>"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.sleep.sleeps, [0.25])
+
+    async def test_rejects_malformed_xml_and_missing_token(self):
+        malformed = await self.client.post(f"{BASE_URL}/localiza", content=b"<unclosed>")
+        no_token = await self.client.post(
+            f"{BASE_URL}/mexgroup/api/brokers/booking-engine/reserve", json={}
+        )
+
+        self.assertEqual(malformed.status_code, 400)
+        self.assertEqual(no_token.status_code, 401)
+
+    async def test_profiles_are_updated_live(self):
+        updated = await self.client.put(f"{BASE_URL}/_profiles/mexgroup", json={"error_rate": 1.0})
+        unknown = await self.client.put(f"{BASE_URL}/_profiles/nope", json={})
+        bad_field = await self.client.put(f"{BASE_URL}/_profiles/mexgroup", json={"nope": 1})
+
+        self.assertEqual(updated.json()["error_rate"], 1.0)
+        self.assertEqual(unknown.status_code, 404)
+        self.assertEqual(bad_field.status_code, 422)
+        profiles = (await self.client.get(f"{BASE_URL}/_profiles")).json()
+        self.assertEqual(profiles["mexgroup"]["error_rate"], 1.0)
+        self.assertEqual(profiles["localiza"]["error_rate"], 0.0)
+
+    async def test_invalid_profile_values_are_rejected(self):
+        for changes in (
+            {"latency": "pareto"},
+            {"latency_ms": "300"},
+            {"error_rate": True},
+            {"timeout_rate": 1.5},
+            {"error_rate": 0.6, "reject_rate": 0.6},
+            {"hang_seconds": -1},
+            {"error_status": 404},
+            {"retry_after_seconds": 2.5},
+        ):
+            with self.subTest(changes=changes):
+                response = await self.client.put(f"{BASE_URL}/_profiles/avis", json=changes)
+                self.assertEqual(response.status_code, 422)
+
+        coerced = await self.client.put(
+            f"{BASE_URL}/_profiles/avis", json={"latency_ms": 300, "retry_after_seconds": 7.0}
+        )
+        profiles = (await self.client.get(f"{BASE_URL}/_profiles")).json()
+        self.assertEqual(coerced.status_code, 200)
+        self.assertEqual(profiles["avis"]["latency_ms"], 300.0)
+        self.assertEqual(profiles["avis"]["retry_after_seconds"], 7)
+        self.assertEqual(profiles["avis"]["latency"], LATENCY_LOGNORMAL)
+
+
+class TestSimulatorProfile(unittest.TestCase):
+    def test_outcome_rates(self):
+        profile = SimulatorProfile(error_rate=0.2, reject_rate=0.3)
+        rng = random.Random(1)
+
+        outcomes = [profile.draw_outcome(rng) for _ in range(10_000)]
+
+        self.assertAlmostEqual(outcomes.count("error") / 10_000, 0.2, delta=0.02)
+        self.assertAlmostEqual(outcomes.count("rejected") / 10_000, 0.3, delta=0.02)
+        self.assertAlmostEqual(outcomes.count("success") / 10_000, 0.5, delta=0.02)
+
+    def test_latency_distributions(self):
+        rng = random.Random(1)
+        uniform = SimulatorProfile(latency=LATENCY_UNIFORM, latency_ms=200, latency_jitter_ms=50)
+        lognormal = SimulatorProfile(latency_ms=100, latency_sigma=0.5)
+
+        uniform_samples = [uniform.sample_latency(rng) for _ in range(1000)]
+        lognormal_samples = sorted(lognormal.sample_latency(rng) for _ in range(1001))
+
+        self.assertTrue(all(0.15 <= s <= 0.25 for s in uniform_samples))
+        self.assertAlmostEqual(lognormal_samples[500], 0.1, delta=0.01)
+        self.assertEqual(SimulatorProfile().sample_latency(rng), 0.0)
+        with self.assertRaises(ValueError):
+            SimulatorProfile(latency="pareto", latency_ms=10).sample_latency(rng)
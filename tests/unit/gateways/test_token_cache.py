@@ -0,0 +1,160 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.infrastructure.gateways.hertz_argentina_gateway import HertzArgentinaGateway
+from app.infrastructure.gateways.token_cache import (
+    IssuedToken,
+    SupplierTokenCache,
+    parse_expires_in,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestSupplierTokenCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.logins = 0
+        self.expires_in = 100.0
+
+    async def _login(self) -> IssuedToken:
+        self.logins += 1
+        await asyncio.sleep(0)
+        return IssuedToken(f"tok-{self.logins}", self.expires_in)
+
+    def _cache(self, **kwargs) -> SupplierTokenCache:
+        return SupplierTokenCache(
+            self._login, "test", refresh_ahead_seconds=20.0, clock=self.clock, **kwargs
+        )
+
+    async def test_concurrent_callers_share_one_login(self):
+        cache = self._cache()
+
+        tokens = await asyncio.gather(*(cache.get() for _ in range(10)))
+
+        self.assertEqual(tokens, ["tok-1"] * 10)
+        self.assertEqual(self.logins, 1)
+        self.assertEqual(await cache.get(), "tok-1")
+        self.assertEqual(self.logins, 1)
+
+    async def test_refreshes_ahead_of_expiry_in_background(self):
+        cache = self._cache()
+        await cache.get()
+
+        self.clock.now += 85  # inside the refresh window, still valid
+        self.assertEqual(await cache.get(), "tok-1")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.logins, 2)
+        self.assertEqual(await cache.get(), "tok-2")
+
+    async def test_expired_token_blocks_on_new_login(self):
+        cache = self._cache()
+        await cache.get()
+
+        self.clock.now += 100
+        self.assertEqual(await cache.get(), "tok-2")
+
+    async def test_default_ttl_when_login_has_no_expiry(self):
+        self.expires_in = None
+        cache = self._cache(default_ttl_seconds=1000.0)
+        await cache.get()
+
+        self.clock.now += 500
+        self.assertEqual(await cache.get(), "tok-1")
+        self.assertEqual(self.logins, 1)
+
+    async def test_invalidate_ignores_already_replaced_token(self):
+        cache = self._cache()
+        await cache.get()
+        cache.invalidate("tok-1")
+        self.assertEqual(await cache.get(), "tok-2")
+
+        cache.invalidate("tok-1")  # stale 401 from a request that used the old token
+
+        self.assertEqual(await cache.get(), "tok-2")
+        self.assertEqual(self.logins, 2)
+
+    async def test_failed_login_propagates_and_is_retried(self):
+        fetch = AsyncMock(side_effect=[RuntimeError("auth down"), IssuedToken("tok", 60)])
+        cache = SupplierTokenCache(fetch, "test", clock=self.clock)
+
+        with self.assertRaises(RuntimeError):
+            await cache.get()
+        self.assertEqual(await cache.get(), "tok")
+
+    def test_parse_expires_in(self):
+        self.assertEqual(parse_expires_in({"expires_in": "3600"}), 3600.0)
+        self.assertIsNone(parse_expires_in({"token": "x"}))
+        remaining = parse_expires_in({"expiration": "2999-01-01T00:00:00Z"})
+        self.assertGreater(remaining, 0)
+
+
+class TestHertzTokenReuse(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.gateway = HertzArgentinaGateway(
+            base_url="http://test.com",
+            auth_url="http://auth.com/token",
+            username="user",
+            password="pass",
+            client_id="client",
+            grant_type="password",
+        )
+        self.snapshot = {
+            "customer": {"first_name": "John", "last_name": "Doe"},
+            "pickup_date": "2023-10-10",
+            "dropoff_date": "2023-10-15",
+            "model": "EDAR",
+        }
+
+    @staticmethod
+    def _response(status_code: int, body: dict) -> MagicMock:
+        response = MagicMock()
+        response.status_code = status_code
+        response.is_success = status_code < 400
+        response.json.return_value = body
+        return response
+
+    @patch("httpx.AsyncClient")
+    async def test_second_booking_reuses_token(self, mock_client_cls):
+        mock_client = AsyncMock()
+        mock_client.post.side_effect = [
+            self._response(200, {"access_token": "tok", "expires_in": 3600}),
+            self._response(200, {"id": "1"}),
+            self._response(200, {"id": "2"}),
+        ]
+        mock_client_cls.return_value = mock_client
+
+        first = await self.gateway.book("RES1", "key1", self.snapshot)
+        second = await self.gateway.book("RES2", "key2", self.snapshot)
+
+        self.assertEqual((first.status, second.status), ("SUCCESS", "SUCCESS"))
+        urls = [call.args[0] for call in mock_client.post.call_args_list]
+        self.assertEqual(
+            urls, ["http://auth.com/token", "http://test.com/Booking", "http://test.com/Booking"]
+        )
+
+    @patch("httpx.AsyncClient")
+    async def test_401_invalidates_token_and_retries_once(self, mock_client_cls):
+        mock_client = AsyncMock()
+        mock_client.post.side_effect = [
+            self._response(200, {"access_token": "old", "expires_in": 3600}),
+            self._response(401, {}),
+            self._response(200, {"access_token": "new", "expires_in": 3600}),
+            self._response(200, {"id": "1"}),
+        ]
+        mock_client_cls.return_value = mock_client
+
+        result = await self.gateway.book("RES1", "key", self.snapshot)
+
+        self.assertEqual(result.status, "SUCCESS")
+        calls = mock_client.post.call_args_list
+        self.assertEqual(calls[3].kwargs["headers"]["Authorization"], "Bearer new")
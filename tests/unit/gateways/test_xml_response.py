@@ -0,0 +1,105 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from app.infrastructure.gateways.centauro_adapter import CentauroAdapter
+from app.infrastructure.gateways.xml_response import (
+    ResponseTooLarge,
+    find_first_text,
+    scan_ota_response,
+)
+
+SUCCESS_RS = b"""\xef\xbb\xbf
+<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/">
+    <soap:Body>
+        <OTA_VehResRS xmlns="http://www.opentravel.org/OTA/2003/05">
+            <Success/>
+            <VehResRSCore>
+                <VehReservation>
+                    <VehSegmentCore><ConfID ID="CONF-1" Type="14"/></VehSegmentCore>
+                </VehReservation>
+            </VehResRSCore>
+        </OTA_VehResRS>
+    </soap:Body>
+</soap:Envelope>"""
+
+
+class CentauroStub(CentauroAdapter):
+    async def confirm_booking(self, reservation_code, details):
+        raise NotImplementedError
+
+
+class TestScanOtaResponse(unittest.TestCase):
+    def test_success_with_namespaces_and_bom(self):
+        parsed = scan_ota_response(SUCCESS_RS, root_tag="OTA_VehResRS")
+
+        self.assertTrue(parsed.root_found)
+        self.assertTrue(parsed.success)
+        self.assertEqual(parsed.conf_id, "CONF-1")
+        self.assertEqual(parsed.errors, [])
+
+    def test_stops_at_conf_id_before_trailing_content(self):
+        rate_rules = b"<RateRule>x</RateRule>" * 20_000
+        content = b'<RS><ConfID ID="EARLY"/><Rules>' + rate_rules + b"<broken"
+
+        self.assertEqual(scan_ota_response(content).conf_id, "EARLY")
+
+    def test_collects_errors(self):
+        content = (
+            b"<OTA_VehResRS><Errors>"
+            b'<Error ShortText="Sold out"/><Error>Bad dates</Error>'
+            b"</Errors></OTA_VehResRS>"
+        )
+
+        parsed = scan_ota_response(content, root_tag="OTA_VehResRS")
+
+        self.assertIsNone(parsed.conf_id)
+        self.assertEqual(parsed.errors, ["Sold out", "Bad dates"])
+
+    def test_missing_root_tag(self):
+        parsed = scan_ota_response(b"<Fault/>", root_tag="OTA_VehResRS")
+
+        self.assertFalse(parsed.root_found)
+
+    def test_rejects_oversized_response(self):
+        with self.assertRaises(ResponseTooLarge):
+            scan_ota_response(b"<RS>" + b" " * 100 + b"</RS>", max_bytes=50)
+
+    def test_malformed_xml_raises_parse_error(self):
+        with self.assertRaises(ET.ParseError):
+            scan_ota_response(b"<RS><Unclosed></RS>")
+        with self.assertRaises(ET.ParseError):
+            scan_ota_response(b"")
+
+
+class TestFindFirstText(unittest.TestCase):
+    def test_prefers_first_tag(self):
+        content = b"<R><CODE>MCR-1</CODE><ID_RESERVATION>CEN-9</ID_RESERVATION></R>"
+
+        self.assertEqual(find_first_text(content, ("ID_RESERVATION", "CODE")), "CEN-9")
+
+    def test_falls_back_to_later_tags(self):
+        content = b"<R><ID_RESERVATION/><CODE>MCR-1</CODE></R>"
+
+        self.assertEqual(find_first_text(content, ("ID_RESERVATION", "CODE")), "MCR-1")
+        self.assertIsNone(find_first_text(b"<R/>", ("ID_RESERVATION",)))
+
+
+class TestCentauroParseResponse(unittest.TestCase):
+    def setUp(self):
+        self.adapter = CentauroStub("http://test.com", "login", "pwd", 1)
+
+    def test_confirmation(self):
+        result = self.adapter._parse_response(
+            b"<RESPONSE><ID_RESERVATION>CEN-9</ID_RESERVATION></RESPONSE>"
+        )
+
+        self.assertEqual(result.status, "SUCCESS")
+        self.assertEqual(result.supplier_reservation_code, "CEN-9")
+
+    def test_rejection_and_parse_error(self):
+        self.assertEqual(
+            self.adapter._parse_response(b"<RESPONSE/>").error_code, "CENTAURO_REJECTED"
+        )
+        self.assertEqual(
+            self.adapter._parse_response(b"not xml").error_code, "CENTAURO_PARSE_ERROR"
+        )
@@ -0,0 +1,89 @@
+import unittest
+import xml.etree.ElementTree as ET
+
+from app.infrastructure.gateways.america_group_gateway import AmericaGroupGateway
+from app.infrastructure.gateways.avis_adapter import AvisAdapter
+from app.infrastructure.gateways.xml_templates import (
+    SOAP_ENV_NS,
+    XmlTemplate,
+    soap_envelope,
+    xml_attr,
+    xml_escape,
+)
+
+
+class TestXmlEscape(unittest.TestCase):
+    def test_escapes_markup_and_drops_invalid_control_chars(self):
+        self.assertEqual(xml_escape('a & <b> "c"\x01'), b"a &amp; &lt;b&gt; &quot;c&quot;")
+
+    def test_passthrough_values(self):
+        self.assertEqual(xml_escape("plain"), b"plain")
+        self.assertEqual(xml_escape(12.5), b"12.5")
+        self.assertEqual(xml_escape(None), b"")
+        self.assertEqual(xml_escape(b"<raw/>"), b"<raw/>")
+
+    def test_optional_attribute(self):
+        self.assertEqual(xml_attr("Size", "4"), b' Size="4"')
+        self.assertEqual(xml_attr("Size", ""), b"")
+        self.assertEqual(xml_attr("Size", None), b"")
+
+
+class TestXmlTemplate(unittest.TestCase):
+    def test_render_compacts_layout_and_escapes_values(self):
+        template = XmlTemplate(
+            """
+            <Root ID="{id}">
+                <Name>{first} {last}</Name>
+                {extra}
+            </Root>
+            """
+        )
+
+        xml = template.render(id='1"2', first="Ana & Jo", last="<x>", extra=b"<Extra/>")
+
+        self.assertEqual(
+            xml,
+            b'<Root ID="1&quot;2"><Name>Ana &amp; Jo &lt;x&gt;</Name><Extra/></Root>',
+        )
+        self.assertEqual(ET.fromstring(xml).find("Name").text, "Ana & Jo <x>")
+
+    def test_missing_value_raises(self):
+        with self.assertRaises(KeyError):
+            XmlTemplate("<A>{a}</A>").render()
+
+    def test_soap_envelope(self):
+        envelope = soap_envelope(
+            b"<Body/>", header=b"<Auth/>", namespaces={"ota": "urn:ota"}
+        )
+
+        root = ET.fromstring(envelope)
+        self.assertTrue(envelope.startswith(b"<?xml"))
+        self.assertEqual(root.tag, f"{{{SOAP_ENV_NS}}}Envelope")
+        self.assertIsNotNone(root.find(f"{{{SOAP_ENV_NS}}}Header/Auth"))
+        self.assertIsNotNone(root.find(f"{{{SOAP_ENV_NS}}}Body/Body"))
+
+
+class TestAdapterPayloads(unittest.TestCase):
+    def test_america_group_payload_is_well_formed(self):
+        gateway = AmericaGroupGateway(endpoint="http://test.com", requestor_id="5")
+
+        xml = gateway._build_xml(
+            "RES1", "CUN", "CUN", "ECAR", None, "2026-01-01T10:00", "2026-01-05T10:00",
+            "RES1", {"first_name": "José & Ana"},
+        )
+
+        root = ET.fromstring(xml.encode())
+        self.assertEqual(root.find(".//GivenName").text, "José & Ana")
+        self.assertEqual(root.find(".//VehClass").text, "ECAR")
+        self.assertNotIn("VendorRateID", root.find(".//RateQualifier").attrib)
+
+    def test_avis_credentials_are_escaped(self):
+        adapter = AvisAdapter("http://test.com", "user", "p<ss&")
+
+        envelope = adapter._build_soap_envelope(
+            adapter._build_ota_res_rq("MIA", "d1", "d2", "e@x.com", "Ana", "O'Neil")
+        )
+
+        root = ET.fromstring(envelope)
+        password = root.find(".//{http://wsg.avis.com/wsbang/authInAny}password")
+        self.assertEqual(password.text, "p<ss&")
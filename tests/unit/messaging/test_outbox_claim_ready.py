@@ -0,0 +1,151 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure.db.repositories.outbox_repo_sql import OutboxRepoSQL
+from app.infrastructure.db.tables import metadata, reservations
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+
+
+def _reservation_row(code: str, supplier_id: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "reservation_code": code,
+        "supplier_id": supplier_id,
+        "country_code": "MX",
+        "pickup_office_id": 1,
+        "dropoff_office_id": 1,
+        "car_category_id": 1,
+        "pickup_datetime": now,
+        "dropoff_datetime": now,
+        "rental_days": 1,
+        "currency_code": "USD",
+        "public_price_total": 0,
+        "supplier_cost_total": 0,
+        "taxes_total": 0,
+        "fees_total": 0,
+        "discount_total": 0,
+        "commission_total": 0,
+        "cashback_earned_amount": 0,
+        "status": "ON_REQUEST",
+        "payment_status": "PAID",
+        "sales_channel_id": 1,
+    }
+
+
+class TestInMemoryClaimReady(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.repo = InMemoryOutboxRepo()
+        for i in range(5):
+            await self.repo.enqueue(
+                event_type="BOOK_SUPPLIER",
+                aggregate_type="reservation",
+                aggregate_code=f"RES-{i}",
+                payload={"reservation_code": f"RES-{i}"},
+            )
+        self.now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    async def test_claims_up_to_limit_in_order(self):
+        events = await self.repo.claim_ready(limit=3, locked_by="w1", now=self.now)
+
+        self.assertEqual([e.id for e in events], [1, 2, 3])
+        self.assertTrue(all(e.status == "IN_PROGRESS" and e.locked_by == "w1" for e in events))
+
+    async def test_second_worker_skips_leased_events(self):
+        await self.repo.claim_ready(limit=3, locked_by="w1", now=self.now)
+        events = await self.repo.claim_ready(limit=10, locked_by="w2", now=self.now)
+
+        self.assertEqual([e.id for e in events], [4, 5])
+
+    async def test_skips_events_not_due(self):
+        await self.repo.mark_retry(
+            event_id=1,
+            attempts=1,
+            next_attempt_at=self.now + timedelta(minutes=5),
+            error_code="TIMEOUT",
+            error_message=None,
+        )
+        events = await self.repo.claim_ready(limit=10, locked_by="w1", now=self.now)
+
+        self.assertNotIn(1, [e.id for e in events])
+
+
+class TestSQLClaimReady(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        async with self.session_maker() as session, session.begin():
+            repo = OutboxRepoSQL(session)
+            for i in range(5):
+                await repo.enqueue(
+                    event_type="BOOK_SUPPLIER",
+                    aggregate_type="reservation",
+                    aggregate_code=f"RES-{i}",
+                    payload={"reservation_code": f"RES-{i}"},
+                )
+        self.now = datetime.utcnow() + timedelta(seconds=1)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_batch_claim_leases_rows(self):
+        async with self.session_maker() as session, session.begin():
+            events = await OutboxRepoSQL(session).claim_ready(
+                limit=3, locked_by="w1", now=self.now
+            )
+
+        self.assertEqual(len(events), 3)
+        self.assertTrue(all(e.status == "IN_PROGRESS" and e.locked_by == "w1" for e in events))
+
+    async def test_concurrent_workers_get_disjoint_batches(self):
+        async with self.session_maker() as session, session.begin():
+            first = await OutboxRepoSQL(session).claim_ready(limit=3, locked_by="w1", now=self.now)
+        async with self.session_maker() as session, session.begin():
+            second = await OutboxRepoSQL(session).claim_ready(
+                limit=10, locked_by="w2", now=self.now
+            )
+
+        self.assertEqual(len(second), 2)
+        self.assertFalse({e.id for e in first} & {e.id for e in second})
+
+    async def test_expired_lease_can_be_reclaimed(self):
+        async with self.session_maker() as session, session.begin():
+            await OutboxRepoSQL(session).claim_ready(
+                limit=1, locked_by="w1", now=self.now, lock_ttl_seconds=30
+            )
+        async with self.session_maker() as session, session.begin():
+            repo = OutboxRepoSQL(session)
+            still_leased = await repo.claim_ready(limit=1, locked_by="w2", now=self.now)
+            later = self.now + timedelta(seconds=31)
+            reclaimed = await repo.claim_ready(limit=1, locked_by="w3", now=later)
+
+        self.assertNotEqual(still_leased[0].id, 1)
+        self.assertEqual(reclaimed[0].id, 1)
+        self.assertEqual(reclaimed[0].locked_by, "w3")
+
+    async def test_supplier_filter_uses_supplier_copied_on_enqueue(self):
+        codes = [f"SUP-{i}" for i in range(5)]
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                insert(reservations),
+                [_reservation_row(c, supplier_id=7 if i % 2 else 9) for i, c in enumerate(codes)],
+            )
+        async with self.session_maker() as session, session.begin():
+            repo = OutboxRepoSQL(session)
+            for code in codes:
+                await repo.enqueue("BOOK_SUPPLIER", "reservation", code, {})
+            counts = await repo.count_ready_by_supplier(now=self.now)
+
+        async with self.session_maker() as session, session.begin():
+            events = await OutboxRepoSQL(session).claim_ready(
+                limit=10, locked_by="w1", now=self.now, supplier_id=7
+            )
+
+        self.assertEqual(sorted(e.aggregate_code for e in events), ["SUP-1", "SUP-3"])
+        self.assertTrue(all(e.supplier_id == 7 for e in events))
+        # RES-* were enqueued before their reservations existed
+        self.assertEqual(counts, {0: 5, 7: 2, 9: 3})
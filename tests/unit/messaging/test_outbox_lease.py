@@ -0,0 +1,139 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.infrastructure.db.repositories.outbox_repo_sql import ScopedOutboxRepoSQL
+from app.infrastructure.db.tables import metadata
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+from app.infrastructure.messaging.lease import LeaseHeartbeat
+from app.infrastructure.messaging.outbox_worker import OutboxWorker
+from app.infrastructure.services.clock_impl import ClockImpl
+
+
+class TestLeaseHeartbeat(unittest.IsolatedAsyncioTestCase):
+    async def test_renews_while_running(self):
+        calls = 0
+
+        async def renew():
+            nonlocal calls
+            calls += 1
+            return True
+
+        async with LeaseHeartbeat(renew, interval_seconds=0.02) as heartbeat:
+            await asyncio.sleep(0.15)
+
+        self.assertGreaterEqual(heartbeat.renewals, 3)
+        self.assertFalse(heartbeat.lost)
+        await asyncio.sleep(0.05)
+        self.assertEqual(calls, heartbeat.renewals)  # stopped on exit
+
+    async def test_stops_when_lease_is_lost(self):
+        async def renew():
+            return False
+
+        async with LeaseHeartbeat(renew, interval_seconds=0.01) as heartbeat:
+            await asyncio.sleep(0.05)
+
+        self.assertTrue(heartbeat.lost)
+        self.assertEqual(heartbeat.renewals, 0)
+
+    async def test_transient_errors_do_not_stop_renewal(self):
+        results = [RuntimeError("db down"), True, True]
+
+        async def renew():
+            result = results.pop(0) if results else True
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        async with LeaseHeartbeat(renew, interval_seconds=0.01) as heartbeat:
+            await asyncio.sleep(0.08)
+
+        self.assertFalse(heartbeat.lost)
+        self.assertGreaterEqual(heartbeat.renewals, 2)
+
+
+class TestSQLLeaseFencing(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self.repo = ScopedOutboxRepoSQL(async_sessionmaker(self.engine, expire_on_commit=False))
+        await self.repo.enqueue("BOOK_SUPPLIER", "reservation", "RES-1", {})
+        self.now = datetime.utcnow() + timedelta(seconds=1)
+        [self.event] = await self.repo.claim_ready(
+            limit=1, locked_by="w1", now=self.now, lock_ttl_seconds=30
+        )
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_renew_extends_lease_of_holder_only(self):
+        later = self.now + timedelta(seconds=20)
+
+        self.assertTrue(await self.repo.renew_lease(self.event.id, "w1", later, 30))
+        self.assertFalse(await self.repo.renew_lease(self.event.id, "w2", later, 30))
+
+        event = await self.repo.get_by_id(self.event.id)
+        self.assertEqual(event.lock_expires_at, later + timedelta(seconds=30))
+
+    async def test_reclaimed_event_rejects_stale_completion(self):
+        expired = self.now + timedelta(seconds=31)
+        [reclaimed] = await self.repo.claim_ready(limit=1, locked_by="w2", now=expired)
+
+        self.assertFalse(await self.repo.mark_done(self.event.id, locked_by="w1"))
+        self.assertFalse(
+            await self.repo.mark_retry(self.event.id, 1, expired, "TIMEOUT", None, locked_by="w1")
+        )
+        self.assertFalse(await self.repo.move_to_dlq(self.event, locked_by="w1"))
+        self.assertFalse(await self.repo.renew_lease(self.event.id, "w1", expired, 30))
+
+        event = await self.repo.get_by_id(reclaimed.id)
+        self.assertEqual((event.status, event.locked_by), ("IN_PROGRESS", "w2"))
+        self.assertTrue(await self.repo.mark_done(reclaimed.id, locked_by="w2"))
+
+
+class TestWorkerLease(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.repo = InMemoryOutboxRepo()
+        await self.repo.enqueue("BOOK_SUPPLIER", "reservation", "RES-1", {})
+
+    def _worker(self, **kwargs) -> OutboxWorker:
+        return OutboxWorker(
+            outbox_repo=self.repo,
+            supplier_gateway=None,
+            clock=ClockImpl(),
+            worker_id="w1",
+            **kwargs,
+        )
+
+    async def test_heartbeat_keeps_slow_handler_lease_alive(self):
+        worker = self._worker(lock_duration_seconds=1, heartbeat_interval_seconds=0.02)
+        expiries = []
+
+        async def handler(event):
+            for _ in range(5):
+                await asyncio.sleep(0.03)
+                expiries.append((await self.repo.get_by_id(event.id)).lock_expires_at)
+
+        worker.register_handler("BOOK_SUPPLIER", handler)
+        self.assertEqual(await worker._process_batch(), 1)
+
+        self.assertGreater(expiries[-1], expiries[0])
+        self.assertEqual((await self.repo.get_by_id(1)).status, "DONE")
+
+    async def test_result_discarded_when_lease_lost(self):
+        worker = self._worker(lock_duration_seconds=1, heartbeat_interval_seconds=10)
+
+        async def handler(event):
+            # Lease expires and another worker reclaims the event mid-call
+            later = datetime.now(timezone.utc) + timedelta(seconds=5)
+            await self.repo.claim_ready(limit=1, locked_by="w2", now=later)
+
+        worker.register_handler("BOOK_SUPPLIER", handler)
+        self.assertEqual(await worker._process_batch(), 0)
+
+        event = await self.repo.get_by_id(1)
+        self.assertEqual((event.status, event.locked_by), ("IN_PROGRESS", "w2"))
@@ -0,0 +1,256 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.application.use_cases.get_outbox_metrics import GetOutboxMetricsUseCase
+from app.infrastructure.circuit_breaker import SupplierBreakerRegistry
+from app.infrastructure.db.repositories.outbox_repo_sql import OutboxRepoSQL
+from app.infrastructure.db.tables import metadata, outbox_dead_letters
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+from app.infrastructure.gateways.in_memory.supplier_gateway import StubSupplierGateway
+from app.infrastructure.gateways.supplier_limiter import SupplierLimiterRegistry
+from app.infrastructure.messaging.metrics import (
+    Histogram,
+    MetricsSnapshotStore,
+    OutboxMetrics,
+    render_prometheus,
+)
+from app.infrastructure.messaging.outbox_worker import OutboxWorker
+from app.infrastructure.services.clock_impl import ClockImpl
+
+
+class TestHistogram(unittest.TestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram(buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+
+        self.assertEqual(snapshot["count"], 4)
+        self.assertAlmostEqual(snapshot["sum"], 3.65)
+        self.assertEqual(snapshot["buckets"], [[0.1, 2], [1, 3], ["+Inf", 4]])
+
+
+class TestInMemoryOutboxMetrics(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.repo = InMemoryOutboxRepo()
+        for i, supplier_id in enumerate((1, 1, 7)):
+            await self.repo.enqueue(
+                event_type="BOOK_SUPPLIER",
+                aggregate_type="reservation",
+                aggregate_code=f"RES-{i}",
+                payload={"reservation_code": f"RES-{i}"},
+                supplier_id=supplier_id,
+            )
+        await self.repo.enqueue(
+            event_type="SEND_EMAIL",
+            aggregate_type="reservation",
+            aggregate_code="RES-9",
+            payload={},
+        )
+        self.now = datetime.now(timezone.utc) + timedelta(seconds=30)
+        self.metrics = OutboxMetrics(buckets=(0.1, 1))
+        self.breakers = SupplierBreakerRegistry(min_calls=1)
+        self.limiters = SupplierLimiterRegistry(max_concurrency=2)
+        self.use_case = GetOutboxMetricsUseCase(
+            self.repo, self.metrics, self.breakers, self.limiters
+        )
+
+    async def test_queue_depth_lag_and_dlq(self):
+        [event] = await self.repo.claim_ready(
+            limit=1, locked_by="w1", now=self.now, event_type="BOOK_SUPPLIER"
+        )
+        await self.repo.move_to_dlq(event=event, error_code="AUTH_ERROR", locked_by="w1")
+        await self.repo.claim_ready(limit=1, locked_by="w1", now=self.now)
+
+        report = await self.use_case.execute(now=self.now)
+
+        self.assertEqual(
+            report["queue"]["by_event_type"]["BOOK_SUPPLIER"],
+            {"NEW": 1, "RETRY": 0, "IN_PROGRESS": 1, "FAILED": 1},
+        )
+        self.assertEqual(report["queue"]["by_supplier"]["7"]["NEW"], 1)
+        self.assertEqual(report["queue"]["by_supplier"]["0"]["NEW"], 1)
+        self.assertGreaterEqual(report["queue"]["oldest_ready_age_seconds"], 29)
+        self.assertEqual(report["dlq"]["moved"], {"5m": 1, "1h": 1})
+        self.assertEqual(report["dlq"]["inflow_per_minute_5m"], 0.2)
+
+    async def test_prometheus_rendering(self):
+        self.metrics.observe_claim(0.05, claimed=3)
+        self.metrics.observe_handler("BOOK_SUPPLIER", 0.5, "ok")
+
+        text = render_prometheus(await self.use_case.execute(now=self.now))
+
+        self.assertIn('outbox_events{event_type="SEND_EMAIL",status="NEW"} 1', text)
+        self.assertIn('outbox_events_by_supplier{supplier_id="1",status="NEW"} 2', text)
+        self.assertIn('outbox_dlq_moved{window="5m"} 0', text)
+        self.assertIn('outbox_claim_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn("outbox_claimed_events_total 3", text)
+        self.assertIn(
+            'outbox_handler_duration_seconds_count{event_type="BOOK_SUPPLIER",outcome="ok"} 1',
+            text,
+        )
+
+    async def test_no_worker_histograms_without_observations(self):
+        report = await self.use_case.execute(now=self.now)
+        text = render_prometheus(report)
+
+        self.assertIsNone(report["worker"])
+        self.assertEqual(report["sources"]["queue"], "database")
+        self.assertNotIn("outbox_claim_latency_seconds", text)
+        self.assertIn('outbox_events{event_type="SEND_EMAIL",status="NEW"} 1', text)
+
+    async def test_sums_snapshots_published_by_worker_processes(self):
+        clock = [1000.0]
+        store = MetricsSnapshotStore(tempfile.mkdtemp(), clock=lambda: clock[0])
+        for pid, seconds in ((101, 0.05), (102, 0.5)):
+            metrics = OutboxMetrics(buckets=(0.1, 1))
+            metrics.observe_claim(seconds, claimed=2)
+            metrics.observe_handler("BOOK_SUPPLIER", seconds, "CONFIRMED")
+            limiters = SupplierLimiterRegistry(max_concurrency=2)
+            async with limiters.slot(7):
+                store.publish(
+                    {
+                        "outbox": metrics.snapshot(),
+                        "circuit_breakers": [],
+                        "supplier_limiters": limiters.snapshot(),
+                    },
+                    interval_seconds=10,
+                    pid=pid,
+                )
+        clock[0] += 10
+        store.publish({"outbox": OutboxMetrics().snapshot()}, interval_seconds=10, pid=103)
+        clock[0] += 5
+        stale = OutboxMetrics(buckets=(0.1, 1))
+        stale.observe_claim(9, claimed=50)
+        store.publish({"outbox": stale.snapshot()}, interval_seconds=1, pid=104)
+        clock[0] += 5  # 101/102 are 2 intervals old, 104 is 5 intervals old
+        use_case = GetOutboxMetricsUseCase(self.repo, self.metrics, snapshot_store=store)
+
+        report = await use_case.execute(now=self.now)
+        text = render_prometheus(report)
+
+        worker = report["worker"]
+        self.assertEqual(worker["processes"], [101, 102])  # 103 idle, 104 stale
+        self.assertEqual(worker["claimed_events"], 4)
+        self.assertEqual(
+            worker["claim_latency_seconds"]["buckets"], [[0.1, 1], [1, 2], ["+Inf", 2]]
+        )
+        [handler] = worker["handler_duration_seconds"]
+        self.assertEqual((handler["outcome"], handler["count"]), ("CONFIRMED", 2))
+        self.assertIn("outbox_worker_processes 2", text)
+        self.assertIn('supplier_limiter_in_flight{supplier_id="7",pid="102"} 1', text)
+
+        store.remove(pid=101)
+        self.assertFalse(os.path.exists(store._path(101)))
+
+    async def test_circuit_breaker_states(self):
+        async def down():
+            raise RuntimeError("down")
+
+        with self.assertRaises(RuntimeError):
+            await self.breakers.get("NizaCarsGateway").call(down)
+        self.breakers.get("HertzArgentinaGateway")
+
+        report = await self.use_case.execute(now=self.now)
+        text = render_prometheus(report)
+
+        self.assertEqual(
+            [(b["name"], b["state"]) for b in report["circuit_breakers"]],
+            [("HertzArgentinaGateway", "closed"), ("NizaCarsGateway", "open")],
+        )
+        self.assertIn('supplier_circuit_state{supplier="NizaCarsGateway",state="open"} 1', text)
+        self.assertIn('supplier_circuit_opened_total{supplier="NizaCarsGateway"} 1', text)
+
+    async def test_supplier_limiter_queues(self):
+        async with self.limiters.slot(7):
+            text = render_prometheus(await self.use_case.execute(now=self.now))
+
+        self.assertIn('supplier_limiter_in_flight{supplier_id="7"} 1', text)
+        self.assertIn('supplier_limiter_wait_seconds_count{supplier_id="7"} 1', text)
+
+
+class TestSQLQueueStats(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.now = datetime.now(timezone.utc) + timedelta(seconds=60)
+        async with self.session_maker() as session, session.begin():
+            repo = OutboxRepoSQL(session)
+            for i, supplier_id in enumerate((3, 3, 5)):
+                await repo.enqueue(
+                    event_type="BOOK_SUPPLIER",
+                    aggregate_type="reservation",
+                    aggregate_code=f"RES-{i}",
+                    payload={"reservation_code": f"RES-{i}"},
+                    supplier_id=supplier_id,
+                )
+            naive_now = self.now.replace(tzinfo=None)
+            for minutes in (1, 30, 120):
+                await session.execute(
+                    insert(outbox_dead_letters).values(
+                        original_event_id=100 + minutes,
+                        event_type="BOOK_SUPPLIER",
+                        aggregate_type="reservation",
+                        aggregate_id=0,
+                        payload={},
+                        error_code="TIMEOUT",
+                        attempts=5,
+                        moved_at=naive_now - timedelta(minutes=minutes),
+                        created_at=naive_now,
+                    )
+                )
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_counts_lag_and_dlq_windows(self):
+        async with self.session_maker() as session, session.begin():
+            repo = OutboxRepoSQL(session)
+            await repo.claim_ready(limit=1, locked_by="w1", now=self.now, supplier_id=5)
+            stats = await repo.queue_stats(self.now, dlq_windows=(300, 3600))
+
+        self.assertEqual(
+            stats.counts,
+            {("BOOK_SUPPLIER", 3, "NEW"): 2, ("BOOK_SUPPLIER", 5, "IN_PROGRESS"): 1},
+        )
+        self.assertGreaterEqual(stats.oldest_ready_age_seconds, 59)
+        self.assertEqual(stats.dead_letters_moved, {300: 1, 3600: 2})
+
+
+class TestWorkerInstrumentation(unittest.IsolatedAsyncioTestCase):
+    async def test_claim_and_handler_observed(self):
+        repo = InMemoryOutboxRepo()
+        for i in range(2):
+            await repo.enqueue(
+                event_type="BOOK_SUPPLIER",
+                aggregate_type="reservation",
+                aggregate_code=f"RES-{i}",
+                payload={"reservation_code": f"RES-{i}"},
+            )
+        metrics = OutboxMetrics()
+        worker = OutboxWorker(
+            outbox_repo=repo,
+            supplier_gateway=StubSupplierGateway(),
+            clock=ClockImpl(),
+            max_in_flight=2,
+            metrics=metrics,
+        )
+        worker.register_handler("BOOK_SUPPLIER", lambda event: asyncio.sleep(0))
+
+        await worker._process_batch()
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["claimed_events"], 2)
+        self.assertGreaterEqual(snapshot["claim_latency_seconds"]["count"], 1)
+        [handler] = snapshot["handler_duration_seconds"]
+        self.assertEqual((handler["event_type"], handler["outcome"]), ("BOOK_SUPPLIER", "ok"))
+        self.assertEqual(handler["count"], 2)
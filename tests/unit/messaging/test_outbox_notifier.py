@@ -0,0 +1,114 @@
+import asyncio
+import socket
+import time
+import unittest
+
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+from app.infrastructure.gateways.in_memory.supplier_gateway import StubSupplierGateway
+from app.infrastructure.messaging.notifier import InProcessOutboxNotifier, LocalSocketOutboxNotifier
+from app.infrastructure.messaging.outbox_worker import OutboxWorker
+from app.infrastructure.services.clock_impl import ClockImpl
+
+
+def _free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestInProcessOutboxNotifier(unittest.IsolatedAsyncioTestCase):
+    async def test_wait_times_out_without_notification(self):
+        notifier = InProcessOutboxNotifier()
+        self.assertFalse(await notifier.wait(timeout=0.01))
+
+    async def test_notify_wakes_waiter(self):
+        notifier = InProcessOutboxNotifier()
+        waiter = asyncio.create_task(notifier.wait(timeout=5))
+        await asyncio.sleep(0)
+
+        await notifier.notify("BOOK_SUPPLIER", "RES-1")
+
+        self.assertTrue(await asyncio.wait_for(waiter, timeout=1))
+
+    async def test_notification_before_wait_is_not_lost(self):
+        notifier = InProcessOutboxNotifier()
+        await notifier.notify("BOOK_SUPPLIER", "RES-1")
+
+        self.assertTrue(await notifier.wait(timeout=0.01))
+        self.assertFalse(await notifier.wait(timeout=0.01))
+
+
+class TestLocalSocketOutboxNotifier(unittest.IsolatedAsyncioTestCase):
+    async def test_datagram_wakes_listener(self):
+        port = _free_udp_port()
+        listener = LocalSocketOutboxNotifier(port=port)
+        producer = LocalSocketOutboxNotifier(port=port)
+        await listener.listen()
+        try:
+            waiter = asyncio.create_task(listener.wait(timeout=5))
+            await asyncio.sleep(0)
+            await producer.notify("BOOK_SUPPLIER", "RES-1")
+
+            self.assertTrue(await asyncio.wait_for(waiter, timeout=1))
+        finally:
+            listener.close()
+            producer.close()
+
+
+    async def test_every_worker_process_is_woken(self):
+        port = _free_udp_port()
+        while True:  # port + 1 también libre
+            try:
+                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+                    sock.bind(("127.0.0.1", port + 1))
+                break
+            except OSError:
+                port = _free_udp_port()
+        workers = [LocalSocketOutboxNotifier(port=port, listeners=2) for _ in range(2)]
+        producer = LocalSocketOutboxNotifier(port=port, listeners=2)
+        for index, worker in enumerate(workers):
+            await worker.listen(index)
+        try:
+            waiters = [asyncio.create_task(w.wait(timeout=5)) for w in workers]
+            await asyncio.sleep(0)
+            for code in ("RES-1", "RES-2", "RES-3"):
+                await producer.notify("BOOK_SUPPLIER", code)
+
+            self.assertEqual(
+                await asyncio.wait_for(asyncio.gather(*waiters), timeout=1), [True, True]
+            )
+        finally:
+            for notifier in (*workers, producer):
+                notifier.close()
+
+
+class TestWorkerWakeup(unittest.IsolatedAsyncioTestCase):
+    async def test_worker_picks_up_event_without_waiting_poll_interval(self):
+        repo = InMemoryOutboxRepo()
+        notifier = InProcessOutboxNotifier()
+        done = asyncio.Event()
+        worker = OutboxWorker(
+            outbox_repo=repo,
+            supplier_gateway=StubSupplierGateway(),
+            clock=ClockImpl(),
+            poll_interval_seconds=30,
+            notifier=notifier,
+        )
+
+        async def handler(event):
+            done.set()
+
+        worker.register_handler("BOOK_SUPPLIER", handler)
+        task = asyncio.create_task(worker.start())
+        await asyncio.sleep(0.05)  # worker is now idle, waiting for work
+
+        started = time.perf_counter()
+        await repo.enqueue("BOOK_SUPPLIER", "reservation", "RES-1", {"reservation_code": "RES-1"})
+        await notifier.notify("BOOK_SUPPLIER", "RES-1")
+        await asyncio.wait_for(done.wait(), timeout=2)
+        elapsed = time.perf_counter() - started
+
+        await worker.stop()
+        await notifier.notify("BOOK_SUPPLIER")
+        await asyncio.wait_for(task, timeout=2)
+        self.assertLess(elapsed, 1.0)
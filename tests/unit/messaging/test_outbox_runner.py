@@ -0,0 +1,156 @@
+import os
+import signal
+import sys
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.application.interfaces.outbox_repo import outbox_shard_key
+from app.infrastructure.db.repositories.outbox_repo_sql import ScopedOutboxRepoSQL
+from app.infrastructure.db.tables import metadata, outbox_events
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+from app.infrastructure.messaging.outbox_worker import OutboxWorker
+from app.infrastructure.messaging.runner import RunnerConfig, WorkerSupervisor
+from app.infrastructure.services.clock_impl import ClockImpl
+
+SHARDS = 3
+
+
+def _crash(index: int, config: RunnerConfig) -> None:
+    os._exit(1)
+
+
+def _idle_until_sigterm(index: int, config: RunnerConfig) -> None:
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    while True:
+        time.sleep(0.05)
+
+
+class TestShardedClaim(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        self.session_maker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.repo = ScopedOutboxRepoSQL(self.session_maker)
+        self.codes = [f"RES-{i}" for i in range(30)]
+        for code in self.codes:
+            await self.repo.enqueue(
+                "BOOK_SUPPLIER", "reservation", code, {"reservation_code": code}
+            )
+        self.now = datetime.utcnow() + timedelta(seconds=1)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def _claim_all(self) -> dict[int, set[str]]:
+        claimed = {}
+        for index in range(SHARDS):
+            events = await self.repo.claim_ready(
+                limit=100, locked_by=f"w{index}", now=self.now, shard=(index, SHARDS)
+            )
+            claimed[index] = {e.aggregate_code for e in events}
+        return claimed
+
+    async def test_shards_partition_the_queue(self):
+        claimed = await self._claim_all()
+
+        self.assertEqual(set().union(*claimed.values()), set(self.codes))
+        self.assertEqual(sum(len(codes) for codes in claimed.values()), len(self.codes))
+        for index, codes in claimed.items():
+            self.assertTrue(all(outbox_shard_key(c) % SHARDS == index for c in codes))
+
+    async def test_rows_without_shard_key_go_to_shard_zero(self):
+        async with self.engine.begin() as conn:
+            await conn.execute(update(outbox_events).values(shard_key=None))
+
+        claimed = await self._claim_all()
+
+        self.assertEqual(claimed[0], set(self.codes))
+        self.assertEqual(claimed[1] | claimed[2], set())
+
+
+class TestInMemoryShardedClaim(unittest.IsolatedAsyncioTestCase):
+    async def test_shard_filter(self):
+        repo = InMemoryOutboxRepo()
+        for i in range(12):
+            await repo.enqueue("BOOK_SUPPLIER", "reservation", f"RES-{i}", {})
+        now = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+        events = await repo.claim_ready(limit=100, locked_by="w1", now=now, shard=(1, SHARDS))
+
+        self.assertTrue(events)
+        self.assertTrue(all(outbox_shard_key(e.aggregate_code) % SHARDS == 1 for e in events))
+
+
+class TestSelfManagedHandler(unittest.IsolatedAsyncioTestCase):
+    async def test_worker_does_not_mark_done_when_handler_manages_status(self):
+        repo = InMemoryOutboxRepo()
+        await repo.enqueue("BOOK_SUPPLIER", "reservation", "RES-1", {})
+        worker = OutboxWorker(outbox_repo=repo, supplier_gateway=None, clock=ClockImpl())
+
+        async def handler(event):
+            await repo.mark_retry(event.id, 1, event.next_attempt_at, "TIMEOUT", "slow")
+
+        worker.register_handler("BOOK_SUPPLIER", handler, manages_status=True)
+        await worker._process_batch()
+
+        self.assertEqual((await repo.get_by_id(1)).status, "RETRY")
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "fork start method")
+class TestWorkerSupervisor(unittest.TestCase):
+    def _config(self, **kwargs) -> RunnerConfig:
+        return RunnerConfig(
+            processes=2,
+            restart_backoff_seconds=0,
+            drain_timeout_seconds=5,
+            **kwargs,
+        )
+
+    def test_restarts_crashed_children(self):
+        supervisor = WorkerSupervisor(self._config(), target=_crash, start_method="fork")
+        try:
+            deadline = time.monotonic() + 5
+            while supervisor.restarts < 4 and time.monotonic() < deadline:
+                supervisor.supervise()
+                time.sleep(0.02)
+        finally:
+            supervisor.shutdown()
+
+        self.assertGreaterEqual(supervisor.restarts, 4)
+
+    def test_shutdown_terminates_children_gracefully(self):
+        supervisor = WorkerSupervisor(
+            self._config(), target=_idle_until_sigterm, start_method="fork"
+        )
+        supervisor.supervise()
+        children = list(supervisor.children.values())
+        time.sleep(0.2)
+
+        started = time.perf_counter()
+        supervisor.shutdown()
+
+        self.assertLess(time.perf_counter() - started, 5)
+        self.assertEqual([p.exitcode for p in children], [0, 0])
+        self.assertEqual(supervisor.restarts, 0)
+
+    def test_warns_when_api_cannot_wake_children(self):
+        local = WorkerSupervisor(self._config(notify_backend="local"), target=_crash)
+
+        with self.assertLogs("app.infrastructure.messaging.runner", "WARNING") as logs:
+            self.assertFalse(local.check_notify_backend())
+
+        self.assertIn("OUTBOX_NOTIFY_BACKEND=socket", logs.output[0])
+        self.assertTrue(WorkerSupervisor(self._config(), target=_crash).check_notify_backend())
+
+    def test_warns_when_api_notifies_fewer_ports_than_processes(self):
+        supervisor = WorkerSupervisor(self._config(notify_listeners=1), target=_crash)
+
+        with self.assertLogs("app.infrastructure.messaging.runner", "WARNING") as logs:
+            self.assertFalse(supervisor.check_notify_backend())
+
+        self.assertIn("OUTBOX_WORKER_PROCESSES=2", logs.output[0])
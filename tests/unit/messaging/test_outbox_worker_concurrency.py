@@ -0,0 +1,93 @@
+import asyncio
+import time
+import unittest
+
+from app.application.retry_policy import RetryPolicy
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+from app.infrastructure.gateways.in_memory.supplier_gateway import StubSupplierGateway
+from app.infrastructure.messaging.outbox_worker import OutboxWorker
+from app.infrastructure.services.clock_impl import ClockImpl
+
+
+class TestOutboxWorkerConcurrency(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.repo = InMemoryOutboxRepo()
+        for i in range(10):
+            await self.repo.enqueue(
+                event_type="BOOK_SUPPLIER",
+                aggregate_type="reservation",
+                aggregate_code=f"RES-{i}",
+                payload={"reservation_code": f"RES-{i}"},
+            )
+
+    def _worker(self, **kwargs) -> OutboxWorker:
+        return OutboxWorker(
+            outbox_repo=self.repo,
+            supplier_gateway=StubSupplierGateway(),
+            clock=ClockImpl(),
+            poll_interval_seconds=0.01,
+            **kwargs,
+        )
+
+    async def test_batch_runs_handlers_concurrently(self):
+        worker = self._worker(max_in_flight=10)
+        worker.register_handler("BOOK_SUPPLIER", lambda event: asyncio.sleep(0.2))
+
+        started = time.perf_counter()
+        processed = await worker._process_batch()
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(processed, 10)
+        self.assertLess(elapsed, 1.0)
+
+    async def test_in_flight_never_exceeds_limit(self):
+        worker = self._worker(max_in_flight=3)
+        peak = 0
+        running = 0
+
+        async def handler(event):
+            nonlocal peak, running
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        worker.register_handler("BOOK_SUPPLIER", handler)
+        task = asyncio.create_task(worker.start())
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if all(e.status == "DONE" for e in self.repo._events.values()):
+                break
+        await worker.stop()
+        await task
+
+        self.assertEqual(peak, 3)
+        self.assertTrue(all(e.status == "DONE" for e in self.repo._events.values()))
+
+    async def test_event_timeout_schedules_retry(self):
+        worker = self._worker(max_in_flight=10, event_timeout_seconds=0.05)
+        worker.register_handler("BOOK_SUPPLIER", lambda event: asyncio.sleep(5))
+
+        processed = await worker._process_batch()
+
+        self.assertEqual(processed, 0)
+        event = self.repo._events[1]
+        self.assertEqual(event.status, "RETRY")
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.error_code, "TimeoutError")
+
+    async def test_non_retryable_error_moves_event_to_dlq(self):
+        async def handler(event):
+            raise PermissionError("bad credentials")
+
+        worker = self._worker(max_in_flight=10, retry_policy=RetryPolicy(max_attempts=1))
+        worker.register_handler("BOOK_SUPPLIER", handler)
+
+        await worker._process_batch()
+
+        self.assertEqual(self.repo._events[1].status, "FAILED")
+        self.assertEqual(len(self.repo.dead_letters), 10)
+        dead_letter = self.repo.dead_letters[0]
+        self.assertEqual(dead_letter["original_event_id"], 1)
+        self.assertEqual(dead_letter["attempts"], 1)
+        self.assertEqual(dead_letter["error_code"], "PermissionError")
@@ -0,0 +1,129 @@
+import asyncio
+import unittest
+from collections import Counter
+
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+from app.infrastructure.messaging.outbox_worker import OutboxWorker
+from app.infrastructure.messaging.supplier_scheduler import SupplierFairScheduler
+from app.infrastructure.services.clock_impl import ClockImpl
+
+SLOW, HEALTHY, OTHER = 1, 7, 9
+
+
+class TestSupplierFairScheduler(unittest.TestCase):
+    def test_round_robin_between_suppliers(self):
+        scheduler = SupplierFairScheduler(max_in_flight_per_supplier=10)
+
+        allocation = scheduler.allocate(6, {SLOW: 100, HEALTHY: 100, OTHER: 100}, {})
+
+        self.assertEqual(allocation, {SLOW: 2, HEALTHY: 2, OTHER: 2})
+
+    def test_cap_leaves_slots_for_other_suppliers(self):
+        scheduler = SupplierFairScheduler(max_in_flight_per_supplier=2)
+
+        allocation = scheduler.allocate(8, {SLOW: 500, HEALTHY: 3}, {SLOW: 1})
+
+        self.assertEqual(allocation, {SLOW: 1, HEALTHY: 2})
+
+    def test_capped_supplier_gets_nothing(self):
+        scheduler = SupplierFairScheduler(
+            max_in_flight_per_supplier=4, max_in_flight_overrides={SLOW: 1}
+        )
+
+        allocation = scheduler.allocate(4, {SLOW: 500, HEALTHY: 1}, {SLOW: 1})
+
+        self.assertEqual(allocation, {HEALTHY: 1})
+
+    def test_weights(self):
+        scheduler = SupplierFairScheduler(
+            max_in_flight_per_supplier=100, weights={HEALTHY: 3, SLOW: 0.5}
+        )
+        served = Counter()
+        for _ in range(10):
+            for supplier_id, count in scheduler.allocate(
+                4, {SLOW: 100, HEALTHY: 100, OTHER: 100}, {}
+            ).items():
+                served[supplier_id] += count
+
+        self.assertEqual(sum(served.values()), 40)
+        self.assertGreater(served[HEALTHY], served[OTHER])
+        self.assertGreater(served[OTHER], served[SLOW])
+        self.assertGreater(served[SLOW], 0)
+
+    def test_rotation_across_calls(self):
+        scheduler = SupplierFairScheduler()
+
+        first = scheduler.allocate(1, {SLOW: 5, HEALTHY: 5, OTHER: 5}, {})
+        second = scheduler.allocate(1, {SLOW: 5, HEALTHY: 5, OTHER: 5}, {})
+        third = scheduler.allocate(1, {SLOW: 5, HEALTHY: 5, OTHER: 5}, {})
+
+        self.assertEqual([first, second, third], [{SLOW: 1}, {HEALTHY: 1}, {OTHER: 1}])
+
+    def test_rejects_non_positive_weight(self):
+        with self.assertRaises(ValueError):
+            SupplierFairScheduler(weights={SLOW: 0})
+
+
+class TestFairWorker(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.repo = InMemoryOutboxRepo()
+        # A backlog for the slow supplier enqueued ahead of healthy bookings
+        for i in range(20):
+            await self.repo.enqueue(
+                "BOOK_SUPPLIER", "reservation", f"SLOW-{i}", {}, supplier_id=SLOW
+            )
+        for i in range(3):
+            await self.repo.enqueue(
+                "BOOK_SUPPLIER", "reservation", f"OK-{i}", {}, supplier_id=HEALTHY
+            )
+        self.release = asyncio.Event()
+        self.started: list[str] = []
+
+    def _worker(self) -> OutboxWorker:
+        worker = OutboxWorker(
+            outbox_repo=self.repo,
+            supplier_gateway=None,
+            clock=ClockImpl(),
+            max_in_flight=4,
+            scheduler=SupplierFairScheduler(max_in_flight_per_supplier=2),
+        )
+
+        async def handler(event):
+            self.started.append(event.aggregate_code)
+            if event.supplier_id == SLOW:
+                await self.release.wait()
+
+        worker.register_handler("BOOK_SUPPLIER", handler)
+        return worker
+
+    async def test_slow_supplier_backlog_does_not_starve_others(self):
+        worker = self._worker()
+
+        self.assertEqual(await worker._fill_slots(), 4)
+        # Healthy events finish; the slow supplier is at its cap, so the freed
+        # slots go to the remaining healthy event
+        await asyncio.sleep(0.01)
+        self.assertEqual(await worker._fill_slots(), 1)
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(
+            sorted(c for c in self.started if c.startswith("OK")), ["OK-0", "OK-1", "OK-2"]
+        )
+        self.assertEqual(sum(c.startswith("SLOW") for c in self.started), 2)
+        self.release.set()
+        await worker._drain()
+
+    async def test_fifo_without_scheduler(self):
+        worker = OutboxWorker(
+            outbox_repo=self.repo, supplier_gateway=None, clock=ClockImpl(), max_in_flight=4
+        )
+        events = await worker._claim(4)
+
+        self.assertEqual({e.supplier_id for e in events}, {SLOW})
+
+    async def test_count_ready_by_supplier(self):
+        self.assertEqual((await self.repo.get_by_id(1)).supplier_id, SLOW)
+        self.assertEqual(
+            await self.repo.count_ready_by_supplier(now=ClockImpl().now()),
+            {SLOW: 20, HEALTHY: 3},
+        )
@@ -0,0 +1,152 @@
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from dataclasses import replace
+
+from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.use_cases.drain_outbox_book_supplier import DrainOutboxBookSupplierUseCase
+from app.application.use_cases.process_outbox_book_supplier import (
+    ProcessOutboxBookSupplierUseCase,
+)
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+from app.infrastructure.gateways.in_memory.reservation_repo import InMemoryReservationRepo
+from app.infrastructure.gateways.in_memory.supplier_request_repo import (
+    InMemorySupplierRequestRepo,
+)
+from app.infrastructure.gateways.in_memory.transaction_manager import NoopTransactionManager
+from app.infrastructure.gateways.supplier_gateway_selector import SupplierGatewaySelector
+from tests.unit.use_cases.test_process_outbox_book_supplier import _reservation
+
+
+class SlowGateway(SupplierGateway):
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+
+    async def book(self, reservation_code, idem_key, reservation_snapshot=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return SupplierBookingResult(
+            status="SUCCESS", supplier_reservation_code=f"SUP-{reservation_code}"
+        )
+
+    async def confirm_booking(self, reservation_code, details):
+        raise NotImplementedError
+
+
+class TestDrainOutboxBookSupplier(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.reservation_repo = InMemoryReservationRepo()
+        self.outbox_repo = InMemoryOutboxRepo(reservation_repo=self.reservation_repo)
+        self.supplier_request_repo = InMemorySupplierRequestRepo()
+        self.gateway = SlowGateway()
+        for i in range(10):
+            code = f"RES-{i}"
+            supplier_id = 11 if i < 8 else 22
+            await self.reservation_repo.create_reservation(
+                replace(_reservation(code), supplier_id=supplier_id), [], []
+            )
+            await self.outbox_repo.enqueue(
+                "BOOK_SUPPLIER", "reservation", code, {"reservation_code": code}
+            )
+
+        @asynccontextmanager
+        async def scope():
+            yield ProcessOutboxBookSupplierUseCase(
+                outbox_repo=self.outbox_repo,
+                reservation_repo=self.reservation_repo,
+                supplier_gateway_selector=SupplierGatewaySelector(default_gateway=self.gateway),
+                supplier_request_repo=self.supplier_request_repo,
+                transaction_manager=NoopTransactionManager(),
+            )
+
+        self.drain = DrainOutboxBookSupplierUseCase(
+            outbox_repo=self.outbox_repo, use_case_scope=scope
+        )
+
+    async def test_drains_supplier_backlog_concurrently(self):
+        summary = await self.drain.execute(limit=100, supplier_id=11, concurrency=4)
+
+        self.assertEqual(summary["claimed"], 8)
+        self.assertEqual(summary["by_status"], {"CONFIRMED": 8})
+        self.assertEqual(self.gateway.peak, 4)
+        self.assertEqual(
+            sorted(r["reservation_code"] for r in summary["results"]),
+            [f"RES-{i}" for i in range(8)],
+        )
+        self.assertTrue(all("elapsed_ms" in r for r in summary["results"]))
+        for i in (8, 9):
+            self.assertEqual((await self.outbox_repo.get_by_id(i + 1)).status, "NEW")
+
+    async def test_respects_limit(self):
+        summary = await self.drain.execute(limit=3, concurrency=8)
+
+        self.assertEqual(summary["claimed"], 3)
+
+    async def test_failed_event_is_released_for_retry(self):
+        get_by_code = self.reservation_repo.get_by_code
+
+        async def flaky_get_by_code(code):
+            if code == "RES-0":
+                raise ConnectionError("db down")
+            return await get_by_code(code)
+
+        self.reservation_repo.get_by_code = flaky_get_by_code
+
+        summary = await self.drain.execute(limit=1)
+
+        [outcome] = summary["results"]
+        self.assertEqual((outcome["status"], outcome["error"]), ("ERROR", "db down"))
+        event = await self.outbox_repo.get_by_id(outcome["event_id"])
+        self.assertEqual((event.status, event.attempts), ("RETRY", 1))
+
+    async def test_non_retryable_failure_goes_to_dlq(self):
+        del self.reservation_repo.reservations["RES-0"]
+
+        summary = await self.drain.execute(limit=1)
+
+        [outcome] = summary["results"]
+        self.assertEqual(outcome["error"], "Reservation not found")
+        self.assertEqual((await self.outbox_repo.get_by_id(outcome["event_id"])).status, "FAILED")
+        [dead_letter] = self.outbox_repo.dead_letters
+        self.assertEqual((dead_letter["error_code"], dead_letter["attempts"]), ("HTTPException", 1))
+
+    async def test_claims_in_chunks_of_concurrency(self):
+        claim_ready = self.outbox_repo.claim_ready
+        claimed_chunks = []
+
+        async def recording_claim_ready(**kwargs):
+            events = await claim_ready(**kwargs)
+            # Nothing from the previous chunk is still leased when the next one is claimed
+            self.assertEqual(self.gateway.running, 0)
+            claimed_chunks.append(len(events))
+            return events
+
+        self.outbox_repo.claim_ready = recording_claim_ready
+
+        summary = await self.drain.execute(limit=100, supplier_id=11, concurrency=3)
+
+        self.assertEqual(claimed_chunks, [3, 3, 2, 0])
+        self.assertEqual(summary["by_status"], {"CONFIRMED": 8})
+
+    async def test_event_whose_lease_was_taken_over_is_not_booked(self):
+        claim_ready = self.outbox_repo.claim_ready
+
+        async def claim_then_lose_lease(**kwargs):
+            events = await claim_ready(**kwargs)
+            for event in events:
+                if event.aggregate_code == "RES-0":
+                    # Lease expired while queued and another worker re-claimed it
+                    self.outbox_repo._events[event.id].locked_by = "other-worker"
+            return events
+
+        self.outbox_repo.claim_ready = claim_then_lose_lease
+
+        summary = await self.drain.execute(limit=2, supplier_id=11, concurrency=2)
+
+        self.assertEqual(summary["by_status"], {"LEASE_LOST": 1, "CONFIRMED": 1})
+        event = await self.outbox_repo.get_by_id(1)
+        self.assertEqual((event.status, event.locked_by), ("IN_PROGRESS", "other-worker"))
+        self.assertEqual(await self.supplier_request_repo.list_for_reservation("RES-0"), [])
@@ -0,0 +1,324 @@
+import asyncio
+import unittest
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from sqlalchemy.exc import OperationalError
+
+import app.application.use_cases.process_outbox_book_supplier as use_case_module
+from app.application.interfaces.reservation_repo import ReservationInput
+from app.application.interfaces.supplier_gateway import SupplierBookingResult, SupplierGateway
+from app.application.use_cases.process_outbox_book_supplier import (
+    ProcessOutboxBookSupplierUseCase,
+)
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+from app.infrastructure.gateways.in_memory.reservation_repo import InMemoryReservationRepo
+from app.infrastructure.gateways.in_memory.supplier_request_repo import (
+    InMemorySupplierRequestRepo,
+)
+from app.infrastructure.gateways.supplier_gateway_selector import SupplierGatewaySelector
+from app.infrastructure.gateways.supplier_limiter import SupplierLimiterRegistry
+
+
+class RecordingTransactionManager:
+    def __init__(self) -> None:
+        self.active = False
+        self.committed = 0
+
+    @asynccontextmanager
+    async def start(self):
+        self.active = True
+        try:
+            yield
+        finally:
+            self.active = False
+        self.committed += 1
+
+
+class AssertingGateway(SupplierGateway):
+    def __init__(self, tx: RecordingTransactionManager, result=None, error=None) -> None:
+        self._tx = tx
+        self._result = result
+        self._error = error
+        self.calls_inside_transaction = 0
+
+    async def book(self, reservation_code, idem_key, reservation_snapshot=None):
+        if self._tx.active:
+            self.calls_inside_transaction += 1
+        if self._error:
+            raise self._error
+        return self._result
+
+    async def confirm_booking(self, reservation_code, details):
+        raise NotImplementedError
+
+
+class StealingGateway(SupplierGateway):
+    """Succeeds, but the lease expires and another worker reclaims the event meanwhile."""
+
+    def __init__(self, outbox_repo: InMemoryOutboxRepo) -> None:
+        self._outbox_repo = outbox_repo
+
+    async def book(self, reservation_code, idem_key, reservation_snapshot=None):
+        later = datetime.now(timezone.utc) + timedelta(minutes=5)
+        await self._outbox_repo.claim_ready(limit=1, locked_by="w2", now=later)
+        return SupplierBookingResult(status="SUCCESS", supplier_reservation_code="SUP-1")
+
+    async def confirm_booking(self, reservation_code, details):
+        raise NotImplementedError
+
+def _reservation(code: str) -> ReservationInput:
+    return ReservationInput(
+        reservation_code=code,
+        supplier_id=11,
+        country_code="MX",
+        pickup_office_id=101,
+        dropoff_office_id=102,
+        car_category_id=5,
+        pickup_datetime="2026-02-01T10:00:00",
+        dropoff_datetime="2026-02-05T10:00:00",
+        rental_days=4,
+        currency_code="USD",
+        public_price_total=Decimal("350.00"),
+        supplier_cost_total=Decimal("200.00"),
+        taxes_total=Decimal("50.00"),
+        fees_total=Decimal("20.00"),
+        discount_total=Decimal("0.00"),
+        commission_total=Decimal("30.00"),
+        cashback_earned_amount=Decimal("0.00"),
+        booking_device="MOBILE_WEB",
+        sales_channel_id=2,
+        customer_ip="203.0.113.10",
+        customer_user_agent="pytest",
+    )
+
+
+class TestProcessOutboxBookSupplierPhases(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tx = RecordingTransactionManager()
+        self.outbox_repo = InMemoryOutboxRepo()
+        self.reservation_repo = InMemoryReservationRepo()
+        self.supplier_request_repo = InMemorySupplierRequestRepo()
+        await self.reservation_repo.create_reservation(_reservation("RES-1"), [], [])
+        await self.outbox_repo.enqueue(
+            "BOOK_SUPPLIER", "reservation", "RES-1", {"reservation_code": "RES-1"}
+        )
+
+    def _use_case(
+        self,
+        gateway: SupplierGateway,
+        limiters: SupplierLimiterRegistry | None = None,
+        booking_budget_seconds: float | None = None,
+    ) -> ProcessOutboxBookSupplierUseCase:
+        return ProcessOutboxBookSupplierUseCase(
+            outbox_repo=self.outbox_repo,
+            reservation_repo=self.reservation_repo,
+            supplier_gateway_selector=SupplierGatewaySelector(default_gateway=gateway),
+            supplier_request_repo=self.supplier_request_repo,
+            transaction_manager=self.tx,
+            supplier_limiters=limiters,
+            booking_budget_seconds=booking_budget_seconds,
+        )
+
+    async def test_supplier_call_runs_outside_transaction(self):
+        gateway = AssertingGateway(
+            self.tx,
+            result=SupplierBookingResult(status="SUCCESS", supplier_reservation_code="SUP-1"),
+        )
+
+        result = await self._use_case(gateway).execute("RES-1", idem_key="k1")
+
+        self.assertEqual(result["status"], "CONFIRMED")
+        self.assertEqual(gateway.calls_inside_transaction, 0)
+        self.assertEqual(self.tx.committed, 2)
+
+    async def test_gateway_exception_is_recorded_as_failure(self):
+        gateway = AssertingGateway(self.tx, error=RuntimeError("connection reset"))
+
+        result = await self._use_case(gateway).execute("RES-1", idem_key="k1")
+
+        self.assertEqual(result["status"], "ON_REQUEST")
+        event = await self.outbox_repo.get_by_id(1)
+        self.assertEqual(event.status, "RETRY")
+        self.assertEqual(event.error_code, "GATEWAY_ERROR")
+
+    async def test_non_retryable_error_goes_straight_to_dlq(self):
+        gateway = AssertingGateway(
+            self.tx, result=SupplierBookingResult(status="FAILED", error_code="AUTH_ERROR")
+        )
+
+        result = await self._use_case(gateway).execute("RES-1", idem_key="k1")
+
+        self.assertEqual(result["retry_reason"], "NON_RETRYABLE")
+        self.assertIsNone(result["next_attempt_at"])
+        self.assertEqual((await self.outbox_repo.get_by_id(1)).status, "FAILED")
+        self.assertEqual(self.outbox_repo.dead_letters[0]["error_code"], "AUTH_ERROR")
+
+    async def test_retry_after_is_honored(self):
+        now = datetime.now(timezone.utc)
+
+        class SlowThrottledGateway(SupplierGateway):
+            async def book(self, reservation_code, idem_key, reservation_snapshot=None):
+                await asyncio.sleep(0.1)
+                return SupplierBookingResult(
+                    status="FAILED",
+                    error_code="HTTP_ERROR",
+                    http_status=429,
+                    retry_after_seconds=120,
+                )
+
+            async def confirm_booking(self, reservation_code, details):
+                raise NotImplementedError
+
+        await self._use_case(SlowThrottledGateway()).execute("RES-1", idem_key="k1", now=now)
+
+        event = await self.outbox_repo.get_by_id(1)
+        self.assertEqual(event.status, "RETRY")
+        # Counted from when the result was recorded, not from the claim
+        self.assertGreaterEqual(event.next_attempt_at, now + timedelta(seconds=120.1))
+        self.assertLess(event.next_attempt_at, now + timedelta(seconds=121))
+
+    async def test_deadlock_retries_recording_without_rebooking(self):
+        gateway = AssertingGateway(
+            self.tx,
+            result=SupplierBookingResult(status="SUCCESS", supplier_reservation_code="SUP-1"),
+        )
+        gateway_book = gateway.book
+        book_calls = []
+
+        async def counting_book(*args, **kwargs):
+            book_calls.append(args)
+            return await gateway_book(*args, **kwargs)
+
+        gateway.book = counting_book
+        mark_done = self.outbox_repo.mark_done
+        deadlocks = [OperationalError("UPDATE outbox_events", {}, Exception("(1213, 'Deadlock')"))]
+
+        async def deadlocking_mark_done(*args, **kwargs):
+            if deadlocks:
+                raise deadlocks.pop()
+            return await mark_done(*args, **kwargs)
+
+        self.outbox_repo.mark_done = deadlocking_mark_done
+
+        with patch("app.infrastructure.db.retry.asyncio.sleep"):
+            result = await self._use_case(gateway).execute("RES-1", idem_key="k1")
+
+        self.assertEqual(result["status"], "CONFIRMED")
+        self.assertEqual(len(book_calls), 1)
+        self.assertEqual((await self.outbox_repo.get_by_id(1)).status, "DONE")
+
+    async def test_supplier_limit_timeout_is_retried_later(self):
+        now = datetime.now(timezone.utc)
+        limiters = SupplierLimiterRegistry(max_concurrency=1, max_wait_seconds=0.01)
+        gateway = AssertingGateway(
+            self.tx,
+            result=SupplierBookingResult(status="SUCCESS", supplier_reservation_code="SUP-1"),
+        )
+
+        async with limiters.slot(11):  # another booking to supplier 11 holds the only slot
+            result = await self._use_case(gateway, limiters).execute(
+                "RES-1", idem_key="k1", now=now
+            )
+
+        self.assertEqual(result["status"], "ON_REQUEST")
+        event = await self.outbox_repo.get_by_id(1)
+        self.assertEqual(event.status, "RETRY")
+        self.assertEqual(event.error_code, "SUPPLIER_RATE_LIMITED")
+        self.assertEqual(event.attempts, 0)  # the supplier was never called
+        self.assertGreaterEqual(event.next_attempt_at, now + timedelta(seconds=5))
+        self.assertEqual(limiters.get(11).snapshot()["rejected_total"], 1)
+
+    async def test_booking_past_its_budget_is_cut_and_retried(self):
+        class HangingGateway(SupplierGateway):
+            async def book(self, reservation_code, idem_key, reservation_snapshot=None):
+                await asyncio.sleep(10)
+
+            async def confirm_booking(self, reservation_code, details):
+                raise NotImplementedError
+
+        result = await self._use_case(HangingGateway(), booking_budget_seconds=0.05).execute(
+            "RES-1", idem_key="k1"
+        )
+
+        self.assertEqual(result["status"], "ON_REQUEST")
+        event = await self.outbox_repo.get_by_id(1)
+        self.assertEqual(event.status, "RETRY")
+        self.assertEqual(event.error_code, "DEADLINE_EXCEEDED")
+
+    async def test_uses_event_already_leased_by_worker(self):
+        now = datetime.now(timezone.utc) + timedelta(seconds=1)
+        [event] = await self.outbox_repo.claim_ready(limit=1, locked_by="w1", now=now)
+        gateway = AssertingGateway(
+            self.tx,
+            result=SupplierBookingResult(status="SUCCESS", supplier_reservation_code="SUP-1"),
+        )
+
+        result = await self._use_case(gateway).execute(
+            "RES-1", idem_key="k1", worker_id="w1", now=now, event=event
+        )
+
+        self.assertEqual(result["status"], "CONFIRMED")
+        self.assertEqual((await self.outbox_repo.get_by_id(event.id)).status, "DONE")
+
+
+    async def test_heartbeat_renews_lease_during_slow_supplier_call(self):
+        class SlowGateway(SupplierGateway):
+            async def book(self, reservation_code, idem_key, reservation_snapshot=None):
+                await asyncio.sleep(0.2)
+                return SupplierBookingResult(status="SUCCESS", supplier_reservation_code="SUP-1")
+
+            async def confirm_booking(self, reservation_code, details):
+                raise NotImplementedError
+
+        renewals = []
+        renew_lease = self.outbox_repo.renew_lease
+
+        async def recording_renew(**kwargs):
+            renewals.append(kwargs["now"])
+            return await renew_lease(**kwargs)
+
+        self.outbox_repo.renew_lease = recording_renew
+        with patch.object(use_case_module, "LEASE_TTL_SECONDS", 0.15):
+            result = await self._use_case(SlowGateway()).execute("RES-1", idem_key="k1")
+
+        self.assertEqual(result["status"], "CONFIRMED")
+        self.assertGreaterEqual(len(renewals), 2)
+
+    async def test_lost_lease_leaves_event_to_new_owner_but_records_booking(self):
+        result = await self._use_case(StealingGateway(self.outbox_repo)).execute(
+            "RES-1", idem_key="k1", worker_id="w1"
+        )
+
+        self.assertTrue(result["lease_lost"])
+        event = await self.outbox_repo.get_by_id(1)
+        self.assertEqual((event.status, event.locked_by), ("IN_PROGRESS", "w2"))
+        reservation = await self.reservation_repo.get_by_code("RES-1")
+        self.assertEqual(reservation.status, "CONFIRMED")
+        self.assertEqual(reservation.supplier_reservation_code, "SUP-1")
+
+        # The new owner closes the event without booking a second time
+        gateway = AssertingGateway(self.tx, error=AssertionError("booked twice"))
+        result = await self._use_case(gateway).execute("RES-1", idem_key="k1", event=event)
+
+        self.assertEqual(result["status"], "CONFIRMED")
+        self.assertTrue(result["already_confirmed"])
+        self.assertEqual((await self.outbox_repo.get_by_id(1)).status, "DONE")
+        requests = await self.supplier_request_repo.list_for_reservation("RES-1")
+        self.assertEqual([request.status for request in requests], ["SUCCESS"])
+
+    async def test_lost_lease_with_failure_leaves_reservation_to_new_owner(self):
+        class FailingStealingGateway(StealingGateway):
+            async def book(self, reservation_code, idem_key, reservation_snapshot=None):
+                await super().book(reservation_code, idem_key, reservation_snapshot)
+                return SupplierBookingResult(status="FAILED", error_code="TIMEOUT")
+
+        result = await self._use_case(FailingStealingGateway(self.outbox_repo)).execute(
+            "RES-1", idem_key="k1", worker_id="w1"
+        )
+
+        self.assertEqual(result, {"status": "ON_REQUEST", "lease_lost": True})
+        reservation = await self.reservation_repo.get_by_code("RES-1")
+        self.assertNotEqual(reservation.status, "CONFIRMED")
@@ -0,0 +1,119 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+
+from app.application.interfaces.dlq_replay_repo import (
+    REPLAY_COMPLETED,
+    REPLAY_FAILED,
+    DeadLetterFilter,
+)
+from app.application.use_cases.replay_dead_letters import ReplayDeadLettersUseCase
+from app.infrastructure.gateways.in_memory.dlq_replay_repo import InMemoryDlqReplayRepo
+from app.infrastructure.gateways.in_memory.outbox_repo import InMemoryOutboxRepo
+
+
+class TestReplayDeadLetters(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.outbox = InMemoryOutboxRepo()
+        now = datetime.now(timezone.utc) + timedelta(seconds=1)
+        for i in range(10):
+            supplier_id = 93 if i < 6 else 1
+            await self.outbox.enqueue(
+                event_type="BOOK_SUPPLIER",
+                aggregate_type="reservation",
+                aggregate_code=f"RES-{i}",
+                payload={"reservation_code": f"RES-{i}"},
+                supplier_id=supplier_id,
+            )
+            [event] = await self.outbox.claim_ready(
+                limit=1, locked_by="w1", now=now, supplier_id=supplier_id
+            )
+            event.attempts = 5
+            await self.outbox.move_to_dlq(
+                event=event, error_code="TIMEOUT" if i % 2 == 0 else "AUTH_ERROR", locked_by="w1"
+            )
+        self.repo = InMemoryDlqReplayRepo(self.outbox)
+        self.sleeps: list[float] = []
+
+        async def fake_sleep(seconds: float) -> None:
+            self.sleeps.append(seconds)
+
+        self.use_case = ReplayDeadLettersUseCase(self.repo, sleep=fake_sleep)
+
+    async def test_replays_only_matching_dead_letters(self):
+        replay = await self.use_case.start(
+            DeadLetterFilter(supplier_id=93, error_code="TIMEOUT"),
+            rate_per_second=10,
+            batch_size=2,
+        )
+        self.assertEqual(replay.total, 3)
+
+        replay = await self.use_case.run(replay.id)
+
+        self.assertEqual((replay.status, replay.replayed, replay.skipped), (REPLAY_COMPLETED, 3, 0))
+        retried = [e for e in self.outbox._events.values() if e.status == "RETRY"]
+        self.assertEqual([e.aggregate_code for e in retried], ["RES-0", "RES-2", "RES-4"])
+        self.assertTrue(all(e.attempts == 0 for e in retried))
+        self.assertEqual(
+            sum(1 for dl in self.outbox.dead_letters if dl["replay_id"] == replay.id), 3
+        )
+
+    async def test_replayed_events_are_spread_at_the_rate(self):
+        replay = await self.use_case.start(DeadLetterFilter(), rate_per_second=4, batch_size=5)
+
+        await self.use_case.run(replay.id)
+
+        due = sorted(e.next_attempt_at for e in self.outbox._events.values())
+        gaps = [(b - a).total_seconds() for a, b in zip(due, due[1:], strict=False)]
+        self.assertTrue(all(abs(gap - 0.25) < 0.05 for gap in gaps), gaps)
+        # Second batch written one batch (5 / 4 s) ahead of its schedule at most
+        self.assertEqual(len(self.sleeps), 1)
+        self.assertAlmostEqual(self.sleeps[0], 1.25, delta=0.1)
+
+    async def test_dead_letters_are_replayed_once(self):
+        first = await self.use_case.start(DeadLetterFilter(), rate_per_second=100, batch_size=50)
+        await self.use_case.run(first.id)
+
+        second = await self.use_case.start(DeadLetterFilter(), rate_per_second=100, batch_size=50)
+
+        self.assertEqual(second.total, 0)
+
+    async def test_interrupted_replay_resumes_after_last_batch(self):
+        replay = await self.use_case.start(DeadLetterFilter(), rate_per_second=100, batch_size=3)
+        requeue_batch = self.repo.requeue_batch
+        calls = 0
+
+        async def crash_on_second_batch(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                raise ConnectionError("lost connection")
+            return await requeue_batch(*args, **kwargs)
+
+        self.repo.requeue_batch = crash_on_second_batch
+        with self.assertRaises(ConnectionError):
+            await self.use_case.run(replay.id)
+        failed = await self.use_case.get(replay.id)
+        self.assertEqual((failed.status, failed.replayed), (REPLAY_FAILED, 3))
+
+        await self.use_case.resume(replay.id)
+        done = await self.use_case.run(replay.id)
+
+        self.assertEqual((done.status, done.replayed, done.skipped), (REPLAY_COMPLETED, 10, 0))
+
+    async def test_stale_cursor_is_rejected(self):
+        replay = await self.use_case.start(DeadLetterFilter(), rate_per_second=100, batch_size=3)
+        batch = await self.repo.next_batch(replay)
+        now = datetime.now(timezone.utc)
+        await self.repo.requeue_batch(replay, batch, [now] * len(batch))
+
+        self.assertIsNone(await self.repo.requeue_batch(replay, batch, [now] * len(batch)))
+
+    async def test_completed_replay_cannot_resume(self):
+        replay = await self.use_case.start(DeadLetterFilter(), rate_per_second=100, batch_size=50)
+        await self.use_case.run(replay.id)
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.use_case.resume(replay.id)
+        self.assertEqual(ctx.exception.status_code, 409)
@@ -0,0 +1,94 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from fastapi import HTTPException
+
+from app.application.retry_policy import (
+    ATTEMPTS_EXHAUSTED,
+    NON_RETRYABLE,
+    PERMANENT,
+    THROTTLED,
+    TRANSIENT,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(rng=lambda: 0.5)  # no jitter
+
+    def test_classification(self):
+        self.assertEqual(self.policy.classify("AUTH_ERROR"), PERMANENT)
+        self.assertEqual(self.policy.classify("MISSING_SNAPSHOT"), PERMANENT)
+        self.assertEqual(self.policy.classify("HTTP_ERROR", 400), PERMANENT)
+        self.assertEqual(self.policy.classify("CIRCUIT_OPEN"), THROTTLED)
+        self.assertEqual(self.policy.classify("HTTP_ERROR", 429), THROTTLED)
+        self.assertEqual(self.policy.classify("HTTP_ERROR", 503), THROTTLED)
+        self.assertEqual(self.policy.classify("HTTP_ERROR", 502), TRANSIENT)
+        self.assertEqual(self.policy.classify("TIMEOUT"), TRANSIENT)
+        self.assertEqual(self.policy.classify(None), TRANSIENT)
+
+    def test_exponential_backoff_capped(self):
+        delays = [self.policy.decide(n, "TIMEOUT").delay_seconds for n in range(1, 5)]
+
+        self.assertEqual(delays, [15, 30, 60, 120])
+        capped = RetryPolicy(max_attempts=20, rng=lambda: 0.5).decide(10, "TIMEOUT")
+        self.assertEqual(capped.delay_seconds, 300)
+
+    def test_jitter_spreads_delays(self):
+        low = RetryPolicy(jitter=0.2, rng=lambda: 0.0).decide(2, "TIMEOUT").delay_seconds
+        high = RetryPolicy(jitter=0.2, rng=lambda: 1.0).decide(2, "TIMEOUT").delay_seconds
+
+        self.assertEqual((low, high), (24, 36))
+
+    def test_fails_fast_on_permanent_errors(self):
+        decision = self.policy.decide(1, "AUTH_ERROR")
+
+        self.assertFalse(decision.retry)
+        self.assertEqual(decision.reason, NON_RETRYABLE)
+        self.assertIsNone(decision.next_attempt_at(datetime.now(timezone.utc)))
+
+    def test_gives_up_after_max_attempts(self):
+        self.assertTrue(self.policy.decide(4, "TIMEOUT").retry)
+        self.assertEqual(self.policy.decide(5, "TIMEOUT").reason, ATTEMPTS_EXHAUSTED)
+
+    def test_throttling_floors(self):
+        self.assertEqual(self.policy.decide(1, "CIRCUIT_OPEN").delay_seconds, 60)
+        self.assertEqual(
+            self.policy.decide(1, "HTTP_ERROR", 429, retry_after_seconds=90).delay_seconds, 90
+        )
+        # Retry-After is a minimum, never shortens the backoff
+        self.assertEqual(self.policy.decide(3, "HTTP_ERROR", 503, 5).delay_seconds, 60)
+        self.assertEqual(self.policy.decide(1, "HTTP_ERROR", 429, 10**6).delay_seconds, 3600)
+
+    def test_throttled_attempts_do_not_consume_the_budget(self):
+        attempts = 3
+        for _ in range(self.policy.max_attempts * 2):
+            decision = self.policy.decide(attempts + 1, "CIRCUIT_OPEN")
+            self.assertTrue(decision.retry)
+            attempts = decision.attempts
+
+        self.assertEqual(attempts, 3)
+        self.assertEqual(self.policy.decide(attempts + 1, "TIMEOUT").attempts, 4)
+        self.assertTrue(self.policy.decide(5, "SUPPLIER_RATE_LIMITED").retry)
+        self.assertEqual(self.policy.decide(5, "TIMEOUT").reason, ATTEMPTS_EXHAUSTED)
+
+    def test_exceptions(self):
+        self.assertFalse(self.policy.decide_for_exception(1, HTTPException(404)).retry)
+        self.assertTrue(self.policy.decide_for_exception(1, HTTPException(409)).retry)
+        self.assertTrue(self.policy.decide_for_exception(1, asyncio.TimeoutError()).retry)
+        self.assertTrue(self.policy.decide_for_exception(1, RuntimeError("boom")).retry)
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    def test_seconds_and_http_date(self):
+        now = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+
+        self.assertEqual(parse_retry_after("120"), 120)
+        self.assertEqual(parse_retry_after(format_datetime(now + timedelta(seconds=30)), now), 30)
+        self.assertEqual(parse_retry_after(format_datetime(now - timedelta(seconds=30)), now), 0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))